@@ -4,7 +4,8 @@ from typing import Any, Dict, Optional, List, Type
 from dataclasses import dataclass, field
 from enum import Enum
 
-from .CacheStore import CacheStore, ArrayCacheStore, RedisCacheStore, FileCacheStore
+from .CacheStore import CacheStore, ArrayCacheStore, RedisCacheStore, FileCacheStore, TieredCacheStore
+from .CacheSerializers import CacheSerializerRegistry
 
 
 class CacheDriver(Enum):
@@ -14,6 +15,7 @@ class CacheDriver(Enum):
     REDIS = "redis"
     DATABASE = "database"
     MEMCACHED = "memcached"
+    TIERED = "tiered"
 
 
 @dataclass
@@ -35,6 +37,9 @@ class CacheConfig:
     default: str = "array"
     prefix: str = "laravel_cache"
     stores: Dict[str, CacheStoreConfig] = field(default_factory=dict)
+    serializer: str = "json"
+    compression: Optional[str] = None
+    compression_threshold: int = 1024
     
     def __post_init__(self) -> None:
         """Initialize default stores if not provided."""
@@ -63,6 +68,7 @@ class CacheDriverFactory:
         CacheDriver.ARRAY: ArrayCacheStore,
         CacheDriver.FILE: FileCacheStore,
         CacheDriver.REDIS: RedisCacheStore,
+        CacheDriver.TIERED: TieredCacheStore,
     }
     
     @classmethod
@@ -80,11 +86,17 @@ class CacheDriverFactory:
         
         # Create instance based on driver type
         if config.driver == CacheDriver.ARRAY:
-            return store_class()
+            return ArrayCacheStore(
+                max_items=config.options.get('max_items', 10000),
+                max_bytes=config.options.get('max_bytes'),
+                eviction_policy=config.options.get('eviction_policy', 'lru')
+            )
         
         elif config.driver == CacheDriver.FILE:
             return FileCacheStore(
-                cache_path=config.path or "storage/cache"
+                cache_path=config.path or "storage/cache",
+                gc_interval=config.options.get('gc_interval', 60.0),
+                gc_shards_per_pass=config.options.get('gc_shards_per_pass', 16)
             )
         
         elif config.driver == CacheDriver.REDIS:
@@ -96,7 +108,24 @@ class CacheDriverFactory:
             if config.password:
                 connection_params['password'] = config.password
             
-            return RedisCacheStore(connection_params)
+            return RedisCacheStore(
+                connection_params,
+                prefix=config.prefix,
+                max_connections=config.options.get('max_connections', 50)
+            )
+        
+        elif config.driver == CacheDriver.TIERED:
+            l2_config = config.options.get('l2')
+            if not isinstance(l2_config, CacheStoreConfig):
+                raise ValueError("Tiered cache driver requires an 'l2' CacheStoreConfig option")
+            
+            return TieredCacheStore(
+                cls.create(l2_config),
+                l1_max_items=config.options.get('l1_max_items', 1000),
+                l1_ttl=config.options.get('l1_ttl', 5),
+                sync_interval=config.options.get('sync_interval', 1.0),
+                channel=config.options.get('channel', f"{config.prefix}cache:near:invalidate")
+            )
         
         else:
             # Fallback for custom drivers
@@ -145,6 +174,19 @@ PRODUCTION_CONFIG = CacheConfig(
             port=6379,
             database=0
         ),
+        "near": CacheStoreConfig(
+            driver=CacheDriver.TIERED,
+            options={
+                'l2': CacheStoreConfig(
+                    driver=CacheDriver.REDIS,
+                    host="redis",
+                    port=6379,
+                    database=0
+                ),
+                'l1_max_items': 5000,
+                'l1_ttl': 5
+            }
+        ),
         "redis_sessions": CacheStoreConfig(
             driver=CacheDriver.REDIS,
             host="redis",
@@ -191,6 +233,13 @@ def configure_cache_manager(config: CacheConfig) -> None:
     # Set default store
     cache_manager.default_store = config.default
     
+    # Serializer used by repository caches
+    cache_manager.serializer = CacheSerializerRegistry.create(
+        config.serializer,
+        compression=config.compression,
+        compression_threshold=config.compression_threshold
+    )
+    
     # Create and register stores
     for name, store_config in config.stores.items():
         store = CacheDriverFactory.create(store_config)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Union
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+import base64
+import json
+import pickle
+import struct
+import uuid
+import zlib
+
+try:
+    from ulid import ULID
+except ImportError:  # python-ulid is optional
+    ULID = None  # type: ignore[assignment,misc]
+
+
+SerializedValue = Union[str, bytes]
+
+
+class CacheSerializer(ABC):
+    """Abstract cache serializer."""
+    
+    @abstractmethod
+    def serialize(self, value: Any) -> SerializedValue:
+        """Serialize a value for storage."""
+        pass
+    
+    @abstractmethod
+    def unserialize(self, data: SerializedValue) -> Any:
+        """Unserialize data from storage."""
+        pass
+
+
+def _encode_special(value: Any) -> Optional[tuple[str, str]]:
+    """Encode types JSON/msgpack can't represent as a (type, text) pair."""
+    if isinstance(value, datetime):
+        return "datetime", value.isoformat()
+    if isinstance(value, date):
+        return "date", value.isoformat()
+    if isinstance(value, dt_time):
+        return "time", value.isoformat()
+    if isinstance(value, Decimal):
+        return "decimal", str(value)
+    if isinstance(value, uuid.UUID):
+        return "uuid", str(value)
+    if ULID is not None and isinstance(value, ULID):
+        return "ulid", str(value)
+    return None
+
+
+def _decode_special(type_name: str, text: str) -> Any:
+    """Inverse of ``_encode_special``."""
+    if type_name == "datetime":
+        return datetime.fromisoformat(text)
+    if type_name == "date":
+        return date.fromisoformat(text)
+    if type_name == "time":
+        return dt_time.fromisoformat(text)
+    if type_name == "decimal":
+        return Decimal(text)
+    if type_name == "uuid":
+        return uuid.UUID(text)
+    if type_name == "ulid":
+        return ULID.from_str(text) if ULID is not None else text
+    raise ValueError(f"Unknown serialized type: {type_name}")
+
+
+class JsonCacheSerializer(CacheSerializer):
+    """
+    JSON cache serializer.
+    
+    datetime, date, time, Decimal, UUID, ULID and bytes values are written
+    as tagged objects so they come back with their original type instead
+    of as strings.
+    """
+    
+    TYPE_KEY = "__cache_type__"
+    
+    def serialize(self, value: Any) -> str:
+        """Serialize value to JSON."""
+        return json.dumps(value, default=self._default, separators=(',', ':'))
+    
+    def unserialize(self, data: SerializedValue) -> Any:
+        """Unserialize JSON data."""
+        return json.loads(data, object_hook=self._object_hook)
+    
+    def _default(self, value: Any) -> Any:
+        special = _encode_special(value)
+        if special is not None:
+            return {self.TYPE_KEY: special[0], "v": special[1]}
+        if isinstance(value, (bytes, bytearray)):
+            return {self.TYPE_KEY: "bytes", "v": base64.b64encode(value).decode()}
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        return str(value)
+    
+    def _object_hook(self, obj: Dict[str, Any]) -> Any:
+        type_name = obj.get(self.TYPE_KEY)
+        if type_name is None or len(obj) != 2:
+            return obj
+        if type_name == "bytes":
+            return base64.b64decode(obj["v"])
+        return _decode_special(type_name, obj["v"])
+
+
+class PickleCacheSerializer(CacheSerializer):
+    """
+    Pickle cache serializer producing raw bytes.
+    
+    With ``out_of_band=True``, protocol 5 out-of-band buffers (bytearray,
+    NumPy arrays and other PickleBuffer providers) are appended after the
+    pickle stream and handed back to ``pickle.loads`` as zero-copy views.
+    """
+    
+    OOB_MAGIC = b'PKB5'
+    _COUNT = struct.Struct('>I')
+    _LENGTH = struct.Struct('>Q')
+    
+    def __init__(self, protocol: int = 5, out_of_band: bool = False) -> None:
+        self.protocol = protocol
+        self.out_of_band = out_of_band and protocol >= 5
+    
+    def serialize(self, value: Any) -> bytes:
+        """Serialize value using pickle."""
+        if not self.out_of_band:
+            return pickle.dumps(value, protocol=self.protocol)
+        
+        buffers: List[pickle.PickleBuffer] = []
+        main = pickle.dumps(value, protocol=self.protocol, buffer_callback=buffers.append)
+        if not buffers:
+            return main
+        
+        raws = [buffer.raw() for buffer in buffers]
+        parts: List[Any] = [self.OOB_MAGIC, self._COUNT.pack(len(raws)), self._LENGTH.pack(len(main))]
+        parts.extend(self._LENGTH.pack(raw.nbytes) for raw in raws)
+        parts.append(main)
+        parts.extend(raws)
+        return b''.join(parts)
+    
+    def unserialize(self, data: SerializedValue) -> Any:
+        """Unserialize pickle data (hex strings from older versions included)."""
+        if isinstance(data, str):
+            return pickle.loads(bytes.fromhex(data))
+        
+        if data[:4] != self.OOB_MAGIC:
+            return pickle.loads(data)
+        
+        view = memoryview(data)
+        (count,) = self._COUNT.unpack_from(view, 4)
+        offset = 4 + self._COUNT.size
+        lengths = []
+        for _ in range(count + 1):
+            lengths.append(self._LENGTH.unpack_from(view, offset)[0])
+            offset += self._LENGTH.size
+        
+        chunks = []
+        for length in lengths:
+            chunks.append(view[offset:offset + length])
+            offset += length
+        return pickle.loads(chunks[0], buffers=chunks[1:])
+
+
+class MsgpackCacheSerializer(CacheSerializer):
+    """
+    Compact binary serializer using msgpack.
+    
+    Types msgpack doesn't know natively travel as ext types, so datetime,
+    Decimal, UUID and ULID values round-trip with their original type.
+    """
+    
+    EXT_SPECIAL = 1
+    
+    def __init__(self) -> None:
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("msgpack package not installed. Install with: pip install msgpack")
+        self._msgpack = msgpack
+    
+    def serialize(self, value: Any) -> bytes:
+        """Serialize value to msgpack."""
+        return self._msgpack.packb(value, default=self._default, use_bin_type=True)  # type: ignore[no-any-return]
+    
+    def unserialize(self, data: SerializedValue) -> Any:
+        """Unserialize msgpack data."""
+        return self._msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+    
+    def _default(self, value: Any) -> Any:
+        special = _encode_special(value)
+        if special is not None:
+            return self._msgpack.ExtType(self.EXT_SPECIAL, f"{special[0]}|{special[1]}".encode())
+        if isinstance(value, (set, frozenset)):
+            return list(value)
+        raise TypeError(f"Cannot serialize {type(value).__name__} with msgpack")
+    
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code != self.EXT_SPECIAL:
+            return self._msgpack.ExtType(code, data)
+        type_name, _, text = data.decode().partition("|")
+        return _decode_special(type_name, text)
+
+
+class CompressedCacheSerializer(CacheSerializer):
+    """
+    Wraps another serializer and compresses payloads above a size threshold.
+    
+    The first byte of the output records the codec, so the threshold and
+    codec can change without invalidating existing entries.
+    """
+    
+    CODECS = {"none": b'\x00', "zlib": b'z', "zstd": b's', "lz4": b'l'}
+    
+    def __init__(self, serializer: CacheSerializer, algorithm: str = "zlib",
+                 threshold: int = 1024, level: Optional[int] = None) -> None:
+        if algorithm not in self.CODECS or algorithm == "none":
+            raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+        
+        self.serializer = serializer
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+        self._compress, self._decompressors = self._load_codecs()
+    
+    def _load_codecs(self) -> tuple[Callable[[bytes], bytes], Dict[bytes, Callable[[bytes], bytes]]]:
+        decompressors: Dict[bytes, Callable[[bytes], bytes]] = {self.CODECS["zlib"]: zlib.decompress}
+        compress: Callable[[bytes], bytes] = lambda data: zlib.compress(
+            data, self.level if self.level is not None else 6
+        )
+        
+        try:
+            import zstandard
+            decompressors[self.CODECS["zstd"]] = zstandard.ZstdDecompressor().decompress
+            if self.algorithm == "zstd":
+                compress = zstandard.ZstdCompressor(level=self.level or 3).compress
+        except ImportError:
+            if self.algorithm == "zstd":
+                raise ImportError("zstandard package not installed. Install with: pip install zstandard")
+        
+        try:
+            import lz4.frame
+            decompressors[self.CODECS["lz4"]] = lz4.frame.decompress
+            if self.algorithm == "lz4":
+                compress = lz4.frame.compress
+        except ImportError:
+            if self.algorithm == "lz4":
+                raise ImportError("lz4 package not installed. Install with: pip install lz4")
+        
+        return compress, decompressors
+    
+    def serialize(self, value: Any) -> bytes:
+        """Serialize and, above the threshold, compress."""
+        payload = self.serializer.serialize(value)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        
+        if len(payload) < self.threshold:
+            return self.CODECS["none"] + payload
+        return self.CODECS[self.algorithm] + self._compress(payload)
+    
+    def unserialize(self, data: SerializedValue) -> Any:
+        """Decompress if needed, then unserialize."""
+        if isinstance(data, str):
+            return self.serializer.unserialize(data)
+        
+        codec, payload = data[:1], data[1:]
+        if codec == self.CODECS["none"]:
+            return self.serializer.unserialize(payload)
+        if codec not in self._decompressors:
+            raise ValueError(f"No decompressor available for codec {codec!r}")
+        return self.serializer.unserialize(self._decompressors[codec](payload))
+
+
+class CacheSerializerRegistry:
+    """Registry of named cache serializers."""
+    
+    _serializers: Dict[str, Callable[..., CacheSerializer]] = {
+        "json": JsonCacheSerializer,
+        "pickle": PickleCacheSerializer,
+        "msgpack": MsgpackCacheSerializer,
+    }
+    
+    @classmethod
+    def register(cls, name: str, factory: Callable[..., CacheSerializer]) -> None:
+        """Register a custom serializer."""
+        cls._serializers[name] = factory
+    
+    @classmethod
+    def available(cls) -> List[str]:
+        """Names of registered serializers."""
+        return list(cls._serializers)
+    
+    @classmethod
+    def create(cls, name: str = "json", compression: Optional[str] = None,
+               compression_threshold: int = 1024, **options: Any) -> CacheSerializer:
+        """
+        Create a serializer by name.
+        
+        Args:
+            name: Registered serializer name (json, pickle, msgpack, ...)
+            compression: Optional codec (zlib, zstd, lz4) applied above the threshold
+            compression_threshold: Minimum payload size in bytes to compress
+            **options: Passed to the serializer factory
+        """
+        if name not in cls._serializers:
+            raise ValueError(f"Unsupported cache serializer: {name}")
+        
+        serializer = cls._serializers[name](**options)
+        if compression and compression != "none":
+            serializer = CompressedCacheSerializer(serializer, compression, compression_threshold)
+        return serializer
@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Union, Callable, TypeVar, Generic
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Callable, TypeVar, Generic, TYPE_CHECKING
 from abc import ABC, abstractmethod
+import asyncio
+import inspect
+import math
+import mmap
+import os
+import random
+import re
+import shutil
+import struct
+import tempfile
 import time
 import json
 import pickle
 import hashlib
+import heapq
+import secrets
+import sys
 import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum
 
+from .CacheSerializers import (
+    CacheSerializer, JsonCacheSerializer, PickleCacheSerializer,
+    MsgpackCacheSerializer, CompressedCacheSerializer, CacheSerializerRegistry
+)
+
+if TYPE_CHECKING:
+    import redis
+    import redis.asyncio as redis_async
+
 T = TypeVar('T')
 
 
@@ -64,6 +89,17 @@ class CacheStore(ABC):
             return self.put(key, value, ttl)
         return False
     
+    def put_if_equals(self, key: str, expected: Any, value: Any, ttl: Optional[int] = None) -> bool:
+        """
+        Store an item only if its current value equals ``expected``.
+        
+        Stores with a write lock make the check and the write atomic; this
+        default is not, so a concurrent writer can slip in between them.
+        """
+        if self.get(key) == expected:
+            return self.put(key, value, ttl)
+        return False
+    
     def forever(self, key: str, value: Any) -> bool:
         """Store an item in the cache indefinitely."""
         return self.put(key, value, None)
@@ -110,6 +146,81 @@ class CacheStore(ABC):
         """Get a lock instance for the given key."""
         return CacheLock(self, key, timeout)
     
+    def restore_lock(self, key: str, owner: Any, timeout: Optional[int] = None) -> 'CacheLock':
+        """
+        Get a lock instance acting as ``owner``, e.g. to release a lock taken
+        by another process that handed its owner along.
+        """
+        lock = self.lock(key, timeout)
+        lock.owner = owner
+        lock.acquired = True
+        return lock
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get store-level statistics, if the driver tracks any."""
+        return {}
+    
+    # Async API. Stores doing blocking I/O run the sync implementation in a
+    # worker thread; stores with native async clients override these.
+    
+    blocking_io = True
+    
+    async def _run_sync(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a sync store operation without blocking the event loop."""
+        if self.blocking_io:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+    
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Asynchronously retrieve an item from the cache."""
+        return await self._run_sync(self.get, key, default)
+    
+    async def aput(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Asynchronously store an item in the cache."""
+        return await self._run_sync(self.put, key, value, ttl)
+    
+    async def aforget(self, key: str) -> bool:
+        """Asynchronously remove an item from the cache."""
+        return await self._run_sync(self.forget, key)
+    
+    async def aadd(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Asynchronously store an item if it doesn't exist."""
+        return await self._run_sync(self.add, key, value, ttl)
+    
+    async def aput_if_equals(self, key: str, expected: Any, value: Any, ttl: Optional[int] = None) -> bool:
+        """Asynchronously store an item if its current value equals ``expected``."""
+        return await self._run_sync(self.put_if_equals, key, expected, value, ttl)
+    
+    async def aincrement(self, key: str, value: int = 1) -> int:
+        """Asynchronously increment the value of an item."""
+        return await self._run_sync(self.increment, key, value)
+    
+    async def adecrement(self, key: str, value: int = 1) -> int:
+        """Asynchronously decrement the value of an item."""
+        return await self.aincrement(key, -value)
+    
+    async def amany(self, keys: List[str]) -> Dict[str, Any]:
+        """Asynchronously retrieve multiple items."""
+        return await self._run_sync(self.many, keys)
+    
+    async def aput_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Asynchronously store multiple items."""
+        return await self._run_sync(self.put_many, items, ttl)
+    
+    async def aremember(self, key: str, ttl: Optional[int], callback: Callable[[], Any]) -> Any:
+        """Get an item or store the result of callback (sync or async)."""
+        value = await self.aget(key)
+        if value is None:
+            value = callback()
+            if inspect.isawaitable(value):
+                value = await value
+            await self.aput(key, value, ttl)
+        return value
+    
+    def alock(self, key: str, timeout: Optional[int] = None) -> 'CacheLock':
+        """Get a lock for use with ``async with``."""
+        return self.lock(key, timeout)
+    
     def atomic(self) -> 'AtomicCacheTransaction':
         """Begin an atomic cache transaction."""
         return AtomicCacheTransaction(self)
@@ -133,172 +244,931 @@ class CacheStore(ABC):
             self.forget = original_forget  # type: ignore
 
 
-class ArrayCacheStore(CacheStore):
-    """In-memory array cache store."""
+class _CacheEntry:
+    """Compact in-memory cache entry."""
     
-    def __init__(self) -> None:
-        self.storage: Dict[str, Dict[str, Any]] = {}
+    __slots__ = ('value', 'expires_at', 'size', 'frequency')
+    
+    def __init__(self, value: Any, expires_at: Optional[float], size: int) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.frequency = 1
+
+
+class ArrayCacheStore(CacheStore):
+    """
+    Bounded in-memory array cache store.
+    
+    Once ``max_items`` or ``max_bytes`` is exceeded, entries are evicted using
+    the configured LRU or LFU policy. Expired entries are tracked in a heap
+    and reclaimed a batch at a time on every write, so keys that are never
+    read again do not stay resident.
+    """
+    
+    EVICTION_POLICIES = ("lru", "lfu")
+    EXPIRY_BATCH = 64
+    blocking_io = False
+    
+    def __init__(
+        self,
+        max_items: Optional[int] = 10000,
+        max_bytes: Optional[int] = None,
+        eviction_policy: str = "lru"
+    ) -> None:
+        if eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"Unsupported eviction policy: {eviction_policy}")
+        
+        self.storage: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.eviction_policy = eviction_policy
+        
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._frequencies: Dict[int, OrderedDict[str, None]] = {}
+        self._min_frequency = 0
+        self._bytes = 0
+        self._lock = threading.RLock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
     
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve an item from the cache."""
-        if key in self.storage:
-            item = self.storage[key]
-            if item['expires_at'] is None or item['expires_at'] > time.time():
-                return item['value']
-            else:
-                # Item has expired
-                del self.storage[key]
-        return default
+        with self._lock:
+            entry = self.storage.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            if entry.expires_at is not None and entry.expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            
+            self._touch(key, entry)
+            self.hits += 1
+            return entry.value
     
     def put(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Store an item in the cache."""
         expires_at = None if ttl is None else time.time() + ttl
-        self.storage[key] = {
-            'value': value,
-            'expires_at': expires_at
-        }
+        size = self._sizeof(key, value)
+        
+        with self._lock:
+            if key in self.storage:
+                self._remove(key)
+            
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            
+            self._insert(key, _CacheEntry(value, expires_at, size))
+            self.prune_expired(self.EXPIRY_BATCH)
+            self._enforce_limits()
         return True
     
     def forget(self, key: str) -> bool:
         """Remove an item from the cache."""
-        if key in self.storage:
-            del self.storage[key]
-            return True
+        with self._lock:
+            if key in self.storage:
+                self._remove(key)
+                return True
         return False
     
     def flush(self) -> bool:
         """Remove all items from the cache."""
-        self.storage.clear()
+        with self._lock:
+            self.storage.clear()
+            self._expiry_heap.clear()
+            self._frequencies.clear()
+            self._min_frequency = 0
+            self._bytes = 0
         return True
     
+    def put_if_equals(self, key: str, expected: Any, value: Any, ttl: Optional[int] = None) -> bool:
+        """Compare and store under the store lock."""
+        with self._lock:
+            return super().put_if_equals(key, expected, value, ttl)
+    
     def increment(self, key: str, value: int = 1) -> int:
-        """Increment the value of an item in the cache."""
-        current = self.get(key, 0)
-        if not isinstance(current, (int, float)):
-            current = 0
-        new_value = current + value
-        self.put(key, new_value)
-        return int(new_value)
+        """Increment the value of an item in the cache, keeping its TTL."""
+        with self._lock:
+            entry = self.storage.get(key)
+            current = self.get(key, 0)
+            if not isinstance(current, (int, float)):
+                current = 0
+            new_value = current + value
+            
+            if entry is not None and key in self.storage:
+                entry.value = new_value
+            else:
+                self.put(key, new_value)
+            return int(new_value)
     
     def decrement(self, key: str, value: int = 1) -> int:
         """Decrement the value of an item in the cache."""
         return self.increment(key, -value)
+    
+    def prune_expired(self, limit: Optional[int] = None) -> int:
+        """Remove up to ``limit`` expired entries, oldest expiry first."""
+        pruned = 0
+        now = time.time()
+        
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now and (limit is None or pruned < limit):
+                expires_at, key = heapq.heappop(heap)
+                entry = self.storage.get(key)
+                # Skip heap records left behind by overwritten keys
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove(key)
+                    self.expirations += 1
+                    pruned += 1
+            
+            if len(heap) > 2 * len(self.storage) + self.EXPIRY_BATCH:
+                self._rebuild_expiry_heap()
+        
+        return pruned
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get store size and hit/miss/eviction counters."""
+        total = self.hits + self.misses
+        return {
+            'driver': 'array',
+            'items': len(self.storage),
+            'bytes': self._bytes,
+            'max_items': self.max_items,
+            'max_bytes': self.max_bytes,
+            'eviction_policy': self.eviction_policy,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': (self.hits / total * 100) if total > 0 else 0.0
+        }
+    
+    def _sizeof(self, key: str, value: Any) -> int:
+        """Approximate (shallow) memory footprint of an entry."""
+        return sys.getsizeof(key) + sys.getsizeof(value)
+    
+    def _insert(self, key: str, entry: _CacheEntry) -> None:
+        """Insert a new entry and register it with the bookkeeping structures."""
+        self.storage[key] = entry
+        self._bytes += entry.size
+        
+        if entry.expires_at is not None:
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+        
+        if self.eviction_policy == "lfu":
+            self._frequencies.setdefault(1, OrderedDict())[key] = None
+            self._min_frequency = 1
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its bookkeeping."""
+        entry = self.storage.pop(key)
+        self._bytes -= entry.size
+        
+        if self.eviction_policy == "lfu":
+            bucket = self._frequencies[entry.frequency]
+            del bucket[key]
+            if not bucket:
+                del self._frequencies[entry.frequency]
+    
+    def _touch(self, key: str, entry: _CacheEntry) -> None:
+        """Record an access for the eviction policy."""
+        if self.eviction_policy == "lru":
+            self.storage.move_to_end(key)
+            return
+        
+        frequency = entry.frequency
+        bucket = self._frequencies[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._frequencies[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        
+        entry.frequency = frequency + 1
+        self._frequencies.setdefault(entry.frequency, OrderedDict())[key] = None
+    
+    def _enforce_limits(self) -> None:
+        """Evict entries until the store is within its configured bounds."""
+        while self.storage and (
+            (self.max_items is not None and len(self.storage) > self.max_items)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._remove(self._eviction_candidate())
+            self.evictions += 1
+    
+    def _eviction_candidate(self) -> str:
+        """Pick the key to evict according to the eviction policy."""
+        if self.eviction_policy == "lru":
+            return next(iter(self.storage))
+        
+        if self._min_frequency not in self._frequencies:
+            self._min_frequency = min(self._frequencies)
+        return next(iter(self._frequencies[self._min_frequency]))
+    
+    def _rebuild_expiry_heap(self) -> None:
+        """Drop stale heap records left behind by overwritten or removed keys."""
+        self._expiry_heap = [
+            (entry.expires_at, key)
+            for key, entry in self.storage.items()
+            if entry.expires_at is not None
+        ]
+        heapq.heapify(self._expiry_heap)
 
 
 class RedisCacheStore(CacheStore):
-    """Redis cache store (placeholder - would need redis-py)."""
+    """
+    Redis cache store backed by a pooled redis-py client.
+    
+    Values are pickled, except integers which are stored as plain numeric
+    strings (like Laravel's RedisStore) so INCRBY/DECRBY work server-side,
+    and bytes (e.g. output of a binary CacheSerializer) which are stored
+    as-is behind a one-byte marker.
+    """
+    
+    RAW_BYTES_MARKER = b"\x00"
+    INTEGER_PATTERN = re.compile(rb"-?[0-9]+")
+    
+    def __init__(
+        self,
+        connection_params: Optional[Dict[str, Any]] = None,
+        prefix: str = "",
+        max_connections: int = 50
+    ) -> None:
+        self.connection_params = connection_params or {
+            "host": "localhost",
+            "port": 6379,
+            "db": 0
+        }
+        self.prefix = prefix
+        self.max_connections = max_connections
+        self._pool: Optional[redis.ConnectionPool] = None
+        self._redis: Optional[redis.Redis] = None
+        self._aredis: Optional[redis_async.Redis] = None
+    
+    @property
+    def redis(self) -> redis.Redis:
+        """Get the pooled Redis client, connecting lazily."""
+        if self._redis is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("Redis package not installed. Install with: pip install redis")
+            
+            self._pool = redis.ConnectionPool(
+                max_connections=self.max_connections,
+                **self.connection_params
+            )
+            self._redis = redis.Redis(connection_pool=self._pool)
+        
+        return self._redis
+    
+    @property
+    def aredis(self) -> redis_async.Redis:
+        """Get the pooled asyncio Redis client, connecting lazily."""
+        if self._aredis is None:
+            try:
+                import redis.asyncio as redis_async
+            except ImportError:
+                raise ImportError("Redis package not installed. Install with: pip install redis")
+            
+            self._aredis = redis_async.Redis(connection_pool=redis_async.ConnectionPool(
+                max_connections=self.max_connections,
+                **self.connection_params
+            ))
+        
+        return self._aredis
+    
+    def set_connection(self, client: redis.Redis) -> None:
+        """Use an existing Redis client (shared pool, fakeredis, etc.)."""
+        self._redis = client
+    
+    def set_async_connection(self, client: redis_async.Redis) -> None:
+        """Use an existing asyncio Redis client."""
+        self._aredis = client
     
-    def __init__(self, connection_params: Optional[Dict[str, Any]] = None) -> None:
-        self.connection_params = connection_params or {}
-        # In a real implementation, you'd initialize Redis connection here
-        self._fallback = ArrayCacheStore()  # Fallback for demo
+    def _key(self, key: str) -> str:
+        """Generate the prefixed Redis key."""
+        return f"{self.prefix}{key}"
+    
+    def _serialize(self, value: Any) -> Union[bytes, int]:
+        """Serialize a value, leaving integers as-is for INCRBY and bytes unpickled."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, bytes):
+            return self.RAW_BYTES_MARKER + value
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def _unserialize(self, data: Optional[bytes]) -> Any:
+        """Unserialize a raw Redis value."""
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode()
+        if data[:1] == b"\x80":
+            return pickle.loads(data)
+        if data[:1] == self.RAW_BYTES_MARKER:
+            return data[1:]
+        if self.INTEGER_PATTERN.fullmatch(data):
+            return int(data)
+        # Written by something other than this store (a lock owner token, another client)
+        try:
+            return data.decode()
+        except UnicodeDecodeError:
+            return data
     
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve an item from Redis cache."""
-        # Fallback to array cache for demo
-        return self._fallback.get(key, default)
+        value = self._unserialize(self.redis.get(self._key(key)))
+        return default if value is None else value
+    
+    def many(self, keys: List[str]) -> Dict[str, Any]:
+        """Retrieve multiple items with a single MGET."""
+        if not keys:
+            return {}
+        values = self.redis.mget([self._key(key) for key in keys])
+        return {key: self._unserialize(value) for key, value in zip(keys, values)}
     
     def put(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Store an item in Redis cache."""
-        # Fallback to array cache for demo
-        return self._fallback.put(key, value, ttl)
+        if ttl is not None and ttl <= 0:
+            self.forget(key)
+            return True
+        return bool(self.redis.set(self._key(key), self._serialize(value), ex=ttl))
+    
+    def put_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Store multiple items in one pipelined round-trip."""
+        if not items:
+            return True
+        if ttl is not None and ttl <= 0:
+            self.redis.delete(*[self._key(key) for key in items])
+            return True
+        
+        if ttl is None:
+            return bool(self.redis.mset({
+                self._key(key): self._serialize(value) for key, value in items.items()
+            }))
+        
+        pipe = self.redis.pipeline(transaction=True)
+        for key, value in items.items():
+            pipe.set(self._key(key), self._serialize(value), ex=ttl)
+        return all(pipe.execute())
+    
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store an item only if the key does not exist (SET NX)."""
+        if ttl is not None and ttl <= 0:
+            return False
+        return bool(self.redis.set(self._key(key), self._serialize(value), ex=ttl, nx=True))
     
     def forget(self, key: str) -> bool:
         """Remove an item from Redis cache."""
-        return self._fallback.forget(key)
+        return bool(self.redis.delete(self._key(key)))
     
     def flush(self) -> bool:
-        """Remove all items from Redis cache."""
-        return self._fallback.flush()
+        """Remove all items from Redis cache (only prefixed keys if a prefix is set)."""
+        if not self.prefix:
+            self.redis.flushdb()
+            return True
+        
+        batch: List[Any] = []
+        for redis_key in self.redis.scan_iter(match=f"{self.prefix}*", count=1000):
+            batch.append(redis_key)
+            if len(batch) >= 1000:
+                self.redis.unlink(*batch)
+                batch = []
+        if batch:
+            self.redis.unlink(*batch)
+        return True
     
     def increment(self, key: str, value: int = 1) -> int:
-        """Increment value in Redis."""
-        return self._fallback.increment(key, value)
+        """Atomically increment a value with INCRBY."""
+        return int(self.redis.incrby(self._key(key), value))
     
     def decrement(self, key: str, value: int = 1) -> int:
-        """Decrement value in Redis."""
-        return self._fallback.decrement(key, value)
+        """Atomically decrement a value with DECRBY."""
+        return int(self.redis.decrby(self._key(key), value))
+    
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Retrieve an item using the asyncio client."""
+        value = self._unserialize(await self.aredis.get(self._key(key)))
+        return default if value is None else value
+    
+    async def amany(self, keys: List[str]) -> Dict[str, Any]:
+        """Retrieve multiple items with a single async MGET."""
+        if not keys:
+            return {}
+        values = await self.aredis.mget([self._key(key) for key in keys])
+        return {key: self._unserialize(value) for key, value in zip(keys, values)}
+    
+    async def aput(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store an item using the asyncio client."""
+        if ttl is not None and ttl <= 0:
+            await self.aforget(key)
+            return True
+        return bool(await self.aredis.set(self._key(key), self._serialize(value), ex=ttl))
+    
+    async def aput_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Store multiple items in one async pipeline."""
+        if not items:
+            return True
+        if ttl is not None and ttl <= 0:
+            await self.aredis.delete(*[self._key(key) for key in items])
+            return True
+        
+        pipe = self.aredis.pipeline(transaction=True)
+        for key, value in items.items():
+            pipe.set(self._key(key), self._serialize(value), ex=ttl)
+        return all(await pipe.execute())
+    
+    async def aadd(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store an item only if the key does not exist (async SET NX)."""
+        if ttl is not None and ttl <= 0:
+            return False
+        return bool(await self.aredis.set(self._key(key), self._serialize(value), ex=ttl, nx=True))
+    
+    async def aforget(self, key: str) -> bool:
+        """Remove an item using the asyncio client."""
+        return bool(await self.aredis.delete(self._key(key)))
+    
+    async def aincrement(self, key: str, value: int = 1) -> int:
+        """Atomically increment a value with async INCRBY."""
+        return int(await self.aredis.incrby(self._key(key), value))
+    
+    def lock(self, key: str, timeout: Optional[int] = None) -> 'CacheLock':
+        """Get a Redis-backed lock instance for the given key."""
+        return RedisCacheLock(self, key, timeout)
 
 
 class FileCacheStore(CacheStore):
-    """File-based cache store."""
-    
-    def __init__(self, cache_path: str = "storage/cache") -> None:
+    """
+    File-based cache store.
+    
+    Entries live in two-level hash fan-out directories
+    (``<path>/ab/cd/<hash>.cache``) and are written to a temp file and
+    renamed into place, so readers never see torn files. Each file starts
+    with a fixed header holding the expiry timestamp, letting expiry checks
+    and garbage collection skip unpickling the value; large values are read
+    through mmap.
+    """
+    
+    HEADER = struct.Struct('>4sd')
+    MAGIC = b'FC01'
+    MMAP_THRESHOLD = 64 * 1024
+    SHARDS = 256
+    
+    def __init__(
+        self,
+        cache_path: str = "storage/cache",
+        gc_interval: Optional[float] = 60.0,
+        gc_shards_per_pass: int = 16
+    ) -> None:
         self.cache_path = cache_path
-        import os
+        self.gc_interval = gc_interval
+        self.gc_shards_per_pass = gc_shards_per_pass
+        self._gc_cursor = 0
+        self._gc_thread: Optional[threading.Thread] = None
+        self._gc_lock = threading.Lock()  # Separate from _lock: increment() writes while holding it
+        self._lock = threading.Lock()
         os.makedirs(cache_path, exist_ok=True)
     
     def _get_file_path(self, key: str) -> str:
         """Get file path for cache key."""
         key_hash = hashlib.md5(key.encode()).hexdigest()
-        return f"{self.cache_path}/{key_hash}.cache"
+        return os.path.join(self.cache_path, key_hash[:2], key_hash[2:4], f"{key_hash}.cache")
+    
+    def _read_expiry(self, f: Any) -> Optional[float]:
+        """Read the expiry header; raises ValueError for foreign files."""
+        header = f.read(self.HEADER.size)
+        if len(header) != self.HEADER.size:
+            raise ValueError("Truncated cache file")
+        magic, expires_at = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError("Unknown cache file format")
+        return None if expires_at == 0 else float(expires_at)
+    
+    def _read_value(self, f: Any) -> Any:
+        """Unpickle the value following the header, via mmap when large."""
+        size = os.fstat(f.fileno()).st_size
+        if size < self.MMAP_THRESHOLD:
+            return pickle.loads(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return pickle.loads(view[self.HEADER.size:])
     
     def get(self, key: str, default: Any = None) -> Any:
         """Retrieve an item from file cache."""
         file_path = self._get_file_path(key)
         try:
             with open(file_path, 'rb') as f:
-                data = pickle.load(f)
-                if data['expires_at'] is None or data['expires_at'] > time.time():
-                    return data['value']
-                else:
-                    # Item has expired
-                    import os
-                    os.remove(file_path)
-        except (FileNotFoundError, pickle.PickleError):
+                expires_at = self._read_expiry(f)
+                if expires_at is None or expires_at > time.time():
+                    return self._read_value(f)
+            # Item has expired
+            self._remove(file_path)
+        except (FileNotFoundError, ValueError, EOFError, pickle.PickleError):
             pass
         return default
     
     def put(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        """Store an item in file cache."""
+        """Store an item in file cache atomically."""
         file_path = self._get_file_path(key)
-        expires_at = None if ttl is None else time.time() + ttl
-        
-        data = {
-            'value': value,
-            'expires_at': expires_at
-        }
+        expires_at = 0.0 if ttl is None else time.time() + ttl
         
         try:
-            with open(file_path, 'wb') as f:
-                pickle.dump(data, f)
-            return True
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            directory = os.path.dirname(file_path)
+            os.makedirs(directory, exist_ok=True)
+            
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self.HEADER.pack(self.MAGIC, expires_at))
+                    f.write(payload)
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                self._remove(tmp_path)
+                raise
         except Exception:
             return False
+        
+        self._ensure_garbage_collector()
+        return True
     
     def forget(self, key: str) -> bool:
         """Remove an item from file cache."""
-        file_path = self._get_file_path(key)
-        try:
-            import os
-            os.remove(file_path)
-            return True
-        except FileNotFoundError:
-            return False
+        return self._remove(self._get_file_path(key))
     
     def flush(self) -> bool:
         """Remove all items from file cache."""
         try:
-            import os
-            import glob
-            for file_path in glob.glob(f"{self.cache_path}/*.cache"):
-                os.remove(file_path)
+            # Move the shards aside first so the cache empties at once,
+            # then delete the detached tree.
+            trash = tempfile.mkdtemp(dir=self.cache_path, prefix='.flush-')
+            with os.scandir(self.cache_path) as entries:
+                for entry in entries:
+                    if entry.is_dir() and not entry.name.startswith('.'):
+                        os.rename(entry.path, os.path.join(trash, entry.name))
+                    elif entry.name.endswith('.cache'):
+                        os.remove(entry.path)
+            shutil.rmtree(trash, ignore_errors=True)
             return True
         except Exception:
             return False
     
+    def put_if_equals(self, key: str, expected: Any, value: Any, ttl: Optional[int] = None) -> bool:
+        """Compare and store under the store lock (atomic within this process only)."""
+        with self._lock:
+            return super().put_if_equals(key, expected, value, ttl)
+    
     def increment(self, key: str, value: int = 1) -> int:
         """Increment the value of an item in file cache."""
-        current = self.get(key, 0)
-        if not isinstance(current, (int, float)):
-            current = 0
-        new_value = current + value
-        self.put(key, new_value)
-        return int(new_value)
+        with self._lock:
+            current = self.get(key, 0)
+            if not isinstance(current, (int, float)):
+                current = 0
+            new_value = current + value
+            self.put(key, new_value)
+            return int(new_value)
     
     def decrement(self, key: str, value: int = 1) -> int:
         """Decrement the value of an item in file cache."""
         return self.increment(key, -value)
+    
+    def collect_garbage(self, shards: Optional[int] = None) -> int:
+        """
+        Remove expired files from the next ``shards`` top-level shards.
+        
+        Successive calls walk the cache round-robin, so each pass only
+        touches a slice of the tree. Returns the number of files removed.
+        """
+        removed = 0
+        now = time.time()
+        
+        for _ in range(shards or self.gc_shards_per_pass):
+            shard = os.path.join(self.cache_path, f"{self._gc_cursor:02x}")
+            self._gc_cursor = (self._gc_cursor + 1) % self.SHARDS
+            
+            for directory, _, files in os.walk(shard):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    if name.endswith('.tmp'):
+                        # Left behind by a crashed writer
+                        if now - os.path.getmtime(path) > 3600:
+                            removed += self._remove(path)
+                        continue
+                    try:
+                        with open(path, 'rb') as f:
+                            expires_at = self._read_expiry(f)
+                    except (OSError, ValueError):
+                        continue
+                    if expires_at is not None and expires_at <= now:
+                        removed += self._remove(path)
+        
+        return removed
+    
+    def _ensure_garbage_collector(self) -> None:
+        """Start the background GC thread on first write."""
+        if self.gc_interval is None or self._gc_thread is not None:
+            return
+        
+        with self._gc_lock:
+            if self._gc_thread is None:
+                self._gc_thread = threading.Thread(
+                    target=self._garbage_collector_loop, name="file-cache-gc", daemon=True
+                )
+                self._gc_thread.start()
+    
+    def _garbage_collector_loop(self) -> None:
+        """Background loop reclaiming expired files incrementally."""
+        while True:
+            time.sleep(self.gc_interval or 60.0)
+            try:
+                self.collect_garbage()
+            except Exception:
+                pass
+    
+    def _remove(self, file_path: str) -> bool:
+        """Remove a file, ignoring races with other workers."""
+        try:
+            os.remove(file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+class TieredCacheStore(CacheStore):
+    """
+    Two-tier near cache: a small per-process L1 in front of a shared L2 store.
+    
+    Reads are served from the bounded L1 when possible. Writes go to L2 and
+    are announced to other processes so they drop their L1 copy: over Redis
+    pub/sub when L2 is a RedisCacheStore, otherwise through a version stamp
+    kept in L2 that each process checks at most every ``sync_interval``
+    seconds. L1 entries also live at most ``l1_ttl`` seconds, which bounds
+    staleness if an invalidation is missed.
+    """
+    
+    def __init__(
+        self,
+        l2: CacheStore,
+        l1_max_items: int = 1000,
+        l1_ttl: int = 5,
+        sync_interval: float = 1.0,
+        channel: str = "cache:near:invalidate"
+    ) -> None:
+        self.l1 = ArrayCacheStore(max_items=l1_max_items)
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+        self.sync_interval = sync_interval
+        self.channel = channel
+        self.origin = secrets.token_hex(8)
+        
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        
+        self._version: Any = None
+        self._last_sync = 0.0
+        self._subscriber: Any = None
+    
+    @property
+    def uses_pubsub(self) -> bool:
+        """Whether invalidations travel over Redis pub/sub."""
+        return isinstance(self.l2, RedisCacheStore)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Retrieve an item, trying L1 before L2."""
+        self._sync()
+        
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+        
+        value = self.l2.get(key)
+        if value is None:
+            self.misses += 1
+            return default
+        
+        self.l2_hits += 1
+        self.l1.put(key, value, self.l1_ttl)
+        return value
+    
+    def many(self, keys: List[str]) -> Dict[str, Any]:
+        """Retrieve multiple items, fetching only L1 misses from L2."""
+        self._sync()
+        
+        results: Dict[str, Any] = {}
+        remaining: List[str] = []
+        for key in keys:
+            value = self.l1.get(key)
+            if value is None:
+                remaining.append(key)
+            else:
+                self.l1_hits += 1
+                results[key] = value
+        
+        if remaining:
+            for key, value in self.l2.many(remaining).items():
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.l2_hits += 1
+                    self.l1.put(key, value, self.l1_ttl)
+                results[key] = value
+        
+        return {key: results.get(key) for key in keys}
+    
+    def put(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store an item in L2 and refresh the local L1 copy."""
+        result = self.l2.put(key, value, ttl)
+        self.l1.put(key, value, self._l1_ttl(ttl))
+        self._invalidate(key)
+        return result
+    
+    def put_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Store multiple items in L2 and refresh the local L1 copies."""
+        result = self.l2.put_many(items, ttl)
+        for key, value in items.items():
+            self.l1.put(key, value, self._l1_ttl(ttl))
+        self._invalidate(*items.keys())
+        return result
+    
+    def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store an item in L2 if it doesn't exist."""
+        added = self.l2.add(key, value, ttl)
+        if added:
+            self.l1.forget(key)
+            self._invalidate(key)
+        return added
+    
+    def put_if_equals(self, key: str, expected: Any, value: Any, ttl: Optional[int] = None) -> bool:
+        """Compare and store in L2, which holds the authoritative value."""
+        stored = self.l2.put_if_equals(key, expected, value, ttl)
+        if stored:
+            self.l1.forget(key)
+            self._invalidate(key)
+        return stored
+    
+    def forget(self, key: str) -> bool:
+        """Remove an item from both tiers."""
+        self.l1.forget(key)
+        result = self.l2.forget(key)
+        self._invalidate(key)
+        return result
+    
+    def flush(self) -> bool:
+        """Remove all items from both tiers."""
+        self.l1.flush()
+        result = self.l2.flush()
+        self._invalidate("*")
+        return result
+    
+    def increment(self, key: str, value: int = 1) -> int:
+        """Increment the value in L2; counters are never served from L1."""
+        self.l1.forget(key)
+        result = self.l2.increment(key, value)
+        self._invalidate(key)
+        return result
+    
+    def decrement(self, key: str, value: int = 1) -> int:
+        """Decrement the value in L2."""
+        return self.increment(key, -value)
+    
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Asynchronously retrieve an item, trying L1 before L2."""
+        await self._async_sync()
+        
+        value = self.l1.get(key)
+        if value is not None:
+            self.l1_hits += 1
+            return value
+        
+        value = await self.l2.aget(key)
+        if value is None:
+            self.misses += 1
+            return default
+        
+        self.l2_hits += 1
+        self.l1.put(key, value, self.l1_ttl)
+        return value
+    
+    async def aput(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Asynchronously store an item in L2 and refresh the L1 copy."""
+        result = await self.l2.aput(key, value, ttl)
+        self.l1.put(key, value, self._l1_ttl(ttl))
+        await self._run_sync(self._invalidate, key)
+        return result
+    
+    async def aforget(self, key: str) -> bool:
+        """Asynchronously remove an item from both tiers."""
+        self.l1.forget(key)
+        result = await self.l2.aforget(key)
+        await self._run_sync(self._invalidate, key)
+        return result
+    
+    def lock(self, key: str, timeout: Optional[int] = None) -> 'CacheLock':
+        """Locks always live in the shared L2 store."""
+        return self.l2.lock(key, timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-tier hit ratios."""
+        total = self.l1_hits + self.l2_hits + self.misses
+        return {
+            'driver': 'tiered',
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'l1_hit_ratio': self.l1_hits / total if total else 0.0,
+            'l2_hit_ratio': self.l2_hits / total if total else 0.0,
+            'miss_ratio': self.misses / total if total else 0.0,
+            'invalidation': 'pubsub' if self.uses_pubsub else 'version',
+            'l1': self.l1.stats(),
+            'l2': self.l2.stats()
+        }
+    
+    def close(self) -> None:
+        """Stop the pub/sub listener thread, if any."""
+        if self._subscriber is not None:
+            self._subscriber.stop()
+            self._subscriber = None
+    
+    def _l1_ttl(self, ttl: Optional[int]) -> int:
+        """L1 copies never outlive the L2 entry or the L1 staleness bound."""
+        return self.l1_ttl if ttl is None else min(ttl, self.l1_ttl)
+    
+    def _version_key(self) -> str:
+        """L2 key holding the invalidation version stamp."""
+        return f"{self.channel}:version"
+    
+    def _invalidate(self, *keys: str) -> None:
+        """Tell other processes to drop their L1 copies of ``keys``."""
+        if self.uses_pubsub:
+            redis_client = self.l2.redis  # type: ignore[attr-defined]
+            for key in keys:
+                redis_client.publish(self.channel, f"{self.origin}|{key}")
+        else:
+            previous = self._version
+            self._version = self.l2.increment(self._version_key())
+            if isinstance(previous, int) and self._version != previous + 1:
+                # Someone else wrote since our last sync
+                self.l1.flush()
+    
+    def _sync(self) -> None:
+        """Apply invalidations published by other processes."""
+        if self.uses_pubsub:
+            if self._subscriber is None:
+                pubsub = self.l2.redis.pubsub(ignore_subscribe_messages=True)  # type: ignore[attr-defined]
+                pubsub.subscribe(**{self.channel: self._on_invalidation})
+                self._subscriber = pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+            return
+        
+        now = time.time()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        
+        self._apply_version(self.l2.get(self._version_key()))
+    
+    async def _async_sync(self) -> None:
+        """Apply invalidations published by other processes without blocking the event loop."""
+        if self.uses_pubsub:
+            if self._subscriber is None:
+                await asyncio.to_thread(self._sync)
+            return
+        
+        now = time.time()
+        if now - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = now
+        
+        self._apply_version(await self.l2.aget(self._version_key()))
+    
+    def _apply_version(self, version: Any) -> None:
+        """Drop L1 if the version stamp moved since the last sync."""
+        if version != self._version:
+            self.l1.flush()
+            self._version = version
+    
+    def _on_invalidation(self, message: Dict[str, Any]) -> None:
+        """Handle an invalidation message from another process."""
+        data = message.get('data')
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, _, key = str(data).partition("|")
+        if origin == self.origin:
+            return
+        if key == "*":
+            self.l1.flush()
+        else:
+            self.l1.forget(key)
 
 
 class CacheManager:
@@ -310,6 +1180,11 @@ class CacheManager:
         self.event_listener = CacheEventListener()
         self.serializer = JsonCacheSerializer()
         
+        # Background refreshes for flexible()
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing: Set[str] = set()
+        self._refresh_guard = threading.Lock()
+        
         # Register default stores
         self.stores["array"] = ArrayCacheStore()
         self.stores["file"] = FileCacheStore()
@@ -354,6 +1229,36 @@ class CacheManager:
         """Remember item in default cache store."""
         return self.store().remember(key, ttl, callback)
     
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """Asynchronously get item from default cache store with event firing."""
+        result = await self.store().aget(key, default)
+        self.event_listener.fire(CacheEvent(CacheOperation.GET, key, result))
+        return result
+    
+    async def aput(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Asynchronously put item in default cache store with event firing."""
+        result = await self.store().aput(key, value, ttl)
+        self.event_listener.fire(CacheEvent(CacheOperation.PUT, key, value, ttl))
+        return result
+    
+    async def aforget(self, key: str) -> bool:
+        """Asynchronously remove item from default cache store with event firing."""
+        result = await self.store().aforget(key)
+        self.event_listener.fire(CacheEvent(CacheOperation.FORGET, key))
+        return result
+    
+    async def amany(self, keys: List[str]) -> Dict[str, Any]:
+        """Asynchronously get multiple items from default cache store."""
+        return await self.store().amany(keys)
+    
+    async def aremember(self, key: str, ttl: Optional[int], callback: Callable[[], Any]) -> Any:
+        """Asynchronously remember item in default cache store."""
+        return await self.store().aremember(key, ttl, callback)
+    
+    def alock(self, key: str, timeout: Optional[int] = None, store_name: Optional[str] = None) -> CacheLock:
+        """Create a cache lock for use with ``async with``."""
+        return self.store(store_name).alock(key, timeout)
+    
     def tags(self, *tags: str) -> TaggedCache:
         """Create a tagged cache instance."""
         return TaggedCache(self.store(), list(tags))
@@ -366,45 +1271,181 @@ class CacheManager:
     def lock(self, key: str, timeout: Optional[int] = None, store_name: Optional[str] = None) -> CacheLock:
         """Create a cache lock."""
         store = self.store(store_name)
-        return CacheLock(store, key, timeout)
+        return store.lock(key, timeout)
     
     def atomic(self, store_name: Optional[str] = None) -> AtomicCacheTransaction:
         """Create an atomic transaction."""
         store = self.store(store_name)
         return AtomicCacheTransaction(store)
     
-    def flexible(self, key: str, callback: Callable[[], T], ttl: Optional[int] = None, 
-                lock_timeout: Optional[int] = None) -> T:
-        """Flexible cache with automatic locking for expensive operations."""
-        # Try to get from cache first
-        value = self.get(key)
+    def flexible(
+        self,
+        key: str,
+        callback: Callable[[], T],
+        fresh_ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        lock_timeout: Optional[int] = None,
+        beta: float = 0.0
+    ) -> T:
+        """
+        Stale-while-revalidate cache lookup.
+        
+        Values younger than ``fresh_ttl`` are returned as-is. During the
+        following ``stale_ttl`` window the stale value is still returned
+        immediately while a single background refresh recomputes it. With
+        ``beta > 0`` fresh values are also refreshed early with XFetch
+        probability, so hot keys don't all expire at the same moment. Only
+        a cold key makes callers wait, on a lock, for the first computation.
+        """
+        store = self.store()
+        meta_key = self._flexible_meta_key(key)
+        
+        found = store.many([key, meta_key])
+        value, meta = found.get(key), found.get(meta_key)
+        
         if value is not None:
-            return value  # type: ignore
+            self.event_listener.fire(CacheEvent(CacheOperation.GET, key, value))
+            if meta is not None and fresh_ttl is not None:
+                created_at, delta = meta
+                age = time.time() - created_at
+                if age >= fresh_ttl or self._should_refresh_early(age, delta, fresh_ttl, beta):
+                    self._refresh_in_background(key, callback, fresh_ttl, stale_ttl, lock_timeout)
+            return value  # type: ignore[no-any-return]
         
-        # Use lock to prevent cache stampede
-        lock_key = f"lock:{key}"
-        with self.lock(lock_key, lock_timeout):
-            # Double-check after acquiring lock
-            value = self.get(key)
+        # Cold key: one caller computes, the rest wait for the lock release
+        with self.lock(f"flexible:{key}", lock_timeout):
+            value = store.get(key)
             if value is not None:
-                return value  # type: ignore
+                return value  # type: ignore[no-any-return]
+            return self._compute_flexible(key, callback, fresh_ttl, stale_ttl)
+    
+    def _flexible_meta_key(self, key: str) -> str:
+        """Key holding the (created_at, compute_time) metadata of a flexible value."""
+        return f"flexible:meta:{key}"
+    
+    def _should_refresh_early(self, age: float, delta: float, fresh_ttl: int, beta: float) -> bool:
+        """XFetch: recompute early with probability rising as expiry nears."""
+        if beta <= 0:
+            return False
+        return age - delta * beta * math.log(1.0 - random.random()) >= fresh_ttl
+    
+    def _compute_flexible(self, key: str, callback: Callable[[], T],
+                          fresh_ttl: Optional[int], stale_ttl: Optional[int]) -> T:
+        """Run the callback and store the value together with its metadata."""
+        started = time.time()
+        value = callback()
+        finished = time.time()
+        
+        ttl = None if fresh_ttl is None else fresh_ttl + (stale_ttl or 0)
+        self.store().put_many({
+            key: value,
+            self._flexible_meta_key(key): (finished, finished - started)
+        }, ttl)
+        self.event_listener.fire(CacheEvent(CacheOperation.PUT, key, value, ttl))
+        return value
+    
+    def _refresh_in_background(self, key: str, callback: Callable[[], Any], fresh_ttl: Optional[int],
+                               stale_ttl: Optional[int], lock_timeout: Optional[int]) -> None:
+        """Schedule a single refresh of ``key`` across threads and processes."""
+        with self._refresh_guard:
+            if key in self._refreshing:
+                return
+            
+            refresh_lock = self.lock(f"flexible:refresh:{key}", lock_timeout)
+            if not refresh_lock.acquire(blocking=False):
+                return
+            self._refreshing.add(key)
             
-            # Generate and cache the value
-            fresh_value = callback()
-            self.put(key, fresh_value, ttl)
-            return fresh_value
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix="cache-refresh"
+                )
+        
+        def refresh() -> None:
+            try:
+                self._compute_flexible(key, callback, fresh_ttl, stale_ttl)
+            except Exception:
+                pass  # Keep serving the stale value; the next stale hit retries
+            finally:
+                refresh_lock.release()
+                with self._refresh_guard:
+                    self._refreshing.discard(key)
+        
+        self._refresh_executor.submit(refresh)
+    
+    def stats(self, store_name: Optional[str] = None) -> Dict[str, Any]:
+        """Get driver statistics (e.g. per-tier hit ratios) for a store."""
+        return self.store(store_name).stats()
     
     def listen(self, operation: CacheOperation, callback: Callable[[CacheEvent], None]) -> None:
         """Listen to cache events."""
         self.event_listener.listen(operation, callback)
 
 
+class CacheNamespace:
+    """
+    Versioned cache namespaces for O(1) group invalidation.
+    
+    Every namespace (a tag, a repository prefix, a key pattern) owns a version
+    number stored in the cache. Keys built from a namespace embed its current
+    version, so bumping the version makes every existing key unreachable
+    without scanning; the orphaned generation ages out through TTL/eviction.
+    Versions are seeded from the clock so a version key that gets evicted
+    never resurrects an older generation.
+    """
+    
+    def __init__(self, store: CacheStore, key_prefix: str = "namespace") -> None:
+        self.store = store
+        self.key_prefix = key_prefix
+    
+    def version_key(self, name: str) -> str:
+        """Get the cache key holding a namespace version."""
+        return f"{self.key_prefix}:{name}:version"
+    
+    def versions(self, names: List[str]) -> List[int]:
+        """Get the current version of each namespace, initializing missing ones."""
+        if not names:
+            return []
+        
+        keys = [self.version_key(name) for name in names]
+        found = self.store.many(keys)
+        
+        versions = []
+        for key in keys:
+            version = found.get(key)
+            if version is None:
+                self.store.add(key, time.time_ns())
+                version = self.store.get(key, 0)
+            versions.append(int(version))
+        return versions
+    
+    def bump(self, name: str) -> bool:
+        """Invalidate everything in a namespace by advancing its version."""
+        key = self.version_key(name)
+        if self.store.get(key) is None:
+            return self.store.put(key, time.time_ns())
+        self.store.increment(key)
+        return True
+    
+    def qualify(self, key: str, names: List[str]) -> str:
+        """Build the versioned cache key for ``key`` within ``names``."""
+        stamp = "|".join(f"{name}={version}" for name, version in zip(names, self.versions(names)))
+        digest = hashlib.sha1(stamp.encode()).hexdigest()
+        return f"{digest}:{key}"
+
+
 class TaggedCache:
-    """Tagged cache implementation."""
+    """
+    Tagged cache implementation using Laravel-style versioned tag sets.
+    
+    ``flush()`` bumps each tag's version; entries written under the previous
+    versions are never read again and expire on their own.
+    """
     
     def __init__(self, store: CacheStore, tags: List[str]) -> None:
         self.store = store
-        self.tags = tags
+        self.tags = sorted(set(tags))
+        self.namespace = CacheNamespace(store, "tag")
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get tagged cache item."""
@@ -416,20 +1457,24 @@ class TaggedCache:
         tagged_key = self._tagged_key(key)
         return self.store.put(tagged_key, value, ttl)
     
+    def remember(self, key: str, ttl: Optional[int], callback: Callable[[], Any]) -> Any:
+        """Get a tagged item or store the result of callback."""
+        return self.store.remember(self._tagged_key(key), ttl, callback)
+    
     def forget(self, key: str) -> bool:
         """Remove tagged cache item."""
         tagged_key = self._tagged_key(key)
         return self.store.forget(tagged_key)
     
     def flush(self) -> bool:
-        """Flush all items with these tags."""
-        # This is simplified - Laravel has a more complex tag invalidation system
+        """Flush all items with these tags by bumping each tag's version."""
+        for tag in self.tags:
+            self.namespace.bump(tag)
         return True
     
     def _tagged_key(self, key: str) -> str:
         """Generate tagged cache key."""
-        tag_string = ":".join(sorted(self.tags))
-        return f"tags:{tag_string}:{key}"
+        return f"tags:{self.namespace.qualify(key, self.tags)}"
 
 
 class CacheOperation(Enum):
@@ -457,46 +1502,53 @@ class CacheEvent:
             self.timestamp = time.time()
 
 
-class CacheSerializer(ABC):
-    """Abstract cache serializer."""
+class _LockNotifier:
+    """In-process release notifications for cache locks, shared per lock key."""
     
-    @abstractmethod
-    def serialize(self, value: Any) -> str:
-        """Serialize a value for storage."""
-        pass
+    _registry: 'weakref.WeakValueDictionary[str, _LockNotifier]' = weakref.WeakValueDictionary()
+    _registry_lock = threading.Lock()
     
-    @abstractmethod
-    def unserialize(self, data: str) -> Any:
-        """Unserialize data from storage."""
-        pass
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.generation = 0
+    
+    @classmethod
+    def for_key(cls, name: str) -> '_LockNotifier':
+        """Get the notifier shared by all locks on ``name`` in this process."""
+        with cls._registry_lock:
+            notifier = cls._registry.get(name)
+            if notifier is None:
+                notifier = cls()
+                cls._registry[name] = notifier
+            return notifier
+    
+    def notify(self) -> None:
+        """Wake every waiter."""
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+    
+    def wait(self, since: int, timeout: float) -> bool:
+        """Wait until a release newer than ``since`` or the timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.generation != since, timeout)
 
 
-class JsonCacheSerializer(CacheSerializer):
-    """JSON cache serializer."""
+class CacheLock:
+    """
+    Cache-based lock implementation.
     
-    def serialize(self, value: Any) -> str:
-        """Serialize value to JSON."""
-        return json.dumps(value, default=str)
+    Blocked acquirers sleep until the holder releases instead of polling.
+    Releases from other processes (or lock expiry) cannot be signalled, so
+    waiters also re-check at least every ``WAIT_SLICE`` seconds.
     
-    def unserialize(self, data: str) -> Any:
-        """Unserialize JSON data."""
-        return json.loads(data)
-
-
-class PickleCacheSerializer(CacheSerializer):
-    """Pickle cache serializer."""
+    Acquiring and extending are only as atomic as the store's ``add`` and
+    ``put_if_equals``: the array and file stores serialise them within one
+    process. Locks shared between processes or hosts, such as scheduler
+    leader election, need the Redis store (RedisCacheLock).
+    """
     
-    def serialize(self, value: Any) -> str:
-        """Serialize value using pickle."""
-        return pickle.dumps(value).hex()
-    
-    def unserialize(self, data: str) -> Any:
-        """Unserialize pickle data."""
-        return pickle.loads(bytes.fromhex(data))
-
-
-class CacheLock:
-    """Cache-based lock implementation."""
+    WAIT_SLICE = 1.0
     
     def __init__(self, store: CacheStore, key: str, timeout: Optional[int] = None) -> None:
         self.store = store
@@ -504,25 +1556,38 @@ class CacheLock:
         self.timeout = timeout or 60
         self.acquired = False
         self.owner = id(self)
+        self._notifier = _LockNotifier.for_key(f"{id(store)}:{self.key}")
+    
+    def _try_acquire(self) -> bool:
+        """Attempt to take the lock once."""
+        return self.store.add(self.key, self.owner, self.timeout)
+    
+    def _release_marker(self) -> Any:
+        """Snapshot taken before an attempt so a release in between isn't missed."""
+        return self._notifier.generation
+    
+    def _wait_for_release(self, marker: Any, timeout: float) -> None:
+        """Block until the lock is released or the timeout elapses."""
+        self._notifier.wait(marker, timeout)
     
     def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
         """Acquire the lock."""
         if self.acquired:
             return True
         
-        end_time = time.time() + (timeout or 0) if timeout else float('inf')
+        end_time = time.time() + timeout if timeout else float('inf')
         
-        while time.time() <= end_time:
-            if self.store.add(self.key, self.owner, self.timeout):
+        while True:
+            marker = self._release_marker()
+            if self._try_acquire():
                 self.acquired = True
                 return True
             
-            if not blocking:
+            remaining = end_time - time.time()
+            if not blocking or remaining <= 0:
                 return False
             
-            time.sleep(0.1)
-        
-        return False
+            self._wait_for_release(marker, min(remaining, self.WAIT_SLICE))
     
     def release(self) -> bool:
         """Release the lock."""
@@ -534,10 +1599,73 @@ class CacheLock:
         if current_owner == self.owner:
             self.store.forget(self.key)
             self.acquired = False
+            self._notifier.notify()
             return True
         
         return False
     
+    def extend(self) -> bool:
+        """Reset the lock's expiry to a full timeout if this instance still holds it."""
+        if not self.acquired:
+            return False
+        
+        if self.store.put_if_equals(self.key, self.owner, self.owner, self.timeout):
+            return True
+        
+        self.acquired = False
+        return False
+    
+    async def _atry_acquire(self) -> bool:
+        """Attempt to take the lock once without blocking the event loop."""
+        return await self.store.aadd(self.key, self.owner, self.timeout)
+    
+    async def _await_release(self, marker: Any, timeout: float) -> None:
+        """Wait for a release without blocking the event loop."""
+        await asyncio.to_thread(self._wait_for_release, marker, timeout)
+    
+    async def aacquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """Acquire the lock without blocking the event loop."""
+        if self.acquired:
+            return True
+        
+        end_time = time.time() + timeout if timeout else float('inf')
+        
+        while True:
+            marker = self._release_marker()
+            if await self._atry_acquire():
+                self.acquired = True
+                return True
+            
+            remaining = end_time - time.time()
+            if not blocking or remaining <= 0:
+                return False
+            
+            await self._await_release(marker, min(remaining, self.WAIT_SLICE))
+    
+    async def arelease(self) -> bool:
+        """Release the lock without blocking the event loop."""
+        if not self.acquired:
+            return False
+        
+        if await self.store.aget(self.key) == self.owner:
+            await self.store.aforget(self.key)
+            self.acquired = False
+            self._notifier.notify()
+            return True
+        
+        return False
+    
+    async def aextend(self) -> bool:
+        """Extend the lock without blocking the event loop."""
+        if not self.acquired:
+            return False
+        
+        if await self.store.aput_if_equals(self.key, self.owner, self.owner, self.timeout):
+            return True
+        
+        self.acquired = False
+        return False
+    
     def __enter__(self) -> 'CacheLock':
         """Context manager entry."""
         if not self.acquire():
@@ -548,9 +1676,142 @@ class CacheLock:
         """Context manager exit."""
         self.release()
     
+    async def __aenter__(self) -> 'CacheLock':
+        """Async context manager entry."""
+        if not await self.aacquire():
+            raise TimeoutError(f"Could not acquire lock: {self.key}")
+        return self
+    
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        await self.arelease()
+    
     def is_owned_by_current_process(self) -> bool:
         """Check if lock is owned by current process."""
-        return bool(self.store.get(self.key) == self.owner)
+        return bool(self.current_owner() == self.owner)
+    
+    def current_owner(self) -> Any:
+        """Owner of the lock as stored, or None if nobody holds it."""
+        return self.store.get(self.key)
+
+
+class RedisCacheLock(CacheLock):
+    """
+    Redis lock using SET NX PX and an owner-checked atomic release.
+    
+    Releasing pushes a token onto a notification list that blocked
+    acquirers wait on with BLPOP, across all processes.
+    """
+    
+    RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    redis.call('rpush', KEYS[2], 1)
+    redis.call('pexpire', KEYS[2], ARGV[2])
+    return 1
+end
+return 0
+"""
+    
+    EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+    
+    def __init__(self, store: RedisCacheStore, key: str, timeout: Optional[int] = None) -> None:
+        super().__init__(store, key, timeout)
+        self.redis_store = store
+        self.owner = secrets.token_hex(16)  # type: ignore[assignment]
+    
+    @property
+    def _redis_key(self) -> str:
+        return self.redis_store._key(self.key)
+    
+    @property
+    def _notify_key(self) -> str:
+        return self.redis_store._key(f"{self.key}:notify")
+    
+    def _try_acquire(self) -> bool:
+        """Attempt a single SET NX PX."""
+        return bool(self.redis_store.redis.set(
+            self._redis_key, self.owner, px=int(self.timeout * 1000), nx=True
+        ))
+    
+    def current_owner(self) -> Any:
+        """Owner token of the lock as stored in Redis, or None if nobody holds it."""
+        owner = self.redis_store.redis.get(self._redis_key)
+        return owner.decode() if isinstance(owner, bytes) else owner
+    
+    def _release_marker(self) -> Any:
+        """Release tokens persist in Redis, so no snapshot is needed."""
+        return None
+    
+    def _wait_for_release(self, marker: Any, timeout: float) -> None:
+        """Block on the notification list until a release or the timeout."""
+        self.redis_store.redis.blpop([self._notify_key], timeout=timeout)
+    
+    def release(self) -> bool:
+        """Release the lock only if this instance still owns it."""
+        if not self.acquired:
+            return False
+        
+        released = self.redis_store.redis.eval(
+            self.RELEASE_SCRIPT, 2, self._redis_key, self._notify_key,
+            self.owner, int(self.timeout * 1000)
+        )
+        self.acquired = False
+        return bool(released)
+    
+    def extend(self) -> bool:
+        """Reset the expiry with an owner-checked PEXPIRE."""
+        if not self.acquired:
+            return False
+        
+        self.acquired = bool(self.redis_store.redis.eval(
+            self.EXTEND_SCRIPT, 1, self._redis_key, self.owner, int(self.timeout * 1000)
+        ))
+        return self.acquired
+    
+    async def _atry_acquire(self) -> bool:
+        """Attempt a single async SET NX PX."""
+        return bool(await self.redis_store.aredis.set(
+            self._redis_key, self.owner, px=int(self.timeout * 1000), nx=True
+        ))
+    
+    async def _await_release(self, marker: Any, timeout: float) -> None:
+        """Wait on the notification list with async BLPOP."""
+        await self.redis_store.aredis.blpop([self._notify_key], timeout=timeout)
+    
+    async def arelease(self) -> bool:
+        """Release the lock with the async compare-and-delete script."""
+        if not self.acquired:
+            return False
+        
+        released = await self.redis_store.aredis.eval(
+            self.RELEASE_SCRIPT, 2, self._redis_key, self._notify_key,
+            self.owner, int(self.timeout * 1000)
+        )
+        self.acquired = False
+        return bool(released)
+    
+    async def aextend(self) -> bool:
+        """Extend the lock with the async owner-checked PEXPIRE."""
+        if not self.acquired:
+            return False
+        
+        self.acquired = bool(await self.redis_store.aredis.eval(
+            self.EXTEND_SCRIPT, 1, self._redis_key, self.owner, int(self.timeout * 1000)
+        ))
+        return self.acquired
+    
+    def is_owned_by_current_process(self) -> bool:
+        """Check if lock is owned by this lock instance."""
+        current = self.redis_store.redis.get(self._redis_key)
+        if isinstance(current, bytes):
+            current = current.decode()
+        return bool(current == self.owner)
 
 
 class AtomicCacheTransaction:
@@ -647,10 +1908,12 @@ class RepositoryCache:
         self.prefix = prefix
         self.serializer = serializer or JsonCacheSerializer()
         self.event_listener = CacheEventListener()
+        self.namespace = CacheNamespace(store, "repository")
     
     def _key(self, key: str) -> str:
-        """Generate prefixed cache key."""
-        return f"{self.prefix}:{key}" if self.prefix else key
+        """Generate prefixed, namespace-versioned cache key."""
+        versioned_key = self.namespace.qualify(key, [self.prefix])
+        return f"{self.prefix}:{versioned_key}" if self.prefix else versioned_key
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get item with optional deserialization."""
@@ -662,7 +1925,7 @@ class RepositoryCache:
             return default
         
         try:
-            value = self.serializer.unserialize(raw_value) if isinstance(raw_value, str) else raw_value
+            value = self.serializer.unserialize(raw_value) if isinstance(raw_value, (str, bytes)) else raw_value
             self.event_listener.fire(CacheEvent(CacheOperation.GET, cache_key, value))
             return value
         except Exception:
@@ -691,9 +1954,8 @@ class RepositoryCache:
         return fresh_value
     
     def flush_prefix(self) -> bool:
-        """Flush all keys with this prefix (simplified implementation)."""
-        # In a real implementation, you'd need to track keys or use pattern matching
-        return True
+        """Flush all keys with this prefix by bumping the prefix namespace."""
+        return self.namespace.bump(self.prefix)
 
 
 # Enhanced cache manager with additional features
@@ -7,13 +7,16 @@ import time
 import inspect
 import hashlib
 import json
+import logging
 from datetime import datetime, timedelta
 
-from .CacheStore import cache_manager, CacheOperation, CacheEvent
+from .CacheStore import cache_manager, CacheOperation, CacheEvent, CacheNamespace
 
 T = TypeVar('T')
 F = TypeVar('F', bound=Callable[..., Any])
 
+logger = logging.getLogger(__name__)
+
 
 def cache_key(*args: Any, **kwargs: Any) -> str:
     """Generate cache key from function arguments."""
@@ -85,14 +88,14 @@ def cache_async(ttl: Optional[int] = None,
             
             # Try to get from cache
             cache_store = cache_manager.store(store)
-            cached_result = cache_store.get(cache_key_str)
+            cached_result = await cache_store.aget(cache_key_str)
             
             if cached_result is not None:
                 return cached_result
             
             # Execute async function and cache result
             result = await func(*args, **kwargs)
-            cache_store.put(cache_key_str, result, ttl)
+            await cache_store.aput(cache_key_str, result, ttl)
             return result
         
         return wrapper  # type: ignore
@@ -130,30 +133,54 @@ def cache_lock(key_func: Optional[Callable[..., str]] = None,
 
 
 class CacheThrough:
-    """Cache-through pattern implementation."""
+    """
+    Cache-through pattern implementation.
+    
+    Keys live in a versioned namespace for the prefix, so
+    ``invalidate_pattern("*")`` drops every key under the prefix in O(1)
+    without scanning the store.
+    """
     
     def __init__(self, prefix: str = "", ttl: Optional[int] = None, store: Optional[str] = None):
         self.prefix = prefix
         self.ttl = ttl
         self.store = store
         self.cache_store = cache_manager.store(store)
+        self.namespace = CacheNamespace(self.cache_store, f"through:{prefix}")
+    
+    def _cache_key(self, key: str) -> str:
+        """Generate the namespace-versioned cache key."""
+        versioned_key = self.namespace.qualify(key, [""])
+        return f"{self.prefix}:{versioned_key}" if self.prefix else versioned_key
     
     def get_or_set(self, key: str, value_func: Callable[[], T], ttl: Optional[int] = None) -> T:
         """Get value from cache or set it using the provided function."""
-        cache_key = f"{self.prefix}:{key}" if self.prefix else key
         ttl = ttl or self.ttl
-        
-        return self.cache_store.remember(cache_key, ttl, value_func)  # type: ignore
+        return self.cache_store.remember(self._cache_key(key), ttl, value_func)  # type: ignore
     
     def invalidate(self, key: str) -> bool:
         """Invalidate a cache entry."""
-        cache_key = f"{self.prefix}:{key}" if self.prefix else key
-        return self.cache_store.forget(cache_key)
+        return self.cache_store.forget(self._cache_key(key))
     
     def invalidate_pattern(self, pattern: str) -> bool:
-        """Invalidate cache entries matching a pattern (simplified)."""
-        # In a real implementation, you'd need pattern matching support
-        return True
+        """
+        Invalidate all cache entries matching a pattern.
+        
+        Only ``"*"``, every entry under the prefix, is supported; it is
+        handled in O(1) by bumping the prefix namespace. Other patterns would
+        need a key scan, so they are logged and nothing is invalidated.
+        
+        Args:
+            pattern: The pattern to invalidate
+        
+        Returns:
+            Whether the entries were invalidated
+        """
+        if pattern != "*":
+            logger.warning("CacheThrough can only invalidate '*', not %r", pattern)
+            return False
+        
+        return self.namespace.bump("")
 
 
 class CacheAside:
@@ -259,7 +286,16 @@ class CacheMetrics:
             'total_requests': total_requests,
             'hit_rate': f"{hit_rate:.2f}%",
             'uptime_seconds': uptime,
-            'requests_per_second': total_requests / uptime if uptime > 0 else 0
+            'requests_per_second': total_requests / uptime if uptime > 0 else 0,
+            'stores': self.get_store_stats()
+        }
+    
+    def get_store_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get driver-level statistics (evictions, hits, misses) per store."""
+        return {
+            name: stats
+            for name, store in cache_manager.stores.items()
+            if (stats := store.stats())
         }
     
     def reset(self) -> None:
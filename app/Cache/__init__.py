@@ -1,9 +1,10 @@
 from .CacheStore import (
-    CacheStore, ArrayCacheStore, RedisCacheStore, FileCacheStore, 
-    CacheManager, TaggedCache, cache_manager,
+    CacheStore, ArrayCacheStore, RedisCacheStore, FileCacheStore, TieredCacheStore,
+    CacheManager, TaggedCache, CacheNamespace, cache_manager,
     # Enhanced features
-    EnhancedCacheManager, CacheLock, AtomicCacheTransaction,
+    EnhancedCacheManager, CacheLock, RedisCacheLock, AtomicCacheTransaction,
     CacheSerializer, JsonCacheSerializer, PickleCacheSerializer,
+    MsgpackCacheSerializer, CompressedCacheSerializer, CacheSerializerRegistry,
     RepositoryCache, CacheEventListener, CacheEvent, CacheOperation
 )
 
@@ -27,17 +28,23 @@ __all__ = [
     "ArrayCacheStore", 
     "RedisCacheStore", 
     "FileCacheStore", 
+    "TieredCacheStore",
     "CacheManager", 
     "TaggedCache", 
+    "CacheNamespace",
     "cache_manager",
     
     # Enhanced features
     "EnhancedCacheManager",
     "CacheLock",
+    "RedisCacheLock",
     "AtomicCacheTransaction",
     "CacheSerializer",
     "JsonCacheSerializer", 
     "PickleCacheSerializer",
+    "MsgpackCacheSerializer",
+    "CompressedCacheSerializer",
+    "CacheSerializerRegistry",
     "RepositoryCache",
     "CacheEventListener",
     "CacheEvent",
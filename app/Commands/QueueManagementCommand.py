@@ -3,8 +3,11 @@ from __future__ import annotations
 import sys
 import json
 import argparse
+from dataclasses import asdict
 from typing import Optional
 
+from app.Queue.FailedJobs import RetryProgress
+from app.Queue.Outbox import OutboxRelay
 from app.Services.QueueService import QueueService
 
 
@@ -37,7 +40,7 @@ def queue_stats_command() -> None:
             print(f"\nOverall Totals:")
             print(f"  Active Jobs: {stats['totals']['active_jobs']}")
             print(f"  Failed Jobs: {stats['totals']['failed_jobs']}")
-            
+    
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
@@ -63,7 +66,7 @@ def queue_clear_command() -> None:
         
         count = queue_service.clear_queue(args.queue)
         print(f"Cleared {count} jobs from '{args.queue}' queue.")
-        
+    
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
@@ -79,8 +82,16 @@ def queue_failed_command() -> None:
     list_parser.add_argument('--queue', help='Filter by queue')
     list_parser.add_argument('--limit', type=int, default=50, help='Number of jobs to show')
     list_parser.add_argument('--offset', type=int, default=0, help='Offset for pagination')
+    list_parser.add_argument('--after', help='Show jobs older than this failed job ID (next page)')
+    list_parser.add_argument('--fingerprint', help='Only jobs with this exception fingerprint')
     list_parser.add_argument('--json', action='store_true', help='Output as JSON')
     
+    # Group failed jobs by exception
+    groups_parser = subparsers.add_parser('groups', help='Group failed jobs by exception fingerprint')
+    groups_parser.add_argument('--queue', help='Filter by queue')
+    groups_parser.add_argument('--job-class', help='Filter by job class')
+    groups_parser.add_argument('--json', action='store_true', help='Output as JSON')
+    
     # Retry failed job
     retry_parser = subparsers.add_parser('retry', help='Retry failed job')
     retry_parser.add_argument('job_id', help='Failed job ID to retry')
@@ -89,6 +100,11 @@ def queue_failed_command() -> None:
     # Retry all failed jobs
     retry_all_parser = subparsers.add_parser('retry-all', help='Retry all failed jobs')
     retry_all_parser.add_argument('--queue', help='Filter by queue')
+    retry_all_parser.add_argument('--fingerprint', help='Only retry jobs with this exception fingerprint')
+    retry_all_parser.add_argument('--job-class', help='Only retry jobs of this class')
+    retry_all_parser.add_argument('--to-queue', help='Queue to retry jobs on')
+    retry_all_parser.add_argument('--chunk-size', type=int, default=500, help='Jobs requeued per transaction')
+    retry_all_parser.add_argument('--rate', type=float, help='Maximum jobs requeued per second')
     retry_all_parser.add_argument('--confirm', action='store_true', help='Skip confirmation prompt')
     
     # Delete failed job
@@ -116,7 +132,9 @@ def queue_failed_command() -> None:
             failed_jobs = queue_service.get_failed_jobs(
                 limit=args.limit,
                 offset=args.offset,
-                queue=args.queue
+                queue=args.queue,
+                after_id=args.after,
+                fingerprint=args.fingerprint
             )
             
             if args.json:
@@ -136,8 +154,36 @@ def queue_failed_command() -> None:
                     print(f"Job Class: {job['job_class']}")
                     print(f"Failed At: {job['failed_at']}")
                     print(f"Attempts: {job['attempts']}")
+                    print(f"Fingerprint: {job['fingerprint']}")
                     print(f"Exception: {job['exception'][:100]}...")
                     print("-" * 80)
+                
+                if len(failed_jobs) == args.limit:
+                    print(f"Next page: --after {failed_jobs[-1]['id']}")
+        
+        elif args.action == 'groups':
+            groups = queue_service.group_failed_jobs(queue=args.queue, job_class=args.job_class)
+            
+            if args.json:
+                print(json.dumps([asdict(group) for group in groups], indent=2, default=str))
+            else:
+                if not groups:
+                    print("No failed jobs found.")
+                    return
+                
+                print("Failed Job Groups:")
+                print("=" * 80)
+                
+                for group in groups:
+                    exception = f"{group.exception_class}: {group.message}" if group.exception_class else group.message
+                    print(f"Fingerprint: {group.fingerprint}  ({group.count} jobs)")
+                    print(f"Job Class: {group.job_class}")
+                    print(f"Exception: {exception[:100]}")
+                    if group.frame:
+                        print(f"Raised In: {group.frame}")
+                    print(f"Queues: {', '.join(group.queues)}")
+                    print(f"Failed: {group.first_failed_at} - {group.last_failed_at}")
+                    print("-" * 80)
         
         elif args.action == 'retry':
             new_job_id = queue_service.retry_failed_job(args.job_id, args.queue)
@@ -146,13 +192,23 @@ def queue_failed_command() -> None:
         elif args.action == 'retry-all':
             if not args.confirm:
                 queue_filter = f" in queue '{args.queue}'" if args.queue else ""
+                if args.fingerprint:
+                    queue_filter += f" with fingerprint {args.fingerprint}"
                 response = input(f"Retry all failed jobs{queue_filter}? [y/N]: ")
                 if response.lower() != 'y':
                     print("Operation cancelled.")
                     return
             
-            count = queue_service.retry_all_failed_jobs(args.queue)
-            print(f"Retried {count} failed jobs.")
+            count = queue_service.retry_failed_jobs(
+                queue=args.queue,
+                fingerprint=args.fingerprint,
+                job_class=args.job_class,
+                to_queue=args.to_queue,
+                chunk_size=args.chunk_size,
+                rate=args.rate,
+                progress=print_retry_progress
+            )
+            print(f"\nRetried {count} failed jobs.")
         
         elif args.action == 'delete':
             if not args.confirm:
@@ -176,12 +232,23 @@ def queue_failed_command() -> None:
             
             count = queue_service.clear_failed_jobs(args.queue)
             print(f"Cleared {count} failed jobs.")
-            
+    
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
 
 
+def print_retry_progress(progress: RetryProgress) -> None:
+    """Overwrite a single progress line while failed jobs are requeued."""
+    percent = progress.scanned / progress.total * 100 if progress.total else 100.0
+    print(
+        f"\rScanned {progress.scanned}/{progress.total} ({percent:.0f}%), "
+        f"retried {progress.retried} at {progress.rate:.0f} jobs/s",
+        end='',
+        flush=True
+    )
+
+
 def queue_release_command() -> None:
     """Release reserved jobs that have timed out."""
     parser = argparse.ArgumentParser(description='Release timed out reserved jobs')
@@ -194,7 +261,50 @@ def queue_release_command() -> None:
         queue_service = QueueService(args.connection)
         count = queue_service.release_reserved_jobs(args.timeout)
         print(f"Released {count} timed out reserved jobs.")
+    
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+
+
+def queue_outbox_command() -> None:
+    """Relay or inspect the job outbox."""
+    parser = argparse.ArgumentParser(description='Relay jobs and broadcasts from the outbox')
+    subparsers = parser.add_subparsers(dest='action', help='Action to perform')
+    
+    relay_parser = subparsers.add_parser('relay', help='Hand committed outbox rows to the queue')
+    relay_parser.add_argument('--once', action='store_true', help='Drain the outbox and exit')
+    relay_parser.add_argument('--batch-size', type=int, help='Rows per batch')
+    
+    subparsers.add_parser('status', help='Show the number of rows waiting in the outbox')
+    
+    args = parser.parse_args()
+    
+    if not args.action:
+        parser.print_help()
+        return
+    
+    try:
+        relay = OutboxRelay(batch_size=getattr(args, 'batch_size', None))
+        
+        if args.action == 'status':
+            print(f"Outbox: {relay.pending()} pending messages")
+        
+        elif args.once:
+            total = 0
+            while True:
+                relayed = relay.relay()
+                total += relayed
+                if relayed < relay.batch_size:
+                    break
+            print(f"Relayed {total} outbox messages.")
         
+        else:
+            print(f"Relaying outbox every {relay.poll_interval}s (Ctrl+C to stop)")
+            relay.run()
+    
+    except KeyboardInterrupt:
+        print("\nStopped.")
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
@@ -211,6 +321,7 @@ def main() -> None:
         print("  clear       - Clear jobs from queue")
         print("  failed      - Manage failed jobs")
         print("  release     - Release timed out reserved jobs")
+        print("  outbox      - Relay or inspect the job outbox")
         return
     
     command = sys.argv[1]
@@ -224,6 +335,8 @@ def main() -> None:
         queue_failed_command()
     elif command == 'release':
         queue_release_command()
+    elif command == 'outbox':
+        queue_outbox_command()
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
@@ -25,7 +25,7 @@ def queue_work_command() -> None:
     parser = argparse.ArgumentParser(description='Start a queue worker')
     
     parser.add_argument('--queue', default='default', help='Queue to process')
-    parser.add_argument('--connection', default='default', help='Database connection')
+    parser.add_argument('--connection', default='default', help='Queue connection')
     parser.add_argument('--name', default='default', help='Worker name')
     parser.add_argument('--delay', type=int, default=0, help='Delay when no jobs (seconds)')
     parser.add_argument('--sleep', type=int, default=3, help='Sleep duration when idle (seconds)')
@@ -33,8 +33,14 @@ def queue_work_command() -> None:
     parser.add_argument('--max-jobs', type=int, default=0, help='Maximum jobs to process (0 = unlimited)')
     parser.add_argument('--max-time', type=int, default=0, help='Maximum time to run (0 = unlimited)')
     parser.add_argument('--memory', type=int, default=128, help='Memory limit (MB)')
+    parser.add_argument('--tries', type=int, default=3, help='Attempts for jobs that don\'t set max_attempts')
     parser.add_argument('--rest', type=int, default=0, help='Microseconds to rest between jobs')
     parser.add_argument('--force', action='store_true', help='Force worker to run')
+    parser.add_argument('--prefetch', type=int, default=1, help='Jobs to reserve per round-trip')
+    parser.add_argument('--ack-batch-size', type=int, default=50, help='Completed jobs deleted per statement')
+    parser.add_argument('--concurrency', type=int, default=1, help='Jobs to run at once')
+    parser.add_argument('--runner', default='thread', choices=['async', 'thread', 'process'],
+                        help='How concurrent jobs run: async (coroutine handlers), thread (blocking I/O), process (CPU-bound)')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
     
     args = parser.parse_args()
@@ -54,7 +60,12 @@ def queue_work_command() -> None:
         memory_limit=args.memory,
         timeout=args.timeout,
         rest=args.rest,
-        force=args.force
+        force=args.force,
+        prefetch=args.prefetch,
+        ack_batch_size=args.ack_batch_size,
+        concurrency=args.concurrency,
+        runner=args.runner,
+        tries=args.tries
     )
     
     # Start worker
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+import asyncio
+import logging
+import argparse
+import importlib
+
+from app.Commands.QueueWorkerCommand import setup_logging
+
+
+def schedule_work_command() -> None:
+    """Command to run the job scheduler."""
+    parser = argparse.ArgumentParser(description='Run the recurring job scheduler')
+    
+    parser.add_argument('--jobs', default='', help='Comma-separated modules that register @recurring jobs')
+    parser.add_argument('--store', default=None, help='Cache store used for leader election')
+    parser.add_argument('--lease', type=int, default=None, help='Leader lease (seconds)')
+    parser.add_argument('--catch-up', default=None, choices=['skip', 'once', 'all'],
+                        help='What to do about runs missed while no scheduler was running')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    
+    args = parser.parse_args()
+    
+    setup_logging(args.log_level)
+    
+    from app.Cache.CacheStore import cache_manager
+    from app.Jobs.JobRegistry import job_registry
+    from app.Jobs.Scheduler import JobScheduler
+    
+    # Importing the job modules runs their @recurring decorators
+    for module in filter(None, args.jobs.split(',')):
+        importlib.import_module(module.strip())
+    
+    scheduler = JobScheduler(
+        store=cache_manager.store(args.store) if args.store else None,
+        lease=args.lease
+    )
+    if args.catch_up:
+        job_registry.set_catch_up_policy(args.catch_up)
+    
+    try:
+        print(f"Scheduler running {len(job_registry.get_recurring_jobs())} recurring job(s)...")
+        print("Press Ctrl+C to stop the scheduler")
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        print("\nScheduler stopped by user")
+    except Exception as e:
+        logging.getLogger("jobs.scheduler").exception(e)
+        print(f"Scheduler error: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    schedule_work_command()
@@ -1,6 +1,7 @@
 """Queue management commands."""
 
 from .QueueWorkerCommand import queue_work_command
+from .ScheduleWorkCommand import schedule_work_command
 from .QueueManagementCommand import (
     queue_stats_command,
     queue_clear_command,
@@ -10,6 +11,7 @@ from .QueueManagementCommand import (
 
 __all__ = [
     "queue_work_command",
+    "schedule_work_command",
     "queue_stats_command",
     "queue_clear_command", 
     "queue_failed_command",
@@ -100,6 +100,25 @@ class EventDispatcher:
             except Exception as e:
                 # Log error but continue with other listeners
                 print(f"Error in event listener {listener.__name__}: {e}")
+        
+        if isinstance(event_instance, ShouldBroadcast):
+            try:
+                await self._broadcast(event_instance)
+            except Exception as e:
+                # Like a failing listener, a failed broadcast doesn't fail the dispatch
+                print(f"Error broadcasting event {event_name}: {e}")
+    
+    async def _broadcast(self, event: ShouldBroadcast) -> None:
+        """Broadcast an event, through the outbox when a session is bound to it."""
+        from app.Queue.Outbox import outbox
+        from app.Broadcasting.BroadcastManager import broadcast_manager
+        
+        channels = event.broadcast_on()
+        name = event.broadcast_as() or event.__class__.__name__
+        if outbox.session() is not None:
+            outbox.add_broadcast(channels, name, event.broadcast_with())
+        else:
+            await broadcast_manager.broadcast(channels, name, event.broadcast_with())
     
     def until(self, event: Union[Event, str], *args: Any, **kwargs: Any) -> Any:
         """Dispatch event until first non-null response."""
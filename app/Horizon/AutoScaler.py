@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .Supervisors import SupervisorConfig
+
+
+@dataclass
+class QueueLoad:
+    """Smoothed load measured on one queue."""
+    queue: str
+    pending_jobs: int
+    arrival_rate: float  # jobs per second entering the queue
+    processing_time: float  # seconds per job, 0 until a job has completed
+    wait_time: float = 0.0  # longest wait of recently started jobs
+
+
+class LoadEstimator:
+    """
+    Turns periodic queue metric samples into per-queue load.
+    
+    Pushes aren't counted anywhere, so the arrival rate comes from flow
+    conservation: what arrived since the last sample is what completed plus
+    what the backlog grew by. Rates and processing times are exponentially
+    smoothed so one noisy sample doesn't swing the worker count.
+    """
+    
+    def __init__(self, smoothing: float = 0.5) -> None:
+        self.smoothing = smoothing
+        self._samples: Dict[str, Tuple[float, int]] = {}
+        self._arrival_rates: Dict[str, float] = {}
+        self._processing_times: Dict[str, float] = {}
+    
+    def observe(self, queue: str, metrics: Dict[str, Any], now: float) -> QueueLoad:
+        """Record a QueueMonitor sample for a queue and return its current load."""
+        pending = int(metrics.get('pending_jobs', 0))
+        completed_rate = float(metrics.get('throughput_per_minute', 0.0)) / 60
+        
+        sample = completed_rate
+        previous = self._samples.get(queue)
+        if previous is not None and now > previous[0]:
+            sample = max(0.0, completed_rate + (pending - previous[1]) / (now - previous[0]))
+        self._samples[queue] = (now, pending)
+        
+        rate = self._smooth(self._arrival_rates.get(queue), sample)
+        self._arrival_rates[queue] = rate
+        
+        processing_time = float(metrics.get('average_processing_time', 0.0))
+        if processing_time > 0:
+            self._processing_times[queue] = self._smooth(self._processing_times.get(queue), processing_time)
+        
+        return QueueLoad(
+            queue=queue,
+            pending_jobs=pending,
+            arrival_rate=rate,
+            processing_time=self._processing_times.get(queue, 0.0),
+            wait_time=float(metrics.get('longest_wait_time', 0.0))
+        )
+    
+    def _smooth(self, previous: Optional[float], sample: float) -> float:
+        if previous is None:
+            return sample
+        return self.smoothing * sample + (1 - self.smoothing) * previous
+
+
+class AutoScaler:
+    """
+    Sizes each queue's worker pool from its measured load.
+    
+    By Little's law a queue receiving λ jobs/s that take S seconds each
+    keeps λ·S workers busy on average; dividing by the target utilization
+    leaves headroom for bursts. On top of that the backlog must drain
+    within ``balance_target_wait`` seconds, which needs pending·S/target
+    more workers, scaled up further when jobs are already waiting longer
+    than the target. Each balance moves a queue by at most
+    ``balance_max_shift`` workers and a supervisor only rebalances once per
+    ``balance_cooldown`` seconds.
+    """
+    
+    def __init__(self, estimator: Optional[LoadEstimator] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.estimator = estimator or LoadEstimator()
+        self.clock = clock
+        self._last_scaled: Dict[str, float] = {}
+    
+    def desired_workers(self, config: SupervisorConfig, load: QueueLoad, current: int) -> int:
+        """Workers a queue needs, before min/max, shift and cooldown limits."""
+        if load.processing_time <= 0:
+            # Nothing has completed yet, so there's no service time to go on
+            return current + 1 if load.pending_jobs else current
+        
+        target_wait = max(config.balance_target_wait, 1)
+        busy = load.arrival_rate * load.processing_time / config.balance_utilization
+        lateness = max(1.0, load.wait_time / target_wait)
+        drain = load.pending_jobs * load.processing_time / target_wait * lateness
+        
+        return math.ceil(busy + drain)
+    
+    def balance(
+        self,
+        config: SupervisorConfig,
+        current: Dict[str, int],
+        queue_metrics: Dict[str, Dict[str, Any]],
+        now: Optional[float] = None
+    ) -> Dict[str, int]:
+        """Target worker count per queue of a supervisor."""
+        now = self.clock() if now is None else now
+        loads = {
+            queue: self.estimator.observe(queue, metrics, now)
+            for queue, metrics in queue_metrics.items()
+            if queue in config.queue
+        }
+        
+        counts = {queue: current.get(queue, 0) for queue in config.queue}
+        last_scaled = self._last_scaled.get(config.name)
+        if last_scaled is not None and now - last_scaled < config.balance_cooldown:
+            return counts
+        
+        shift = config.balance_max_shift
+        targets = {}
+        for queue, have in counts.items():
+            want = self.desired_workers(config, loads[queue], have) if queue in loads else have
+            want = min(have + shift, max(have - shift, want))
+            targets[queue] = max(want, config.min_processes)
+        
+        self._cap(targets, counts, config.max_processes, config.min_processes)
+        
+        if targets != counts:
+            self._last_scaled[config.name] = now
+        return targets
+    
+    def _cap(self, targets: Dict[str, int], counts: Dict[str, int], max_processes: int, min_processes: int) -> None:
+        """Trim the queues that grew most until the supervisor fits max_processes."""
+        while sum(targets.values()) > max_processes:
+            shrinkable = [queue for queue, target in targets.items() if target > min_processes]
+            if not shrinkable:
+                return
+            queue = max(shrinkable, key=lambda q: (targets[q] - counts[q], targets[q]))
+            targets[queue] -= 1
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
@@ -75,6 +75,14 @@ class HorizonDashboard:
             stats = await self.horizon.get_dashboard_stats()
             return stats.get('metrics', {})
         
+        @app.get("/horizon/api/batches/{batch_id}")
+        async def get_batch(batch_id: str):
+            """Get job batch progress."""
+            progress = await self.horizon.get_batch_progress(batch_id)
+            if progress is None:
+                raise HTTPException(status_code=404, detail="Batch not found")
+            return progress
+        
         @app.post("/horizon/api/supervisors/{supervisor_name}/pause")
         async def pause_supervisor(supervisor_name: str):
             """Pause a supervisor."""
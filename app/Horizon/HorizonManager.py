@@ -6,51 +6,13 @@ import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Set
 import redis.asyncio as redis
-from dataclasses import dataclass, asdict
+from dataclasses import asdict
 
 from app.Queue.QueueManager import QueueManager
+from .AutoScaler import AutoScaler
 from .Metrics import HorizonMetrics
 from .Monitoring import JobMonitor, QueueMonitor
-
-
-@dataclass
-class SupervisorConfig:
-    """Configuration for queue supervisors."""
-    name: str
-    connection: str = 'redis'
-    queue: List[str] = None
-    processes: int = 1
-    timeout: int = 60
-    memory: int = 128
-    tries: int = 3
-    nice: int = 0
-    balance: str = 'auto'
-    min_processes: int = 1
-    max_processes: int = 10
-    balance_cooldown: int = 3
-    balance_max_shift: int = 1
-    rest: int = 0
-    max_time: int = 0
-    max_jobs: int = 1000
-    
-    def __post_init__(self):
-        if self.queue is None:
-            self.queue = ['default']
-
-
-@dataclass
-class WorkerProcess:
-    """Represents a running worker process."""
-    id: str
-    supervisor: str
-    queue: List[str]
-    status: str  # 'starting', 'running', 'paused', 'stopping'
-    started_at: datetime
-    pid: Optional[int] = None
-    memory_usage: int = 0
-    jobs_processed: int = 0
-    current_job: Optional[str] = None
-    last_activity: Optional[datetime] = None
+from .Supervisors import SupervisorConfig, SupervisorManager, WorkerProcess
 
 
 class HorizonManager:
@@ -71,11 +33,14 @@ class HorizonManager:
         
         # Supervisor configuration
         self.supervisors: Dict[str, SupervisorConfig] = {}
-        self.workers: Dict[str, WorkerProcess] = {}
+        self.supervisor_manager = SupervisorManager()
+        self.workers: Dict[str, WorkerProcess] = self.supervisor_manager.workers
+        self.auto_scaler = AutoScaler()
         
         # Horizon state
         self.is_running = False
         self.master_supervisors: Set[str] = set()
+        self.paused_supervisors: Set[str] = set()
         
         # Default configuration
         self._setup_default_supervisors()
@@ -121,12 +86,18 @@ class HorizonManager:
         await self.initialize()
         self.is_running = True
         
+        for config in self.supervisors.values():
+            for queue in config.queue:
+                await self.queue_monitor.add_queue_to_monitoring(queue, config.connection)
+            await self._start_supervisor(config)
+        
         # Start monitoring tasks
         tasks = [
             asyncio.create_task(self._monitor_queues()),
             asyncio.create_task(self._monitor_jobs()),
             asyncio.create_task(self._collect_metrics()),
             asyncio.create_task(self._manage_workers()),
+            asyncio.create_task(self._supervise_workers()),
         ]
         
         try:
@@ -138,9 +109,9 @@ class HorizonManager:
         """Stop Horizon and all worker processes."""
         self.is_running = False
         
-        # Stop all workers
-        for worker_id in list(self.workers.keys()):
-            await self._stop_worker(worker_id)
+        # Stop all workers, giving running jobs up to the longest timeout to finish
+        timeout = max((config.timeout for config in self.supervisors.values()), default=60)
+        await asyncio.to_thread(self.supervisor_manager.shutdown, timeout)
         
         # Close Redis connection
         if self.redis:
@@ -199,124 +170,98 @@ class HorizonManager:
             try:
                 for supervisor_name, config in self.supervisors.items():
                     await self._balance_workers(supervisor_name, config)
-                await asyncio.sleep(30)  # Balance every 30 seconds
+                await asyncio.sleep(5)  # Balance every 5 seconds
             except Exception as e:
                 print(f"Worker management error: {e}")
                 await asyncio.sleep(10)
     
+    async def _supervise_workers(self) -> None:
+        """Reap exited worker processes and restart crashed ones."""
+        while self.is_running:
+            try:
+                for worker in self.supervisor_manager.reap():
+                    if worker.exit_code:
+                        print(f"Worker {worker.id} (pid {worker.pid}) exited with code {worker.exit_code}")
+                await asyncio.sleep(1)
+            except Exception as e:
+                print(f"Worker supervision error: {e}")
+                await asyncio.sleep(5)
+    
+    async def _start_supervisor(self, config: SupervisorConfig) -> None:
+        """Start a supervisor's initial worker processes."""
+        for queue, count in self._initial_processes(config).items():
+            for _ in range(count):
+                await self._start_worker(config.name, config, queue)
+    
+    def _initial_processes(self, config: SupervisorConfig) -> Dict[str, int]:
+        """Split the supervisor's processes across its queues."""
+        if config.balance == 'auto':
+            return {queue: config.min_processes for queue in config.queue}
+        
+        per_queue, extra = divmod(config.processes, len(config.queue))
+        return {
+            queue: per_queue + (1 if index < extra else 0)
+            for index, queue in enumerate(config.queue)
+        }
+    
     async def _balance_workers(self, supervisor_name: str, config: SupervisorConfig) -> None:
         """Balance worker processes based on queue load."""
-        if config.balance == 'off':
+        if config.balance == 'off' or supervisor_name in self.paused_supervisors:
             return
         
-        # Get current workers for this supervisor
-        supervisor_workers = [
-            w for w in self.workers.values() 
-            if w.supervisor == supervisor_name
-        ]
-        
-        current_count = len(supervisor_workers)
-        
-        # Get queue metrics for balancing decision
-        queue_metrics = await self.queue_monitor.get_queue_metrics(config.queue)
-        pending_jobs = sum(q.get('pending_jobs', 0) for q in queue_metrics.values())
+        current = {
+            queue: self.supervisor_manager.count(supervisor_name, queue)
+            for queue in config.queue
+        }
         
-        # Determine target worker count
+        # Determine target worker count per queue
         if config.balance == 'auto':
-            target_count = self._calculate_target_workers(
-                pending_jobs, current_count, config
-            )
+            queue_metrics = await self.queue_monitor.get_queue_metrics(config.queue)
+            targets = self.auto_scaler.balance(config, current, queue_metrics)
         else:
-            target_count = config.processes
+            targets = self._initial_processes(config)
         
         # Adjust workers
-        if target_count > current_count and current_count < config.max_processes:
-            # Add workers
-            for _ in range(min(target_count - current_count, config.max_processes - current_count)):
-                await self._start_worker(supervisor_name, config)
-        elif target_count < current_count and current_count > config.min_processes:
-            # Remove workers
-            for _ in range(min(current_count - target_count, current_count - config.min_processes)):
-                await self._stop_oldest_worker(supervisor_name)
+        for queue, target in targets.items():
+            if target > current[queue]:
+                for _ in range(target - current[queue]):
+                    await self._start_worker(supervisor_name, config, queue)
+            elif target < current[queue]:
+                surplus = current[queue] - target
+                # Crashed workers still waiting to restart go first
+                surplus -= self.supervisor_manager.cancel_restarts(supervisor_name, queue, surplus)
+                for _ in range(surplus):
+                    await self._stop_oldest_worker(supervisor_name, queue)
     
-    def _calculate_target_workers(self, pending_jobs: int, current_workers: int, config: SupervisorConfig) -> int:
-        """Calculate target worker count based on pending jobs."""
-        if pending_jobs == 0:
-            return max(config.min_processes, 1)
-        
-        # Estimate workers needed (assuming 1 job per worker per minute)
-        jobs_per_worker_per_minute = 1
-        estimated_workers = min(
-            max(config.min_processes, pending_jobs // jobs_per_worker_per_minute),
-            config.max_processes
-        )
-        
-        # Apply balance constraints
-        max_shift = config.balance_max_shift
-        if estimated_workers > current_workers + max_shift:
-            return current_workers + max_shift
-        elif estimated_workers < current_workers - max_shift:
-            return max(current_workers - max_shift, config.min_processes)
-        
-        return estimated_workers
-    
-    async def _start_worker(self, supervisor_name: str, config: SupervisorConfig) -> str:
+    async def _start_worker(self, supervisor_name: str, config: SupervisorConfig, queue: Optional[str] = None) -> str:
         """Start a new worker process."""
-        worker_id = f"{supervisor_name}_{len(self.workers)}_{int(time.time())}"
-        
-        worker = WorkerProcess(
-            id=worker_id,
-            supervisor=supervisor_name,
-            queue=config.queue,
-            status='starting',
-            started_at=datetime.utcnow()
-        )
-        
-        self.workers[worker_id] = worker
-        
-        # In a real implementation, this would spawn an actual process
-        # For now, we'll simulate the worker state
-        worker.status = 'running'
-        worker.pid = hash(worker_id) % 10000  # Simulated PID
-        
-        return worker_id
+        worker = self.supervisor_manager.spawn(config, queue or config.queue[0])
+        return worker.id
     
     async def _stop_worker(self, worker_id: str) -> None:
-        """Stop a specific worker process."""
+        """Stop a specific worker process; it is reaped once it exits."""
         if worker_id in self.workers:
-            worker = self.workers[worker_id]
-            worker.status = 'stopping'
-            
-            # In a real implementation, this would terminate the process
-            # For now, we'll just remove from tracking
-            del self.workers[worker_id]
+            config = self.supervisors.get(self.workers[worker_id].supervisor)
+            self.supervisor_manager.stop(worker_id, config.timeout if config else None)
     
-    async def _stop_oldest_worker(self, supervisor_name: str) -> None:
+    async def _stop_oldest_worker(self, supervisor_name: str, queue: Optional[str] = None) -> None:
         """Stop the oldest worker in a supervisor."""
-        supervisor_workers = [
-            (worker_id, worker) for worker_id, worker in self.workers.items()
-            if worker.supervisor == supervisor_name
-        ]
-        
-        if supervisor_workers:
-            # Find oldest worker
-            oldest_worker_id, _ = min(
-                supervisor_workers, 
-                key=lambda x: x[1].started_at
-            )
-            await self._stop_worker(oldest_worker_id)
+        config = self.supervisors.get(supervisor_name)
+        self.supervisor_manager.stop_oldest(supervisor_name, queue, config.timeout if config else None)
     
     async def _pause_supervisor(self, supervisor_name: str) -> None:
         """Pause all workers in a supervisor."""
-        for worker in self.workers.values():
+        self.paused_supervisors.add(supervisor_name)
+        for worker in list(self.workers.values()):
             if worker.supervisor == supervisor_name:
-                worker.status = 'paused'
+                self.supervisor_manager.pause(worker.id)
     
     async def _continue_supervisor(self, supervisor_name: str) -> None:
         """Continue all paused workers in a supervisor."""
-        for worker in self.workers.values():
-            if worker.supervisor == supervisor_name and worker.status == 'paused':
-                worker.status = 'running'
+        self.paused_supervisors.discard(supervisor_name)
+        for worker in list(self.workers.values()):
+            if worker.supervisor == supervisor_name:
+                self.supervisor_manager.resume(worker.id)
     
     # Dashboard data methods
     
@@ -331,6 +276,11 @@ class HorizonManager:
             'metrics': await self._get_metrics_summary(),
         }
     
+    async def get_batch_progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job batch's counters and progress (single keyed read)."""
+        from app.Jobs.BatchRepository import batch_repository
+        return await asyncio.to_thread(batch_repository().progress, batch_id)
+    
     async def _get_overview_stats(self) -> Dict[str, Any]:
         """Get high-level overview statistics."""
         total_workers = len(self.workers)
@@ -3,8 +3,8 @@ from __future__ import annotations
 import asyncio
 import json
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Set
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Set, Tuple
 import redis.asyncio as redis
 from dataclasses import dataclass, asdict
 
@@ -41,6 +41,7 @@ class QueueStatus:
     longest_wait_time: float
     throughput_per_minute: float
     last_processed_at: Optional[datetime] = None
+    suppressed_jobs: int = 0  # duplicate, debounced and overlapping jobs dropped or released
 
 
 class JobMonitor:
@@ -84,7 +85,7 @@ class JobMonitor:
         
         # Store in Redis
         await self._store_job_status(job_status)
-        await self._update_job_metrics('started', queue)
+        await self._update_job_metrics('started', queue, wait_time=self._wait_time(payload, job_status.started_at))
     
     async def complete_job(self, job_id: str, processing_time: float) -> None:
         """Record job completion."""
@@ -266,7 +267,23 @@ class JobMonitor:
             {json.dumps(job_data): timestamp}
         )
     
-    async def _update_job_metrics(self, event: str, queue: str, processing_time: float = None) -> None:
+    def _wait_time(self, payload: Dict[str, Any], started_at: datetime) -> Optional[float]:
+        """Seconds between a job being pushed and a worker starting it."""
+        created_at = payload.get('available_at') or payload.get('created_at')
+        if not created_at:
+            return None
+        
+        try:
+            created = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            return None
+        if created.tzinfo is not None:
+            created = created.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        return max(0.0, (started_at - created).total_seconds())
+    
+    async def _update_job_metrics(self, event: str, queue: str, processing_time: float = None,
+                                  wait_time: float = None) -> None:
         """Update job metrics counters."""
         now = datetime.utcnow()
         minute_key = f"{self.JOB_METRICS_KEY}:{queue}:{now.strftime('%Y%m%d%H%M')}"
@@ -288,6 +305,11 @@ class JobMonitor:
             await self.redis.lpush(f"{minute_key}:times", processing_time)
             await self.redis.ltrim(f"{minute_key}:times", 0, 99)  # Keep last 100
             await self.redis.expire(f"{minute_key}:times", 3600)
+        
+        if wait_time is not None:
+            await self.redis.lpush(f"{minute_key}:waits", wait_time)
+            await self.redis.ltrim(f"{minute_key}:waits", 0, 99)
+            await self.redis.expire(f"{minute_key}:waits", 3600)
     
     async def _get_recent_metrics(self, seconds: int) -> Dict[str, Any]:
         """Get metrics for the recent time period."""
@@ -333,7 +355,9 @@ class QueueMonitor:
         
         # Queue tracking
         self.QUEUE_METRICS_KEY = 'horizon:monitoring:queue_metrics'
+        self.JOB_METRICS_KEY = 'horizon:monitoring:job_metrics'
         self.monitored_queues: Set[str] = {'default', 'emails', 'notifications'}
+        self.queue_connections: Dict[str, str] = {}  # Queue connection per monitored queue
     
     async def initialize(self) -> None:
         """Initialize Redis connection."""
@@ -367,9 +391,11 @@ class QueueMonitor:
         """Get metrics for all monitored queues."""
         return await self.get_queue_metrics(list(self.monitored_queues))
     
-    async def add_queue_to_monitoring(self, queue_name: str) -> None:
-        """Add a queue to monitoring."""
+    async def add_queue_to_monitoring(self, queue_name: str, connection: Optional[str] = None) -> None:
+        """Add a queue to monitoring, read from ``connection`` (the configured default if None)."""
         self.monitored_queues.add(queue_name)
+        if connection is not None:
+            self.queue_connections[queue_name] = connection
     
     async def remove_queue_from_monitoring(self, queue_name: str) -> None:
         """Remove a queue from monitoring."""
@@ -377,13 +403,15 @@ class QueueMonitor:
     
     async def _collect_single_queue_metrics(self, queue_name: str) -> QueueStatus:
         """Collect metrics for a single queue."""
-        # Get queue sizes
-        pending_jobs = await self.redis.llen(f"queue:{queue_name}")
-        processing_jobs = await self.redis.llen(f"queue:{queue_name}:processing")
+        # Get queue sizes from the driver the queue's workers consume
+        pending_jobs, processing_jobs = await self._get_queue_sizes(queue_name)
         
         # Get completed/failed counts from recent metrics
         completed_jobs = await self._get_recent_job_count(queue_name, 'completed', 3600)
         failed_jobs = await self._get_recent_job_count(queue_name, 'failed', 3600)
+        suppressed_jobs = 0
+        for event in ('duplicate', 'debounced', 'overlapping'):
+            suppressed_jobs += await self._get_recent_job_count(queue_name, event, 3600)
         
         # Calculate performance metrics
         avg_processing_time = await self._calculate_average_processing_time(queue_name)
@@ -402,9 +430,42 @@ class QueueMonitor:
             average_processing_time=avg_processing_time,
             longest_wait_time=longest_wait_time,
             throughput_per_minute=throughput,
-            last_processed_at=last_processed
+            last_processed_at=last_processed,
+            suppressed_jobs=suppressed_jobs
         )
     
+    async def _get_queue_sizes(self, queue_name: str) -> Tuple[int, int]:
+        """Pending and processing job counts for a queue."""
+        from config.queue import get_connection_config
+        connection = get_connection_config(self.queue_connections.get(queue_name))
+        
+        if connection.get('driver', 'database') == 'database':
+            return await asyncio.to_thread(self._database_queue_sizes, queue_name)
+        
+        # The Redis driver keeps pending jobs in a sorted set
+        pending_jobs = await self.redis.zcard(f"queue:{queue_name}")
+        processing_jobs = await self.redis.llen(f"queue:{queue_name}:processing")
+        return pending_jobs, processing_jobs
+    
+    def _database_queue_sizes(self, queue_name: str) -> Tuple[int, int]:
+        """Count available and reserved rows of a queue in the jobs table."""
+        from sqlalchemy import and_, case, func, select
+        from config.database import get_database
+        from database.migrations.create_jobs_table import Job as JobModel
+        
+        now = datetime.utcnow()
+        db = next(get_database())
+        try:
+            pending, processing = db.execute(
+                select(
+                    func.sum(case((and_(JobModel.is_reserved == False, JobModel.available_at <= now), 1), else_=0)),
+                    func.sum(case((JobModel.is_reserved == True, 1), else_=0)),
+                ).where(JobModel.queue == queue_name)
+            ).one()
+        finally:
+            db.close()
+        return int(pending or 0), int(processing or 0)
+    
     async def _store_queue_metrics(self, status: QueueStatus) -> None:
         """Store queue metrics in Redis."""
         now = datetime.utcnow()
@@ -420,27 +481,51 @@ class QueueMonitor:
     
     async def _get_recent_job_count(self, queue_name: str, event: str, seconds: int) -> int:
         """Get count of specific job events in recent time."""
-        # This would sum up job counts from metrics
-        # For now, return a placeholder
-        return 0
+        now = datetime.utcnow()
+        pipe = self.redis.pipeline(transaction=False)
+        for offset in range(max(1, seconds // 60)):
+            minute = now - timedelta(minutes=offset)
+            pipe.hget(f"{self.JOB_METRICS_KEY}:{queue_name}:{minute.strftime('%Y%m%d%H%M')}", event)
+        return sum(int(count or 0) for count in await pipe.execute())
     
     async def _calculate_average_processing_time(self, queue_name: str) -> float:
-        """Calculate average processing time for the queue."""
-        # This would analyze recent processing times
-        # For now, return a placeholder
-        return 0.0
+        """Calculate average processing time for the queue over the last 5 minutes."""
+        times = await self._recent_samples(queue_name, 'times', 5)
+        return sum(times) / len(times) if times else 0.0
     
     async def _calculate_longest_wait_time(self, queue_name: str) -> float:
-        """Calculate longest wait time in the queue."""
-        # This would analyze job wait times
-        # For now, return a placeholder
-        return 0.0
+        """Calculate longest wait of jobs started in the last 2 minutes."""
+        waits = await self._recent_samples(queue_name, 'waits', 2)
+        return max(waits, default=0.0)
     
     async def _calculate_throughput(self, queue_name: str, seconds: int) -> float:
-        """Calculate jobs processed per time unit."""
-        # This would count completed jobs in the time period
-        # For now, return a placeholder
-        return 0.0
+        """Calculate jobs completed per minute over the last N seconds."""
+        now = datetime.utcnow()
+        minutes = max(1, seconds // 60)
+        completed = 0.0
+        
+        # Per-minute counters: the current minute is partial, so the oldest
+        # one is weighted by the share of it still inside the window
+        elapsed = now.second / 60
+        for offset in range(minutes + 1):
+            minute = now - timedelta(minutes=offset)
+            count = await self.redis.hget(
+                f"{self.JOB_METRICS_KEY}:{queue_name}:{minute.strftime('%Y%m%d%H%M')}", 'completed'
+            )
+            weight = 1.0 - elapsed if offset == minutes else 1.0
+            completed += int(count or 0) * weight
+        
+        return completed / minutes
+    
+    async def _recent_samples(self, queue_name: str, kind: str, minutes: int) -> List[float]:
+        """Processing or wait time samples recorded by JobMonitor in the last N minutes."""
+        now = datetime.utcnow()
+        samples: List[float] = []
+        for offset in range(minutes):
+            minute = now - timedelta(minutes=offset)
+            key = f"{self.JOB_METRICS_KEY}:{queue_name}:{minute.strftime('%Y%m%d%H%M')}:{kind}"
+            samples.extend(float(value) for value in await self.redis.lrange(key, 0, -1))
+        return samples
     
     async def _get_last_processed_time(self, queue_name: str) -> Optional[datetime]:
         """Get timestamp of last processed job."""
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class SupervisorConfig:
+    """Configuration for queue supervisors."""
+    name: str
+    connection: str = 'database'  # Queue connection the workers consume
+    queue: List[str] = None
+    processes: int = 1
+    timeout: int = 60
+    memory: int = 128
+    tries: int = 3
+    nice: int = 0
+    balance: str = 'auto'
+    min_processes: int = 1
+    max_processes: int = 10
+    balance_cooldown: int = 3
+    balance_max_shift: int = 1
+    balance_target_wait: int = 10  # Seconds a job should wait before it starts
+    balance_utilization: float = 0.8  # Busy fraction the auto balancer aims for
+    rest: int = 0
+    max_time: int = 0
+    max_jobs: int = 1000
+    
+    def __post_init__(self):
+        if self.queue is None:
+            self.queue = ['default']
+
+
+@dataclass
+class WorkerProcess:
+    """Represents a running worker process."""
+    id: str
+    supervisor: str
+    queue: List[str]
+    status: str  # 'starting', 'running', 'paused', 'stopping', 'stopped'
+    started_at: datetime
+    pid: Optional[int] = None
+    memory_usage: int = 0
+    jobs_processed: int = 0
+    current_job: Optional[str] = None
+    last_activity: Optional[datetime] = None
+    restarts: int = 0
+    exit_code: Optional[int] = None
+
+
+@dataclass
+class _PendingRestart:
+    """A crashed worker waiting out its backoff."""
+    due_at: float
+    config: SupervisorConfig
+    queue: str
+    restarts: int
+
+
+class SupervisorManager:
+    """
+    Spawns, reaps and restarts queue worker processes.
+    
+    Each worker is a ``python -m app.Commands.QueueWorkerCommand`` child on
+    one queue. ``reap`` collects exited children: workers that were told to
+    stop are dropped, workers that exited on their own (max jobs, max time,
+    memory limit) are replaced immediately, and crashed workers are replaced
+    after an exponential backoff that resets once a worker stays up for
+    ``stable_after`` seconds.
+    """
+    
+    def __init__(
+        self,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 60.0,
+        stable_after: float = 30.0,
+        stop_timeout: float = 60.0
+    ) -> None:
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.logger = logging.getLogger("horizon.supervisor")
+        
+        self.workers: Dict[str, WorkerProcess] = {}
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._configs: Dict[str, SupervisorConfig] = {}
+        self._started: Dict[str, float] = {}
+        self._stop_deadlines: Dict[str, float] = {}
+        self._crashes: Dict[Tuple[str, str], int] = {}
+        self._pending: List[_PendingRestart] = []
+        self._sequence = itertools.count(1)
+    
+    def spawn(self, config: SupervisorConfig, queue: str, restarts: int = 0) -> WorkerProcess:
+        """Start a worker process for one of the supervisor's queues."""
+        worker_id = f"{config.name}:{queue}:{os.getpid()}:{next(self._sequence)}"
+        worker = WorkerProcess(
+            id=worker_id,
+            supervisor=config.name,
+            queue=[queue],
+            status='starting',
+            started_at=datetime.utcnow(),
+            restarts=restarts
+        )
+        
+        process = subprocess.Popen(self._command(config, queue, worker_id), cwd=self._project_root())
+        worker.pid = process.pid
+        worker.status = 'running'
+        
+        self.workers[worker_id] = worker
+        self._processes[worker_id] = process
+        self._configs[worker_id] = config
+        self._started[worker_id] = time.monotonic()
+        return worker
+    
+    def stop(self, worker_id: str, timeout: Optional[float] = None) -> None:
+        """Ask a worker to finish its current job and exit; killed after the timeout."""
+        process = self._processes.get(worker_id)
+        if process is None or self.workers[worker_id].status == 'stopping':
+            return
+        
+        self.workers[worker_id].status = 'stopping'
+        self._stop_deadlines[worker_id] = time.monotonic() + (self.stop_timeout if timeout is None else timeout)
+        if process.poll() is None:
+            process.terminate()
+    
+    def stop_oldest(self, supervisor: str, queue: Optional[str] = None,
+                    timeout: Optional[float] = None) -> Optional[str]:
+        """Stop the longest-running worker of a supervisor (or one of its queues)."""
+        candidates = [
+            worker for worker in self.workers.values()
+            if worker.supervisor == supervisor
+            and worker.status != 'stopping'
+            and (queue is None or queue in worker.queue)
+        ]
+        if not candidates:
+            return None
+        
+        oldest = min(candidates, key=lambda worker: worker.started_at)
+        self.stop(oldest.id, timeout)
+        return oldest.id
+    
+    def pause(self, worker_id: str) -> None:
+        """Pause a worker; QueueWorker toggles pausing on SIGUSR2."""
+        worker = self.workers.get(worker_id)
+        if worker and worker.status == 'running' and self._signal(worker_id, 'SIGUSR2'):
+            worker.status = 'paused'
+    
+    def resume(self, worker_id: str) -> None:
+        """Resume a paused worker."""
+        worker = self.workers.get(worker_id)
+        if worker and worker.status == 'paused' and self._signal(worker_id, 'SIGUSR2'):
+            worker.status = 'running'
+    
+    def count(self, supervisor: str, queue: Optional[str] = None) -> int:
+        """Workers a supervisor has (or will have after pending restarts), excluding stopping ones."""
+        running = sum(
+            1 for worker in self.workers.values()
+            if worker.supervisor == supervisor
+            and worker.status != 'stopping'
+            and (queue is None or queue in worker.queue)
+        )
+        pending = sum(
+            1 for restart in self._pending
+            if restart.config.name == supervisor and (queue is None or restart.queue == queue)
+        )
+        return running + pending
+    
+    def cancel_restarts(self, supervisor: str, queue: Optional[str] = None, limit: Optional[int] = None) -> int:
+        """Drop pending restarts, e.g. when the balancer scales a crashing queue down."""
+        cancelled = 0
+        for restart in list(self._pending):
+            if limit is not None and cancelled >= limit:
+                break
+            if restart.config.name == supervisor and (queue is None or restart.queue == queue):
+                self._pending.remove(restart)
+                cancelled += 1
+        return cancelled
+    
+    def reap(self) -> List[WorkerProcess]:
+        """Collect exited workers, kill overdue stops and start due restarts."""
+        now = time.monotonic()
+        exited = []
+        
+        for worker_id, process in list(self._processes.items()):
+            if process.poll() is None:
+                deadline = self._stop_deadlines.get(worker_id)
+                if deadline is not None and now >= deadline:
+                    self.logger.warning(f"Worker {worker_id} did not stop in time, killing it")
+                    process.kill()
+                continue
+            
+            worker = self.workers.pop(worker_id)
+            del self._processes[worker_id]
+            config = self._configs.pop(worker_id)
+            started = self._started.pop(worker_id)
+            stopping = self._stop_deadlines.pop(worker_id, None) is not None
+            worker.exit_code = process.returncode
+            exited.append(worker)
+            
+            if not stopping:
+                self._schedule_restart(worker, config, now - started, now)
+            
+            worker.status = 'stopped'
+        
+        for restart in [r for r in self._pending if r.due_at <= now]:
+            self._pending.remove(restart)
+            self.spawn(restart.config, restart.queue, restart.restarts)
+        
+        return exited
+    
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop every worker and wait for them, killing any still running at the timeout."""
+        self._pending.clear()
+        for worker_id in list(self._processes):
+            self.stop(worker_id, timeout)
+        
+        while self._processes:
+            self.reap()
+            if self._processes:
+                time.sleep(0.1)
+    
+    def _schedule_restart(self, worker: WorkerProcess, config: SupervisorConfig, uptime: float, now: float) -> None:
+        key = (worker.supervisor, worker.queue[0])
+        
+        if worker.exit_code == 0 or uptime >= self.stable_after:
+            # Recycled itself (job, time or memory limit) or ran long enough to count as healthy
+            self._crashes[key] = 0
+            delay = 0.0
+        else:
+            self._crashes[key] = self._crashes.get(key, 0) + 1
+            delay = min(self.restart_backoff * 2 ** (self._crashes[key] - 1), self.max_restart_backoff)
+            self.logger.warning(
+                f"Worker {worker.id} exited with code {worker.exit_code} after {uptime:.1f}s, "
+                f"restarting in {delay:.1f}s"
+            )
+        
+        self._pending.append(_PendingRestart(now + delay, config, worker.queue[0], worker.restarts + 1))
+    
+    def _signal(self, worker_id: str, name: str) -> bool:
+        signum = getattr(signal, name, None)
+        process = self._processes.get(worker_id)
+        if signum is None or process is None or process.poll() is not None:
+            return False
+        process.send_signal(signum)
+        return True
+    
+    def _command(self, config: SupervisorConfig, queue: str, worker_id: str) -> List[str]:
+        command = [
+            sys.executable, '-m', 'app.Commands.QueueWorkerCommand',
+            '--name', worker_id,
+            '--connection', config.connection,
+            '--queue', queue,
+            '--tries', str(config.tries),
+            '--timeout', str(config.timeout),
+            '--memory', str(config.memory),
+            '--max-jobs', str(config.max_jobs),
+            '--max-time', str(config.max_time),
+            '--rest', str(config.rest),
+        ]
+        if config.nice and shutil.which('nice'):
+            command = ['nice', '-n', str(config.nice)] + command
+        return command
+    
+    def _project_root(self) -> str:
+        return str(Path(__file__).resolve().parents[2])
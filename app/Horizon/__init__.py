@@ -8,10 +8,11 @@ similar to Laravel Horizon for Redis-based queues.
 """
 
 from .HorizonManager import HorizonManager
-from .Dashboard import Dashboard
+from .Dashboard import HorizonDashboard as Dashboard
 from .Metrics import HorizonMetrics
 from .Monitoring import JobMonitor, QueueMonitor
-from .Supervisors import SupervisorManager
+from .Supervisors import SupervisorConfig, SupervisorManager, WorkerProcess
+from .AutoScaler import AutoScaler, LoadEstimator, QueueLoad
 from .Facades import Horizon
 
 __all__ = [
@@ -20,6 +21,11 @@ __all__ = [
     'HorizonMetrics',
     'JobMonitor',
     'QueueMonitor',
+    'SupervisorConfig',
     'SupervisorManager',
+    'WorkerProcess',
+    'AutoScaler',
+    'LoadEstimator',
+    'QueueLoad',
     'Horizon',
 ]
\ No newline at end of file
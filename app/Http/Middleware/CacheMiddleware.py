@@ -40,7 +40,7 @@ class CacheMiddleware(BaseHTTPMiddleware):
         cache_key = self._generate_cache_key(request)
         
         # Try to get from cache
-        cached_response = self.cache_store.get(cache_key)
+        cached_response = await self.cache_store.aget(cache_key)
         if cached_response:
             return self._restore_response(cached_response)
         
@@ -49,7 +49,7 @@ class CacheMiddleware(BaseHTTPMiddleware):
         
         # Cache successful responses
         if self._should_cache_response(response):
-            self._cache_response(cache_key, response)
+            await self._cache_response(cache_key, response)
         
         return response
     
@@ -108,7 +108,7 @@ class CacheMiddleware(BaseHTTPMiddleware):
         
         return True
     
-    def _cache_response(self, cache_key: str, response: Response) -> None:
+    async def _cache_response(self, cache_key: str, response: Response) -> None:
         """Cache the response."""
         try:
             # Extract TTL from response headers
@@ -134,7 +134,7 @@ class CacheMiddleware(BaseHTTPMiddleware):
             if hasattr(response, 'body'):
                 cached_data['body'] = response.body.decode() if isinstance(response.body, bytes) else response.body
             
-            self.cache_store.put(cache_key, cached_data, ttl)
+            await self.cache_store.aput(cache_key, cached_data, ttl)
             
         except Exception:
             # Don't let caching errors affect the response
@@ -196,7 +196,7 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         cache_key = self._generate_rule_cache_key(request, cache_rule)
         
         # Try cache first
-        cached = self.cache_store.get(cache_key)
+        cached = await self.cache_store.aget(cache_key)
         if cached:
             return self._build_cached_response(cached)
         
@@ -204,7 +204,7 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         
         if response.status_code == 200:
-            self._cache_rule_response(cache_key, response, cache_rule)
+            await self._cache_rule_response(cache_key, response, cache_rule)
         
         return response
     
@@ -242,7 +242,7 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
         key_string = ':'.join(key_parts)
         return hashlib.md5(key_string.encode()).hexdigest()
     
-    def _cache_rule_response(self, cache_key: str, response: Response, rule: Dict[str, Any]) -> None:
+    async def _cache_rule_response(self, cache_key: str, response: Response, rule: Dict[str, Any]) -> None:
         """Cache response according to rule."""
         ttl = rule.get('ttl', 300)
         
@@ -259,7 +259,7 @@ class ResponseCacheMiddleware(BaseHTTPMiddleware):
                 'body': body.decode() if isinstance(body, bytes) else str(body)
             }
             
-            self.cache_store.put(cache_key, cached_data, ttl)
+            await self.cache_store.aput(cache_key, cached_data, ttl)
             
         except Exception:
             pass
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import json
 import uuid
+import logging
+import importlib
 from typing import List, Dict, Any, Optional, Callable, TYPE_CHECKING
 from datetime import datetime, timezone
 from dataclasses import dataclass
 
 from app.Jobs.Job import ShouldQueue
+from app.Jobs.BatchRepository import batch_repository
 from config.database import get_database
 
 if TYPE_CHECKING:
@@ -71,22 +74,24 @@ class JobBatcher:
         if not self.jobs:
             raise ValueError("Cannot dispatch empty batch")
         
-        batch_id = self._create_batch()
+        from app.Utils.ULIDUtils import generate_ulid
+        batch_id = generate_ulid()
         
-        # Dispatch all jobs with batch ID
+        # Dispatch all jobs with batch ID in chunked bulk inserts
         from app.Services.QueueService import QueueService
         from config.database import get_database
         db = next(get_database())
         queue_service = QueueService(db)
         
         for job in self.jobs:
-            # Add batch ID to job payload
+            # Stored in the jobs.batch_id column
             job._batch_id = batch_id  # type: ignore
-            queue_service.push(job, queue)
+        # The batch counts only the jobs queued, not skipped duplicates of unique jobs
+        queue_service.bulk(self.jobs, queue, before_insert=lambda total: self._create_batch(batch_id, total))
         
         return batch_id
     
-    def _create_batch(self) -> str:
+    def _create_batch(self, batch_id: str, total_jobs: int) -> str:
         """Create batch record in database."""
         db = next(get_database())
         try:
@@ -95,9 +100,10 @@ class JobBatcher:
             batch_name = self.options.name or f"Batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
             
             batch = JobBatch(
+                id=batch_id,
                 name=batch_name,
-                total_jobs=len(self.jobs),
-                pending_jobs=len(self.jobs),
+                total_jobs=total_jobs,
+                pending_jobs=total_jobs,
                 failed_jobs=0,
                 allow_failures=self.options.allow_failures,
                 failure_threshold=self.options.failure_threshold,
@@ -105,12 +111,18 @@ class JobBatcher:
                     "has_then_callback": self.options.then_callback is not None,
                     "has_catch_callback": self.options.catch_callback is not None,
                     "has_finally_callback": self.options.finally_callback is not None,
+                    "then_callback": _callback_path(self.options.then_callback),
+                    "catch_callback": _callback_path(self.options.catch_callback),
+                    "finally_callback": _callback_path(self.options.finally_callback),
                 })
             )
             
             db.add(batch)
             db.commit()
             
+            cancel_threshold = None if self.options.allow_failures else self.options.failure_threshold
+            batch_repository().create(batch.id, total_jobs, cancel_threshold)
+            
             return batch.id
             
         except Exception as e:
@@ -120,6 +132,35 @@ class JobBatcher:
             db.close()
 
 
+def _callback_path(callback: Optional[Callable[..., Any]]) -> Optional[str]:
+    """
+    Importable ``module:qualname`` reference for a batch callback.
+    
+    Callbacks run in whichever worker finishes the batch, so only
+    module-level functions (or methods reachable from one) can be stored.
+    """
+    if callback is None:
+        return None
+    
+    module = getattr(callback, "__module__", None)
+    qualname = getattr(callback, "__qualname__", "")
+    if not module or not qualname or "<" in qualname:
+        logging.getLogger(__name__).warning(
+            f"Batch callback {callback!r} is not importable (lambda or closure) and will not run"
+        )
+        return None
+    return f"{module}:{qualname}"
+
+
+def _resolve_callback(path: str) -> Callable[..., Any]:
+    """Inverse of ``_callback_path``."""
+    module_path, qualname = path.split(":", 1)
+    target: Any = importlib.import_module(module_path)
+    for attribute in qualname.split("."):
+        target = getattr(target, attribute)
+    return target  # type: ignore[no-any-return]
+
+
 class Batchable:
     """
     Mixin for jobs that can be part of a batch.
@@ -151,28 +192,32 @@ class Batchable:
             db.close()
     
     def notify_batch_job_completed(self, failed: bool = False) -> None:
-        """Notify batch that this job completed."""
-        if not self.is_batched():
+        """
+        Notify batch that this job completed.
+        
+        Counters are updated atomically by the batch repository. Only the
+        worker whose update finishes (or cancels) the batch cancels the
+        remaining jobs and runs the callbacks, so they fire exactly once.
+        """
+        batch_id = self.batch_id()
+        if batch_id is None:
+            return
+        
+        outcome = batch_repository().record_job(batch_id, failed)
+        if outcome is None or not (outcome.finished or outcome.cancelled):
             return
         
         db = next(get_database())
         try:
             from database.migrations.create_job_batches_table import JobBatch
             
-            batch = db.query(JobBatch).filter(JobBatch.id == self.batch_id()).first()
-            if batch:
-                batch.job_completed(failed)
-                
-                # Check if batch should be cancelled due to failures
-                if not batch.allow_failures and batch.should_cancel_on_failure():
-                    batch.cancel()
-                    self._cancel_remaining_batch_jobs(db, batch.id)
-                
+            if outcome.cancelled:
+                self._cancel_remaining_batch_jobs(db, batch_id)
                 db.commit()
-                
-                # Execute callbacks if batch is finished
-                if batch.is_finished():
-                    self._execute_batch_callbacks(batch)
+            
+            batch = db.query(JobBatch).filter(JobBatch.id == batch_id).first()
+            if batch:
+                self._execute_batch_callbacks(batch)
         except Exception as e:
             db.rollback()
             raise
@@ -183,36 +228,34 @@ class Batchable:
         """Cancel remaining jobs in the batch."""
         from database.migrations.create_jobs_table import Job as JobModel
         
-        # Mark remaining jobs in batch as cancelled
-        remaining_jobs = (
+        # Delete remaining unreserved jobs in the batch via the batch_id index
+        (
             db.query(JobModel)
-            .filter(JobModel.payload.contains(f'"_batch_id": "{batch_id}"'))
+            .filter(JobModel.batch_id == batch_id)
             .filter(JobModel.is_reserved == False)
-            .all()
+            .delete(synchronize_session=False)
         )
-        
-        for job in remaining_jobs:
-            db.delete(job)
     
     def _execute_batch_callbacks(self, batch: JobBatch) -> None:
         """Execute batch completion callbacks."""
-        try:
-            options_data = json.loads(batch.options or "{}")
-            
-            if batch.failed_jobs > 0 and options_data.get("has_catch_callback"):
-                # Would execute catch callback here
-                pass
-            elif batch.failed_jobs == 0 and options_data.get("has_then_callback"):
-                # Would execute then callback here  
-                pass
-            
-            if options_data.get("has_finally_callback"):
-                # Would execute finally callback here
-                pass
-                
-        except Exception as e:
-            # Log callback execution error
-            print(f"Error executing batch callbacks: {str(e)}")
+        logger = logging.getLogger(__name__)
+        options_data = json.loads(batch.options or "{}")
+        
+        def run(name: str, *args: Any) -> None:
+            path = options_data.get(name)
+            if not path:
+                return
+            try:
+                _resolve_callback(path)(*args)
+            except Exception as e:
+                logger.error(f"Error executing batch {name} for {batch.id}: {str(e)}")
+        
+        if batch.failed_jobs > 0:
+            run("catch_callback", Exception(f"Batch {batch.id} finished with {batch.failed_jobs} failed jobs"))
+        else:
+            run("then_callback")
+        
+        run("finally_callback")
 
 
 class BatchableJob(ShouldQueue, Batchable):
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from sqlalchemy import select, update
+
+from config.database import get_database
+
+if TYPE_CHECKING:
+    import redis
+
+
+@dataclass
+class BatchOutcome:
+    """Batch counters right after a job was recorded."""
+    total_jobs: int
+    pending_jobs: int
+    failed_jobs: int
+    finished: bool = False  # this update completed the batch
+    cancelled: bool = False  # this update crossed the failure threshold
+    
+    @property
+    def progress(self) -> float:
+        if self.total_jobs == 0:
+            return 100.0
+        return (self.total_jobs - self.pending_jobs) / self.total_jobs * 100.0
+
+
+class BatchRepository(ABC):
+    """
+    Stores job batch counters.
+    
+    ``record_job`` is atomic, so concurrent workers never lose updates, and
+    the finished/cancelled transition is claimed by exactly one caller,
+    which is the one that runs the batch callbacks.
+    """
+    
+    @abstractmethod
+    def create(self, batch_id: str, total_jobs: int, cancel_threshold: Optional[int]) -> None:
+        """Start tracking counters for a new batch."""
+        pass
+    
+    @abstractmethod
+    def record_job(self, batch_id: str, failed: bool = False) -> Optional[BatchOutcome]:
+        """Count one finished job; None if the batch is unknown or already drained."""
+        pass
+    
+    @abstractmethod
+    def progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Current counters for a batch, read in O(1)."""
+        pass
+    
+    def _progress_dict(self, batch_id: str, total: int, pending: int, failed: int,
+                       finished: bool, cancelled: bool) -> Dict[str, Any]:
+        outcome = BatchOutcome(total, pending, failed)
+        return {
+            "id": batch_id,
+            "total_jobs": total,
+            "pending_jobs": pending,
+            "processed_jobs": total - pending,
+            "failed_jobs": failed,
+            "progress": round(outcome.progress, 2),
+            "finished": finished,
+            "cancelled": cancelled,
+        }
+
+
+class DatabaseBatchRepository(BatchRepository):
+    """
+    Counters on the job_batches row.
+    
+    Each job is one ``UPDATE ... SET pending_jobs = pending_jobs - 1
+    RETURNING ...``; finishing and cancelling are conditional updates on
+    ``finished_at IS NULL``, so only one worker observes the transition.
+    """
+    
+    def create(self, batch_id: str, total_jobs: int, cancel_threshold: Optional[int]) -> None:
+        # The job_batches row written by JobBatcher already holds the counters
+        pass
+    
+    def record_job(self, batch_id: str, failed: bool = False) -> Optional[BatchOutcome]:
+        from database.migrations.create_job_batches_table import JobBatch
+        
+        # progress is listed first so MySQL, which applies SET left to right,
+        # computes it from the old pending count like every other database
+        statement = (
+            update(JobBatch)
+            .where(JobBatch.id == batch_id, JobBatch.pending_jobs > 0)
+            .ordered_values(
+                (JobBatch.progress, (JobBatch.total_jobs - JobBatch.pending_jobs + 1) * 100.0 / JobBatch.total_jobs),
+                (JobBatch.failed_jobs, JobBatch.failed_jobs + (1 if failed else 0)),
+                (JobBatch.pending_jobs, JobBatch.pending_jobs - 1)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        columns = (
+            JobBatch.total_jobs,
+            JobBatch.pending_jobs,
+            JobBatch.failed_jobs,
+            JobBatch.allow_failures,
+            JobBatch.failure_threshold
+        )
+        
+        db = next(get_database())
+        try:
+            if db.get_bind().dialect.update_returning:
+                row = db.execute(statement.returning(*columns)).first()
+            else:
+                # The UPDATE holds the row lock until commit, so this read is consistent
+                row = None
+                if db.execute(statement).rowcount:
+                    row = db.execute(select(*columns).where(JobBatch.id == batch_id)).first()
+            
+            if row is None:
+                db.commit()
+                return None
+            
+            total, pending, failed_jobs, allow_failures, failure_threshold = row
+            outcome = BatchOutcome(total, pending, failed_jobs)
+            
+            now = datetime.now(timezone.utc)
+            if not allow_failures and failure_threshold and failed_jobs >= failure_threshold:
+                outcome.cancelled = self._claim_finish(db, batch_id, finished_at=now, cancelled_at=now)
+            elif pending == 0:
+                outcome.finished = self._claim_finish(db, batch_id, finished_at=now)
+            
+            db.commit()
+            return outcome
+        
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _claim_finish(self, db: Any, batch_id: str, **values: Any) -> bool:
+        from database.migrations.create_job_batches_table import JobBatch
+        
+        result = db.execute(
+            update(JobBatch)
+            .where(JobBatch.id == batch_id, JobBatch.finished_at.is_(None))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount == 1)
+    
+    def progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        from database.migrations.create_job_batches_table import JobBatch
+        
+        db = next(get_database())
+        try:
+            row = db.execute(
+                select(
+                    JobBatch.total_jobs,
+                    JobBatch.pending_jobs,
+                    JobBatch.failed_jobs,
+                    JobBatch.finished_at,
+                    JobBatch.cancelled_at
+                ).where(JobBatch.id == batch_id)
+            ).first()
+        finally:
+            db.close()
+        
+        if row is None:
+            return None
+        return self._progress_dict(batch_id, row[0], row[1], row[2], row[3] is not None, row[4] is not None)
+
+
+# KEYS: batch hash
+# ARGV: failed (1/0), now, finished-batch ttl
+RECORD_JOB_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+if tonumber(redis.call('HGET', KEYS[1], 'pending_jobs')) <= 0 then
+    return nil
+end
+local pending = redis.call('HINCRBY', KEYS[1], 'pending_jobs', -1)
+local failed = tonumber(redis.call('HGET', KEYS[1], 'failed_jobs'))
+if ARGV[1] == '1' then
+    failed = redis.call('HINCRBY', KEYS[1], 'failed_jobs', 1)
+end
+local total = tonumber(redis.call('HGET', KEYS[1], 'total_jobs'))
+local threshold = tonumber(redis.call('HGET', KEYS[1], 'cancel_threshold') or 0)
+
+local transition = ''
+if threshold > 0 and failed >= threshold then
+    if redis.call('HSETNX', KEYS[1], 'finished_at', ARGV[2]) == 1 then
+        redis.call('HSET', KEYS[1], 'cancelled_at', ARGV[2])
+        transition = 'cancelled'
+    end
+elseif pending == 0 then
+    if redis.call('HSETNX', KEYS[1], 'finished_at', ARGV[2]) == 1 then
+        transition = 'finished'
+    end
+end
+if transition ~= '' then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {total, pending, failed, transition}
+"""
+
+
+class RedisBatchRepository(BatchRepository):
+    """
+    Counters in a Redis hash per batch, updated with HINCRBY inside one
+    script that also claims the finish with HSETNX.
+    
+    The job_batches row stays the system of record for batch metadata;
+    the worker that finishes or cancels the batch writes the final counters
+    back to it.
+    """
+    
+    def __init__(
+        self,
+        connection_params: Optional[Dict[str, Any]] = None,
+        key_prefix: str = "batch:",
+        finished_ttl: int = 86400
+    ) -> None:
+        self.connection_params = connection_params or {
+            "host": "localhost",
+            "port": 6379,
+            "db": 0,
+            "decode_responses": True
+        }
+        self.key_prefix = key_prefix
+        self.finished_ttl = finished_ttl
+        self._redis: Optional[redis.Redis] = None
+        self._record_script: Any = None
+    
+    @property
+    def redis(self) -> redis.Redis:
+        """Get Redis connection."""
+        if self._redis is None:
+            try:
+                import redis
+                self._redis = redis.Redis(**self.connection_params)
+            except ImportError:
+                raise ImportError("Redis package not installed. Install with: pip install redis")
+        
+        return self._redis
+    
+    def create(self, batch_id: str, total_jobs: int, cancel_threshold: Optional[int]) -> None:
+        self.redis.hset(f"{self.key_prefix}{batch_id}", mapping={
+            "total_jobs": total_jobs,
+            "pending_jobs": total_jobs,
+            "failed_jobs": 0,
+            "cancel_threshold": cancel_threshold or 0,
+        })
+    
+    def record_job(self, batch_id: str, failed: bool = False) -> Optional[BatchOutcome]:
+        if self._record_script is None:
+            self._record_script = self.redis.register_script(RECORD_JOB_SCRIPT)
+        
+        result = self._record_script(
+            keys=[f"{self.key_prefix}{batch_id}"],
+            args=[1 if failed else 0, time.time(), self.finished_ttl]
+        )
+        if result is None:
+            return None
+        
+        total, pending, failed_jobs, transition = result
+        if isinstance(transition, bytes):
+            transition = transition.decode()
+        outcome = BatchOutcome(
+            int(total),
+            int(pending),
+            int(failed_jobs),
+            finished=transition == "finished",
+            cancelled=transition == "cancelled"
+        )
+        
+        if outcome.finished or outcome.cancelled:
+            self._persist(batch_id, outcome)
+        return outcome
+    
+    def _persist(self, batch_id: str, outcome: BatchOutcome) -> None:
+        """Write the final counters to the job_batches row."""
+        from database.migrations.create_job_batches_table import JobBatch
+        
+        now = datetime.now(timezone.utc)
+        values: Dict[str, Any] = {
+            "pending_jobs": outcome.pending_jobs,
+            "failed_jobs": outcome.failed_jobs,
+            "progress": outcome.progress,
+            "finished_at": now,
+        }
+        if outcome.cancelled:
+            values["cancelled_at"] = now
+        
+        db = next(get_database())
+        try:
+            db.execute(update(JobBatch).where(JobBatch.id == batch_id).values(**values))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        values = self.redis.hmget(
+            f"{self.key_prefix}{batch_id}",
+            ["total_jobs", "pending_jobs", "failed_jobs", "finished_at", "cancelled_at"]
+        )
+        if values[0] is None:
+            # Expired from Redis; fall back to the row
+            return DatabaseBatchRepository().progress(batch_id)
+        
+        total, pending, failed, finished_at, cancelled_at = values
+        return self._progress_dict(
+            batch_id, int(total), int(pending), int(failed), finished_at is not None, cancelled_at is not None
+        )
+
+
+_repository: Optional[BatchRepository] = None
+
+
+def batch_repository() -> BatchRepository:
+    """The batch repository configured under ``queue.batching.driver``."""
+    global _repository
+    if _repository is None:
+        from config.queue import get_queue_config
+        
+        config = get_queue_config("batching") or {}
+        driver = config.get("driver", "database")
+        if driver == "database":
+            _repository = DatabaseBatchRepository()
+        elif driver == "redis":
+            _repository = RedisBatchRepository(
+                connection_params=config.get("redis"),
+                key_prefix=config.get("key_prefix", "batch:")
+            )
+        else:
+            raise ValueError(f"Unsupported batch driver: {driver}")
+    
+    return _repository
@@ -0,0 +1,208 @@
+"""
+Cron expression parsing and matching.
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+
+class CronExpression:
+    """
+    Five-field cron expression (minute hour day-of-month month day-of-week).
+    
+    Each field is parsed once into an integer bitmap, so matching a time is a
+    handful of bit tests and ``next_after``/``previous_before`` jump straight
+    to the next set bit instead of stepping minute by minute. Supports
+    lists, ranges, steps, month and weekday names, 7 as Sunday and the
+    ``@hourly``-style macros. As in Vixie cron, when both day fields are
+    restricted a day matches if either one does.
+    """
+    
+    MACROS: Dict[str, str] = {
+        '@yearly': '0 0 1 1 *',
+        '@annually': '0 0 1 1 *',
+        '@monthly': '0 0 1 * *',
+        '@weekly': '0 0 * * 0',
+        '@daily': '0 0 * * *',
+        '@midnight': '0 0 * * *',
+        '@hourly': '0 * * * *',
+    }
+    
+    MONTH_NAMES = {
+        name: index for index, name in enumerate(
+            ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC'], start=1
+        )
+    }
+    WEEKDAY_NAMES = {name: index for index, name in enumerate(['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT'])}
+    
+    # Give up after this many years without a match (e.g. "0 0 30 2 *")
+    SEARCH_YEARS = 8
+    
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        fields = self.MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12, self.MONTH_NAMES)
+        weekdays = self._parse_field(fields[4], 0, 7, self.WEEKDAY_NAMES)
+        self.weekdays = (weekdays | (weekdays >> 7)) & 0x7F  # 7 is also Sunday
+        
+        self._days_restricted = not fields[2].startswith(('*', '?'))
+        self._weekdays_restricted = not fields[4].startswith(('*', '?'))
+    
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+    
+    def matches(self, moment: datetime) -> bool:
+        """Whether the expression fires during the given minute."""
+        return bool(
+            self.minutes >> moment.minute & 1
+            and self.hours >> moment.hour & 1
+            and self.months >> moment.month & 1
+            and self._day_matches(moment)
+        )
+    
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``, in its timezone."""
+        candidate = self._next_wall_time(moment.replace(second=0, microsecond=0) + timedelta(minutes=1))
+        # Wall-clock search can land on a repeated hour when clocks go back
+        while moment.tzinfo is not None and candidate.timestamp() <= moment.timestamp():
+            candidate = self._next_wall_time(candidate + timedelta(minutes=1))
+        return candidate
+    
+    def previous_before(self, moment: datetime) -> datetime:
+        """Last matching minute at or before ``moment``, in its timezone."""
+        return self._previous_wall_time(moment.replace(second=0, microsecond=0))
+    
+    def _next_wall_time(self, moment: datetime) -> datetime:
+        limit = moment.year + self.SEARCH_YEARS
+        while moment.year <= limit:
+            if not self.months >> moment.month & 1:
+                month = _next_bit(self.months, moment.month + 1)
+                year = moment.year if month is not None else moment.year + 1
+                month = month if month is not None else _next_bit(self.months, 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            
+            if not self._day_matches(moment):
+                moment = _start_of_day(moment) + timedelta(days=1)
+                continue
+            
+            hour = _next_bit(self.hours, moment.hour)
+            if hour is None:
+                moment = _start_of_day(moment) + timedelta(days=1)
+                continue
+            if hour != moment.hour:
+                moment = moment.replace(hour=hour, minute=0)
+            
+            minute = _next_bit(self.minutes, moment.minute)
+            if minute is None:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            return moment.replace(minute=minute)
+        
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+    
+    def _previous_wall_time(self, moment: datetime) -> datetime:
+        limit = moment.year - self.SEARCH_YEARS
+        while moment.year >= limit:
+            if not self.months >> moment.month & 1:
+                month = _previous_bit(self.months, moment.month - 1)
+                year = moment.year if month is not None else moment.year - 1
+                month = month if month is not None else _previous_bit(self.months, 12)
+                day = calendar.monthrange(year, month)[1]
+                moment = moment.replace(year=year, month=month, day=day, hour=23, minute=59)
+                continue
+            
+            if not self._day_matches(moment):
+                moment = _end_of_previous_day(moment)
+                continue
+            
+            hour = _previous_bit(self.hours, moment.hour)
+            if hour is None:
+                moment = _end_of_previous_day(moment)
+                continue
+            if hour != moment.hour:
+                moment = moment.replace(hour=hour, minute=59)
+            
+            minute = _previous_bit(self.minutes, moment.minute)
+            if minute is None:
+                if moment.hour == 0:
+                    moment = _end_of_previous_day(moment)
+                else:
+                    moment = moment.replace(hour=moment.hour - 1, minute=59)
+                continue
+            return moment.replace(minute=minute)
+        
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+    
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = self.days >> moment.day & 1
+        in_weekdays = self.weekdays >> (moment.isoweekday() % 7) & 1
+        if self._days_restricted and self._weekdays_restricted:
+            return bool(in_days or in_weekdays)
+        return bool(in_days and in_weekdays)
+    
+    def _parse_field(self, field: str, low: int, high: int, names: Optional[Dict[str, int]] = None) -> int:
+        bitmap = 0
+        for part in field.split(','):
+            start, end, step = self._parse_part(part, low, high, names)
+            for value in range(start, end + 1, step):
+                bitmap |= 1 << value
+        return bitmap
+    
+    def _parse_part(self, part: str, low: int, high: int,
+                    names: Optional[Dict[str, int]]) -> Tuple[int, int, int]:
+        range_part, _, step_part = part.partition('/')
+        step = self._parse_value(step_part, 1, high, None, part) if step_part else 1
+        
+        if range_part in ('*', '?'):
+            start, end = low, high
+        elif '-' in range_part:
+            first, _, last = range_part.partition('-')
+            start = self._parse_value(first, low, high, names, part)
+            end = self._parse_value(last, low, high, names, part)
+            if start > end:
+                raise ValueError(f"Invalid cron range {part!r}")
+        else:
+            start = self._parse_value(range_part, low, high, names, part)
+            end = high if step_part else start
+        
+        return start, end, step
+    
+    def _parse_value(self, value: str, low: int, high: int, names: Optional[Dict[str, int]], part: str) -> int:
+        if names and value.upper() in names:
+            return names[value.upper()]
+        if not value.isdigit() or not low <= int(value) <= high:
+            raise ValueError(f"Invalid cron value {value!r} in {part!r} (expected {low}-{high})")
+        return int(value)
+
+
+def _next_bit(bitmap: int, start: int) -> Optional[int]:
+    """Lowest set bit at or above ``start``."""
+    remaining = bitmap >> start
+    if not remaining:
+        return None
+    return start + (remaining & -remaining).bit_length() - 1
+
+
+def _previous_bit(bitmap: int, start: int) -> Optional[int]:
+    """Highest set bit at or below ``start``."""
+    if start < 0:
+        return None
+    remaining = bitmap & ((1 << (start + 1)) - 1)
+    return remaining.bit_length() - 1 if remaining else None
+
+
+def _start_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0)
+
+
+def _end_of_previous_day(moment: datetime) -> datetime:
+    return moment.replace(hour=23, minute=59) - timedelta(days=1)
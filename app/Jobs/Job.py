@@ -7,7 +7,10 @@ from typing import Any, Dict, Optional, List, TYPE_CHECKING
 from datetime import datetime
 from dataclasses import dataclass
 
+from app.Jobs.JobTypeRegistry import job_types
+
 if TYPE_CHECKING:
+    from app.Jobs.Middleware.JobMiddleware import JobMiddleware
     from database.migrations.create_jobs_table import Job as JobModel
 
 
@@ -22,6 +25,7 @@ class JobOptions:
     timeout: int = 3600  # Seconds before job times out
     retry_delay: int = 60  # Base seconds before retry
     tags: Optional[List[str]] = None
+    dispatch_after_commit: Optional[bool] = None  # None = the connection's "after_commit" setting
 
 
 class ShouldQueue(ABC):
@@ -60,13 +64,17 @@ class ShouldQueue(ABC):
         """Get tags for the job. Override for custom tagging."""
         return self.options.tags or []
     
+    def middleware(self) -> List[JobMiddleware]:
+        """Middleware the worker runs this job through. Override to add some."""
+        return []
+    
     def serialize(self) -> Dict[str, Any]:
         """
         Serialize job data for storage.
         Override this method if your job has custom data to serialize.
         """
         return {
-            "job_class": f"{self.__class__.__module__}.{self.__class__.__name__}",
+            "job_class": job_types.code_for(self.__class__),
             "job_method": "handle",
             "data": {},
             "options": {
@@ -77,7 +85,8 @@ class ShouldQueue(ABC):
                 "max_attempts": self.options.max_attempts,
                 "timeout": self.options.timeout,
                 "retry_delay": self.options.retry_delay,
-                "tags": self.get_tags()
+                "tags": self.get_tags(),
+                "dispatch_after_commit": self.options.dispatch_after_commit
             }
         }
     
@@ -98,7 +107,8 @@ class ShouldQueue(ABC):
                 max_attempts=options_data.get("max_attempts", 3),
                 timeout=options_data.get("timeout", 3600),
                 retry_delay=options_data.get("retry_delay", 60),
-                tags=options_data.get("tags")
+                tags=options_data.get("tags"),
+                dispatch_after_commit=options_data.get("dispatch_after_commit")
             )
         return job
     
@@ -139,19 +149,29 @@ class Dispatchable:
         """
         Dispatch the job to the queue.
         Returns the job ID.
+        
+        Jobs dispatched after commit while a session is bound to the outbox
+        are written to it in that session's transaction instead, and the
+        outbox message ID is returned.
         """
-        from app.Services.QueueService import QueueService
+        from app.Queue.Outbox import outbox
         
         # Create job instance
         job = cls(*args, **kwargs)
         if not isinstance(job, ShouldQueue):
             raise ValueError(f"Job {cls.__name__} must implement ShouldQueue interface")
         
+        if outbox.should_defer(job):
+            return outbox.add(job)
+        
         # Dispatch to queue
+        from app.Services.QueueService import QueueService
         from config.database import get_database
         db = next(get_database())
-        queue_service = QueueService(db)
-        return queue_service.push(job)
+        try:
+            return QueueService(db).push(job)
+        finally:
+            db.close()
     
     @classmethod
     def dispatch_if(cls, condition: bool, *args: Any, **kwargs: Any) -> Optional[str]:
@@ -201,6 +221,19 @@ class JobRetryException(JobException):
         self.delay = delay
 
 
+class JobReleaseException(JobRetryException):
+    """
+    Exception to put a job back on the queue after ``delay`` seconds without
+    using up an attempt, e.g. when it is throttled.
+    """
+    pass
+
+
 class JobFailedException(JobException):
     """Exception to mark job as permanently failed."""
-    pass
\ No newline at end of file
+    pass
+
+
+class JobTimeoutException(JobException):
+    """Raised when a job runs longer than its timeout."""
+    pass
@@ -0,0 +1,98 @@
+"""
+Per-minute job counters for Horizon
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import redis
+
+
+class JobMetrics:
+    """
+    Reports job events to the metric hashes Horizon's QueueMonitor reads.
+    
+    Each event is counted in per-minute, per-hour and per-day hashes under
+    ``horizon:monitoring:job_metrics:<queue>``, the keys JobMonitor writes,
+    and processing and wait times are kept as per-minute samples. The
+    autoscaler sizes worker pools from these, so workers record every job
+    they start and settle. Reporting never gets in the way of running a
+    job: when Redis is unreachable, events are dropped and reporting pauses
+    for ``retry_after`` seconds.
+    """
+    
+    KEY = 'horizon:monitoring:job_metrics'
+    SAMPLES = 100  # Timing samples kept per minute
+    
+    def __init__(self, redis_url: Optional[str] = None, enabled: Optional[bool] = None,
+                 retry_after: float = 60.0) -> None:
+        self.redis_url: Optional[str] = redis_url
+        self.enabled: Optional[bool] = enabled
+        self.retry_after = retry_after
+        self._redis: Optional[redis.Redis] = None
+        self._paused_until = 0.0
+        self.logger = logging.getLogger("jobs.metrics")
+    
+    @property
+    def redis(self) -> redis.Redis:
+        """Synchronous client, connected on first use."""
+        if self._redis is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("Redis package not installed. Install with: pip install redis")
+            self._load_config()
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+    
+    def set_connection(self, client: redis.Redis) -> None:
+        """Use an existing Redis client (shared pool, fakeredis, etc.)."""
+        self._redis = client
+    
+    def record(self, queue: str, event: str, processing_time: Optional[float] = None,
+               wait_time: Optional[float] = None) -> None:
+        """Count one job event on a queue, with its processing or wait time if known."""
+        self._load_config()
+        if not self.enabled or time.monotonic() < self._paused_until:
+            return
+        
+        now = datetime.utcnow()
+        minute_key = f"{self.KEY}:{queue}:{now.strftime('%Y%m%d%H%M')}"
+        keys = [
+            (minute_key, 3600),
+            (f"{self.KEY}:{queue}:hour:{now.strftime('%Y%m%d%H')}", 86400),
+            (f"{self.KEY}:{queue}:day:{now.strftime('%Y%m%d')}", 604800),
+        ]
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, ttl in keys:
+                pipe.hincrby(key, event, 1)
+                pipe.expire(key, ttl)
+            for kind, sample in (('times', processing_time), ('waits', wait_time)):
+                if sample is not None:
+                    pipe.lpush(f"{minute_key}:{kind}", sample)
+                    pipe.ltrim(f"{minute_key}:{kind}", 0, self.SAMPLES - 1)
+                    pipe.expire(f"{minute_key}:{kind}", 3600)
+            pipe.execute()
+        except Exception as e:
+            self._paused_until = time.monotonic() + self.retry_after
+            self.logger.debug(f"Could not report {event} job on {queue}: {e}")
+    
+    def _load_config(self) -> None:
+        if self.enabled is not None and self.redis_url is not None:
+            return
+        
+        from config.queue import get_queue_config
+        config = get_queue_config("metrics") or {}
+        if self.enabled is None:
+            self.enabled = config.get("report", True)
+        if self.redis_url is None:
+            self.redis_url = config.get("redis_url", 'redis://localhost:6379/0')
+
+
+# Global instance
+job_metrics = JobMetrics()
@@ -4,13 +4,18 @@ Laravel-style Job Registry and Queue Management
 from __future__ import annotations
 
 import asyncio
+import heapq
+import itertools
 import json
-from typing import Dict, Any, Type, Optional, List, Callable, Union, TypeVar
+import time
+from typing import Dict, Any, Type, Optional, List, Callable, Union, TypeVar, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
+from zoneinfo import ZoneInfo
 
 from app.Jobs.Job import Job
+from app.Jobs.CronExpression import CronExpression
 
 
 class JobStatus(Enum):
@@ -36,17 +41,36 @@ class JobResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class CatchUpPolicy(Enum):
+    """What a recurring job does about runs missed while no scheduler was up"""
+    SKIP = "skip"  # drop missed runs; only fire runs that are on time
+    ONCE = "once"  # fire once for the most recent missed run
+    ALL = "all"  # replay every missed run, up to max_catch_up
+
+
 class JobRegistry:
     """
     Laravel-style Job Registry
     Manages job types, scheduling, and execution tracking
+    
+    One-off and recurring jobs are kept in min-heaps keyed by their next run
+    timestamp, so finding due jobs costs O(log n) per due job instead of a
+    scan. Heap entries are invalidated lazily: cancelling or rescheduling
+    only updates the dicts, and stale entries are dropped when popped.
     """
     
     def __init__(self) -> None:
         self._registered_jobs: Dict[str, Type[Job]] = {}
         self._job_results: Dict[str, JobResult] = {}
         self._scheduled_jobs: Dict[str, datetime] = {}
+        self._scheduled_instances: Dict[str, Job] = {}
         self._recurring_jobs: Dict[str, Dict[str, Any]] = {}
+        self._scheduled_heap: List[Tuple[float, int, str]] = []
+        self._recurring_heap: List[Tuple[float, int, str]] = []
+        self._heap_sequence = itertools.count()
+        self._catch_up_policy = CatchUpPolicy.ONCE
+        self._catch_up_grace = 60  # seconds a run may be late and still count as on time
+        self._max_catch_up = 100
         self._job_middlewares: List[Callable] = []
         self._global_timeout: Optional[int] = None
         self._retry_delays: List[int] = [1, 5, 10, 30, 60, 300]  # Exponential backoff
@@ -64,6 +88,8 @@ class JobRegistry:
         """Schedule a job to run at specific time"""
         job_id = job.job_id or str(id(job))
         self._scheduled_jobs[job_id] = run_at
+        self._scheduled_instances[job_id] = job
+        heapq.heappush(self._scheduled_heap, (run_at.timestamp(), next(self._heap_sequence), job_id))
         
         # Store job result as pending
         self._job_results[job_id] = JobResult(
@@ -83,27 +109,51 @@ class JobRegistry:
         cron: str,
         name: Optional[str] = None,
         timezone: str = "UTC",
+        catch_up: Optional[Union[CatchUpPolicy, str]] = None,
         **job_kwargs
     ) -> str:
         """Schedule a recurring job using cron expression"""
         job_name = name or f"{job_class.__name__}_recurring"
+        expression = CronExpression(cron)
         
         self._recurring_jobs[job_name] = {
             'job_class': job_class,
             'cron': cron,
+            'expression': expression,
             'timezone': timezone,
+            'catch_up': CatchUpPolicy(catch_up) if catch_up else None,
             'kwargs': job_kwargs,
             'last_run': None,
-            'next_run': self._calculate_next_run(cron),
+            'next_run': None,
             'enabled': True
         }
+        self._set_next_run(job_name, self._calculate_next_run(cron, timezone))
         
         return job_name
     
+    def restore_last_run(self, name: str, last_run: datetime) -> None:
+        """Resume a recurring job from a run recorded elsewhere (e.g. by another scheduler node)"""
+        job = self._recurring_jobs.get(name)
+        if not job or (job['last_run'] and job['last_run'] >= last_run):
+            return
+        
+        job['last_run'] = last_run.astimezone(ZoneInfo(job['timezone']))
+        self._set_next_run(name, job['expression'].next_after(job['last_run']))
+    
+    def set_catch_up_policy(self, policy: Union[CatchUpPolicy, str], grace: Optional[int] = None,
+                            max_runs: Optional[int] = None) -> None:
+        """Set the default catch-up policy for recurring jobs"""
+        self._catch_up_policy = CatchUpPolicy(policy)
+        if grace is not None:
+            self._catch_up_grace = grace
+        if max_runs is not None:
+            self._max_catch_up = max_runs
+    
     def cancel_scheduled(self, job_id: str) -> bool:
         """Cancel a scheduled job"""
         if job_id in self._scheduled_jobs:
             del self._scheduled_jobs[job_id]
+            self._scheduled_instances.pop(job_id, None)
             
             # Update job result
             if job_id in self._job_results:
@@ -117,16 +167,111 @@ class JobRegistry:
         """Get all scheduled jobs"""
         return self._scheduled_jobs.copy()
     
+    def get_recurring_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """Get all recurring jobs"""
+        return {name: dict(job) for name, job in self._recurring_jobs.items()}
+    
     def get_due_jobs(self) -> List[str]:
         """Get jobs that are due to run"""
-        now = datetime.now()
-        due_jobs = []
+        due = self._pop_due(self._scheduled_heap, time.time(), self._is_current_schedule)
+        
+        # Peeking only: put the entries back
+        for entry in due:
+            heapq.heappush(self._scheduled_heap, entry)
+        
+        return [job_id for _, _, job_id in due]
+    
+    def pop_due_jobs(self, now: Optional[float] = None) -> List[Tuple[str, Job]]:
+        """Remove and return one-off jobs that are due, in run order"""
+        due = self._pop_due(self._scheduled_heap, time.time() if now is None else now, self._is_current_schedule)
+        
+        jobs = []
+        for _, _, job_id in due:
+            del self._scheduled_jobs[job_id]
+            jobs.append((job_id, self._scheduled_instances.pop(job_id)))
+        
+        return jobs
+    
+    def pop_due_recurring(self, now: Optional[float] = None) -> List[Tuple[str, List[datetime]]]:
+        """
+        Advance due recurring jobs and return the runs to fire for each,
+        after applying its catch-up policy to runs missed during downtime
+        (an empty list when the policy skips them)
+        """
+        now = time.time() if now is None else now
+        due = self._pop_due(self._recurring_heap, now, self._is_current_recurring)
         
-        for job_id, run_at in self._scheduled_jobs.items():
-            if run_at <= now:
-                due_jobs.append(job_id)
+        runs = []
+        for _, _, name in due:
+            job = self._recurring_jobs[name]
+            zone = ZoneInfo(job['timezone'])
+            current = datetime.fromtimestamp(now, zone)
+            fire = self._runs_to_fire(job, current)
+            
+            job['last_run'] = job['expression'].previous_before(current)
+            self._set_next_run(name, job['expression'].next_after(current))
+            
+            runs.append((name, fire))
+        
+        return runs
+    
+    def next_due_at(self, recurring: bool = True) -> Optional[float]:
+        """Timestamp of the earliest pending one-off (and recurring) run"""
+        heaps = [(self._scheduled_heap, self._is_current_schedule)]
+        if recurring:
+            heaps.append((self._recurring_heap, self._is_current_recurring))
+        
+        candidates = []
+        for heap, is_current in heaps:
+            while heap and not is_current(heap[0]):
+                heapq.heappop(heap)
+            if heap:
+                candidates.append(heap[0][0])
+        
+        return min(candidates) if candidates else None
+    
+    def _runs_to_fire(self, job: Dict[str, Any], current: datetime) -> List[datetime]:
+        """Scheduled times to fire for a due recurring job, per its catch-up policy"""
+        policy = job['catch_up'] or self._catch_up_policy
+        latest = job['expression'].previous_before(current)
         
-        return due_jobs
+        if policy == CatchUpPolicy.ALL:
+            runs = []
+            run = job['next_run']
+            while run <= current and len(runs) < self._max_catch_up:
+                runs.append(run)
+                run = job['expression'].next_after(run)
+            return runs
+        
+        if policy == CatchUpPolicy.SKIP and (current - latest).total_seconds() > self._catch_up_grace:
+            return []
+        return [latest]
+    
+    def _set_next_run(self, name: str, next_run: datetime) -> None:
+        self._recurring_jobs[name]['next_run'] = next_run
+        heapq.heappush(self._recurring_heap, (next_run.timestamp(), next(self._heap_sequence), name))
+    
+    def _is_current_schedule(self, entry: Tuple[float, int, str]) -> bool:
+        run_at = self._scheduled_jobs.get(entry[2])
+        return run_at is not None and run_at.timestamp() == entry[0]
+    
+    def _is_current_recurring(self, entry: Tuple[float, int, str]) -> bool:
+        job = self._recurring_jobs.get(entry[2])
+        return bool(job and job['enabled'] and job['next_run'].timestamp() == entry[0])
+    
+    def _pop_due(
+        self,
+        heap: List[Tuple[float, int, str]],
+        now: float,
+        is_current: Callable[[Tuple[float, int, str]], bool]
+    ) -> List[Tuple[float, int, str]]:
+        """Pop due entries off a heap, discarding stale ones"""
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if is_current(entry):
+                due.append(entry)
+        return due
     
     def get_job_result(self, job_id: str) -> Optional[JobResult]:
         """Get job execution result"""
@@ -214,11 +359,9 @@ class JobRegistry:
         
         return cleaned
     
-    def _calculate_next_run(self, cron: str) -> datetime:
+    def _calculate_next_run(self, cron: str, timezone: str = "UTC") -> datetime:
         """Calculate next run time for cron expression"""
-        # This would use a proper cron parser like croniter
-        # For now, return a placeholder
-        return datetime.now() + timedelta(hours=1)
+        return CronExpression(cron).next_after(datetime.now(ZoneInfo(timezone)))
     
     def export_metrics(self) -> Dict[str, Any]:
         """Export detailed metrics for monitoring"""
@@ -296,7 +439,7 @@ class JobPipeline:
                     failed_jobs.append(i)
                     if self.stop_on_failure:
                         break
-                        
+            
             except Exception as e:
                 failed_jobs.append(i)
                 results.append({'success': False, 'error': str(e)})
@@ -359,10 +502,15 @@ def schedule_at(job: Job, time_str: str) -> str:
     return job_registry.schedule(job, run_at)
 
 
-def recurring(cron: str, name: str = "") -> Callable[[Type[Job]], Type[Job]]:
+def recurring(
+    cron: str,
+    name: str = "",
+    timezone: str = "UTC",
+    catch_up: Optional[Union[CatchUpPolicy, str]] = None
+) -> Callable[[Type[Job]], Type[Job]]:
     """Decorator for recurring jobs"""
     def decorator(job_class: Type[Job]) -> Type[Job]:
-        job_registry.schedule_recurring(job_class, cron, name)
+        job_registry.schedule_recurring(job_class, cron, name, timezone=timezone, catch_up=catch_up)
         return job_class
     
     return decorator
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""
+Job type codes and payload encoding
+"""
+from __future__ import annotations
+
+import base64
+import importlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Type, TypeVar, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.Jobs.Job import ShouldQueue
+
+T = TypeVar('T', bound=type)
+
+
+class JobTypeRegistry:
+    """
+    Maps job classes to short type codes and resolves payload class names.
+    
+    Payloads name their job class with a registered code such as
+    ``"email.send"`` rather than its dotted path, and workers resolve each
+    name (code or dotted path) to a class once and keep it, instead of
+    importing and looking it up for every job. Codes come from the
+    ``job_types`` queue config, which maps them to dotted paths so a worker
+    can resolve them without importing the job modules up front, and from
+    ``register``/``@job_type`` at import time. Unregistered classes keep
+    using their dotted path, so payloads written before a class got a code
+    still resolve.
+    """
+    
+    def __init__(self, types: Optional[Dict[str, str]] = None) -> None:
+        self._paths: Dict[str, str] = dict(types or {})
+        self._classes: Dict[str, type] = {}
+        self._codes: Dict[type, str] = {}
+        self._configured = types is not None
+        self._lock = threading.Lock()
+    
+    def register(self, code: str, job_class: Union[type, str]) -> None:
+        """Register a type code for a job class (or its dotted path)."""
+        if not code:
+            raise ValueError("Job type code cannot be empty")
+        
+        path = job_class if isinstance(job_class, str) else class_path(job_class)
+        existing = self._paths.get(code)
+        if existing is not None and existing != path:
+            raise ValueError(f"Job type code {code!r} is already registered for {existing}")
+        
+        with self._lock:
+            self._paths[code] = path
+            if not isinstance(job_class, str):
+                self._classes[code] = job_class
+                self._codes[job_class] = code
+    
+    def code_for(self, job_class: type) -> str:
+        """The name payloads use for a job class: its code, or its dotted path."""
+        code = self._codes.get(job_class)
+        if code is not None:
+            return code
+        
+        self._load_config()
+        path = class_path(job_class)
+        for code, registered in self._paths.items():
+            if registered == path:
+                with self._lock:
+                    self._codes[job_class] = code
+                    self._classes[code] = job_class
+                return code
+        
+        # Remember the miss too, so later calls skip the scan
+        with self._lock:
+            self._codes[job_class] = path
+        return path
+    
+    def resolve(self, name: str) -> Type[ShouldQueue]:
+        """The job class for a payload's ``job_class`` value (code or dotted path)."""
+        job_class = self._classes.get(name)
+        if job_class is not None:
+            return job_class  # type: ignore[return-value]
+        
+        self._load_config()
+        path = self._paths.get(name, name)
+        if '.' not in path:
+            raise ValueError(f"Unknown job type: {name}")
+        
+        try:
+            job_class = _import_path(path)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Unknown job type: {name}") from e
+        with self._lock:
+            self._classes[name] = job_class
+        return job_class  # type: ignore[return-value]
+    
+    def types(self) -> Dict[str, str]:
+        """Registered codes and the dotted paths they stand for."""
+        self._load_config()
+        return dict(self._paths)
+    
+    def _load_config(self) -> None:
+        if self._configured:
+            return
+        
+        from config.queue import get_queue_config
+        configured = get_queue_config("job_types") or {}
+        with self._lock:
+            for code, path in configured.items():
+                self._paths.setdefault(code, path)
+            self._configured = True
+
+
+def class_path(job_class: type) -> str:
+    """Dotted import path of a class."""
+    return f"{job_class.__module__}.{job_class.__qualname__}"
+
+
+def _import_path(path: str) -> Any:
+    """
+    The object at a dotted path, nested classes included.
+    
+    Imports the longest prefix of ``path`` that is a module, then looks up
+    the rest one attribute at a time.
+    """
+    parts = path.split('.')
+    for split in range(len(parts) - 1, 0, -1):
+        module_path = '.'.join(parts[:split])
+        try:
+            target = importlib.import_module(module_path)
+        except ModuleNotFoundError as e:
+            if e.name is None or not (module_path == e.name or module_path.startswith(e.name + '.')):
+                raise  # the module exists but one of its own imports is missing
+            continue
+        for attribute in parts[split:]:
+            target = getattr(target, attribute)
+        return target
+    raise ImportError(f"No module found in {path}")
+
+
+def job_type(code: str) -> Callable[[T], T]:
+    """
+    Class decorator registering a job type code.
+    
+    Workers only know the code once the class's module is imported; list
+    the code under ``job_types`` in the queue config when they may not be.
+    
+    Example:
+        @job_type("email.send")
+        class SendEmailJob(Job):
+            ...
+    """
+    def decorator(job_class: T) -> T:
+        job_types.register(code, job_class)
+        return job_class
+    return decorator
+
+
+class JobPayloadCodec:
+    """
+    Encodes job payloads for the jobs table.
+    
+    ``json`` writes compact JSON text. ``msgpack`` packs the payload and
+    stores it as base64 text behind a ``msgpack:`` prefix, since the payload
+    column is text; job data must be JSON-compatible either way. Decoding
+    looks at the payload itself, so workers read either format (and every
+    payload written before formats existed) whatever they write.
+    """
+    
+    MSGPACK_PREFIX = 'msgpack:'
+    
+    def __init__(self, format: str = 'json') -> None:
+        if format not in ('json', 'msgpack'):
+            raise ValueError(f"Unsupported job payload format: {format}")
+        self.format = format
+        if format == 'msgpack':
+            _load_msgpack()  # fail at start-up rather than on the first push
+    
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """Encode a serialized job for storage."""
+        if self.format == 'msgpack':
+            packed = _load_msgpack().packb(payload, use_bin_type=True)
+            return self.MSGPACK_PREFIX + base64.b64encode(packed).decode('ascii')
+        return _json_encoder.encode(payload)
+    
+    @classmethod
+    def decode(cls, data: Union[str, bytes]) -> Dict[str, Any]:
+        """Decode a stored payload in any supported format."""
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        if data.startswith(cls.MSGPACK_PREFIX):
+            packed = base64.b64decode(data[len(cls.MSGPACK_PREFIX):])
+            return _load_msgpack().unpackb(packed, raw=False)  # type: ignore[no-any-return]
+        return json.loads(data)  # type: ignore[no-any-return]
+
+
+# json.dumps builds a new encoder per call whenever options are passed
+_json_encoder = json.JSONEncoder(separators=(',', ':'))
+_msgpack: Any = None
+
+
+def _load_msgpack() -> Any:
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError("msgpack package not installed. Install with: pip install msgpack")
+        _msgpack = msgpack
+    return _msgpack
+
+
+def payload_codec() -> JobPayloadCodec:
+    """Codec for the configured ``payload_format``."""
+    from config.queue import get_queue_config
+    return JobPayloadCodec(get_queue_config("payload_format") or 'json')
+
+
+# Global job type registry
+job_types = JobTypeRegistry()
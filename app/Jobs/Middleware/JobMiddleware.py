@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, TYPE_CHECKING, List, Optional
+from typing import Any, Callable, TYPE_CHECKING, List, Optional
 from datetime import datetime, timezone
 
 if TYPE_CHECKING:
+    from app.Cache.CacheStore import CacheStore
     from app.Jobs.Job import ShouldQueue
+    from app.Jobs.RateLimiter import CacheRateLimiter
 
 
 class JobMiddleware(ABC):
@@ -22,7 +25,7 @@ class JobMiddleware(ABC):
         Args:
             job: The job being processed
             next_handler: The next middleware or job handler
-            
+        
         Returns:
             The result of the next handler
         """
@@ -57,7 +60,7 @@ class LoggingMiddleware(JobMiddleware):
             
             print(f"[{end_time.isoformat()}] Completed job: {job_name} ({duration:.2f}s)")
             return result
-            
+        
         except Exception as e:
             end_time = datetime.now(timezone.utc)
             duration = (end_time - start_time).total_seconds()
@@ -69,51 +72,70 @@ class LoggingMiddleware(JobMiddleware):
 class ThrottleMiddleware(JobMiddleware):
     """
     Middleware that throttles job execution based on rate limits.
+    
+    The limit is shared by every worker through the cache store configured
+    under ``rate_limiting`` in the queue config (or the one given). With
+    the ``sliding_window`` strategy at most ``max_attempts`` jobs run per
+    ``decay_seconds``; ``token_bucket`` allows bursts of ``max_attempts``
+    refilled at ``max_attempts / decay_seconds`` per second. A throttled
+    job is released until the limiter says the next attempt can succeed,
+    without using up one of its attempts.
     """
     
-    def __init__(self, max_attempts: int = 60, decay_seconds: int = 60) -> None:
+    STRATEGIES = ("sliding_window", "token_bucket")
+    
+    def __init__(
+        self,
+        max_attempts: int = 60,
+        decay_seconds: int = 60,
+        strategy: str = "sliding_window",
+        store: Optional[CacheStore] = None,
+        key: Optional[str] = None
+    ) -> None:
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported throttle strategy: {strategy}")
+        
         self.max_attempts = max_attempts
         self.decay_seconds = decay_seconds
-        self._attempts: Dict[str, list[datetime]] = {}
+        self.strategy = strategy
+        self.store = store
+        self.key = key
+        self._limiter: Optional[CacheRateLimiter] = None
     
     def handle(self, job: ShouldQueue, next_handler: Callable[[], Any]) -> Any:
         """Throttle job execution."""
-        key = self._get_throttle_key(job)
+        decision = self.limiter.attempt(self._get_throttle_key(job))
         
-        if self._should_throttle(key):
-            from app.Jobs.Job import JobRetryException
-            raise JobRetryException(
+        if not decision.allowed:
+            from app.Jobs.Job import JobReleaseException
+            raise JobReleaseException(
                 f"Job throttled. Max {self.max_attempts} attempts per {self.decay_seconds}s",
-                delay=self.decay_seconds
+                delay=max(1, math.ceil(decision.retry_after))
             )
         
-        self._record_attempt(key)
         return next_handler()
     
+    @property
+    def limiter(self) -> CacheRateLimiter:
+        """The shared limiter, created on first use."""
+        if self._limiter is None:
+            from app.Jobs.RateLimiter import CacheSlidingWindow, CacheTokenBucket
+            
+            if self.strategy == "token_bucket":
+                self._limiter = CacheTokenBucket(
+                    self.max_attempts, self.max_attempts / self.decay_seconds, store=self.store
+                )
+            else:
+                self._limiter = CacheSlidingWindow(self.max_attempts, self.decay_seconds, store=self.store)
+        return self._limiter
+    
     def _get_throttle_key(self, job: ShouldQueue) -> str:
         """Generate throttle key for the job."""
-        return f"{job.__class__.__module__}.{job.__class__.__name__}"
-    
-    def _should_throttle(self, key: str) -> bool:
-        """Check if job should be throttled."""
-        if key not in self._attempts:
-            return False
-        
-        # Clean old attempts
-        cutoff = datetime.now(timezone.utc).timestamp() - self.decay_seconds
-        self._attempts[key] = [
-            attempt for attempt in self._attempts[key]
-            if attempt.timestamp() > cutoff
-        ]
+        if self.key:
+            return f"throttle:{self.key}"
         
-        return len(self._attempts[key]) >= self.max_attempts
-    
-    def _record_attempt(self, key: str) -> None:
-        """Record a job attempt."""
-        if key not in self._attempts:
-            self._attempts[key] = []
-        
-        self._attempts[key].append(datetime.now(timezone.utc))
+        from app.Jobs.JobTypeRegistry import job_types
+        return f"throttle:{job_types.code_for(job.__class__)}"
 
 
 class RetryMiddleware(JobMiddleware):
@@ -204,7 +226,7 @@ class MemoryLimitMiddleware(JobMiddleware):
                 print(f"Warning: Job {job.get_display_name()} exceeded memory limit: {final_memory:.1f}MB")
             
             return result
-            
+        
         except Exception as e:
             final_memory = process.memory_info().rss / 1024 / 1024  # MB
             if final_memory > self.memory_limit_mb:
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
+import math
 import time
-from typing import Dict, List, Optional, TYPE_CHECKING, Any, Callable
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, TYPE_CHECKING, Any, Callable, Tuple
 from datetime import datetime, timezone, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
 if TYPE_CHECKING:
+    from app.Cache.CacheStore import CacheStore
     from app.Jobs.Job import ShouldQueue
 
 
@@ -117,14 +120,215 @@ class FixedWindow:
             self.window_start = now
 
 
+@dataclass
+class RateLimitDecision:
+    """Outcome of one attempt against a cache-backed limiter."""
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0  # seconds until an attempt can succeed, 0 when allowed
+
+
+class CacheRateLimiter(ABC):
+    """
+    Rate limiter whose state lives on a shared cache store.
+    
+    Every worker using the same store and key shares one limit. Each key
+    holds a fixed-size state, whatever the limit. On a RedisCacheStore an
+    attempt is a single Lua script; other stores run the same step under a
+    CacheLock, which is atomic across processes wherever the store's
+    ``add`` is (process-local for the array store).
+    """
+    
+    SCRIPT = ""
+    LOCK_TIMEOUT = 5
+    
+    def __init__(self, store: Optional[CacheStore] = None, prefix: str = "job_rate_limit:") -> None:
+        if store is None:
+            from app.Cache.CacheStore import cache_manager
+            from config.queue import get_queue_config
+            store = cache_manager.store((get_queue_config("rate_limiting") or {}).get("store"))
+        self.store = store
+        self.prefix = prefix
+        self._script: Any = None
+    
+    def attempt(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """Take ``cost`` from the limit for ``key`` if it allows it."""
+        from app.Cache.CacheStore import RedisCacheStore
+        
+        now = time.time()
+        if isinstance(self.store, RedisCacheStore):
+            if self._script is None:
+                self._script = self.store.redis.register_script(self.SCRIPT)
+            allowed, remaining, retry_after = self._script(
+                keys=[self.store._key(self.prefix + key)], args=[repr(now), *self._arguments(), cost]
+            )
+            return RateLimitDecision(bool(allowed), int(remaining), float(retry_after))
+        
+        with self.store.lock(f"{self.prefix}{key}", self.LOCK_TIMEOUT):
+            state, ttl, decision = self._step(self.store.get(self.prefix + key), now, cost)
+            if state is not None:
+                self.store.put(self.prefix + key, state, ttl)
+            return decision
+    
+    def reset(self, key: str) -> bool:
+        """Forget the state for ``key``."""
+        return self.store.forget(self.prefix + key)
+    
+    @abstractmethod
+    def _arguments(self) -> List[Any]:
+        """Script ARGV between the timestamp and the cost."""
+        pass
+    
+    @abstractmethod
+    def _step(self, state: Any, now: float, cost: int) -> Tuple[Any, int, RateLimitDecision]:
+        """The script's logic for other stores: new state (None = unchanged), its TTL and the decision."""
+        pass
+
+
+class CacheTokenBucket(CacheRateLimiter):
+    """
+    Token bucket on the shared cache, as a generic cell rate algorithm.
+    
+    Rather than a token count and a refill timestamp, each key stores one
+    number: the theoretical arrival time (TAT) at which the bucket would be
+    full again. Taking ``cost`` tokens pushes it ``cost`` emission intervals
+    further out, and an attempt is refused when that would put it more than
+    ``capacity`` intervals ahead of now. The refusal's retry-after is exact:
+    the moment enough tokens have dripped back in.
+    """
+    
+    # KEYS: bucket key
+    # ARGV: now, seconds per token, capacity, cost
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local allow_at = tat + interval * (cost - capacity)
+if allow_at > now then
+    local remaining = math.floor((now - tat) / interval + capacity)
+    return {0, math.max(remaining, 0), tostring(allow_at - now)}
+end
+local new_tat = tat + interval * cost
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - new_tat) / interval + capacity), '0'}
+"""
+
+    def __init__(self, capacity: int, refill_rate: float, store: Optional[CacheStore] = None,
+                 prefix: str = "job_rate_limit:") -> None:
+        super().__init__(store, prefix)
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.interval = 1.0 / refill_rate
+    
+    def _arguments(self) -> List[Any]:
+        return [repr(self.interval), self.capacity]
+    
+    def _step(self, state: Any, now: float, cost: int) -> Tuple[Any, int, RateLimitDecision]:
+        tat = max(float(state) if state is not None else now, now)
+        allow_at = tat + self.interval * (cost - self.capacity)
+        if allow_at > now:
+            remaining = max(math.floor((now - tat) / self.interval + self.capacity), 0)
+            return None, 0, RateLimitDecision(False, remaining, allow_at - now)
+        
+        new_tat = tat + self.interval * cost
+        remaining = math.floor((now - new_tat) / self.interval + self.capacity)
+        return new_tat, max(math.ceil(new_tat - now), 1), RateLimitDecision(True, remaining)
+
+
+class CacheSlidingWindow(CacheRateLimiter):
+    """
+    Sliding window limit on the shared cache, as a sliding window counter.
+    
+    An exact sliding log keeps a timestamp per attempt. Instead each key
+    keeps the counts of the current and previous fixed windows, and the
+    attempts in the trailing window are estimated as the current count
+    plus the previous one weighted by how much of it still overlaps. That
+    assumes attempts were spread evenly over the previous window, which
+    in exchange for constant memory can let through slightly more or
+    fewer than an exact log would at a window boundary.
+    """
+    
+    # KEYS: window hash (start, current, previous)
+    # ARGV: now, window seconds, max attempts, cost
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local start = math.floor(now / window) * window
+local state = redis.call('HMGET', KEYS[1], 'start', 'current', 'previous')
+local current, previous = 0, 0
+if tonumber(state[1]) == start then
+    current, previous = tonumber(state[2]), tonumber(state[3])
+elseif tonumber(state[1]) == start - window then
+    previous = tonumber(state[2])
+end
+local count = previous * (1 - (now - start) / window) + current
+local room = limit - cost
+if count > room then
+    local retry = window
+    if room >= 0 and current <= room then
+        retry = start + window * (1 - (room - current) / previous) - now
+    elseif room >= 0 then
+        retry = start + window * (2 - room / current) - now
+    end
+    return {0, math.max(math.floor(limit - count), 0), tostring(retry)}
+end
+redis.call('HSET', KEYS[1], 'start', start, 'current', current + cost, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], math.ceil(window * 2000))
+return {1, math.floor(room - count), '0'}
+"""
+
+    def __init__(self, max_attempts: int, window_seconds: int, store: Optional[CacheStore] = None,
+                 prefix: str = "job_rate_limit:") -> None:
+        super().__init__(store, prefix)
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+    
+    def _arguments(self) -> List[Any]:
+        return [self.window_seconds, self.max_attempts]
+    
+    def _step(self, state: Any, now: float, cost: int) -> Tuple[Any, int, RateLimitDecision]:
+        window = self.window_seconds
+        start = math.floor(now / window) * window
+        current, previous = 0, 0
+        if state is not None and state[0] == start:
+            current, previous = state[1], state[2]
+        elif state is not None and state[0] == start - window:
+            previous = state[1]
+        
+        count = previous * (1 - (now - start) / window) + current
+        room = self.max_attempts - cost
+        if count > room:
+            retry = float(window)
+            if room >= 0 and current <= room:
+                # Wait for the previous window's share to slide out
+                retry = start + window * (1 - (room - current) / previous) - now
+            elif room >= 0:
+                # The current window alone is full; wait into the next one
+                retry = start + window * (2 - room / current) - now
+            return None, 0, RateLimitDecision(False, max(math.floor(self.max_attempts - count), 0), retry)
+        
+        state = [start, current + cost, previous]
+        return state, window * 2, RateLimitDecision(True, math.floor(room - count))
+
+
 class JobRateLimiter:
     """
     Rate limiter for job execution.
     Supports multiple rate limiting strategies.
+    
+    Limits are per process unless a cache store is given, in which case
+    token bucket and sliding window limits are shared through it by every
+    worker (see CacheTokenBucket and CacheSlidingWindow).
     """
     
-    def __init__(self) -> None:
+    def __init__(self, store: Optional[CacheStore] = None) -> None:
+        self.store = store
         self.limiters: Dict[str, Dict[str, Any]] = {}
+        self._decisions: Dict[str, RateLimitDecision] = {}
     
     def limit(self, job: ShouldQueue, rate_limit: RateLimit) -> bool:
         """
@@ -141,6 +345,11 @@ class JobRateLimiter:
         limiter = self.limiters[key]
         strategy = rate_limit.strategy
         
+        if "shared" in limiter:
+            decision = limiter["shared"].attempt(key)
+            self._decisions[key] = decision
+            return decision.allowed  # type: ignore[no-any-return]
+        
         if strategy == RateLimitStrategy.TOKEN_BUCKET:
             return limiter["bucket"].consume()  # type: ignore[no-any-return]
         
@@ -186,6 +395,18 @@ class JobRateLimiter:
     
     def _create_limiter(self, rate_limit: RateLimit) -> Dict[str, Any]:
         """Create appropriate limiter based on strategy."""
+        if self.store is not None and rate_limit.strategy == RateLimitStrategy.TOKEN_BUCKET:
+            return {
+                "shared": CacheTokenBucket(
+                    capacity=rate_limit.burst_limit or rate_limit.max_attempts,
+                    refill_rate=rate_limit.max_attempts / rate_limit.per_seconds,
+                    store=self.store
+                )
+            }
+        
+        if self.store is not None and rate_limit.strategy == RateLimitStrategy.SLIDING_WINDOW:
+            return {"shared": CacheSlidingWindow(rate_limit.max_attempts, rate_limit.per_seconds, store=self.store)}
+        
         if rate_limit.strategy == RateLimitStrategy.TOKEN_BUCKET:
             refill_rate = rate_limit.max_attempts / rate_limit.per_seconds
             return {
@@ -219,6 +440,10 @@ class JobRateLimiter:
         """
         Get suggested wait time before retrying rate-limited job.
         """
+        decision = self._decisions.get(self._get_rate_limit_key(job, rate_limit))
+        if decision is not None and not decision.allowed:
+            return max(1, math.ceil(decision.retry_after))
+        
         if rate_limit.strategy == RateLimitStrategy.SLIDING_WINDOW:
             key = self._get_rate_limit_key(job, rate_limit)
             if key in self.limiters:
@@ -236,6 +461,7 @@ class JobRateLimiter:
         """Clear rate limits, optionally matching pattern."""
         if key_pattern is None:
             self.limiters.clear()
+            self._decisions.clear()
         else:
             keys_to_remove = [
                 key for key in self.limiters.keys()
@@ -243,6 +469,7 @@ class JobRateLimiter:
             ]
             for key in keys_to_remove:
                 del self.limiters[key]
+                self._decisions.pop(key, None)
 
 
 class RateLimited:
@@ -274,8 +501,8 @@ class RateLimited:
                 # Rate limited, calculate wait time
                 wait_time = self._rate_limiter.get_wait_time(self, rate_limit)  # type: ignore[arg-type]
                 
-                from app.Jobs.Job import JobRetryException
-                raise JobRetryException(
+                from app.Jobs.Job import JobReleaseException
+                raise JobReleaseException(
                     f"Job rate limited: {rate_limit.max_attempts} per {rate_limit.per_seconds}s",
                     delay=wait_time
                 )
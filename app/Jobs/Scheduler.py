@@ -0,0 +1,168 @@
+"""
+Scheduler loop for JobRegistry's one-off and recurring jobs
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
+
+from app.Jobs.Job import Job
+from app.Jobs.JobRegistry import JobRegistry, JobStatus, job_registry
+
+if TYPE_CHECKING:
+    from app.Cache.CacheStore import CacheStore
+
+
+class JobScheduler:
+    """
+    Dispatches due jobs from a single long-running loop.
+    
+    Recurring jobs are registered identically on every node, so the nodes
+    elect a leader through a CacheLock on a shared cache store and only the
+    leader fires them. The leader renews its lease every tick; if it dies,
+    another node takes over within one lease. Each job's last fired run is
+    kept next to the lock, so a new leader resumes where the previous one
+    stopped: runs missed while no scheduler was up go through the job's
+    catch-up policy, and no run fires twice across a handover.
+    
+    One-off jobs from ``JobRegistry.schedule`` only exist on the node that
+    scheduled them, so every node dispatches its own.
+    """
+    
+    def __init__(
+        self,
+        registry: Optional[JobRegistry] = None,
+        store: Optional[CacheStore] = None,
+        lock_name: Optional[str] = None,
+        lease: Optional[int] = None,
+        dispatcher: Optional[Callable[[Job], Any]] = None
+    ) -> None:
+        from config.queue import get_queue_config
+        
+        config = get_queue_config("scheduler") or {}
+        if store is None:
+            from app.Cache.CacheStore import cache_manager
+            store = cache_manager.store(config.get("store"))
+        
+        self.registry = registry or job_registry
+        self.store = store
+        self.lease = lease or config.get("lease", 30)
+        self.lock = store.lock(lock_name or config.get("lock", "scheduler:leader"), self.lease)
+        self.dispatcher = dispatcher or self._push
+        self.key_prefix = "scheduler:last_run:"
+        self.is_leader = False
+        self.is_running = False
+        self.logger = logging.getLogger("jobs.scheduler")
+        
+        if "catch_up" in config:
+            self.registry.set_catch_up_policy(
+                config["catch_up"],
+                grace=config.get("catch_up_grace"),
+                max_runs=config.get("max_catch_up")
+            )
+    
+    async def run(self) -> None:
+        """Run the scheduler until stop() is called."""
+        self.is_running = True
+        try:
+            while self.is_running:
+                try:
+                    # JobRegistry isn't thread-safe, so ticks stay on the loop thread
+                    self.tick()
+                except Exception as e:
+                    self.logger.error(f"Scheduler tick failed: {e}")
+                await asyncio.sleep(self._seconds_until_next_tick())
+        finally:
+            self.resign()
+    
+    def stop(self) -> None:
+        """Stop the loop after the current tick."""
+        self.is_running = False
+    
+    def tick(self, now: Optional[float] = None) -> int:
+        """Dispatch everything that is due; returns the number of jobs dispatched."""
+        now = time.time() if now is None else now
+        dispatched = 0
+        
+        for job_id, job in self.registry.pop_due_jobs(now):
+            dispatched += self._dispatch_scheduled(job_id, job)
+        
+        if self._hold_leadership():
+            for name, runs in self.registry.pop_due_recurring(now):
+                dispatched += self._fire_recurring(name, runs)
+        
+        return dispatched
+    
+    def resign(self) -> None:
+        """Give up leadership so another node can take over straight away."""
+        if self.is_leader:
+            self.lock.release()
+            self.is_leader = False
+    
+    def _hold_leadership(self) -> bool:
+        if self.is_leader and not self.lock.extend():
+            self.logger.warning("Scheduler lost leadership")
+            self.is_leader = False
+        
+        if not self.is_leader and self.lock.acquire(blocking=False):
+            self.logger.info("Scheduler elected leader")
+            self.is_leader = True
+            self._restore_last_runs()
+        
+        return self.is_leader
+    
+    def _restore_last_runs(self) -> None:
+        """Resume each recurring job from the last run any leader fired."""
+        for name in self.registry.get_recurring_jobs():
+            last_run = self.store.get(f"{self.key_prefix}{name}")
+            if last_run is not None:
+                self.registry.restore_last_run(name, datetime.fromtimestamp(float(last_run), timezone.utc))
+    
+    def _fire_recurring(self, name: str, runs: List[datetime]) -> int:
+        job = self.registry.get_recurring_jobs()[name]
+        key = f"{self.key_prefix}{name}"
+        last_fired = self.store.get(key)
+        
+        fired = 0
+        for run in runs:
+            if last_fired is not None and run.timestamp() <= float(last_fired):
+                continue  # a previous leader already fired it
+            try:
+                self.dispatcher(job['job_class'](**job['kwargs']))
+                fired += 1
+            except Exception as e:
+                self.logger.error(f"Failed to dispatch recurring job {name} for {run.isoformat()}: {e}")
+        
+        last_run = job['last_run'].timestamp()
+        if last_fired is None or last_run > float(last_fired):
+            self.store.put(key, last_run)
+        return fired
+    
+    def _dispatch_scheduled(self, job_id: str, job: Job) -> int:
+        try:
+            queued_id = self.dispatcher(job)
+        except Exception as e:
+            self.logger.error(f"Failed to dispatch scheduled job {job_id}: {e}")
+            self.registry.update_job_status(job_id, JobStatus.FAILED, error=str(e), completed_at=datetime.now())
+            return 0
+        
+        result = self.registry.get_job_result(job_id)
+        if result:
+            result.metadata['dispatched_at'] = datetime.now().isoformat()
+            result.metadata['queue_job_id'] = queued_id
+        return 1
+    
+    def _seconds_until_next_tick(self) -> float:
+        # Wake for the next due run, and often enough to renew the lease
+        wait = self.lease / 3
+        next_due = self.registry.next_due_at(recurring=self.is_leader)
+        if next_due is not None:
+            wait = min(wait, next_due - time.time())
+        return max(wait, 0.01)
+    
+    def _push(self, job: Job) -> Any:
+        from app.Queue.QueueManager import global_queue_manager
+        return global_queue_manager.push(job, job.options.queue)
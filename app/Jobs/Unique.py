@@ -0,0 +1,260 @@
+"""
+Unique, debounced and non-overlapping jobs
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, List, Optional, TYPE_CHECKING
+
+from app.Jobs.Job import JobRetryException, JobReleaseException, JobFailedException
+from app.Jobs.JobMetrics import JobMetrics
+from app.Jobs.JobTypeRegistry import job_types
+from app.Jobs.Middleware.JobMiddleware import JobMiddleware
+
+if TYPE_CHECKING:
+    from app.Cache.CacheStore import CacheLock, CacheStore
+    from app.Jobs.Job import ShouldQueue
+
+
+class ShouldBeUnique:
+    """
+    Mixin for jobs that should only be queued once per ``unique_id``.
+    
+    Dispatching takes a CacheLock named after the job type and unique id,
+    owned by the new job's id. While the lock is held, dispatching the same
+    job again queues nothing and returns the id of the job already queued.
+    The lock is released when the job finishes (or, with
+    ``unique_until_processing``, when it starts), fails for good, or after
+    ``unique_for`` seconds. A queued copy that finds the lock owned by
+    another job when it runs is dropped as a duplicate.
+    
+    With ``debounce`` set, every dispatch is queued ``debounce`` seconds
+    late instead, and only the latest job for the unique id runs; earlier
+    ones are dropped when their turn comes. Suppressed jobs are counted in
+    Horizon's per-queue job metrics.
+    
+    Example:
+        class ReindexUser(ShouldBeUnique, Job):
+            debounce = 30
+            
+            def unique_id(self) -> str:
+                return str(self.user_id)
+    """
+    
+    unique_for: int = 3600  # Seconds the uniqueness lock is held at most
+    unique_until_processing: bool = False  # Release when the job starts rather than finishes
+    debounce: int = 0  # Seconds to wait for a newer job with the same unique id
+    
+    def unique_id(self) -> str:
+        """Identifies which jobs of this type are duplicates of each other."""
+        return ""
+    
+    def unique_via(self) -> CacheStore:
+        """Cache store holding the uniqueness locks."""
+        return unique_jobs.store
+    
+    def middleware(self) -> List[JobMiddleware]:
+        """Enforce uniqueness when the job runs, before any other middleware."""
+        return [UniqueJobMiddleware(), *super().middleware()]  # type: ignore[misc]
+
+
+class UniqueJobs:
+    """
+    Dispatch- and run-time bookkeeping for ShouldBeUnique jobs.
+    
+    Locks are owned by job ids, so a worker can release the lock taken at
+    dispatch without anything extra in the payload.
+    """
+    
+    def __init__(self, store: Optional[CacheStore] = None, prefix: str = "unique_job:") -> None:
+        self._store = store
+        self.prefix = prefix
+        self.logger = logging.getLogger("jobs.unique")
+    
+    @property
+    def store(self) -> CacheStore:
+        """Configured cache store, resolved on first use."""
+        if self._store is None:
+            from app.Cache.CacheStore import cache_manager
+            from config.queue import get_queue_config
+            self._store = cache_manager.store((get_queue_config("unique") or {}).get("store"))
+        return self._store
+    
+    def claim(self, job: ShouldQueue, job_id: str, queue: Optional[str] = None) -> Optional[str]:
+        """
+        Claim uniqueness for a job about to be queued as ``job_id``.
+        
+        Returns None if the job should be queued, otherwise the id of the
+        queued job it duplicates.
+        """
+        if not isinstance(job, ShouldBeUnique):
+            return None
+        
+        store = job.unique_via()
+        if job.debounce > 0:
+            store.put(self._debounce_key(job), job_id, job.debounce + job.unique_for)
+            job.options.delay = max(job.options.delay, job.debounce)
+            return None
+        
+        lock = self._lock(job, job_id)
+        if lock.acquire(blocking=False):
+            return None
+        
+        existing = lock.current_owner()
+        if existing is None and lock.acquire(blocking=False):
+            return None  # expired between the two checks
+        
+        suppression_metrics.record(queue or job.options.queue, 'duplicate')
+        self.logger.info(f"Skipped duplicate {job.get_display_name()} ({job.unique_id()}): {existing} is queued")
+        return str(existing) if existing is not None else job_id
+    
+    def is_current(self, job: ShouldQueue) -> bool:
+        """Whether a job about to run is still the one its uniqueness belongs to."""
+        if not isinstance(job, ShouldBeUnique):
+            return True
+        
+        if job.debounce > 0:
+            latest = job.unique_via().get(self._debounce_key(job))
+            return latest is None or latest == job.job_id
+        
+        owner = self._lock(job, job.job_id).current_owner()
+        return owner is None or owner == job.job_id
+    
+    def release(self, job: ShouldQueue) -> None:
+        """Release the job's uniqueness if it still holds it."""
+        if job.job_id is None:
+            return
+        
+        self.release_claim(job, job.job_id)
+    
+    def release_claim(self, job: ShouldQueue, job_id: str) -> None:
+        """Give back uniqueness claimed for ``job_id``, e.g. when queueing it failed."""
+        if not isinstance(job, ShouldBeUnique):
+            return
+        
+        if job.debounce > 0:
+            store = job.unique_via()
+            key = self._debounce_key(job)
+            if store.get(key) == job_id:
+                store.forget(key)
+            return
+        
+        job.unique_via().restore_lock(self._key(job), job_id, job.unique_for).release()
+    
+    def _lock(self, job: ShouldBeUnique, owner: Any) -> CacheLock:
+        lock = job.unique_via().lock(self._key(job), job.unique_for)
+        lock.owner = owner
+        return lock
+    
+    def _key(self, job: ShouldBeUnique) -> str:
+        return f"{self.prefix}{job_types.code_for(job.__class__)}:{job.unique_id()}"
+    
+    def _debounce_key(self, job: ShouldBeUnique) -> str:
+        return f"{self._key(job)}:latest"
+
+
+class UniqueJobMiddleware(JobMiddleware):
+    """
+    Run-time half of ShouldBeUnique: drops superseded copies and releases
+    the uniqueness lock once the job is done with it.
+    """
+    
+    def handle(self, job: ShouldQueue, next_handler: Callable[[], Any]) -> Any:
+        """Run the job if it is still the current one for its unique id."""
+        if not unique_jobs.is_current(job):
+            event = 'debounced' if getattr(job, 'debounce', 0) > 0 else 'duplicate'
+            suppression_metrics.record(job.options.queue, event)
+            unique_jobs.logger.info(f"Dropped {event} {job.get_display_name()} ({job.job_id})")
+            return None
+        
+        if getattr(job, 'unique_until_processing', False):
+            unique_jobs.release(job)
+            return next_handler()
+        
+        try:
+            result = next_handler()
+        except JobRetryException:
+            raise  # still queued, so it stays unique
+        except JobFailedException:
+            unique_jobs.release(job)
+            raise
+        except Exception:
+            if job.attempts >= job.options.max_attempts:
+                unique_jobs.release(job)
+            raise
+        
+        unique_jobs.release(job)
+        return result
+
+
+class WithoutOverlapping(JobMiddleware):
+    """
+    Middleware that stops jobs sharing a key from running at the same time.
+    
+    The job holds a CacheLock named after its type and ``key`` while it
+    runs. A job that finds the lock taken is released back onto the queue
+    for ``release_after`` seconds, without using up an attempt, or dropped
+    if ``release_after`` is None. ``expire_after`` bounds how long a
+    crashed worker can keep the lock.
+    """
+    
+    def __init__(
+        self,
+        key: str = "",
+        release_after: Optional[int] = 10,
+        expire_after: int = 3600,
+        store: Optional[CacheStore] = None
+    ) -> None:
+        self.key = key
+        self.release_after = release_after
+        self.expire_after = expire_after
+        self.store = store
+    
+    def handle(self, job: ShouldQueue, next_handler: Callable[[], Any]) -> Any:
+        """Run the job only if no other job holds its key."""
+        store = self.store or unique_jobs.store
+        lock = store.lock(f"overlap:{job_types.code_for(job.__class__)}:{self.key}", self.expire_after)
+        
+        if not lock.acquire(blocking=False):
+            suppression_metrics.record(job.options.queue, 'overlapping')
+            if self.release_after is None:
+                return None
+            raise JobReleaseException(
+                f"Job overlaps a running {job.get_display_name()}", delay=self.release_after
+            )
+        
+        try:
+            return next_handler()
+        finally:
+            lock.release()
+
+
+class SuppressionMetrics(JobMetrics):
+    """
+    Counts suppressed jobs for Horizon.
+    
+    Events are added to the per-minute, per-hour and per-day job metric
+    hashes JobMonitor keeps, as ``duplicate``, ``debounced`` and
+    ``overlapping`` next to its ``completed`` and ``failed`` counts.
+    Reporting never gets in the way of dispatching or running a job.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, enabled: Optional[bool] = None) -> None:
+        super().__init__(redis_url, enabled)
+        self.logger = logging.getLogger("jobs.unique")
+    
+    def _load_config(self) -> None:
+        if self.enabled is not None and self.redis_url is not None:
+            return
+        
+        from config.queue import get_queue_config
+        config = get_queue_config("unique") or {}
+        if self.enabled is None:
+            self.enabled = config.get("report_metrics", True)
+        if self.redis_url is None:
+            self.redis_url = config.get("metrics_redis_url", 'redis://localhost:6379/0')
+
+
+# Global instances
+unique_jobs = UniqueJobs()
+suppression_metrics = SuppressionMetrics()
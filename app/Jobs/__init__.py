@@ -1,4 +1,6 @@
-from .Job import Job, ShouldQueue, Dispatchable, JobOptions, JobException, JobRetryException, JobFailedException
+from .Job import Job, ShouldQueue, Dispatchable, JobOptions, JobException, JobRetryException, JobReleaseException, JobFailedException, JobTimeoutException
+from .JobTypeRegistry import JobTypeRegistry, JobPayloadCodec, job_type, job_types
+from .Unique import ShouldBeUnique, UniqueJobs, UniqueJobMiddleware, WithoutOverlapping, unique_jobs
 
 __all__ = [
     "Job",
@@ -7,5 +9,16 @@ __all__ = [
     "JobOptions",
     "JobException",
     "JobRetryException", 
-    "JobFailedException"
+    "JobReleaseException",
+    "JobFailedException",
+    "JobTimeoutException",
+    "JobTypeRegistry",
+    "JobPayloadCodec",
+    "job_type",
+    "job_types",
+    "ShouldBeUnique",
+    "UniqueJobs",
+    "UniqueJobMiddleware",
+    "WithoutOverlapping",
+    "unique_jobs"
 ]
\ No newline at end of file
@@ -2,25 +2,147 @@ from __future__ import annotations
 
 import json
 import time
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
 from datetime import datetime, timezone, timedelta
 
 from app.Jobs.Job import ShouldQueue
+from app.Jobs.Unique import unique_jobs
+from app.Queue.FailedJobs import (
+    FailedJobGroup,
+    ProgressCallback,
+    RequeuePacer,
+    RetryProgress,
+    describe_exception,
+    exception_fingerprint
+)
 
 if TYPE_CHECKING:
     import redis
+    from redis.commands.core import Script
+
+
+# KEYS: queue zset (or delayed zset), jobs hash, notify list
+# ARGV: job id, payload, score, notify (1 = ready now)
+PUSH_SCRIPT = """
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+if ARGV[4] == '1' then
+    redis.call('RPUSH', KEYS[3], 1)
+end
+return 1
+"""
+
+# KEYS: queue zset, jobs hash, reserved set, reserved_data hash, notify list
+# ARGV: count, reservation JSON
+POP_SCRIPT = """
+local popped = redis.call('ZPOPMIN', KEYS[1], ARGV[1])
+local result = {}
+for i = 1, #popped, 2 do
+    local id = popped[i]
+    local payload = redis.call('HGET', KEYS[2], id)
+    redis.call('LPOP', KEYS[5])
+    if payload then
+        redis.call('SADD', KEYS[3], id)
+        redis.call('HSET', KEYS[4], id, ARGV[2])
+        result[#result + 1] = payload
+    end
+end
+return result
+"""
+
+# KEYS: jobs hash, reserved set, reserved_data hash, delayed zset
+# ARGV: job id, key prefix, ready-at timestamp (0 = now)
+RELEASE_SCRIPT = """
+local payload = redis.call('HGET', KEYS[1], ARGV[1])
+if not payload then
+    return 0
+end
+redis.call('SREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('ZADD', KEYS[4], ARGV[3], ARGV[1])
+else
+    local job = cjson.decode(payload)
+    local queue = job['queue'] or 'default'
+    redis.call('ZADD', ARGV[2] .. queue, -(tonumber(job['priority']) or 0), ARGV[1])
+    redis.call('RPUSH', ARGV[2] .. queue .. ':notify', 1)
+end
+return 1
+"""
+
+# KEYS: jobs hash, reserved set, reserved_data hash, failed hash
+# ARGV: job id, failed payload ('' = complete instead of fail)
+FINISH_SCRIPT = """
+redis.call('SREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+local removed = redis.call('HDEL', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('HSET', KEYS[4], ARGV[1], ARGV[2])
+end
+return removed
+"""
+
+# KEYS: delayed zset, jobs hash, promoter lock
+# ARGV: now, batch size, lock ttl ms, key prefix
+PROMOTE_SCRIPT = """
+if not redis.call('SET', KEYS[3], 1, 'NX', 'PX', ARGV[3]) then
+    return -1
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    local payload = redis.call('HGET', KEYS[2], id)
+    if payload then
+        local job = cjson.decode(payload)
+        local queue = job['queue'] or 'default'
+        redis.call('ZADD', ARGV[4] .. queue, -(tonumber(job['priority']) or 0), id)
+        redis.call('RPUSH', ARGV[4] .. queue .. ':notify', 1)
+    end
+end
+if #ids == tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[3])
+end
+return #ids
+"""
+
+# KEYS: failed hash, jobs hash, queue zset, notify list
+# ARGV: job id, payload, score
+RETRY_SCRIPT = """
+if redis.call('HDEL', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[3], ARGV[3], ARGV[1])
+redis.call('RPUSH', KEYS[4], 1)
+return 1
+"""
 
 
 class RedisQueueDriver:
     """
     Redis-based queue driver for high-performance job processing.
     Supports delayed jobs, priorities, and reliable processing.
+    
+    Every state transition (push, reserve, release, complete, fail,
+    promote) is a single Lua script, so a crashed client can't leave a job
+    half-moved. Poppers block on a per-queue notify list rather than the
+    queue itself. Delayed jobs are promoted in batches of
+    ``promote_batch_size`` by whichever client wins the promoter lock,
+    at most once per ``promote_interval`` unless a batch came back full.
+    
+    Scripts derive queue keys from the job payload, so all keys must live
+    on one Redis node (use a hash-tagged ``key_prefix`` such as
+    ``"{queue}:"`` on Redis Cluster).
     """
     
+    NOTIFY_SUFFIX = ":notify"
+    
     def __init__(
         self,
         connection_params: Optional[Dict[str, Any]] = None,
-        key_prefix: str = "queue:"
+        key_prefix: str = "queue:",
+        promote_interval: float = 1.0,
+        promote_batch_size: int = 100
     ) -> None:
         self.connection_params = connection_params or {
             "host": "localhost",
@@ -29,7 +151,11 @@ class RedisQueueDriver:
             "decode_responses": True
         }
         self.key_prefix = key_prefix
+        self.promote_interval = promote_interval
+        self.promote_batch_size = promote_batch_size
         self._redis: Optional[redis.Redis] = None
+        self._scripts: Dict[str, Script] = {}
+        self._next_promotion = 0.0
     
     @property
     def redis(self) -> redis.Redis:
@@ -43,49 +169,133 @@ class RedisQueueDriver:
         
         return self._redis
     
+    def _script(self, name: str) -> Script:
+        """Registered script by name; EVALSHA with an automatic load on first use."""
+        if name not in self._scripts:
+            source = {
+                "push": PUSH_SCRIPT,
+                "pop": POP_SCRIPT,
+                "release": RELEASE_SCRIPT,
+                "finish": FINISH_SCRIPT,
+                "promote": PROMOTE_SCRIPT,
+                "retry": RETRY_SCRIPT,
+            }[name]
+            self._scripts[name] = self.redis.register_script(source)
+        return self._scripts[name]
+    
     def push(self, job: ShouldQueue, queue: str = "default") -> str:
         """Push job to queue."""
         job_id = self._generate_job_id()
-        job_data = self._serialize_job(job, job_id)
-        
-        # Handle delayed jobs
-        if job.options.delay > 0:
-            score = time.time() + job.options.delay
-            self.redis.zadd(f"{self.key_prefix}delayed", {job_id: score})
-        else:
-            # Use priority for scoring (higher priority = lower score for correct ordering)
-            priority_score = -job.options.priority
-            self.redis.zadd(f"{self.key_prefix}{queue}", {job_id: priority_score})
+        existing = unique_jobs.claim(job, job_id, queue)
+        if existing is not None:
+            return existing
         
-        # Store job data
-        self.redis.hset(f"{self.key_prefix}jobs", job_id, json.dumps(job_data))
+        try:
+            job_data = self._serialize_job(job, job_id, queue)
+            
+            # Handle delayed jobs
+            if job.options.delay > 0:
+                target, score, ready = f"{self.key_prefix}delayed", time.time() + job.options.delay, "0"
+            else:
+                # Use priority for scoring (higher priority = lower score for correct ordering)
+                target, score, ready = f"{self.key_prefix}{queue}", -job.options.priority, "1"
+            
+            self._script("push")(
+                keys=[target, f"{self.key_prefix}jobs", f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}"],
+                args=[job_id, json.dumps(job_data), score, ready]
+            )
+        except Exception:
+            unique_jobs.release_claim(job, job_id)
+            raise
         
         return job_id
     
+    def push_many(self, jobs: List[ShouldQueue], queue: str = "default", chunk_size: int = 1000) -> List[str]:
+        """
+        Push several jobs, pipelining the push script one round-trip per chunk.
+        
+        Jobs pushed before an error stay queued; the uniqueness claimed for
+        jobs that weren't is given back.
+        """
+        job_ids: List[str] = []
+        push = self._script("push")
+        notify_key = f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}"
+        
+        for start in range(0, len(jobs), chunk_size):
+            pipe = self.redis.pipeline(transaction=False)
+            claimed: List[Tuple[ShouldQueue, str]] = []
+            try:
+                for job in jobs[start:start + chunk_size]:
+                    job_id = self._generate_job_id()
+                    existing = unique_jobs.claim(job, job_id, queue)
+                    if existing is not None:
+                        job_ids.append(existing)
+                        continue
+                    claimed.append((job, job_id))
+                    
+                    job_data = self._serialize_job(job, job_id, queue)
+                    
+                    if job.options.delay > 0:
+                        target, score, ready = f"{self.key_prefix}delayed", time.time() + job.options.delay, "0"
+                    else:
+                        target, score, ready = f"{self.key_prefix}{queue}", -job.options.priority, "1"
+                    
+                    push(keys=[target, f"{self.key_prefix}jobs", notify_key],
+                         args=[job_id, json.dumps(job_data), score, ready], client=pipe)
+                    job_ids.append(job_id)
+                results = pipe.execute(raise_on_error=False)
+            except Exception:
+                for job, job_id in claimed:
+                    unique_jobs.release_claim(job, job_id)
+                raise
+            
+            # One push per claimed job; only the ones that failed give their claim back
+            errors = [result for result in results if isinstance(result, Exception)]
+            for (job, job_id), result in zip(claimed, results):
+                if isinstance(result, Exception):
+                    unique_jobs.release_claim(job, job_id)
+            if errors:
+                raise errors[0]
+        
+        return job_ids
+    
     def pop(self, queue: str = "default", timeout: int = 10) -> Optional[Dict[str, Any]]:
-        """Pop job from queue with blocking."""
-        # First, move any delayed jobs that are ready
-        self._move_delayed_jobs()
-        
-        # Pop job with priority (lowest score first)
-        result = self.redis.bzpopmin(f"{self.key_prefix}{queue}", timeout=timeout)
-        
-        if not result:
-            return None
-        
-        queue_name, job_id, score = result
-        
-        # Get job data
-        job_data_json = self.redis.hget(f"{self.key_prefix}jobs", job_id)
-        if not job_data_json:
-            return None
-        
-        job_data = json.loads(job_data_json)
-        
-        # Mark job as reserved
-        self._reserve_job(job_id, job_data)
-        
-        return job_data  # type: ignore[no-any-return]
+        """Pop job from queue, blocking up to ``timeout`` seconds."""
+        deadline = time.monotonic() + timeout
+        notify_key = f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}"
+        
+        while True:
+            jobs = self.pop_many(queue, 1)
+            if jobs:
+                return jobs[0]
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            
+            # Wake on the next push, or in time to promote delayed jobs
+            self.redis.blpop([notify_key], timeout=min(remaining, self.promote_interval))
+    
+    def pop_many(self, queue: str = "default", count: int = 10,
+                 worker_id: Optional[str] = None, timeout: int = 3600) -> List[Dict[str, Any]]:
+        """Reserve up to ``count`` jobs in one round-trip, without blocking."""
+        self._promote_delayed_jobs()
+        
+        reservation: Dict[str, Any] = {"reserved_at": time.time(), "timeout": timeout}
+        if worker_id is not None:
+            reservation["worker_id"] = worker_id
+        
+        payloads = self._script("pop")(
+            keys=[
+                f"{self.key_prefix}{queue}",
+                f"{self.key_prefix}jobs",
+                f"{self.key_prefix}reserved",
+                f"{self.key_prefix}reserved_data",
+                f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}"
+            ],
+            args=[count, json.dumps(reservation)]
+        )
+        return [json.loads(payload) for payload in payloads]
     
     def reserve_job(self, job_id: str, worker_id: str, timeout: int = 3600) -> bool:
         """Reserve a job for processing."""
@@ -93,37 +303,20 @@ class RedisQueueDriver:
     
     def release_job(self, job_id: str, delay: int = 0) -> bool:
         """Release reserved job back to queue."""
-        job_data_json = self.redis.hget(f"{self.key_prefix}jobs", job_id)
-        if not job_data_json:
-            return False
-        
-        job_data = json.loads(job_data_json)
-        
-        # Remove from reserved set
-        self.redis.srem(f"{self.key_prefix}reserved", job_id)
-        self.redis.hdel(f"{self.key_prefix}reserved_data", job_id)
-        
-        # Re-queue job
-        queue = job_data.get("queue", "default")
-        priority_score = -job_data.get("priority", 0)
-        
-        if delay > 0:
-            score = time.time() + delay
-            self.redis.zadd(f"{self.key_prefix}delayed", {job_id: score})
-        else:
-            self.redis.zadd(f"{self.key_prefix}{queue}", {job_id: priority_score})
-        
-        return True
+        released = self._script("release")(
+            keys=[
+                f"{self.key_prefix}jobs",
+                f"{self.key_prefix}reserved",
+                f"{self.key_prefix}reserved_data",
+                f"{self.key_prefix}delayed"
+            ],
+            args=[job_id, self.key_prefix, time.time() + delay if delay > 0 else 0]
+        )
+        return bool(released)
     
     def complete_job(self, job_id: str) -> bool:
         """Mark job as completed and remove from system."""
-        # Remove from reserved
-        self.redis.srem(f"{self.key_prefix}reserved", job_id)
-        self.redis.hdel(f"{self.key_prefix}reserved_data", job_id)
-        
-        # Remove job data
-        self.redis.hdel(f"{self.key_prefix}jobs", job_id)
-        
+        self._finish_job(job_id, "")
         return True
     
     def fail_job(self, job_id: str, error: str) -> bool:
@@ -136,15 +329,20 @@ class RedisQueueDriver:
         job_data["failed_at"] = datetime.now(timezone.utc).isoformat()
         job_data["error"] = error
         
-        # Move to failed jobs
-        self.redis.hset(f"{self.key_prefix}failed", job_id, json.dumps(job_data))
-        
-        # Remove from other locations
-        self.redis.srem(f"{self.key_prefix}reserved", job_id)
-        self.redis.hdel(f"{self.key_prefix}reserved_data", job_id)
-        self.redis.hdel(f"{self.key_prefix}jobs", job_id)
-        
-        return True
+        # Move to failed jobs and out of every other location at once
+        return self._finish_job(job_id, json.dumps(job_data))
+    
+    def _finish_job(self, job_id: str, failed_payload: str) -> bool:
+        removed = self._script("finish")(
+            keys=[
+                f"{self.key_prefix}jobs",
+                f"{self.key_prefix}reserved",
+                f"{self.key_prefix}reserved_data",
+                f"{self.key_prefix}failed"
+            ],
+            args=[job_id, failed_payload]
+        )
+        return bool(removed)
     
     def get_queue_size(self, queue: str = "default") -> int:
         """Get number of jobs in queue."""
@@ -173,7 +371,7 @@ class RedisQueueDriver:
         
         # Clear queue
         count = self.redis.zcard(f"{self.key_prefix}{queue}")
-        self.redis.delete(f"{self.key_prefix}{queue}")
+        self.redis.delete(f"{self.key_prefix}{queue}", f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}")
         
         return count  # type: ignore[no-any-return]
     
@@ -189,44 +387,123 @@ class RedisQueueDriver:
         if not failed_data_json:
             return False
         
-        job_data = json.loads(failed_data_json)
-        
+        keys, args = self._retry_arguments(job_id, json.loads(failed_data_json))
+        return bool(self._script("retry")(keys=keys, args=args))
+    
+    def retry_failed_jobs(
+        self,
+        queue: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        chunk_size: int = 500,
+        rate: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Requeue failed jobs in bulk.
+        
+        The failed hash is walked with HSCAN and each chunk's matches are
+        moved back with the retry script, pipelined in one round-trip. The
+        script skips jobs another client already retried, so concurrent
+        runs never requeue a job twice. ``rate`` caps requeued jobs per
+        second; ``progress`` is called after every chunk.
+        
+        Returns:
+            The number of jobs requeued
+        """
+        pacer = RequeuePacer(rate)
+        chunk_size = pacer.chunk_size(chunk_size)
+        retry = self._script("retry")
+        status = RetryProgress(total=self.get_failed_count())
+        
+        cursor = 0
+        while True:
+            cursor, jobs = self.scan_failed_jobs(cursor, chunk_size, queue=queue, fingerprint=fingerprint)
+            if jobs:
+                pipe = self.redis.pipeline(transaction=False)
+                for job_data in jobs:
+                    keys, args = self._retry_arguments(job_data.pop("id"), job_data)
+                    retry(keys=keys, args=args, client=pipe)
+                status.retried += sum(1 for retried in pipe.execute() if retried)
+            
+            # HSCAN's count is only a hint, so this is an estimate until the end
+            status.scanned = min(status.scanned + chunk_size, status.total) if cursor else status.total
+            if progress is not None:
+                progress(status)
+            if not cursor:
+                return status.retried
+            pacer.wait(status)
+    
+    def _retry_arguments(self, job_id: str, job_data: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Retry script keys and arguments for a failed job record."""
         # Remove failed info
-        if "failed_at" in job_data:
-            del job_data["failed_at"]
-        if "error" in job_data:
-            del job_data["error"]
+        job_data.pop("failed_at", None)
+        job_data.pop("error", None)
         
-        # Re-queue job
+        # Re-queue job and remove from failed
         queue = job_data.get("queue", "default")
-        priority_score = -job_data.get("priority", 0)
-        
-        self.redis.zadd(f"{self.key_prefix}{queue}", {job_id: priority_score})
-        self.redis.hset(f"{self.key_prefix}jobs", job_id, json.dumps(job_data))
-        
-        # Remove from failed
-        self.redis.hdel(f"{self.key_prefix}failed", job_id)
-        
-        return True
+        keys = [
+            f"{self.key_prefix}failed",
+            f"{self.key_prefix}jobs",
+            f"{self.key_prefix}{queue}",
+            f"{self.key_prefix}{queue}{self.NOTIFY_SUFFIX}"
+        ]
+        return keys, [job_id, json.dumps(job_data), -job_data.get("priority", 0)]
     
     def get_failed_jobs(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get failed jobs."""
+        """Get failed jobs (in hash order, which only stays stable while the hash doesn't change)."""
+        failed_jobs: List[Dict[str, Any]] = []
+        cursor = 0
+        while len(failed_jobs) < offset + limit:
+            cursor, jobs = self.scan_failed_jobs(cursor, offset + limit - len(failed_jobs))
+            failed_jobs.extend(jobs)
+            if not cursor:
+                break
+        return failed_jobs[offset:offset + limit]
+    
+    def scan_failed_jobs(
+        self,
+        cursor: int = 0,
+        count: int = 100,
+        queue: Optional[str] = None,
+        fingerprint: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        One HSCAN step over failed jobs: the next cursor (0 when done) and
+        the matching jobs, each with its ``id`` and ``fingerprint``.
+        """
+        cursor, records = self.redis.hscan(f"{self.key_prefix}failed", cursor, count=count)
         failed_jobs = []
-        
-        # Get all failed job IDs
-        job_ids = list(self.redis.hkeys(f"{self.key_prefix}failed"))
-        
-        # Apply pagination
-        paginated_ids = job_ids[offset:offset + limit]
-        
-        for job_id in paginated_ids:
-            job_data_json = self.redis.hget(f"{self.key_prefix}failed", job_id)
-            if job_data_json:
-                job_data = json.loads(job_data_json)
-                job_data["id"] = job_id
-                failed_jobs.append(job_data)
-        
-        return failed_jobs
+        for job_id, job_data_json in records.items():
+            job_data = json.loads(job_data_json)
+            job_data["id"] = job_id
+            job_data["fingerprint"] = exception_fingerprint(job_data.get("job_class", ""), job_data.get("error", ""))
+            if queue is not None and job_data.get("queue", "default") != queue:
+                continue
+            if fingerprint is not None and job_data["fingerprint"] != fingerprint:
+                continue
+            failed_jobs.append(job_data)
+        return cursor, failed_jobs
+    
+    def group_failed_jobs(self, queue: Optional[str] = None, chunk_size: int = 1000) -> List[FailedJobGroup]:
+        """Group failed jobs by exception fingerprint, largest group first."""
+        groups: Dict[str, FailedJobGroup] = {}
+        cursor = 0
+        while True:
+            cursor, jobs = self.scan_failed_jobs(cursor, chunk_size, queue=queue)
+            for job_data in jobs:
+                key = job_data["fingerprint"]
+                group = groups.get(key)
+                if group is None:
+                    name, message, frame = describe_exception(job_data.get("error", ""))
+                    group = groups[key] = FailedJobGroup(key, job_data.get("job_class", ""), name, message, frame)
+                failed_at = job_data.get("failed_at")
+                group.add(
+                    job_data["id"],
+                    job_data.get("queue", "default"),
+                    datetime.fromisoformat(failed_at) if failed_at else None
+                )
+            if not cursor:
+                return sorted(groups.values(), key=lambda group: group.count, reverse=True)
     
     def release_expired_reservations(self, timeout: int = 3600) -> int:
         """Release jobs reserved longer than timeout."""
@@ -251,16 +528,18 @@ class RedisQueueDriver:
         
         return released_count
     
-    def _serialize_job(self, job: ShouldQueue, job_id: str) -> Dict[str, Any]:
+    def _serialize_job(self, job: ShouldQueue, job_id: str, queue: Optional[str] = None) -> Dict[str, Any]:
         """Serialize job for Redis storage."""
         job_data = job.serialize()
         job_data.update({
             "id": job_id,
-            "queue": job.options.queue,
+            "queue": queue or job.options.queue,
             "priority": job.options.priority,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "attempts": 0
         })
+        if getattr(job, "_batch_id", None):
+            job_data["batch_id"] = job._batch_id  # type: ignore[attr-defined]
         return job_data
     
     def _reserve_job(self, job_id: str, extra_data: Optional[Dict[str, Any]] = None, timeout: int = 3600) -> bool:
@@ -276,36 +555,26 @@ class RedisQueueDriver:
         
         return True
     
-    def _move_delayed_jobs(self) -> int:
-        """Move delayed jobs that are ready to their queues."""
+    def _promote_delayed_jobs(self) -> int:
+        """
+        Move due delayed jobs to their queues if this client wins the promoter lock.
+        
+        Returns the number promoted, or -1 if another client holds the lock.
+        The local throttle keeps non-promoters from hitting Redis on every pop.
+        """
         now = time.time()
-        moved_count = 0
+        if now < self._next_promotion:
+            return -1
         
-        # Get jobs ready to be moved
-        ready_jobs = self.redis.zrangebyscore(
-            f"{self.key_prefix}delayed",
-            min=0,
-            max=now,
-            withscores=True
+        promoted: int = self._script("promote")(
+            keys=[f"{self.key_prefix}delayed", f"{self.key_prefix}jobs", f"{self.key_prefix}delayed:promoter"],
+            args=[now, self.promote_batch_size, int(self.promote_interval * 1000), self.key_prefix]
         )
         
-        for job_id, score in ready_jobs:
-            # Get job data to determine target queue
-            job_data_json = self.redis.hget(f"{self.key_prefix}jobs", job_id)
-            if job_data_json:
-                job_data = json.loads(job_data_json)
-                queue = job_data.get("queue", "default")
-                priority_score = -job_data.get("priority", 0)
-                
-                # Move to target queue
-                self.redis.zadd(f"{self.key_prefix}{queue}", {job_id: priority_score})
-                
-                # Remove from delayed
-                self.redis.zrem(f"{self.key_prefix}delayed", job_id)
-                
-                moved_count += 1
-        
-        return moved_count
+        # A full batch means more are due: let the next pop continue straight away
+        if promoted < self.promote_batch_size:
+            self._next_promotion = now + self.promote_interval
+        return promoted
     
     def _generate_job_id(self) -> str:
         """Generate unique job ID."""
@@ -315,11 +584,13 @@ class RedisQueueDriver:
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get comprehensive queue statistics."""
         # Get all queue names
-        queue_keys = self.redis.keys(f"{self.key_prefix}*")
+        queue_keys = self.redis.scan_iter(match=f"{self.key_prefix}*", count=1000)
         queues = {}
         
         for key in queue_keys:
-            if key.startswith(f"{self.key_prefix}") and not key.endswith(("delayed", "reserved", "failed", "jobs", "reserved_data")):
+            if key.startswith(f"{self.key_prefix}") and not key.endswith(
+                ("delayed", "reserved", "failed", "jobs", "reserved_data", "delayed:promoter", self.NOTIFY_SUFFIX)
+            ):
                 queue_name = key.replace(self.key_prefix, "")
                 queues[queue_name] = self.redis.zcard(key)
         
@@ -0,0 +1,139 @@
+"""
+Failed job fingerprints, grouping and paced bulk requeue
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+# Prefix QueueWorker puts on the last error of a job that ran out of attempts
+_MAX_ATTEMPTS_PREFIX = "Max attempts exceeded. Last error: "
+
+_EXCEPTION_CLASS = re.compile(r"^[A-Za-z_][\w.]*$")
+_FRAME = re.compile(r'File "(?:[^"]*[/\\])?([^"/\\]+)", line \d+, in (\S+)')
+
+# Values that differ between occurrences of the same error
+_VOLATILE = re.compile(
+    r"""
+    [0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}  # UUIDs
+    | \b[0-9A-HJKMNP-TV-Z]{26}\b                                 # ULIDs
+    | \b0x[0-9a-f]+\b                                            # addresses
+    | '[^']*' | "[^"]*"                                          # quoted values
+    | \d+(?:\.\d+)?                                              # numbers
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+
+def describe_exception(exception: str) -> Tuple[str, str, str]:
+    """
+    Split a stored failure into exception class, normalized message and the
+    innermost traceback frame (``file:function``); any part may be empty.
+    """
+    if exception.startswith(_MAX_ATTEMPTS_PREFIX):
+        exception = exception[len(_MAX_ATTEMPTS_PREFIX):]
+    
+    first_line = exception.strip().split("\n", 1)[0]
+    name, separator, message = first_line.partition(":")
+    if not separator or not _EXCEPTION_CLASS.match(name):
+        name, message = "", first_line
+    
+    frames = _FRAME.findall(exception)
+    frame = f"{frames[-1][0]}:{frames[-1][1]}" if frames else ""
+    return name, _VOLATILE.sub("?", message.strip())[:200], frame
+
+
+def exception_fingerprint(job_class: str, exception: str) -> str:
+    """
+    Fingerprint grouping failures of the same job with the same error.
+    
+    Ids, numbers and quoted values are masked out of the message and line
+    numbers are ignored, so one bug hitting many records (or surviving a
+    deploy that shifts the code) gives one fingerprint.
+    """
+    name, message, frame = describe_exception(exception)
+    digest = hashlib.sha1(f"{job_class}\0{name}\0{message}\0{frame}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+@dataclass
+class FailedJobGroup:
+    """Failed jobs sharing an exception fingerprint."""
+    fingerprint: str
+    job_class: str
+    exception_class: str
+    message: str
+    frame: str
+    count: int = 0
+    queues: List[str] = field(default_factory=list)
+    first_failed_at: Optional[datetime] = None
+    last_failed_at: Optional[datetime] = None
+    sample_id: Optional[str] = None
+    
+    def add(self, failed_job_id: str, queue: str, failed_at: Optional[datetime]) -> None:
+        """Count one more failed job in the group."""
+        self.count += 1
+        if queue not in self.queues:
+            self.queues.append(queue)
+        if failed_at is not None:
+            if self.first_failed_at is None or failed_at < self.first_failed_at:
+                self.first_failed_at = failed_at
+            if self.last_failed_at is None or failed_at >= self.last_failed_at:
+                self.last_failed_at = failed_at
+                self.sample_id = failed_job_id
+        elif self.sample_id is None:
+            self.sample_id = failed_job_id
+
+
+@dataclass
+class RetryProgress:
+    """Running totals of a bulk requeue, passed to its progress callback."""
+    total: int
+    scanned: int = 0
+    retried: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+    
+    @property
+    def rate(self) -> float:
+        """Jobs requeued per second so far."""
+        return self.retried / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[RetryProgress], Any]
+
+
+class RequeuePacer:
+    """
+    Keeps a bulk requeue at or under ``rate`` jobs per second.
+    
+    Chunks are written whole, at most one second's worth each, and the
+    pacer sleeps between them for as long as the jobs requeued so far are
+    ahead of schedule.
+    """
+    
+    def __init__(self, rate: Optional[float] = None) -> None:
+        if rate is not None and rate <= 0:
+            raise ValueError("Requeue rate must be positive")
+        self.rate = rate
+    
+    def chunk_size(self, requested: int) -> int:
+        """Largest chunk that doesn't burst past one second's worth of jobs."""
+        if self.rate is None:
+            return requested
+        return max(1, min(requested, int(self.rate)))
+    
+    def wait(self, progress: RetryProgress) -> None:
+        """Sleep until the next chunk may be requeued."""
+        if self.rate is None:
+            return
+        ahead = progress.retried / self.rate - progress.elapsed
+        if ahead > 0:
+            time.sleep(ahead)
@@ -0,0 +1,351 @@
+"""
+Transactional outbox for jobs and broadcasts
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from sqlalchemy import asc, event
+
+from app.Jobs.Job import ShouldQueue
+from app.Jobs.JobTypeRegistry import JobPayloadCodec, job_types, payload_codec
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+    from database.migrations.create_job_outbox_table import OutboxMessage
+
+_bound_session: ContextVar[Optional[Session]] = ContextVar("outbox_session", default=None)
+
+
+class Outbox:
+    """
+    Writes jobs and broadcasts into the caller's transaction.
+    
+    Bind a session with ``outbox.bind(db)`` and every job dispatched after
+    commit (``JobOptions.dispatch_after_commit``, or the connection's
+    ``after_commit`` setting) and every ShouldBroadcast event dispatched
+    inside the block becomes a job_outbox row in that session. The rows
+    commit or roll back with the caller's own writes, so a job never sees
+    data that was never saved and no extra connection is opened per
+    dispatch. The relay hands committed rows to the queue driver in batches.
+    
+    Example:
+        with outbox.bind(db):
+            order = create_order(db, data)
+            SendOrderConfirmation.dispatch(order.id)
+            db.commit()  # the job is queued only now
+    """
+    
+    def __init__(self, relay: Optional[OutboxRelay] = None) -> None:
+        self._relay = relay
+        self._codec: Optional[JobPayloadCodec] = None
+        self._last_id = ""
+        self._id_lock = threading.Lock()
+    
+    @property
+    def relay(self) -> OutboxRelay:
+        """Relay woken after each commit, created on first use."""
+        if self._relay is None:
+            self._relay = OutboxRelay()
+        return self._relay
+    
+    @property
+    def codec(self) -> JobPayloadCodec:
+        if self._codec is None:
+            self._codec = payload_codec()
+        return self._codec
+    
+    @contextmanager
+    def bind(self, session: Session) -> Iterator[Session]:
+        """Route deferred dispatches in this context through ``session``."""
+        token = _bound_session.set(session)
+        try:
+            yield session
+        finally:
+            _bound_session.reset(token)
+    
+    def session(self) -> Optional[Session]:
+        """The session bound in the current context, if any."""
+        return _bound_session.get()
+    
+    def should_defer(self, job: ShouldQueue) -> bool:
+        """Whether dispatching ``job`` now should go through the outbox."""
+        if self.session() is None:
+            return False
+        
+        after_commit = job.options.dispatch_after_commit
+        if after_commit is None:
+            from config.queue import get_connection_config
+            connection = None if job.options.connection == "default" else job.options.connection
+            after_commit = get_connection_config(connection).get("after_commit", False)
+        return bool(after_commit)
+    
+    def add(self, job: ShouldQueue, queue: Optional[str] = None, session: Optional[Session] = None) -> str:
+        """Write a job to the outbox; returns the outbox message ID."""
+        return self._add(session, "job", job.options.connection, queue or job.options.queue,
+                         self.codec.encode(job.serialize()))
+    
+    def add_broadcast(
+        self,
+        channels: List[str],
+        event_name: str,
+        data: Dict[str, Any],
+        channel_name: Optional[str] = None,
+        session: Optional[Session] = None
+    ) -> str:
+        """
+        Write a broadcast to the outbox; returns the outbox message ID.
+        
+        The broadcast channel travels in the payload; ``connection`` stays
+        the default since it names a queue connection.
+        """
+        payload = {"channels": channels, "event": event_name, "data": data, "channel": channel_name}
+        return self._add(session, "broadcast", "default", "broadcasts", json.dumps(payload, default=str))
+    
+    def _add(self, session: Optional[Session], kind: str, connection: str, queue: str, payload: str) -> str:
+        from database.migrations.create_job_outbox_table import OutboxMessage
+        
+        session = session or self.session()
+        if session is None:
+            raise RuntimeError("No session is bound to the outbox")
+        
+        message_id = self._next_id()
+        session.add(OutboxMessage(
+            id=message_id,
+            kind=kind,
+            connection=connection,
+            queue=queue,
+            payload=payload,
+            available_at=datetime.utcnow()
+        ))
+        self._watch(session)
+        return message_id
+    
+    def _next_id(self) -> str:
+        """
+        A ULID greater than every earlier one from this process. The relay
+        delivers in ID order, and plain ULIDs made in the same millisecond
+        sort randomly.
+        """
+        from app.Utils.ULIDUtils import generate_ulid
+        
+        message_id = generate_ulid()
+        with self._id_lock:
+            if message_id <= self._last_id:
+                message_id = _increment_ulid(self._last_id)
+            self._last_id = message_id
+        return message_id
+    
+    def _watch(self, session: Session) -> None:
+        """Wake the relay when ``session`` commits outbox rows."""
+        session.info["outbox_pending"] = True
+        if session.info.get("outbox_watched"):
+            return
+        
+        session.info["outbox_watched"] = True
+        event.listen(session, "after_commit", self._after_commit)
+        event.listen(session, "after_soft_rollback", self._after_rollback)
+    
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop("outbox_pending", False):
+            self.relay.notify()
+    
+    def _after_rollback(self, session: Session, previous_transaction: Any) -> None:
+        session.info.pop("outbox_pending", None)
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox rows to the queue driver and broadcaster.
+    
+    Each pass takes up to ``batch_size`` due rows, oldest first, locked with
+    SKIP LOCKED where the database supports it so several relays can run.
+    Jobs are pushed one ``bulk`` call per queue through the queue manager,
+    so they land on whichever driver the queue is configured for;
+    broadcasts are sent concurrently. Delivered rows are deleted in the
+    same transaction. Rows that fail are retried with backoff up to
+    ``max_backoff`` seconds apart and are never dropped. Delivery is
+    at least once: a relay that dies between pushing and committing pushes
+    the batch again.
+    
+    With ``relay`` set to ``thread`` in the outbox config, the first commit
+    in a process starts a background relay thread that is woken by every
+    commit. Run ``outbox relay`` from the queue command to drain rows left
+    behind by processes that exited early, or instead of the threads.
+    """
+    
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_backoff: Optional[int] = None,
+        dispatcher: Optional[Callable[[List[ShouldQueue], str], Any]] = None,
+        broadcaster: Optional[Callable[[List[str], str, Dict[str, Any], Optional[str]], Awaitable[Any]]] = None
+    ) -> None:
+        from config.queue import get_queue_config
+        
+        config = get_queue_config("outbox") or {}
+        self.batch_size = batch_size or config.get("batch_size", 500)
+        self.poll_interval = poll_interval or config.get("poll_interval", 5)
+        self.max_backoff = max_backoff or config.get("max_backoff", 300)
+        self.mode = config.get("relay", "thread")
+        self.dispatcher = dispatcher or self._bulk_push
+        self.broadcaster = broadcaster or self._broadcast
+        self.is_running = False
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("queue.outbox")
+    
+    def relay(self) -> int:
+        """Deliver one batch of due rows; returns the number of rows taken."""
+        from config.database import get_database
+        from database.migrations.create_job_outbox_table import OutboxMessage
+        
+        db = next(get_database())
+        try:
+            now = datetime.utcnow()
+            messages = (
+                db.query(OutboxMessage)
+                .filter(OutboxMessage.available_at <= now)
+                .order_by(asc(OutboxMessage.id))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not messages:
+                return 0
+            
+            failures = self._deliver(messages)
+            delivered = [message.id for message in messages if message.id not in failures]
+            if delivered:
+                db.query(OutboxMessage).filter(OutboxMessage.id.in_(delivered)).delete(synchronize_session=False)
+            for message in messages:
+                if message.id in failures:
+                    message.attempts += 1
+                    message.last_error = failures[message.id]
+                    message.available_at = now + timedelta(seconds=min(2 ** message.attempts, self.max_backoff))
+            db.commit()
+            
+            if failures:
+                self.logger.warning(f"Outbox relay delivered {len(delivered)} messages, {len(failures)} failed")
+            return len(messages)
+        
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def run(self) -> None:
+        """Relay until stop() is called, waking on notify() or every poll interval."""
+        self.is_running = True
+        while self.is_running:
+            try:
+                relayed = self.relay()
+            except Exception as e:
+                self.logger.error(f"Outbox relay failed: {e}")
+                relayed = 0
+            
+            # A full batch means more are waiting
+            if relayed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+    
+    def stop(self) -> None:
+        """Stop the loop after the current batch."""
+        self.is_running = False
+        self._wake.set()
+    
+    def notify(self) -> None:
+        """Outbox rows were committed: relay them soon."""
+        if self.mode == "thread" and self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+                    self._thread.start()
+        self._wake.set()
+    
+    def pending(self) -> int:
+        """Number of rows waiting in the outbox."""
+        from config.database import get_database
+        from database.migrations.create_job_outbox_table import OutboxMessage
+        
+        db = next(get_database())
+        try:
+            return db.query(OutboxMessage).count()
+        finally:
+            db.close()
+    
+    def _deliver(self, messages: List[OutboxMessage]) -> Dict[str, str]:
+        """Hand messages on; returns the errors of those that failed, by ID."""
+        failures: Dict[str, str] = {}
+        queues: Dict[str, List[Tuple[str, ShouldQueue]]] = {}
+        broadcasts: List[Tuple[str, Dict[str, Any]]] = []
+        
+        for message in messages:
+            try:
+                if message.kind == "broadcast":
+                    broadcasts.append((message.id, json.loads(message.payload)))
+                else:
+                    payload = JobPayloadCodec.decode(message.payload)
+                    job = job_types.resolve(payload["job_class"]).deserialize(payload)
+                    queues.setdefault(message.queue, []).append((message.id, job))
+            except Exception as e:
+                failures[message.id] = f"Could not decode outbox message: {e}"
+        
+        for queue, entries in queues.items():
+            try:
+                self.dispatcher([job for _, job in entries], queue)
+            except Exception as e:
+                self.logger.error(f"Outbox relay could not push {len(entries)} jobs to '{queue}': {e}")
+                failures.update((message_id, str(e)) for message_id, _ in entries)
+        
+        if broadcasts:
+            results = asyncio.run(self._broadcast_all([payload for _, payload in broadcasts]))
+            for (message_id, _), result in zip(broadcasts, results):
+                if isinstance(result, BaseException):
+                    failures[message_id] = str(result)
+        
+        return failures
+    
+    async def _broadcast_all(self, payloads: List[Dict[str, Any]]) -> List[Any]:
+        return await asyncio.gather(
+            *(self.broadcaster(p["channels"], p["event"], p["data"], p.get("channel")) for p in payloads),
+            return_exceptions=True
+        )
+    
+    def _bulk_push(self, jobs: List[ShouldQueue], queue: str) -> Any:
+        from app.Queue.QueueManager import global_queue_manager
+        return global_queue_manager.bulk(jobs, queue)
+    
+    async def _broadcast(self, channels: List[str], event_name: str, data: Dict[str, Any],
+                         channel_name: Optional[str]) -> Any:
+        from app.Broadcasting.BroadcastManager import broadcast_manager
+        return await broadcast_manager.broadcast(channels, event_name, data, channel_name)
+
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def _increment_ulid(ulid: str) -> str:
+    """The next ULID after ``ulid`` (the monotonic ULID rule)."""
+    digits = list(ulid)
+    for position in range(len(digits) - 1, -1, -1):
+        index = _CROCKFORD.index(digits[position]) + 1
+        if index < len(_CROCKFORD):
+            digits[position] = _CROCKFORD[index]
+            return "".join(digits)
+        digits[position] = _CROCKFORD[0]
+    raise OverflowError("ULID space exhausted")
+
+
+# Global outbox
+outbox = Outbox()
@@ -63,6 +63,10 @@ class QueueDriver(ABC):
         """Push job to queue."""
         pass
     
+    def bulk(self, jobs: List[ShouldQueue], queue: str = "default") -> List[str]:
+        """Push several jobs to queue."""
+        return [self.push(job, queue) for job in jobs]
+    
     @abstractmethod
     def pop(self, queue: str = "default", timeout: int = 10) -> Optional[Dict[str, Any]]:
         """Pop job from queue."""
@@ -93,6 +97,14 @@ class DatabaseQueueDriver(QueueDriver):
         queue_service = QueueService(db)
         return queue_service.push(job, queue)
     
+    def bulk(self, jobs: List[ShouldQueue], queue: str = "default") -> List[str]:
+        """Push several jobs with chunked multi-row inserts."""
+        from app.Services.QueueService import QueueService
+        from config.database import get_database
+        db = next(get_database())
+        queue_service = QueueService(db)
+        return queue_service.bulk(jobs, queue)
+    
     def pop(self, queue: str = "default", timeout: int = 10) -> Optional[Dict[str, Any]]:
         """Pop job from database queue."""
         # Implementation would use database operations
@@ -137,10 +149,18 @@ class RedisQueueDriver(QueueDriver):
         """Push job to Redis queue."""
         return self._get_driver().push(job, queue)
     
+    def bulk(self, jobs: List[ShouldQueue], queue: str = "default") -> List[str]:
+        """Push several jobs to Redis queue over a pipeline."""
+        return cast(Any, self._get_driver()).push_many(jobs, queue)  # type: ignore[no-any-return]
+    
     def pop(self, queue: str = "default", timeout: int = 10) -> Optional[Dict[str, Any]]:
         """Pop job from Redis queue."""
         return self._get_driver().pop(queue, timeout)
     
+    def pop_many(self, queue: str = "default", count: int = 10) -> List[Dict[str, Any]]:
+        """Reserve several jobs from Redis queue in one round-trip."""
+        return cast(Any, self._get_driver()).pop_many(queue, count)  # type: ignore[no-any-return]
+    
     def size(self, queue: str = "default") -> int:
         """Get Redis queue size."""
         return self._get_driver().size(queue)
@@ -226,6 +246,18 @@ class QueueManager:
         
         return driver.push(job, queue)
     
+    def bulk(self, jobs: List[ShouldQueue], queue: str = "default") -> List[str]:
+        """Push several jobs to a queue in one driver call."""
+        if queue in self.middleware_stacks:
+            # Middleware wraps each push individually
+            return [self.push(job, queue) for job in jobs]
+        
+        config = self.get_queue_config(queue)
+        driver = self.get_driver(config.connection)
+        for job in jobs:
+            self._apply_queue_config_to_job(job, config)
+        return driver.bulk(jobs, queue)
+    
     def create_worker_for_queue(self, queue: str) -> QueueWorker:
         """Create a worker configured for specific queue."""
         from app.Queue.Worker import QueueWorker, WorkerOptions
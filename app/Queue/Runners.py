@@ -0,0 +1,464 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import inspect
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+import traceback
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait as wait_connections
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from app.Jobs.Job import ShouldQueue, JobRetryException, JobReleaseException, JobFailedException, JobTimeoutException
+from app.Jobs.JobTypeRegistry import job_types
+from app.Jobs.Middleware.JobMiddleware import MiddlewareStack
+
+
+def resolve_job(
+    payload: Dict[str, Any],
+    job_id: str,
+    attempts: int,
+    loop: Optional[asyncio.AbstractEventLoop] = None
+) -> Tuple[ShouldQueue, Callable[[], Any]]:
+    """
+    Deserialize a job payload into an instance and the bound method to call.
+    
+    ``job_class`` may be a registered type code or a dotted path; either is
+    resolved to a class once and cached by the job type registry.
+    
+    A top-level ``batch_id`` (the jobs.batch_id column, or the Redis job
+    record's field) is restored onto the instance for Batchable jobs.
+    
+    The returned callable is synchronous: a coroutine handler is run to
+    completion, on ``loop`` (from another thread) if given, so callers
+    without an event loop never ack a job that hasn't run. When the job
+    declares middleware the callable runs through it, so middleware such
+    as WithoutOverlapping wraps the job's actual execution. The one
+    exception is a coroutine handler without middleware when ``loop`` is
+    given; it is returned as is for the async runner to await.
+    """
+    job_class_name = payload.get("job_class")
+    job_method = payload.get("job_method", "handle")
+    
+    if not job_class_name:
+        raise ValueError("Job class not specified in payload")
+    
+    job_class = job_types.resolve(job_class_name)
+    job_instance = job_class.deserialize(payload)
+    job_instance.job_id = job_id
+    job_instance.attempts = attempts
+    if payload.get("batch_id"):
+        job_instance._batch_id = payload["batch_id"]  # type: ignore[attr-defined]
+    
+    method = getattr(job_instance, job_method)
+    middleware = job_instance.middleware()
+    if middleware:
+        stack = MiddlewareStack()
+        for layer in middleware:
+            stack.add(layer)
+        handler = _blocking(method, loop)
+        return job_instance, lambda: stack.process(job_instance, handler)
+    if loop is not None and inspect.iscoroutinefunction(method):
+        return job_instance, method
+    return job_instance, _blocking(method, loop)
+
+
+def _blocking(method: Callable[[], Any], loop: Optional[asyncio.AbstractEventLoop]) -> Callable[[], Any]:
+    """Wrap a handler so any awaitable it returns is awaited before returning."""
+    def call() -> Any:
+        result = method()
+        if not inspect.isawaitable(result):
+            return result
+        if loop is not None:
+            return asyncio.run_coroutine_threadsafe(_await(result), loop).result()
+        return asyncio.run(_await(result))
+    return call
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+def job_timeout(payload: Dict[str, Any], worker_timeout: int) -> Optional[float]:
+    """The effective timeout: the lower of the worker's and the job's own, 0 meaning none."""
+    limits = [t for t in (worker_timeout, payload.get("options", {}).get("timeout", 0)) if t and t > 0]
+    return float(min(limits)) if limits else None
+
+
+class JobProcessError(Exception):
+    """An unexpected exception raised by a job in a child process."""
+    
+    def __init__(self, exception_class: str, message: str, remote_traceback: str) -> None:
+        super().__init__(f"{exception_class}: {message}")
+        self.exception_class = exception_class
+        self.remote_traceback = remote_traceback
+    
+    def __str__(self) -> str:
+        return f"{self.args[0]}\n{self.remote_traceback}"
+
+
+@dataclass
+class _RunningJob:
+    """Book-keeping for a job currently executing in a runner."""
+    job_id: str
+    future: Future[None]
+    deadline: Optional[float]
+    thread_id: Optional[int] = None
+    slot: Optional[_ProcessSlot] = None
+
+
+class JobRunner(ABC):
+    """
+    Executes queued jobs concurrently on behalf of QueueWorker.
+    
+    The worker keeps ownership of the database: it reserves jobs, submits
+    their payloads here and settles each returned future (ack, retry or
+    fail) on its own thread. Runners only execute job code and enforce the
+    per-job timeout.
+    """
+    
+    def __init__(self, concurrency: int, timeout: int = 0, memory_limit: int = 0) -> None:
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.logger = logging.getLogger(f"queue.runner.{self.__class__.__name__}")
+        self._running: Dict[Future[None], _RunningJob] = {}
+    
+    @abstractmethod
+    def submit(self, job_id: str, payload: Dict[str, Any], attempts: int) -> Future[None]:
+        """Start a job; the future resolves with None or the job's exception."""
+        pass
+    
+    @abstractmethod
+    def shutdown(self) -> None:
+        """Release runner resources once no jobs are in flight."""
+        pass
+    
+    def wait(self, futures: List[Future[None]], timeout: float) -> None:
+        """Block until one of ``futures`` completes, a deadline passes or ``timeout`` elapses."""
+        if futures:
+            wait_futures(futures, timeout=self._until_next_deadline(timeout), return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(timeout)
+    
+    def enforce_timeouts(self) -> None:
+        """Fail jobs that outlived their deadline."""
+        now = time.monotonic()
+        for running in list(self._running.values()):
+            if running.deadline is not None and now >= running.deadline and not running.future.done():
+                self._expire(running)
+    
+    def _expire(self, running: _RunningJob) -> None:
+        self._finish(running.future, JobTimeoutException(f"Job {running.job_id} timed out"))
+    
+    def _track(self, job_id: str, timeout: Optional[float]) -> _RunningJob:
+        running = _RunningJob(
+            job_id=job_id,
+            future=Future(),
+            deadline=time.monotonic() + timeout if timeout else None
+        )
+        running.future.set_running_or_notify_cancel()
+        self._running[running.future] = running
+        return running
+    
+    def _finish(self, future: Future[None], error: Optional[BaseException]) -> None:
+        """Resolve a job's future once; late results of expired jobs are dropped."""
+        self._running.pop(future, None)
+        try:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+        except Exception:
+            pass  # already settled (timed out)
+    
+    def _until_next_deadline(self, timeout: float) -> float:
+        deadlines = [r.deadline for r in self._running.values() if r.deadline is not None]
+        if not deadlines:
+            return timeout
+        return max(0.0, min(timeout, min(deadlines) - time.monotonic()))
+
+
+class AsyncJobRunner(JobRunner):
+    """
+    Runs jobs as tasks on a dedicated asyncio event loop.
+    
+    Coroutine ``handle`` methods share the loop; synchronous ones, and jobs
+    with middleware, are moved to the loop's default executor, where the
+    middleware chain runs a coroutine handler back on the loop. Timeouts
+    cancel the task, which interrupts coroutine jobs at their next await.
+    """
+    
+    def __init__(self, concurrency: int, timeout: int = 0, memory_limit: int = 0) -> None:
+        super().__init__(concurrency, timeout, memory_limit)
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        self._thread = threading.Thread(target=self._loop.run_forever, name="queue-async-runner", daemon=True)
+        self._thread.start()
+    
+    def submit(self, job_id: str, payload: Dict[str, Any], attempts: int) -> Future[None]:
+        timeout = job_timeout(payload, self.timeout)
+        # wait_for on the loop enforces the deadline
+        running = self._track(job_id, None)
+        
+        task = asyncio.run_coroutine_threadsafe(self._run(job_id, payload, attempts, timeout), self._loop)
+        task.add_done_callback(lambda done: self._finish(running.future, done.exception()))
+        return running.future
+    
+    async def _run(self, job_id: str, payload: Dict[str, Any], attempts: int, timeout: Optional[float]) -> None:
+        _, method = resolve_job(payload, job_id, attempts, self._loop)
+        if inspect.iscoroutinefunction(method):
+            call = method()
+        else:
+            call = asyncio.get_running_loop().run_in_executor(None, method)
+        
+        try:
+            await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise JobTimeoutException(f"Job {job_id} timed out after {timeout:g}s")
+    
+    def shutdown(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        if not self._loop.is_running():
+            self._loop.close()
+
+
+class ThreadJobRunner(JobRunner):
+    """
+    Runs jobs on a thread pool, for jobs that block on I/O.
+    
+    A timed-out job is failed immediately and ``JobTimeoutException`` is
+    raised inside its thread. A thread stuck in a C call can't be
+    interrupted, so if it is still alive the pool is replaced to keep
+    ``concurrency`` slots available and the old thread is left to finish.
+    """
+    
+    def __init__(self, concurrency: int, timeout: int = 0, memory_limit: int = 0) -> None:
+        super().__init__(concurrency, timeout, memory_limit)
+        self._executor = self._new_executor()
+        self._interrupt_lock = threading.Lock()
+    
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="queue-job")
+    
+    def submit(self, job_id: str, payload: Dict[str, Any], attempts: int) -> Future[None]:
+        running = self._track(job_id, job_timeout(payload, self.timeout))
+        self._executor.submit(self._run, running, payload, attempts)
+        return running.future
+    
+    def _run(self, running: _RunningJob, payload: Dict[str, Any], attempts: int) -> None:
+        try:
+            self._execute(running, payload, attempts)
+        except JobTimeoutException:
+            pass  # interrupt delivered just as the job finished; already failed
+    
+    def _execute(self, running: _RunningJob, payload: Dict[str, Any], attempts: int) -> None:
+        error: Optional[BaseException] = None
+        try:
+            with self._interrupt_lock:
+                running.thread_id = threading.get_ident()
+            _, method = resolve_job(payload, running.job_id, attempts)
+            method()
+        except BaseException as e:
+            error = e
+        finally:
+            with self._interrupt_lock:
+                running.thread_id = None
+        self._finish(running.future, error)
+    
+    def _expire(self, running: _RunningJob) -> None:
+        super()._expire(running)
+        
+        with self._interrupt_lock:
+            if running.thread_id is None:
+                return
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(running.thread_id), ctypes.py_object(JobTimeoutException)
+            )
+        
+        time.sleep(0.05)
+        if running.thread_id is not None:
+            self.logger.warning(f"Job {running.job_id} did not stop after timing out; replacing thread pool")
+            stale, self._executor = self._executor, self._new_executor()
+            stale.shutdown(wait=False)
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class _ProcessSlot:
+    """One long-lived child process executing jobs sent over a pipe."""
+    
+    def __init__(self, context: Any, memory_limit: int) -> None:
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_process_slot_main,
+            args=(child_connection, memory_limit),
+            name="queue-job-process",
+            daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        self.running: Optional[_RunningJob] = None
+    
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        self.connection.close()
+
+
+def _process_slot_main(connection: Connection, memory_limit: int) -> None:
+    """Child loop: run jobs until told to stop or over the memory limit."""
+    # The parent owns shutdown; children finish their current job on SIGTERM/SIGINT
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    
+    # Don't reuse database connections inherited from the parent
+    database = sys.modules.get("config.database")
+    if database is not None:
+        database.engine.dispose(close=False)
+    
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        
+        job_id, payload, attempts = message
+        try:
+            _, method = resolve_job(payload, job_id, attempts)
+            method()
+            outcome: Tuple[Any, ...] = ("ok",)
+        except JobReleaseException as e:
+            outcome = ("release", str(e), e.delay)
+        except JobRetryException as e:
+            outcome = ("retry", str(e), e.delay)
+        except JobFailedException as e:
+            outcome = ("failed", str(e))
+        except Exception as e:
+            outcome = ("error", e.__class__.__name__, str(e), traceback.format_exc())
+        
+        recycle = _memory_exceeded(memory_limit)
+        connection.send((outcome, recycle))
+        if recycle:
+            return
+
+
+def _memory_exceeded(memory_limit: int) -> bool:
+    if memory_limit <= 0:
+        return False
+    try:
+        import psutil
+        return bool(psutil.Process().memory_info().rss / 1024 / 1024 > memory_limit)
+    except ImportError:
+        return False
+
+
+class ProcessJobRunner(JobRunner):
+    """
+    Runs jobs in a pool of child processes, for CPU-bound jobs.
+    
+    Each child applies ``memory_limit`` to itself and is replaced after the
+    job that pushed it over. A timed-out job's process is killed and a
+    fresh one started in its place.
+    """
+    
+    def __init__(self, concurrency: int, timeout: int = 0, memory_limit: int = 0) -> None:
+        super().__init__(concurrency, timeout, memory_limit)
+        self._context = multiprocessing.get_context()
+        self._slots = [_ProcessSlot(self._context, memory_limit) for _ in range(self.concurrency)]
+    
+    def submit(self, job_id: str, payload: Dict[str, Any], attempts: int) -> Future[None]:
+        slot = next((s for s in self._slots if s.running is None), None)
+        if slot is None:
+            raise RuntimeError("No idle worker process available")
+        
+        running = self._track(job_id, job_timeout(payload, self.timeout))
+        running.slot = slot
+        slot.running = running
+        try:
+            slot.connection.send((job_id, payload, attempts))
+        except (BrokenPipeError, OSError) as e:
+            self._replace(slot, kill=True)
+            self._finish(running.future, e)
+        return running.future
+    
+    def wait(self, futures: List[Future[None]], timeout: float) -> None:
+        busy = {slot.connection: slot for slot in self._slots if slot.running is not None}
+        if not busy:
+            time.sleep(timeout)
+            return
+        
+        for connection in wait_connections(list(busy), timeout=self._until_next_deadline(timeout)):
+            slot = busy[connection]  # type: ignore[index]
+            running = slot.running
+            assert running is not None
+            slot.running = None
+            try:
+                outcome, recycle = slot.connection.recv()
+            except (EOFError, OSError):
+                self._replace(slot, kill=True)
+                self._finish(running.future, RuntimeError(f"Worker process exited while running job {running.job_id}"))
+                continue
+            
+            self._finish(running.future, self._outcome_error(outcome))
+            if recycle:
+                self.logger.info("Worker process exceeded memory limit; replacing it")
+                self._replace(slot)
+    
+    def _outcome_error(self, outcome: Tuple[Any, ...]) -> Optional[BaseException]:
+        kind = outcome[0]
+        if kind == "ok":
+            return None
+        if kind == "release":
+            return JobReleaseException(outcome[1], outcome[2])
+        if kind == "retry":
+            return JobRetryException(outcome[1], outcome[2])
+        if kind == "failed":
+            return JobFailedException(outcome[1])
+        return JobProcessError(outcome[1], outcome[2], outcome[3])
+    
+    def _expire(self, running: _RunningJob) -> None:
+        super()._expire(running)
+        if running.slot is not None:
+            running.slot.running = None
+            self._replace(running.slot, kill=True)
+    
+    def _replace(self, slot: _ProcessSlot, kill: bool = False) -> None:
+        slot.stop(kill=kill)
+        self._slots[self._slots.index(slot)] = _ProcessSlot(self._context, self.memory_limit)
+    
+    def shutdown(self) -> None:
+        for slot in self._slots:
+            slot.stop(kill=slot.running is not None)
+        self._slots = []
+
+
+RUNNERS: Dict[str, Type[JobRunner]] = {
+    "async": AsyncJobRunner,
+    "thread": ThreadJobRunner,
+    "process": ProcessJobRunner,
+}
+
+
+def create_runner(name: str, concurrency: int, timeout: int = 0, memory_limit: int = 0) -> JobRunner:
+    """Create a job runner by name (async, thread or process)."""
+    if name not in RUNNERS:
+        raise ValueError(f"Unsupported job runner: {name}")
+    return RUNNERS[name](concurrency, timeout, memory_limit)
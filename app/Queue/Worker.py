@@ -5,13 +5,21 @@ import time
 import signal
 import logging
 import traceback
-import importlib
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+import uuid
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Deque, Iterator, List, TYPE_CHECKING
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from sqlalchemy import select, update, delete
 from sqlalchemy.orm import Session
 
-from app.Jobs.Job import ShouldQueue, JobRetryException, JobFailedException
+from app.Jobs.Job import ShouldQueue, JobRetryException, JobReleaseException, JobFailedException, JobTimeoutException
+from app.Jobs.JobMetrics import job_metrics
+from app.Jobs.JobTypeRegistry import JobPayloadCodec
+from app.Queue.Runners import create_runner, job_timeout, resolve_job
 from config.database import get_database
 
 if TYPE_CHECKING:
@@ -33,6 +41,11 @@ class WorkerOptions:
     timeout: int = 60  # Job timeout in seconds
     rest: int = 0  # Microseconds to rest between jobs
     force: bool = False  # Force worker to run even in maintenance mode
+    prefetch: int = 1  # Jobs reserved per round-trip
+    ack_batch_size: int = 50  # Completed jobs deleted per statement
+    concurrency: int = 1  # Jobs run at once; above 1 uses the runner below
+    runner: str = "thread"  # async, thread or process
+    tries: int = 3  # Attempts for jobs whose payload doesn't set max_attempts
 
 
 class QueueWorker:
@@ -49,6 +62,14 @@ class QueueWorker:
         self.start_time = datetime.utcnow()
         self.logger = logging.getLogger(f"queue.worker.{self.options.name}")
         
+        # Prefetched jobs share one session until the buffer drains
+        self._db: Optional[Session] = None
+        self._reserved: Deque[JobModel] = deque()
+        self._pending_acks: List[JobModel] = []
+        
+        # Monotonic start times of running jobs, for the metrics Horizon scales on
+        self._started: Dict[str, float] = {}
+        
         # Set up signal handlers
         signal.signal(signal.SIGTERM, self._handle_signal)
         signal.signal(signal.SIGINT, self._handle_signal)
@@ -59,6 +80,17 @@ class QueueWorker:
         """Start processing jobs from the queue."""
         self.logger.info(f"Worker {self.options.name} starting on queue: {self.options.queue}")
         
+        driver = self._connection_driver()
+        if driver != "database":
+            self.logger.warning(
+                f"Connection {self.options.connection} uses the {driver} driver; "
+                f"this worker only consumes the database jobs table"
+            )
+        
+        if self.options.concurrency > 1:
+            self._work_concurrently()
+            return
+        
         while not self.should_quit:
             if self.paused:
                 self._sleep(self.options.delay or self.options.sleep)
@@ -92,109 +124,363 @@ class QueueWorker:
                 if self.options.rest > 0:
                     time.sleep(self.options.rest / 1000000)  # Convert microseconds
         
+        self._shutdown_session()
         self.logger.info(f"Worker {self.options.name} stopping after processing {self.jobs_processed} jobs")
     
     def _run_next_job(self) -> bool:
-        """Process the next available job."""
-        db = next(get_database())
+        """Process the next available job, reserving a new batch when the buffer is empty."""
         try:
-            # Import here to avoid circular imports
-            from database.migrations.create_jobs_table import Job as JobModel
-            
-            # Get next available job with priority ordering
-            job_model = (
-                db.query(JobModel)
-                .filter(
-                    JobModel.queue == self.options.queue,
-                    JobModel.is_reserved == False,
-                    JobModel.available_at <= datetime.utcnow()
-                )
-                .order_by(JobModel.priority.desc(), JobModel.available_at.asc())
-                .first()
-            )
+            if not self._reserved:
+                self._flush_acks()
+                self._close_session()
+                
+                self._db = next(get_database())
+                # Prefetched rows must stay loaded across the per-job commits below
+                self._db.expire_on_commit = False
+                limit = max(1, self.options.prefetch)
+                if self.options.max_jobs > 0:
+                    limit = min(limit, self.options.max_jobs - self.jobs_processed)
+                self._reserved.extend(self._reserve_jobs(self._db, limit))
             
-            if not job_model:
+            if not self._reserved:
+                self._close_session()
                 return False
-            
-            # Reserve the job
-            worker_id = f"{self.options.name}_{datetime.utcnow().isoformat()}"
-            job_model.reserve(worker_id)
-            db.commit()
-            
-            try:
-                # Process the job
-                self._process_job(db, job_model)
-                
-                # Job succeeded, delete from queue
-                db.delete(job_model)
-                db.commit()
+        except Exception as e:
+            self.logger.error(f"Error reserving jobs: {str(e)}")
+            self._close_session()
+            return False
+        
+        db = self._db
+        assert db is not None
+        job_model = self._reserved.popleft()
+        
+        error: Optional[BaseException] = None
+        self._job_started(job_model)
+        try:
+            self._process_job(db, job_model)
+        except Exception as e:
+            error = e
+        
+        self._settle_job(db, job_model, error)
+        return True
+    
+    def _work_concurrently(self) -> None:
+        """
+        Run up to ``concurrency`` jobs at once on the configured runner.
+        
+        This thread keeps the database session: it reserves as many jobs as
+        there are free slots and settles each job as its future completes.
+        On SIGTERM/SIGINT it stops reserving and drains in-flight jobs, each
+        bounded by its timeout, before exiting.
+        """
+        runner = create_runner(
+            self.options.runner,
+            self.options.concurrency,
+            self.options.timeout,
+            self.options.memory_limit
+        )
+        in_flight: Dict[Future[None], JobModel] = {}
+        accepting = True
+        queue_empty = False
+        
+        self._db = next(get_database())
+        self._db.expire_on_commit = False
+        db = self._db
+        
+        self.logger.info(
+            f"Running {self.options.concurrency} concurrent jobs with the {self.options.runner} runner"
+        )
+        
+        try:
+            while accepting or in_flight:
+                if accepting and self.should_quit:
+                    self.logger.info(f"Draining {len(in_flight)} in-flight jobs")
+                    accepting = False
+                elif accepting and self._memory_exceeded():
+                    self.logger.warning("Memory limit exceeded, draining and stopping worker")
+                    accepting = False
+                elif accepting and self._time_limit_exceeded():
+                    self.logger.info("Time limit exceeded, draining and stopping worker")
+                    accepting = False
                 
-                self.logger.info(f"Job {job_model.id} completed successfully")
-                return True
+                free = self.options.concurrency - len(in_flight)
+                if self.options.max_jobs > 0:
+                    free = min(free, self.options.max_jobs - self.jobs_processed - len(in_flight))
+                    if accepting and free <= 0 and not in_flight:
+                        self.logger.info("Job limit exceeded, stopping worker")
+                        accepting = False
                 
-            except JobRetryException as e:
-                # Job requested retry
-                self._handle_job_retry(db, job_model, str(e), e.delay)
-                return True
+                if accepting and not self.paused and free > 0:
+                    try:
+                        reserved = self._reserve_jobs(db, free)
+                    except Exception as e:
+                        self.logger.error(f"Error reserving jobs: {str(e)}")
+                        db.rollback()
+                        reserved = []
+                    
+                    queue_empty = not reserved
+                    for job_model in reserved:
+                        self._job_started(job_model)
+                        future = runner.submit(job_model.id, self._job_payload(job_model), job_model.attempts)
+                        in_flight[future] = job_model
                 
-            except JobFailedException as e:
-                # Job failed permanently
-                self._handle_job_failure(db, job_model, str(e))
-                return True
+                if not in_flight:
+                    if accepting:
+                        self._flush_acks()
+                        self._sleep(self.options.delay or self.options.sleep)
+                    continue
                 
-            except Exception as e:
-                # Unexpected exception
-                self._handle_job_exception(db, job_model, e)
-                return True
+                # Poll quickly while there is room and work; otherwise wait for a completion
+                poll = 1.0 if queue_empty or free <= 0 or self.paused else 0.0
+                runner.wait(list(in_flight), poll)
+                runner.enforce_timeouts()
                 
-        except Exception as e:
-            self.logger.error(f"Error processing job: {str(e)}")
-            db.rollback()
-            return False
+                for future in [f for f in in_flight if f.done()]:
+                    job_model = in_flight.pop(future)
+                    self._settle_job(db, job_model, future.exception())
+                    self.jobs_processed += 1
         finally:
-            db.close()
+            self._flush_acks()
+            runner.shutdown()
+            self._close_session()
+        
+        self.logger.info(f"Worker {self.options.name} stopping after processing {self.jobs_processed} jobs")
     
-    def _process_job(self, db: Session, job_model: JobModel) -> None:
-        """Execute a job."""
+    def _connection_driver(self) -> str:
+        """Driver of the configured connection ("default" means the configured default)."""
+        from config.queue import get_connection_config
+        connection = None if self.options.connection == "default" else self.options.connection
+        return str(get_connection_config(connection).get("driver", "database"))
+    
+    def _job_started(self, job_model: JobModel) -> None:
+        """Report a job starting, with how long it waited since it became available."""
+        now = datetime.utcnow()
+        self._started[job_model.id] = time.monotonic()
+        wait_time = max(0.0, (now - job_model.available_at).total_seconds()) if job_model.available_at else None
+        job_metrics.record(job_model.queue, 'started', wait_time=wait_time)
+    
+    def _settle_job(self, db: Session, job_model: JobModel, error: Optional[BaseException]) -> None:
+        """Acknowledge, retry or fail a job that has finished running."""
+        started = self._started.pop(job_model.id, None)
         try:
-            # Parse job payload
-            payload = json.loads(job_model.payload)
-            job_class_path = payload.get("job_class")
-            job_method = payload.get("job_method", "handle")
+            if error is None:
+                processing_time = time.monotonic() - started if started is not None else None
+                job_metrics.record(job_model.queue, 'completed', processing_time=processing_time)
+                
+                # Job succeeded, delete from queue with the next batched ack
+                self._pending_acks.append(job_model)
+                if len(self._pending_acks) >= self.options.ack_batch_size:
+                    self._flush_acks()
+                
+                self.logger.info(f"Job {job_model.id} completed successfully")
+            
+            elif isinstance(error, JobReleaseException):
+                # Job asked to run later (e.g. throttled); doesn't count as an attempt
+                self._handle_job_release(db, job_model, error.delay)
             
-            if not job_class_path:
-                raise ValueError("Job class not specified in payload")
+            elif isinstance(error, JobRetryException):
+                # Job requested retry
+                self._handle_job_retry(db, job_model, str(error), error.delay)
             
-            # Import job class dynamically
-            module_path, class_name = job_class_path.rsplit(".", 1)
-            module = importlib.import_module(module_path)
-            job_class = getattr(module, class_name)
+            elif isinstance(error, JobFailedException):
+                # Job failed permanently
+                self._handle_job_failure(db, job_model, str(error))
             
-            # Deserialize job instance
-            job_instance = job_class.deserialize(payload)
-            job_instance.job_id = job_model.id
-            job_instance.attempts = job_model.attempts
+            else:
+                # Unexpected exception, including timeouts
+                self._handle_job_exception(db, job_model, error)
+        
+        except Exception as handler_error:
+            self.logger.error(f"Error processing job: {str(handler_error)}")
+            db.rollback()
+    
+    def _reserve_jobs(self, db: Session, limit: int) -> List[JobModel]:
+        """
+        Atomically claim up to ``limit`` available jobs for this worker.
+        
+        Candidates are selected with ``FOR UPDATE SKIP LOCKED`` so concurrent
+        workers on PostgreSQL/MySQL skip each other's rows instead of blocking.
+        The claim itself is a conditional UPDATE (``is_reserved = false``)
+        stamped with a unique token, which is also what makes it safe on
+        SQLite, where ``FOR UPDATE`` is not compiled and writers are
+        serialized: a row already taken by another worker simply doesn't match.
+        """
+        from database.migrations.create_jobs_table import Job as JobModel
+        
+        now = datetime.utcnow()
+        claim_token = f"{self.options.name}:{uuid.uuid4().hex}"
+        
+        candidates = (
+            select(JobModel.id)
+            .where(
+                JobModel.queue == self.options.queue,
+                JobModel.is_reserved == False,
+                JobModel.available_at <= now
+            )
+            .order_by(JobModel.priority.desc(), JobModel.available_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        
+        if db.get_bind().dialect.update_returning:
+            # One statement: UPDATE ... WHERE id IN (SELECT ... SKIP LOCKED) RETURNING id
+            claimed_ids = list(db.scalars(
+                update(JobModel)
+                .where(JobModel.id.in_(candidates.scalar_subquery()), JobModel.is_reserved == False)
+                .values(
+                    is_reserved=True,
+                    reserved_at=now,
+                    worker_id=claim_token,
+                    attempts=JobModel.attempts + 1
+                )
+                .returning(JobModel.id)
+                .execution_options(synchronize_session=False)
+            ))
+        else:
+            # MySQL can't UPDATE from a LIMITed subquery on the same table
+            candidate_ids = list(db.scalars(candidates))
+            if candidate_ids:
+                db.execute(
+                    update(JobModel)
+                    .where(JobModel.id.in_(candidate_ids), JobModel.is_reserved == False)
+                    .values(
+                        is_reserved=True,
+                        reserved_at=now,
+                        worker_id=claim_token,
+                        attempts=JobModel.attempts + 1
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            claimed_ids = candidate_ids
+        
+        db.commit()
+        if not claimed_ids:
+            return []
+        
+        return list(db.scalars(
+            select(JobModel)
+            .where(JobModel.id.in_(claimed_ids), JobModel.worker_id == claim_token)
+            .order_by(JobModel.priority.desc(), JobModel.available_at.asc())
+            .execution_options(populate_existing=True)
+        ))
+    
+    def _flush_acks(self) -> None:
+        """Delete completed jobs in a single statement."""
+        if not self._pending_acks or self._db is None:
+            return
+        
+        from database.migrations.create_jobs_table import Job as JobModel
+        
+        acked, self._pending_acks = self._pending_acks, []
+        ids = [job.id for job in acked]
+        try:
+            self._db.execute(
+                delete(JobModel)
+                .where(JobModel.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            self._db.commit()
+            for job in acked:
+                self._db.expunge(job)
+        except Exception as e:
+            # Unacked jobs stay reserved and are picked up again by release_reserved_jobs
+            self.logger.error(f"Error acknowledging {len(ids)} jobs: {str(e)}")
+            self._db.rollback()
+    
+    def _release_prefetched(self) -> None:
+        """Hand reserved-but-unstarted jobs back to the queue."""
+        if not self._reserved or self._db is None:
+            return
+        
+        from database.migrations.create_jobs_table import Job as JobModel
+        
+        ids = [job.id for job in self._reserved]
+        self._reserved.clear()
+        try:
+            self._db.execute(
+                update(JobModel)
+                .where(JobModel.id.in_(ids))
+                .values(
+                    is_reserved=False,
+                    reserved_at=None,
+                    worker_id=None,
+                    attempts=JobModel.attempts - 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self._db.commit()
+        except Exception as e:
+            self.logger.error(f"Error releasing {len(ids)} prefetched jobs: {str(e)}")
+            self._db.rollback()
+    
+    def _close_session(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def _shutdown_session(self) -> None:
+        """Flush pending acks, release prefetched jobs and close the session."""
+        self._flush_acks()
+        self._release_prefetched()
+        self._close_session()
+    
+    def _process_job(self, db: Session, job_model: JobModel) -> None:
+        """Execute a job."""
+        try:
+            # Parse job payload and deserialize job instance
+            payload = self._job_payload(job_model)
+            job_instance, method = resolve_job(payload, job_model.id, job_model.attempts)
             
             # Execute job with timeout
             start_time = datetime.utcnow()
-            self.logger.info(f"Processing job {job_model.id}: {job_class_path}")
+            self.logger.info(f"Processing job {job_model.id}: {payload.get('job_class')}")
             
             # Call the job method
-            method = getattr(job_instance, job_method)
-            result = method()
+            with self._timeout_alarm(job_model.id, job_timeout(payload, self.options.timeout)):
+                result = method()
             
             execution_time = (datetime.utcnow() - start_time).total_seconds()
             self.logger.info(f"Job {job_model.id} completed in {execution_time:.2f}s")
             
             return result  # type: ignore[no-any-return]
-            
+        
         except Exception as e:
             self.logger.error(f"Error executing job {job_model.id}: {str(e)}")
             raise
     
+    def _job_payload(self, job_model: JobModel) -> Dict[str, Any]:
+        """Decoded payload, with the batch_id column carried alongside."""
+        payload = JobPayloadCodec.decode(job_model.payload)
+        if job_model.batch_id:
+            payload["batch_id"] = job_model.batch_id
+        return payload
+    
+    @contextmanager
+    def _timeout_alarm(self, job_id: str, timeout: Optional[float]) -> Iterator[None]:
+        """Raise JobTimeoutException in the job if it runs past ``timeout`` (SIGALRM, main thread only)."""
+        if (not timeout or not hasattr(signal, 'SIGALRM')
+                or threading.current_thread() is not threading.main_thread()):
+            yield
+            return
+        
+        def on_alarm(signum: int, frame: Any) -> None:
+            raise JobTimeoutException(f"Job {job_id} timed out after {timeout:g}s")
+        
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    
     def _handle_job_retry(self, db: Session, job_model: JobModel, error: str, delay: int = 0) -> None:
         """Handle job retry."""
-        max_attempts = 3  # Default, should come from job options
+        try:
+            options = JobPayloadCodec.decode(job_model.payload).get("options") or {}
+        except Exception:
+            options = {}
+        max_attempts = int(options.get("max_attempts") or self.options.tries)
         
         if job_model.attempts >= max_attempts:
             self._handle_job_failure(db, job_model, f"Max attempts exceeded. Last error: {error}")
@@ -207,9 +493,18 @@ class QueueWorker:
         # Release job back to queue with delay
         job_model.release(delay)
         db.commit()
+        job_metrics.record(job_model.queue, 'retried')
         
         self.logger.warning(f"Job {job_model.id} will retry in {delay}s. Attempt {job_model.attempts}/{max_attempts}")
     
+    def _handle_job_release(self, db: Session, job_model: JobModel, delay: int) -> None:
+        """Put a job back on the queue after ``delay`` seconds, giving back its attempt."""
+        job_model.release(delay)
+        job_model.attempts = max(job_model.attempts - 1, 0)
+        db.commit()
+        
+        self.logger.info(f"Job {job_model.id} released for {delay}s")
+    
     def _handle_job_failure(self, db: Session, job_model: JobModel, error: str) -> None:
         """Move job to failed jobs table."""
         from database.migrations.create_failed_jobs_table import FailedJob
@@ -228,19 +523,22 @@ class QueueWorker:
             context=json.dumps({
                 "worker": self.options.name,
                 "failed_at": datetime.utcnow().isoformat(),
-                "priority": job_model.priority
+                "priority": job_model.priority,
+                "batch_id": job_model.batch_id
             })
         )
         
         db.add(failed_job)
         db.delete(job_model)
         db.commit()
+        job_metrics.record(job_model.queue, 'failed')
         
         self.logger.error(f"Job {job_model.id} failed permanently: {error}")
     
-    def _handle_job_exception(self, db: Session, job_model: JobModel, exception: Exception) -> None:
+    def _handle_job_exception(self, db: Session, job_model: JobModel, exception: BaseException) -> None:
         """Handle unexpected job exception."""
-        error_message = f"{exception.__class__.__name__}: {str(exception)}\n{traceback.format_exc()}"
+        formatted = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+        error_message = f"{exception.__class__.__name__}: {str(exception)}\n{formatted}"
         
         # Treat as retry unless it's a specific failure
         self._handle_job_retry(db, job_model, error_message)
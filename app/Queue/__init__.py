@@ -1,6 +1,21 @@
 from .Worker import QueueWorker, WorkerOptions
+from .Runners import JobRunner, AsyncJobRunner, ThreadJobRunner, ProcessJobRunner, create_runner
+from .FailedJobs import FailedJobGroup, RetryProgress, RequeuePacer, exception_fingerprint
+from .Outbox import Outbox, OutboxRelay, outbox
 
 __all__ = [
     "QueueWorker",
-    "WorkerOptions"
-]
\ No newline at end of file
+    "WorkerOptions",
+    "JobRunner",
+    "AsyncJobRunner",
+    "ThreadJobRunner",
+    "ProcessJobRunner",
+    "create_runner",
+    "FailedJobGroup",
+    "RetryProgress",
+    "RequeuePacer",
+    "exception_fingerprint",
+    "Outbox",
+    "OutboxRelay",
+    "outbox"
+]
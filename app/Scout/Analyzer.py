@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Union
+
+
+ENGLISH_STOP_WORDS: FrozenSet[str] = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in',
+    'into', 'is', 'it', 'no', 'not', 'of', 'on', 'or', 'such', 'that', 'the',
+    'their', 'then', 'there', 'these', 'they', 'this', 'to', 'was', 'will', 'with',
+})
+
+
+class Analyzer:
+    """
+    Turns field values into index terms, similar to an Elasticsearch analyzer.
+    
+    Text is split into unicode word tokens, lowercased, optionally stripped
+    of accents, and filtered by length and stop words. Queries must go
+    through the same analyzer as the documents they search.
+    """
+    
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+    
+    def __init__(
+        self,
+        lowercase: bool = True,
+        ascii_folding: bool = False,
+        stop_words: Optional[Iterable[str]] = None,
+        min_length: int = 1,
+        max_length: int = 255
+    ) -> None:
+        self.lowercase = lowercase
+        self.ascii_folding = ascii_folding
+        self.stop_words: FrozenSet[str] = frozenset(stop_words or ())
+        self.min_length = min_length
+        self.max_length = max_length
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Split a piece of text into terms.
+        
+        Args:
+            text: Text to analyze
+        
+        Returns:
+            Terms in the order they appear, duplicates included
+        """
+        if self.lowercase:
+            text = text.lower()
+        if self.ascii_folding:
+            text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+        
+        terms = self.TOKEN_PATTERN.findall(text)
+        if self.stop_words or self.min_length > 1:
+            return [
+                term for term in terms
+                if self.min_length <= len(term) <= self.max_length and term not in self.stop_words
+            ]
+        return [term for term in terms if len(term) <= self.max_length]
+    
+    def analyze(self, value: Any) -> List[str]:
+        """
+        Terms for a field value of any searchable type.
+        
+        Strings are tokenized, numbers and booleans become a single term,
+        and lists and dicts contribute the terms of everything inside them.
+        """
+        if isinstance(value, str):
+            return self.tokenize(value)
+        if isinstance(value, (bool, int, float)):
+            return self.tokenize(str(value))
+        
+        terms: List[str] = []
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                terms.extend(self.analyze(item))
+        elif isinstance(value, dict):
+            for item in value.values():
+                terms.extend(self.analyze(item))
+        return terms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Analyzer settings, for storing alongside an index."""
+        return {
+            'lowercase': self.lowercase,
+            'ascii_folding': self.ascii_folding,
+            'stop_words': sorted(self.stop_words),
+            'min_length': self.min_length,
+            'max_length': self.max_length,
+        }
+
+
+# Built-in analyzers, selectable by name in SearchableConfig.analyzer
+ANALYZERS: Dict[str, Analyzer] = {
+    'standard': Analyzer(),
+    'folding': Analyzer(ascii_folding=True),
+    'english': Analyzer(ascii_folding=True, stop_words=ENGLISH_STOP_WORDS),
+}
+
+
+def get_analyzer(analyzer: Union[str, Analyzer, None] = None) -> Analyzer:
+    """
+    Resolve an analyzer by name, passing instances through.
+    
+    Args:
+        analyzer: Analyzer name, instance, or None for ``standard``
+    
+    Returns:
+        The Analyzer to use
+    """
+    if isinstance(analyzer, Analyzer):
+        return analyzer
+    
+    name = analyzer or 'standard'
+    if name not in ANALYZERS:
+        raise ValueError(f"Unknown analyzer: {name}")
+    return ANALYZERS[name]
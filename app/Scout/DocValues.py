@@ -0,0 +1,594 @@
+from __future__ import annotations
+
+import math
+from array import array
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Placeholder for a field a document doesn't have
+MISSING: Any = type('Missing', (), {'__repr__': lambda self: 'MISSING'})()
+
+# Positions of the set bits of every byte value
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+# Fixed-length date histogram intervals, in seconds
+_FIXED_INTERVALS = {
+    'second': 1, '1s': 1,
+    'minute': 60, '1m': 60,
+    'hour': 3600, '1h': 3600,
+    'day': 86400, '1d': 86400,
+    'week': 604800, '1w': 604800,
+}
+_CALENDAR_MONTHS = {'month': 1, '1M': 1, 'quarter': 3, '1q': 3, 'year': 12, '1y': 12}
+
+# 1970-01-01 was a Thursday; weeks start on Monday
+_WEEK_OFFSET = 3 * 86400
+
+
+class Bitmap:
+    """
+    A set of document ordinals stored as the bits of an integer.
+    
+    Intersections, unions and differences are single integer operations
+    done in C, whatever the number of documents.
+    """
+    
+    __slots__ = ('bits', '_bytes')
+    
+    def __init__(self, bits: int = 0) -> None:
+        self.bits = bits
+        self._bytes: Optional[bytes] = None
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Bitmap:
+        return cls(int.from_bytes(data, 'little'))
+    
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> Bitmap:
+        data = bytearray()
+        for ordinal in ordinals:
+            index = ordinal >> 3
+            if index >= len(data):
+                data.extend(bytes(index - len(data) + 1))
+            data[index] |= 1 << (ordinal & 7)
+        return cls.from_bytes(data)
+    
+    def __and__(self, other: Bitmap) -> Bitmap:
+        return Bitmap(self.bits & other.bits)
+    
+    def __or__(self, other: Bitmap) -> Bitmap:
+        return Bitmap(self.bits | other.bits)
+    
+    def __sub__(self, other: Bitmap) -> Bitmap:
+        return Bitmap(self.bits & ~other.bits)
+    
+    def __bool__(self) -> bool:
+        return self.bits != 0
+    
+    def __len__(self) -> int:
+        return bin(self.bits).count('1')
+    
+    def __contains__(self, ordinal: int) -> bool:
+        data = self.to_bytes()
+        index = ordinal >> 3
+        return index < len(data) and bool(data[index] >> (ordinal & 7) & 1)
+    
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self.to_bytes()):
+            if byte:
+                base = index << 3
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+    
+    def to_bytes(self, size: int = 0) -> bytes:
+        """Little-endian bytes of the bitmap, padded to at least ``size``."""
+        if self._bytes is None or len(self._bytes) < size:
+            length = max(size, (self.bits.bit_length() + 7) // 8)
+            self._bytes = self.bits.to_bytes(length, 'little')
+        return self._bytes
+
+
+class DocValues:
+    """
+    Column-oriented per-document values for filtering and aggregating.
+    
+    Documents get small integer ordinals (reused after removal) and each
+    field is a column indexed by ordinal, so a filter or aggregation reads
+    one list instead of a dict per document. Fields with at most
+    ``max_cardinality`` distinct hashable values also keep a bitmap per
+    value; ``where``, ``where_in`` and ``where_not_in`` on those fields are
+    answered with bitmap operations before anything is scored. Other fields
+    are filtered with a pass over their column. A field that grows past the
+    limit drops its bitmaps for good.
+    
+    The source data of every document is kept too, so callers can re-read
+    what they indexed.
+    """
+    
+    def __init__(self, max_cardinality: int = 1024) -> None:
+        self.max_cardinality = max_cardinality
+        
+        self._ordinals: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._sources: List[Optional[Dict[str, Any]]] = []
+        self._free: List[int] = []
+        self._live = bytearray()
+        
+        self._columns: Dict[str, List[Any]] = {}
+        # {field: {value: bitmap}} and {field: {value: documents}}, low-cardinality fields only
+        self._bitmaps: Dict[str, Dict[Any, bytearray]] = {}
+        self._counts: Dict[str, Dict[Any, int]] = {}
+        self._high_cardinality: Set[str] = set()
+        # Columns of epoch seconds, built for date histograms on first use
+        self._dates: Dict[str, array] = {}
+    
+    def __len__(self) -> int:
+        return len(self._ordinals)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._ordinals
+    
+    @property
+    def slots(self) -> int:
+        """Number of ordinals allocated, live or free."""
+        return len(self._keys)
+    
+    def add(self, key: str, data: Dict[str, Any]) -> int:
+        """
+        Store a document's values, replacing any earlier version.
+        
+        Args:
+            key: Document key
+            data: Field values
+        
+        Returns:
+            The document's ordinal
+        """
+        ordinal = self._ordinals.get(key)
+        if ordinal is not None:
+            self._clear_values(ordinal)
+        else:
+            ordinal = self._allocate(key)
+        
+        self._sources[ordinal] = data
+        for field, value in data.items():
+            column = self._columns.get(field)
+            if column is None:
+                column = self._columns[field] = [MISSING] * len(self._keys)
+            column[ordinal] = value
+            
+            if field not in self._high_cardinality:
+                self._add_to_bitmap(field, value, ordinal)
+            if field in self._dates:
+                self._dates[field][ordinal] = _epoch_seconds(value)
+        
+        return ordinal
+    
+    def remove(self, key: str) -> Optional[int]:
+        """Remove a document; returns the ordinal it had, or None."""
+        ordinal = self._ordinals.pop(key, None)
+        if ordinal is None:
+            return None
+        
+        self._clear_values(ordinal)
+        self._keys[ordinal] = None
+        self._sources[ordinal] = None
+        self._live[ordinal >> 3] &= ~(1 << (ordinal & 7))
+        self._free.append(ordinal)
+        return ordinal
+    
+    def clear(self) -> None:
+        """Remove every document."""
+        self._ordinals.clear()
+        self._keys.clear()
+        self._sources.clear()
+        self._free.clear()
+        self._live = bytearray()
+        self._columns.clear()
+        self._bitmaps.clear()
+        self._counts.clear()
+        self._high_cardinality.clear()
+        self._dates.clear()
+    
+    def ordinal(self, key: str) -> Optional[int]:
+        """Ordinal of a stored document, or None."""
+        return self._ordinals.get(key)
+    
+    def key(self, ordinal: int) -> Optional[str]:
+        """Key of the document at an ordinal, or None if the slot is free."""
+        return self._keys[ordinal]
+    
+    def source(self, ordinal: int) -> Optional[Dict[str, Any]]:
+        """Data the document at an ordinal was stored with."""
+        return self._sources[ordinal]
+    
+    def ordinals(self) -> Iterator[int]:
+        """Ordinals of every stored document."""
+        return iter(self._ordinals.values())
+    
+    def all(self) -> Bitmap:
+        """Bitmap of every stored document."""
+        return Bitmap.from_bytes(self._live)
+    
+    def value(self, field: str, ordinal: int, default: Any = None) -> Any:
+        """A document's value for a field."""
+        column = self._columns.get(field)
+        if column is None or column[ordinal] is MISSING:
+            return default
+        return column[ordinal]
+    
+    def has_bitmaps(self, field: str) -> bool:
+        """Whether filters on ``field`` are answered from bitmaps."""
+        return field in self._bitmaps
+    
+    # Filters
+    
+    def filter(self, params: Dict[str, Any]) -> Optional[Bitmap]:
+        """
+        Documents matching the where, where in and where not in constraints.
+        
+        A document matches ``where`` and ``where_in`` only if it has the
+        field, and matches ``where_not_in`` if it lacks the field.
+        
+        Args:
+            params: Search parameters
+        
+        Returns:
+            Bitmap of matching ordinals, or None if there are no constraints
+        """
+        mask: Optional[Bitmap] = None
+        
+        for where in params.get('wheres', []):
+            matches = self._matching(where['field'], [where['value']])
+            mask = matches if mask is None else mask & matches
+        
+        for where_in in params.get('where_ins', []):
+            matches = self._matching(where_in['field'], where_in['values'])
+            mask = matches if mask is None else mask & matches
+        
+        for where_not_in in params.get('where_not_ins', []):
+            matches = self._matching(where_not_in['field'], where_not_in['values'])
+            mask = (self.all() if mask is None else mask) - matches
+        
+        return mask
+    
+    def _matching(self, field: str, values: List[Any]) -> Bitmap:
+        """Documents whose value for ``field`` equals one of ``values``."""
+        bitmaps = self._bitmaps.get(field)
+        if bitmaps is not None and all(_hashable(value) for value in values):
+            matches = Bitmap()
+            for value in values:
+                bitmap = bitmaps.get(value)
+                if bitmap is not None:
+                    matches = matches | Bitmap.from_bytes(bitmap)
+            return matches
+        
+        column = self._columns.get(field)
+        if column is None:
+            return Bitmap()
+        
+        if len(values) == 1:
+            wanted = values[0]
+            return Bitmap.from_ordinals(
+                ordinal for ordinal, value in enumerate(column)
+                if value is not MISSING and value == wanted
+            )
+        
+        candidates: Any = set(values) if all(_hashable(value) for value in values) else values
+        return Bitmap.from_ordinals(
+            ordinal for ordinal, value in enumerate(column)
+            if value is not MISSING and _safe_in(value, candidates)
+        )
+    
+    # Aggregations
+    
+    def aggregate(self, aggregations: Dict[str, Dict[str, Any]], matches: Bitmap) -> Dict[str, Any]:
+        """
+        Compute aggregations over the matching documents.
+        
+        Supports ``terms`` (``field``, ``size``) and ``date_histogram``
+        (``field``, ``calendar_interval`` or ``fixed_interval``), returning
+        Elasticsearch-style bucket lists.
+        
+        Args:
+            aggregations: Aggregation definitions by name
+            matches: Documents to aggregate over
+        
+        Returns:
+            Results by aggregation name
+        """
+        return aggregate([(self, matches)], aggregations)
+    
+    def terms(self, field: str, matches: Bitmap, size: int = 10) -> Dict[str, Any]:
+        """Most frequent values of a field among the matching documents."""
+        return terms_result(self.term_counts(field, matches), size)
+    
+    def date_histogram(self, field: str, interval: str, matches: Bitmap) -> Dict[str, Any]:
+        """Count the matching documents per calendar or fixed interval."""
+        return histogram_result(self.histogram_counts(field, interval, matches))
+    
+    def term_counts(self, field: str, matches: Bitmap) -> Dict[Any, int]:
+        """Number of matching documents per value of a field."""
+        counts: Dict[Any, int] = {}
+        bitmaps = self._bitmaps.get(field)
+        match_count = len(matches)
+        
+        # One AND per value beats visiting each match once there are many
+        # more matches than values
+        if bitmaps is not None and len(bitmaps) * self.slots < match_count * 800:
+            for value, bitmap in bitmaps.items():
+                count = len(Bitmap.from_bytes(bitmap) & matches)
+                if count:
+                    counts[value] = count
+        else:
+            column = self._columns.get(field, [])
+            for ordinal in matches:
+                value = column[ordinal] if ordinal < len(column) else MISSING
+                if value is MISSING:
+                    continue
+                for item in (value if isinstance(value, list) else (value,)):
+                    if _hashable(item):
+                        counts[item] = counts.get(item, 0) + 1
+        return counts
+    
+    def histogram_counts(self, field: str, interval: str, matches: Bitmap) -> Dict[float, int]:
+        """
+        Number of matching documents per interval, keyed by interval start.
+        
+        Values may be datetimes, dates, ISO 8601 strings or epoch seconds
+        (milliseconds above 1e11). Naive datetimes are taken as UTC. The
+        field is converted to a column of epoch seconds once and kept up to
+        date afterwards; with NumPy installed, bucketing is vectorized.
+        """
+        if interval not in _FIXED_INTERVALS and interval not in _CALENDAR_MONTHS:
+            raise ValueError(f"Unsupported date histogram interval: {interval}")
+        
+        seconds = self._date_column(field)
+        ordinals = [ordinal for ordinal in matches if ordinal < len(seconds)]
+        
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        
+        if numpy is not None:
+            return _numpy_buckets(numpy, seconds, ordinals, interval)
+        
+        counts: Dict[float, int] = {}
+        for ordinal in ordinals:
+            value = seconds[ordinal]
+            if value == value:  # not NaN
+                key = _bucket_start(value, interval)
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    # Internals
+    
+    def _allocate(self, key: str) -> int:
+        if self._free:
+            ordinal = self._free.pop()
+            self._keys[ordinal] = key
+        else:
+            ordinal = len(self._keys)
+            self._keys.append(key)
+            self._sources.append(None)
+            for column in self._columns.values():
+                column.append(MISSING)
+            for seconds in self._dates.values():
+                seconds.append(math.nan)
+            if ordinal >> 3 >= len(self._live):
+                self._live.append(0)
+        
+        self._ordinals[key] = ordinal
+        self._live[ordinal >> 3] |= 1 << (ordinal & 7)
+        return ordinal
+    
+    def _clear_values(self, ordinal: int) -> None:
+        """Take a document's values out of the columns and bitmaps."""
+        data = self._sources[ordinal]
+        if data is None:
+            return
+        
+        for field in data:
+            column = self._columns.get(field)
+            if column is None:
+                continue
+            
+            value = column[ordinal]
+            column[ordinal] = MISSING
+            if field in self._bitmaps:
+                self._remove_from_bitmap(field, value, ordinal)
+            if field in self._dates:
+                self._dates[field][ordinal] = math.nan
+    
+    def _add_to_bitmap(self, field: str, value: Any, ordinal: int) -> None:
+        if not _hashable(value):
+            self._drop_bitmaps(field)
+            return
+        
+        bitmaps = self._bitmaps.setdefault(field, {})
+        counts = self._counts.setdefault(field, {})
+        bitmap = bitmaps.get(value)
+        if bitmap is None:
+            if len(bitmaps) >= self.max_cardinality:
+                self._drop_bitmaps(field)
+                return
+            bitmap = bitmaps[value] = bytearray()
+            counts[value] = 0
+        
+        index = ordinal >> 3
+        if index >= len(bitmap):
+            bitmap.extend(bytes(index - len(bitmap) + 1))
+        bitmap[index] |= 1 << (ordinal & 7)
+        counts[value] += 1
+    
+    def _remove_from_bitmap(self, field: str, value: Any, ordinal: int) -> None:
+        bitmap = self._bitmaps[field].get(value)
+        if bitmap is None:
+            return
+        
+        bitmap[ordinal >> 3] &= ~(1 << (ordinal & 7))
+        counts = self._counts[field]
+        counts[value] -= 1
+        if not counts[value]:
+            del counts[value], self._bitmaps[field][value]
+    
+    def _drop_bitmaps(self, field: str) -> None:
+        self._high_cardinality.add(field)
+        self._bitmaps.pop(field, None)
+        self._counts.pop(field, None)
+    
+    def _date_column(self, field: str) -> array:
+        seconds = self._dates.get(field)
+        if seconds is None:
+            column = self._columns.get(field, [])
+            seconds = array('d', (math.nan if value is MISSING else _epoch_seconds(value) for value in column))
+            seconds.extend([math.nan] * (self.slots - len(seconds)))
+            self._dates[field] = seconds
+        return seconds
+
+
+def aggregate(parts: Iterable[Tuple[DocValues, Bitmap]], aggregations: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compute aggregations over documents spread across several DocValues.
+    
+    Counts from each part are added up before the buckets are built, so
+    an index split into segments aggregates like a single one.
+    
+    Args:
+        parts: Each DocValues with the bitmap of its matching documents
+        aggregations: Aggregation definitions by name
+    
+    Returns:
+        Results by aggregation name
+    """
+    parts = list(parts)
+    results: Dict[str, Any] = {}
+    for name, definition in aggregations.items():
+        counts: Dict[Any, int] = {}
+        if 'terms' in definition:
+            terms = definition['terms']
+            for doc_values, matches in parts:
+                for value, count in doc_values.term_counts(terms['field'], matches).items():
+                    counts[value] = counts.get(value, 0) + count
+            results[name] = terms_result(counts, terms.get('size', 10))
+        elif 'date_histogram' in definition:
+            histogram = definition['date_histogram']
+            interval = histogram.get('calendar_interval') or histogram.get('fixed_interval') or histogram.get('interval')
+            for doc_values, matches in parts:
+                for key, count in doc_values.histogram_counts(histogram['field'], interval, matches).items():
+                    counts[key] = counts.get(key, 0) + count
+            results[name] = histogram_result(counts)
+        else:
+            raise ValueError(f"Unsupported aggregation: {name}")
+    return results
+
+
+def terms_result(counts: Dict[Any, int], size: int = 10) -> Dict[str, Any]:
+    """Elasticsearch ``terms`` aggregation result for value counts."""
+    buckets = sorted(counts.items(), key=lambda bucket: (-bucket[1], str(bucket[0])))
+    return {
+        'doc_count_error_upper_bound': 0,
+        'sum_other_doc_count': sum(count for _, count in buckets[size:]),
+        'buckets': [{'key': value, 'doc_count': count} for value, count in buckets[:size]],
+    }
+
+
+def histogram_result(counts: Dict[float, int]) -> Dict[str, Any]:
+    """Elasticsearch ``date_histogram`` result for counts by interval start."""
+    return {
+        'buckets': [
+            {
+                'key_as_string': datetime.fromtimestamp(key, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'key': int(key * 1000),
+                'doc_count': count,
+            }
+            for key, count in sorted(counts.items())
+        ]
+    }
+
+
+def count_by_interval(values: Iterable[Any], interval: str) -> Dict[float, int]:
+    """
+    Number of date-like values per interval, keyed by interval start.
+    
+    For values streamed from elsewhere (such as a database cursor) rather
+    than held in a DocValues column. Values that aren't dates are skipped.
+    """
+    if interval not in _FIXED_INTERVALS and interval not in _CALENDAR_MONTHS:
+        raise ValueError(f"Unsupported date histogram interval: {interval}")
+    
+    counts: Dict[float, int] = {}
+    for value in values:
+        seconds = _epoch_seconds(value)
+        if seconds == seconds:  # not NaN
+            key = _bucket_start(seconds, interval)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _safe_in(value: Any, candidates: Any) -> bool:
+    try:
+        return value in candidates
+    except TypeError:
+        return False
+
+
+def _epoch_seconds(value: Any) -> float:
+    """Epoch seconds of a date-like value, or NaN."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp()
+    if isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return value / 1000 if abs(value) > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return _epoch_seconds(datetime.fromisoformat(value.replace('Z', '+00:00')))
+        except ValueError:
+            return math.nan
+    return math.nan
+
+
+def _bucket_start(seconds: float, interval: str) -> float:
+    """Start of the interval containing ``seconds``, in epoch seconds."""
+    if interval in _FIXED_INTERVALS:
+        width = _FIXED_INTERVALS[interval]
+        offset = _WEEK_OFFSET if width == 604800 else 0
+        return math.floor((seconds + offset) / width) * width - offset
+    
+    step = _CALENDAR_MONTHS[interval]
+    moment = datetime.fromtimestamp(seconds, timezone.utc)
+    month = (moment.month - 1) // step * step + 1
+    return datetime(moment.year, month, 1, tzinfo=timezone.utc).timestamp()
+
+
+def _numpy_buckets(numpy: Any, seconds: array, ordinals: List[int], interval: str) -> Dict[float, int]:
+    """Bucket counts computed with NumPy array operations."""
+    values = numpy.frombuffer(seconds, dtype=numpy.float64)[numpy.asarray(ordinals, dtype=numpy.int64)]
+    values = values[~numpy.isnan(values)]
+    
+    if interval in _FIXED_INTERVALS:
+        width = _FIXED_INTERVALS[interval]
+        offset = _WEEK_OFFSET if width == 604800 else 0
+        keys = numpy.floor((values + offset) / width) * width - offset
+    else:
+        step = _CALENDAR_MONTHS[interval]
+        months = numpy.floor(values).astype(numpy.int64).astype('datetime64[s]').astype('datetime64[M]').astype(numpy.int64)
+        months = months // step * step
+        keys = months.astype('datetime64[M]').astype('datetime64[s]').astype(numpy.int64).astype(numpy.float64)
+    
+    unique, counts = numpy.unique(keys, return_counts=True)
+    return {float(key): int(count) for key, count in zip(unique, counts)}
@@ -1,121 +1,128 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import re
-from typing import Dict, Any, List, Optional, Type
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple, Type, TypeVar, TYPE_CHECKING
 from ..ScoutManager import SearchEngine
 from ..Searchable import Searchable, SearchResults, SearchResult
+from ..DocValues import count_by_interval, histogram_result, terms_result
+from ..TermDictionary import fuzzy_edits
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine
+
+T = TypeVar('T')
 
 
 class DatabaseEngine(SearchEngine):
     """
-    Database-based search engine for Laravel Scout.
+    Database-backed search engine for Laravel Scout.
+    
+    Each index is a table of documents (key, JSON data, indexed_at) and
+    full-text search runs inside the database: an FTS5 table ranked with
+    bm25() on SQLite, or a tsvector column with a GIN index ranked with
+    ts_rank on PostgreSQL. Filters, ordering, pagination and terms
+    aggregations are compiled into SQL and highlights come from snippet() or
+    ts_headline, so only the requested page is loaded and the process holds
+    no index of its own. Models are rebuilt from their stored data with
+    ``from_searchable_array``. Queries run in a worker thread, so they never
+    block the event loop.
     
-    Provides basic full-text search using database LIKE queries.
-    Good for development and simple search requirements.
+    ``fuzziness`` is approximated with prefix matching: a query term that
+    ``fuzzy_edits`` allows any edits matches every indexed term starting
+    with it, but typos are not corrected. Edit-distance expansion needs the
+    whole term vocabulary, which the MemoryEngine keeps in a TermDictionary
+    and this engine would have to scan for every query.
     """
     
-    def __init__(self) -> None:
-        self.indexed_data: Dict[str, Dict[str, Any]] = {}  # Simple in-memory storage
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        table_prefix: str = 'scout_',
+        text_search_config: str = 'simple'
+    ) -> None:
+        self._engine = engine
+        self.table_prefix = table_prefix
+        self.text_search_config = text_search_config  # PostgreSQL only
+        self.tables: Dict[str, _FullTextTable] = {}
+    
+    @property
+    def engine(self) -> Engine:
+        """SQLAlchemy engine, the application's database unless one was given."""
+        if self._engine is None:
+            from config.database import engine
+            self._engine = engine
+        return self._engine
     
     async def update(self, models: List[Searchable]) -> bool:
         """Add or update models in the search index."""
         try:
+            batches: Dict[str, Tuple[Type[Searchable], List[Tuple[str, Dict[str, Any]]]]] = {}
             for model in models:
-                index_name = model.searchable_as()
-                model_key = str(model.get_scout_key())
-                
-                if index_name not in self.indexed_data:
-                    self.indexed_data[index_name] = {}
-                
-                # Store the searchable data
-                self.indexed_data[index_name][model_key] = {
-                    'model': model,
-                    'data': model.to_searchable_array(),
-                    'searchable_text': self._create_searchable_text(model.to_searchable_array())
-                }
+                _, documents = batches.setdefault(model.searchable_as(), (type(model), []))
+                documents.append((str(model.get_scout_key()), model.to_searchable_array()))
+            
+            # One transaction keeps documents and their full-text rows in step
+            def upsert(connection: Connection) -> None:
+                for index_name, (model_class, documents) in batches.items():
+                    self._table(connection, index_name, model_class).upsert(connection, documents)
             
+            await self._transaction(upsert)
             return True
         except Exception:
+            # A rolled back transaction may have undone tables or columns we cached
+            self.tables.clear()
             return False
     
     async def delete(self, models: List[Searchable]) -> bool:
         """Remove models from the search index."""
         try:
+            batches: Dict[str, Tuple[Type[Searchable], List[str]]] = {}
             for model in models:
-                index_name = model.searchable_as()
-                model_key = str(model.get_scout_key())
-                
-                if index_name in self.indexed_data and model_key in self.indexed_data[index_name]:
-                    del self.indexed_data[index_name][model_key]
+                _, keys = batches.setdefault(model.searchable_as(), (type(model), []))
+                keys.append(str(model.get_scout_key()))
             
+            def delete(connection: Connection) -> None:
+                for index_name, (model_class, keys) in batches.items():
+                    self._table(connection, index_name, model_class).delete(connection, keys)
+            
+            await self._transaction(delete)
             return True
         except Exception:
             return False
     
     async def search(self, model: Type[Searchable], params: Dict[str, Any]) -> SearchResults:
         """Perform a search query."""
+        start_time = time.time()
         index_name = model().searchable_as()
-        query = params.get('query', '')
         limit = params.get('limit', 15)
         offset = params.get('offset', 0)
+        boosts = {**getattr(model.__scout_config__, 'boost_fields', {}), **params.get('boost_fields', {})}
         
-        # Get all indexed data for this model
-        if index_name not in self.indexed_data:
-            return SearchResults([], 0, 1, limit)
-        
-        indexed_models = self.indexed_data[index_name]
+        found = await self._transaction(
+            lambda connection: self._table(connection, index_name, model).search(connection, params, boosts)
+        )
         
-        # Filter results
-        filtered_results = []
-        for model_key, indexed_item in indexed_models.items():
-            score = self._calculate_relevance_score(query, indexed_item['searchable_text'])
-            
-            if score > 0:
-                # Apply where filters
-                if self._matches_filters(indexed_item['data'], params):
-                    filtered_results.append({
-                        'model': indexed_item['model'],
-                        'score': score,
-                        'data': indexed_item['data']
-                    })
-        
-        # Sort by score
-        filtered_results.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Apply min_score filter
-        min_score = params.get('min_score')
-        if min_score:
-            filtered_results = [r for r in filtered_results if r['score'] >= min_score]
-        
-        # Apply ordering
-        orders = params.get('orders', [])
-        if orders:
-            filtered_results = self._apply_ordering(filtered_results, orders)
-        
-        # Calculate pagination
-        total = len(filtered_results)
-        page = (offset // limit) + 1 if limit > 0 else 1
-        
-        # Apply pagination
-        paginated_results = filtered_results[offset:offset + limit] if limit else filtered_results
-        
-        # Create SearchResult objects
-        search_results = []
-        for result in paginated_results:
-            highlights = self._generate_highlights(query, result['data'], params.get('highlight_fields', []))
-            search_results.append(SearchResult(
-                model=result['model'],
-                score=result['score'],
+        search_results = [
+            SearchResult(
+                model=model.from_searchable_array(data, key),
+                score=score,
                 highlights=highlights
-            ))
+            )
+            for key, data, score, highlights in found['hits']
+        ]
         
         return SearchResults(
             items=search_results,
-            total=total,
-            page=page,
+            total=found['total'],
+            page=(offset // limit) + 1 if limit > 0 else 1,
             per_page=limit,
-            took=1,  # Simulated execution time
-            max_score=filtered_results[0]['score'] if filtered_results else None
+            took=int((time.time() - start_time) * 1000),
+            max_score=found['max_score'],
+            aggregations=found['aggregations']
         )
     
     async def raw_search(self, model: Type[Searchable], params: Dict[str, Any]) -> Dict[str, Any]:
@@ -137,169 +144,588 @@ class DatabaseEngine(SearchEngine):
                 ]
             },
             'took': results.took,
+            'aggregations': results.aggregations,
         }
     
     async def flush(self, model: Type[Searchable]) -> bool:
         """Remove all records for a model from the search index."""
         try:
             index_name = model().searchable_as()
-            if index_name in self.indexed_data:
-                del self.indexed_data[index_name]
+            await self._transaction(lambda connection: self._table(connection, index_name, model).clear(connection))
             return True
         except Exception:
             return False
     
     async def create_index(self, model: Type[Searchable], mapping: Optional[Dict[str, Any]] = None) -> bool:
         """Create a search index for the model."""
-        # For database engine, just ensure the index exists
-        index_name = model().searchable_as()
-        if index_name not in self.indexed_data:
-            self.indexed_data[index_name] = {}
-        return True
+        try:
+            index_name = model().searchable_as()
+            
+            def create(connection: Connection) -> None:
+                table = self._table(connection, index_name, model)
+                # Mapped fields get their full-text columns up front
+                if mapping and mapping.get('properties'):
+                    table.add_fields(connection, list(mapping['properties']))
+            
+            await self._transaction(create)
+            return True
+        except Exception:
+            # A rolled back transaction may have undone tables or columns we cached
+            self.tables.clear()
+            return False
     
     async def delete_index(self, model: Type[Searchable]) -> bool:
         """Delete the search index for the model."""
-        return await self.flush(model)
+        try:
+            index_name = model().searchable_as()
+            await self._transaction(lambda connection: self._table(connection, index_name, model).drop(connection))
+            del self.tables[index_name]
+            return True
+        except Exception:
+            # A rolled back transaction may have undone tables or columns we cached
+            self.tables.clear()
+            return False
     
     async def map(self, model: Type[Searchable], mapping: Dict[str, Any]) -> bool:
         """Update the mapping for the model's index."""
-        # Database engine doesn't use explicit mappings
-        return True
+        # Full-text columns follow the indexed data; mappings only pre-create them
+        return await self.create_index(model, mapping)
     
-    def _create_searchable_text(self, data: Dict[str, Any]) -> str:
-        """Create a searchable text string from model data."""
-        text_parts = []
-        
-        def extract_text(value: Any) -> None:
-            if isinstance(value, str):
-                text_parts.append(value.lower())
-            elif isinstance(value, (int, float)):
-                text_parts.append(str(value))
-            elif isinstance(value, list):
-                for item in value:
-                    extract_text(item)
-            elif isinstance(value, dict):
-                for v in value.values():
-                    extract_text(v)
-        
-        for value in data.values():
-            extract_text(value)
-        
-        return ' '.join(text_parts)
-    
-    def _calculate_relevance_score(self, query: str, text: str) -> float:
-        """Calculate relevance score for a search query."""
-        if not query.strip():
-            return 1.0
-        
-        query_lower = query.lower()
-        text_lower = text.lower()
-        
-        # Exact match gets highest score
-        if query_lower in text_lower:
-            score = 1.0
-            
-            # Bonus for exact word matches
-            words = query_lower.split()
-            word_matches = sum(1 for word in words if word in text_lower.split())
-            score += (word_matches / len(words)) * 0.5
-            
-            # Bonus for query appearing early in text
-            position = text_lower.find(query_lower)
-            if position >= 0:
-                position_score = max(0, 1 - (position / len(text_lower)))
-                score += position_score * 0.3
-            
-            return min(score, 2.0)  # Cap at 2.0
-        
-        # Partial word matches
-        words = query_lower.split()
-        matching_words = [word for word in words if word in text_lower]
-        
-        if matching_words:
-            return len(matching_words) / len(words) * 0.8
-        
-        # Fuzzy matching (simple implementation)
-        fuzzy_score = 0.0
-        for word in words:
-            if len(word) > 2:
-                # Check for partial matches (at least 70% of the word)
-                min_length = max(2, int(len(word) * 0.7))
-                for i in range(len(word) - min_length + 1):
-                    substring = word[i:i + min_length]
-                    if substring in text_lower:
-                        fuzzy_score += 0.3 / len(words)
-                        break
-        
-        return fuzzy_score
-    
-    def _matches_filters(self, data: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """Check if data matches the search filters."""
-        # Where filters
-        for where in params.get('wheres', []):
-            field = where['field']
-            value = where['value']
-            
-            if field not in data or data[field] != value:
-                return False
+    async def get_total_count(self, model: Type[Searchable]) -> int:
+        """Get total count of indexed documents for a model."""
+        index_name = model().searchable_as()
+        return await self._transaction(lambda connection: self._table(connection, index_name, model).count(connection))
+    
+    async def _transaction(self, work: Callable[[Connection], T]) -> T:
+        """Run ``work`` in one transaction on a worker thread."""
+        def run() -> T:
+            with self.engine.begin() as connection:
+                return work(connection)
         
-        # Where in filters
-        for where_in in params.get('where_ins', []):
-            field = where_in['field']
-            values = where_in['values']
+        return await asyncio.to_thread(run)
+    
+    def _table(self, connection: Connection, index_name: str, model: Type[Searchable]) -> _FullTextTable:
+        """The tables of an index, created on first use."""
+        table = self.tables.get(index_name)
+        if table is None:
+            dialect = connection.dialect.name
+            if dialect not in _DIALECTS:
+                raise ValueError(f"Unsupported database for Scout full-text search: {dialect}")
             
-            if field not in data or data[field] not in values:
-                return False
+            name = self.table_prefix + re.sub(r'\W', '_', index_name)
+            boosted = set(getattr(model.__scout_config__, 'boost_fields', {}) or {})
+            table = _DIALECTS[dialect](connection, name, boosted, self.text_search_config)
+            table.create(connection)
+            self.tables[index_name] = table
+        return table
+
+
+class _Binds(dict):
+    """Bound parameters of a statement being built."""
+    
+    def add(self, value: Any) -> str:
+        name = f"p{len(self)}"
+        self[name] = value
+        return f":{name}"
+
+
+class _FullTextTable(ABC):
+    """
+    One index's tables, and the SQL to maintain and search them.
+    
+    Subclasses supply the dialect-specific parts: the full-text match and
+    score, field access into the JSON data, filters and highlights.
+    """
+    
+    # Stops subqueries using bm25() from being flattened on SQLite
+    UNLIMITED = ''
+    
+    # Column breaking ties in insertion order, so pages are stable
+    INSERTION_ORDER: str
+    
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+    
+    def __init__(self, connection: Connection, name: str, boosted: set, text_search_config: str) -> None:
+        self.quote = connection.dialect.identifier_preparer.quote
+        self.name = name
+        self.documents = self.quote(name)
+        self.boosted = boosted
+        self.text_search_config = text_search_config
+    
+    def search(self, connection: Connection, params: Dict[str, Any], boosts: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Run a search, returning the page of hits, total, max score and aggregations.
         
-        # Where not in filters
-        for where_not_in in params.get('where_not_ins', []):
-            field = where_not_in['field']
-            values = where_not_in['values']
-            
-            if field in data and data[field] in values:
-                return False
+        Query terms are matched with OR semantics. With ``fuzziness``, terms
+        that ``fuzzy_edits`` allows any edits become prefix matches. An empty
+        query matches every document, newest first.
+        """
+        from sqlalchemy import text
         
-        return True
+        binds = _Binds()
+        terms = self.TOKEN_PATTERN.findall(params.get('query', '').lower())
+        fuzziness = params.get('fuzziness')
+        prefix = {term for term in terms if fuzzy_edits(term, fuzziness) > 0} if fuzziness else set()
+        highlight_fields = params.get('highlight_fields', []) if terms else []
+        
+        conditions: List[str] = []
+        highlights: List[Tuple[str, str]] = []
+        if terms:
+            source, score, match = self._match(terms, prefix, boosts, binds)
+            conditions.append(match)
+            highlights = [
+                (field, self._highlight(field, terms, prefix, binds))
+                for field in highlight_fields if self._searchable(field)
+            ]
+        else:
+            source, score = f"{self.documents} d", '1.0'
+        conditions.extend(self._filters(params, binds))
+        
+        min_score = params.get('min_score')
+        if min_score and terms:
+            conditions.append(f"{score} >= {binds.add(min_score)}")
+        where = ' AND '.join(conditions) or '1 = 1'
+        
+        total, max_score = connection.execute(
+            text(f"SELECT count(*), max(score) FROM (SELECT {score} AS score FROM {source} WHERE {where}{self.UNLIMITED}) m"),
+            binds
+        ).one()
+        
+        columns = ''.join(f", {expression} AS h{position}" for position, (_, expression) in enumerate(highlights))
+        statement = (
+            f"SELECT d.key, d.data, {score} AS score{columns} FROM {source} WHERE {where}"
+            f" ORDER BY {self._order_by(params.get('orders', []), bool(terms), binds)}"
+        )
+        limit = params.get('limit', 15)
+        if limit:
+            statement += f" LIMIT {binds.add(limit)} OFFSET {binds.add(params.get('offset', 0))}"
+        
+        hits = []
+        for row in connection.execute(text(statement), binds):
+            data = row[1] if isinstance(row[1], dict) else json.loads(row[1])
+            fragments = {
+                field: [row[3 + position]]
+                for position, (field, _) in enumerate(highlights)
+                if row[3 + position] and '<em>' in row[3 + position]
+            }
+            hits.append((row[0], data, float(row[2]), fragments))
+        
+        aggregations = None
+        if params.get('aggregations'):
+            aggregations = self._aggregate(connection, params['aggregations'], source, where, binds)
+        
+        return {
+            'hits': hits,
+            'total': total,
+            'max_score': float(max_score) if max_score is not None else None,
+            'aggregations': aggregations,
+        }
     
-    def _apply_ordering(self, results: List[Dict[str, Any]], orders: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-        """Apply ordering to search results."""
-        for order in reversed(orders):  # Apply in reverse order for stable sort
-            field = order['field']
-            direction = order['direction']
-            reverse = direction == 'desc'
-            
-            # Special case for _score
-            if field == '_score':
-                results.sort(key=lambda x: x['score'], reverse=reverse)
+    def count(self, connection: Connection) -> int:
+        from sqlalchemy import text
+        
+        return connection.execute(text(f"SELECT count(*) FROM {self.documents}")).scalar_one()
+    
+    def _filters(self, params: Dict[str, Any], binds: _Binds) -> List[str]:
+        """SQL conditions for the where, where in and where not in constraints."""
+        conditions = []
+        for where in params.get('wheres', []):
+            conditions.append(self._in(where['field'], [where['value']], binds))
+        for where_in in params.get('where_ins', []):
+            conditions.append(self._in(where_in['field'], where_in['values'], binds))
+        for where_not_in in params.get('where_not_ins', []):
+            # Documents without the field match too
+            conditions.append(f"NOT COALESCE({self._in(where_not_in['field'], where_not_in['values'], binds)}, {self._false()})")
+        return conditions
+    
+    def _order_by(self, orders: List[Dict[str, str]], scored: bool, binds: _Binds) -> str:
+        clauses = []
+        for order in orders:
+            direction = 'DESC' if order.get('direction') == 'desc' else 'ASC'
+            if order['field'] == '_score':
+                clauses.append(f"score {direction}")
+            elif order['field'] == '_indexed_at':
+                clauses.append(f"d.indexed_at {direction}")
             else:
-                results.sort(
-                    key=lambda x: x['data'].get(field, ''),
-                    reverse=reverse
-                )
+                clauses.append(f"{self._value(order['field'], binds)} {direction}")
         
+        clauses.append('score DESC' if scored else 'd.indexed_at DESC')
+        clauses.append(self.INSERTION_ORDER)
+        return ', '.join(clauses)
+    
+    def _aggregate(
+        self,
+        connection: Connection,
+        aggregations: Dict[str, Dict[str, Any]],
+        source: str,
+        where: str,
+        binds: _Binds
+    ) -> Dict[str, Any]:
+        """Terms are grouped in SQL; date histogram values are streamed and bucketed."""
+        from sqlalchemy import text
+        
+        results: Dict[str, Any] = {}
+        for name, definition in aggregations.items():
+            aggregation_binds = _Binds(binds)
+            if 'terms' in definition:
+                terms = definition['terms']
+                statement = self._terms(terms['field'], source, where, aggregation_binds)
+                counts = {value: count for value, count in connection.execute(text(statement), aggregation_binds)}
+                results[name] = terms_result(counts, terms.get('size', 10))
+            elif 'date_histogram' in definition:
+                histogram = definition['date_histogram']
+                interval = histogram.get('calendar_interval') or histogram.get('fixed_interval') or histogram.get('interval')
+                value = self._value(histogram['field'], aggregation_binds)
+                rows = connection.execute(text(f"SELECT {value} FROM {source} WHERE {where}"), aggregation_binds)
+                results[name] = histogram_result(count_by_interval((row[0] for row in rows), interval))
+            else:
+                raise ValueError(f"Unsupported aggregation: {name}")
         return results
     
-    def _generate_highlights(self, query: str, data: Dict[str, Any], highlight_fields: List[str]) -> Dict[str, List[str]]:
-        """Generate search highlights for specified fields."""
-        highlights = {}
-        
-        if not query.strip() or not highlight_fields:
-            return highlights
-        
-        query_words = [w.lower() for w in query.split()]
-        
-        for field in highlight_fields:
-            if field in data and isinstance(data[field], str):
-                field_value = str(data[field])
-                highlighted_text = field_value
-                
-                # Simple highlighting - wrap matching words with <em> tags
-                for word in query_words:
-                    pattern = re.compile(re.escape(word), re.IGNORECASE)
-                    highlighted_text = pattern.sub(f'<em>{word}</em>', highlighted_text)
-                
-                # Only include if highlighting was applied
-                if '<em>' in highlighted_text:
-                    highlights[field] = [highlighted_text]
-        
-        return highlights
\ No newline at end of file
+    # Dialect-specific parts
+    
+    @abstractmethod
+    def create(self, connection: Connection) -> None:
+        """Create the index's tables if they don't exist."""
+        pass
+    
+    @abstractmethod
+    def upsert(self, connection: Connection, documents: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Write documents and their full-text rows."""
+        pass
+    
+    @abstractmethod
+    def delete(self, connection: Connection, keys: List[str]) -> None:
+        """Remove documents by key."""
+        pass
+    
+    @abstractmethod
+    def clear(self, connection: Connection) -> None:
+        """Remove every document."""
+        pass
+    
+    @abstractmethod
+    def drop(self, connection: Connection) -> None:
+        """Drop the index's tables."""
+        pass
+    
+    def add_fields(self, connection: Connection, fields: List[str]) -> None:
+        """Make fields searchable before any document has them."""
+    
+    @abstractmethod
+    def _match(self, terms: List[str], prefix: Set[str], boosts: Dict[str, float], binds: _Binds) -> Tuple[str, str, str]:
+        """FROM clause, score expression and match condition of a full-text query."""
+        pass
+    
+    @abstractmethod
+    def _searchable(self, field: str) -> bool:
+        """Whether a field can be highlighted."""
+        pass
+    
+    @abstractmethod
+    def _highlight(self, field: str, terms: List[str], prefix: Set[str], binds: _Binds) -> str:
+        """Expression for a field's highlighted fragments."""
+        pass
+    
+    @abstractmethod
+    def _value(self, field: str, binds: _Binds) -> str:
+        """Expression for a field of the JSON data."""
+        pass
+    
+    @abstractmethod
+    def _in(self, field: str, values: List[Any], binds: _Binds) -> str:
+        """Condition matching documents whose field has one of the values."""
+        pass
+    
+    @abstractmethod
+    def _terms(self, field: str, source: str, where: str, binds: _Binds) -> str:
+        """Statement counting matching documents per value of a field."""
+        pass
+    
+    def _false(self) -> str:
+        return 'FALSE'
+
+
+class _SQLiteTable(_FullTextTable):
+    """
+    Documents with an FTS5 table alongside, one column per field.
+    
+    The FTS5 rows share their rowid with the documents and are written from
+    the stored JSON with json_extract, in the same transaction. A document
+    with a field the FTS5 table lacks makes it be rebuilt with the extra
+    column, from the documents table, without leaving SQL.
+    """
+    
+    UNLIMITED = ' LIMIT -1'
+    INSERTION_ORDER = 'd.rowid'
+    
+    def __init__(self, connection: Connection, name: str, boosted: set, text_search_config: str) -> None:
+        super().__init__(connection, name, boosted, text_search_config)
+        self.full_text = self.quote(name + '_fts')
+        self.fields: List[str] = []
+    
+    def create(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.documents} ("
+            "rowid INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, data TEXT NOT NULL, indexed_at REAL NOT NULL)"
+        ))
+        self.fields = [row[1] for row in connection.execute(text(f"PRAGMA table_info({self.full_text})"))]
+    
+    def upsert(self, connection: Connection, documents: List[Tuple[str, Dict[str, Any]]]) -> None:
+        from sqlalchemy import text
+        
+        self.add_fields(connection, [field for _, data in documents for field in data])
+        
+        now = time.time()
+        rows = [
+            {'key': key, 'data': json.dumps(data, default=str), 'indexed_at': now, **self._paths()}
+            for key, data in documents
+        ]
+        connection.execute(
+            text(f"DELETE FROM {self.full_text} WHERE rowid IN (SELECT rowid FROM {self.documents} WHERE key = :key)"),
+            rows
+        )
+        connection.execute(
+            text(
+                f"INSERT INTO {self.documents} (key, data, indexed_at) VALUES (:key, :data, :indexed_at) "
+                "ON CONFLICT (key) DO UPDATE SET data = excluded.data, indexed_at = excluded.indexed_at"
+            ),
+            rows
+        )
+        connection.execute(text(self._populate('WHERE key = :key')), rows)
+    
+    def delete(self, connection: Connection, keys: List[str]) -> None:
+        from sqlalchemy import text
+        
+        rows = [{'key': key} for key in keys]
+        if self.fields:
+            connection.execute(
+                text(f"DELETE FROM {self.full_text} WHERE rowid IN (SELECT rowid FROM {self.documents} WHERE key = :key)"),
+                rows
+            )
+        connection.execute(text(f"DELETE FROM {self.documents} WHERE key = :key"), rows)
+    
+    def clear(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        if self.fields:
+            connection.execute(text(f"DELETE FROM {self.full_text}"))
+        connection.execute(text(f"DELETE FROM {self.documents}"))
+    
+    def drop(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(f"DROP TABLE IF EXISTS {self.full_text}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {self.documents}"))
+        self.fields = []
+    
+    def add_fields(self, connection: Connection, fields: List[str]) -> None:
+        from sqlalchemy import text
+        
+        missing = [field for field in dict.fromkeys(fields) if field not in self.fields]
+        if not missing:
+            return
+        
+        # FTS5 tables can't gain columns, so rebuild with the new ones
+        self.fields = self.fields + missing
+        columns = ', '.join(self.quote(field) for field in self.fields)
+        connection.execute(text(f"DROP TABLE IF EXISTS {self.full_text}"))
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {self.full_text} USING fts5({columns}, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        connection.execute(text(self._populate('')), self._paths())
+    
+    def _populate(self, where: str) -> str:
+        """Statement copying documents' fields into the FTS5 table."""
+        columns = ', '.join(self.quote(field) for field in self.fields)
+        values = ', '.join(f"json_extract(data, :path{position})" for position in range(len(self.fields)))
+        return f"INSERT INTO {self.full_text} (rowid, {columns}) SELECT rowid, {values} FROM {self.documents} {where}"
+    
+    def _paths(self) -> Dict[str, str]:
+        return {f"path{position}": _json_path(field) for position, field in enumerate(self.fields)}
+    
+    def _match(self, terms: List[str], prefix: Set[str], boosts: Dict[str, float], binds: _Binds) -> Tuple[str, str, str]:
+        if not self.fields:
+            return f"{self.documents} d", '0.0', '1 = 0'
+        
+        query = ' OR '.join(f'"{term}"' + ('*' if term in prefix else '') for term in terms)
+        weights = ', '.join(repr(float(boosts.get(field, 1.0))) for field in self.fields)
+        return (
+            f"{self.full_text} JOIN {self.documents} d ON d.rowid = {self.full_text}.rowid",
+            f"-bm25({self.full_text}, {weights})",
+            f"{self.full_text} MATCH {binds.add(query)}",
+        )
+    
+    def _searchable(self, field: str) -> bool:
+        return field in self.fields
+    
+    def _highlight(self, field: str, terms: List[str], prefix: Set[str], binds: _Binds) -> str:
+        return f"snippet({self.full_text}, {self.fields.index(field)}, '<em>', '</em>', '...', 32)"
+    
+    def _value(self, field: str, binds: _Binds) -> str:
+        return f"json_extract(d.data, {binds.add(_json_path(field))})"
+    
+    def _in(self, field: str, values: List[Any], binds: _Binds) -> str:
+        candidates = ', '.join(binds.add(_sqlite_value(value)) for value in values)
+        return f"{self._value(field, binds)} IN ({candidates})"
+    
+    def _terms(self, field: str, source: str, where: str, binds: _Binds) -> str:
+        # json_each yields each element of a list, or the value itself
+        return (
+            f"SELECT j.value, count(*) FROM {source}, json_each(d.data, {binds.add(_json_path(field))}) j "
+            f"WHERE {where} GROUP BY j.value"
+        )
+    
+    def _false(self) -> str:
+        return '0'
+
+
+class _PostgresTable(_FullTextTable):
+    """
+    Documents with a JSONB data column and a weighted tsvector column.
+    
+    The tsvector is computed when a document is written: fields with a
+    boost in the model's scout config get weight A, the rest weight D, and
+    ts_rank weighs A by the largest boost. Both columns have GIN indexes,
+    so matches and where filters (jsonb containment) are index lookups.
+    """
+    
+    UNLIMITED = ' LIMIT ALL'
+    INSERTION_ORDER = 'd.id'
+    
+    def create(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {self.documents} ("
+            "id BIGINT GENERATED ALWAYS AS IDENTITY, key TEXT PRIMARY KEY, data JSONB NOT NULL, "
+            "indexed_at DOUBLE PRECISION NOT NULL, document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {self.quote(self.name + '_document')} ON {self.documents} USING GIN (document)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {self.quote(self.name + '_data')} ON {self.documents} USING GIN (data jsonb_path_ops)"
+        ))
+    
+    def upsert(self, connection: Connection, documents: List[Tuple[str, Dict[str, Any]]]) -> None:
+        from sqlalchemy import text
+        
+        now = time.time()
+        rows = []
+        for key, data in documents:
+            boosted = ' '.join(_text(value) for field, value in data.items() if field in self.boosted)
+            rest = ' '.join(_text(value) for field, value in data.items() if field not in self.boosted)
+            rows.append({
+                'key': key,
+                'data': json.dumps(data, default=str),
+                'indexed_at': now,
+                'config': self.text_search_config,
+                'boosted': boosted,
+                'rest': rest,
+            })
+        
+        connection.execute(
+            text(
+                f"INSERT INTO {self.documents} (key, data, indexed_at, document) VALUES ("
+                ":key, CAST(:data AS jsonb), :indexed_at, "
+                "setweight(to_tsvector(CAST(:config AS regconfig), :boosted), 'A') || "
+                "to_tsvector(CAST(:config AS regconfig), :rest)) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "data = excluded.data, indexed_at = excluded.indexed_at, document = excluded.document"
+            ),
+            rows
+        )
+    
+    def delete(self, connection: Connection, keys: List[str]) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(f"DELETE FROM {self.documents} WHERE key = :key"), [{'key': key} for key in keys])
+    
+    def clear(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(f"TRUNCATE {self.documents}"))
+    
+    def drop(self, connection: Connection) -> None:
+        from sqlalchemy import text
+        
+        connection.execute(text(f"DROP TABLE IF EXISTS {self.documents}"))
+    
+    def _match(self, terms: List[str], prefix: Set[str], boosts: Dict[str, float], binds: _Binds) -> Tuple[str, str, str]:
+        query = self._tsquery(terms, prefix, binds)
+        boost = max([float(boosts.get(field, 1.0)) for field in self.boosted] or [1.0])
+        # Weights of D, C, B and A
+        weights = binds.add(f"{{1.0,1.0,1.0,{boost!r}}}")
+        return (
+            f"{self.documents} d",
+            f"ts_rank(CAST({weights} AS real[]), d.document, {query})",
+            f"d.document @@ {query}",
+        )
+    
+    def _searchable(self, field: str) -> bool:
+        return True
+    
+    def _highlight(self, field: str, terms: List[str], prefix: Set[str], binds: _Binds) -> str:
+        return (
+            f"ts_headline(CAST({binds.add(self.text_search_config)} AS regconfig), d.data ->> {binds.add(field)}, "
+            f"{self._tsquery(terms, prefix, binds)}, 'StartSel=<em>, StopSel=</em>, MaxFragments=3, FragmentDelimiter=...')"
+        )
+    
+    def _tsquery(self, terms: List[str], prefix: Set[str], binds: _Binds) -> str:
+        query = ' | '.join(term + (':*' if term in prefix else '') for term in terms)
+        return f"to_tsquery(CAST({binds.add(self.text_search_config)} AS regconfig), {binds.add(query)})"
+    
+    def _value(self, field: str, binds: _Binds) -> str:
+        return f"d.data -> {binds.add(field)}"
+    
+    def _in(self, field: str, values: List[Any], binds: _Binds) -> str:
+        # jsonb containment compares values with their JSON types and uses the GIN index
+        matches = ' OR '.join(
+            f"d.data @> CAST({binds.add(json.dumps({field: value}, default=str))} AS jsonb)" for value in values
+        )
+        return f"({matches or 'FALSE'})"
+    
+    def _terms(self, field: str, source: str, where: str, binds: _Binds) -> str:
+        # In lax mode [*] yields each element of a list, or the value itself
+        path = binds.add(_json_path(field) + '[*]')
+        return (
+            f"SELECT value, count(*) FROM {source} "
+            f"CROSS JOIN LATERAL jsonb_path_query(d.data, CAST({path} AS jsonpath)) AS value "
+            f"WHERE {where} GROUP BY value"
+        )
+
+
+_DIALECTS: Dict[str, Type[_FullTextTable]] = {
+    'sqlite': _SQLiteTable,
+    'postgresql': _PostgresTable,
+}
+
+
+def _json_path(field: str) -> str:
+    """JSON path of a top-level field, quoted so any name works."""
+    return '$."' + field.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _sqlite_value(value: Any) -> Any:
+    """A value as json_extract returns it, for comparisons."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+def _text(value: Any) -> str:
+    """Searchable text of a field value of any type."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ' '.join(_text(item) for item in value)
+    if isinstance(value, dict):
+        return ' '.join(_text(item) for item in value.values())
+    if value is None:
+        return ''
+    return str(value)
@@ -477,5 +477,6 @@ class ElasticsearchEngine(SearchEngine):
             page=page,
             per_page=limit,
             took=took,
-            max_score=max_score
+            max_score=max_score,
+            aggregations=response.get('aggregations')
         )
\ No newline at end of file
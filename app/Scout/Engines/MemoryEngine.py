@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List, Optional, Type
+from collections import Counter
+from typing import Dict, Any, List, Optional, Set, Type, Union
 from ..ScoutManager import SearchEngine
 from ..Searchable import Searchable, SearchResults, SearchResult
+from ..InvertedIndex import InvertedIndex
+from ..Segments import SegmentedIndex
+from ..DocValues import Bitmap
+from ..TermDictionary import fuzzy_edits
 import json
+import os
 import time
 
 
@@ -11,13 +17,21 @@ class MemoryEngine(SearchEngine):
     """
     In-memory search engine for Laravel Scout.
     
-    Stores all data in memory for fast development and testing.
-    Data is lost when the application restarts.
+    Each index is an inverted index ranked with BM25, so a query only
+    visits the documents containing its terms. Without a ``path``, data is
+    lost when the application restarts. With one, each index is kept in a
+    subdirectory as memory-mapped segments (see SegmentedIndex), reopened
+    in milliseconds on startup and shared between worker processes; models
+    are then rebuilt from their stored data with ``from_searchable_array``.
     """
     
-    def __init__(self) -> None:
-        # Storage: {index_name: {model_id: {model, data, searchable_text}}}
+    def __init__(self, k1: float = 1.2, b: float = 0.75, path: Optional[str] = None) -> None:
+        # Storage: {index_name: {model_id: {model, data, indexed_at}}}, in-memory indices only
         self.storage: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.indices: Dict[str, Union[InvertedIndex, SegmentedIndex]] = {}
+        self.k1 = k1
+        self.b = b
+        self.path = path
         self.statistics: Dict[str, Any] = {
             'total_operations': 0,
             'last_operation': None,
@@ -28,31 +42,30 @@ class MemoryEngine(SearchEngine):
         """Add or update models in the search index."""
         try:
             start_time = time.time()
+            touched: Set[str] = set()
             
             for model in models:
                 index_name = model.searchable_as()
                 model_key = str(model.get_scout_key())
                 
                 # Initialize index if it doesn't exist
-                if index_name not in self.storage:
-                    self.storage[index_name] = {}
-                    self.statistics['indices'][index_name] = {
-                        'documents': 0,
-                        'created_at': time.time()
-                    }
+                index = self._get_index(index_name, type(model))
+                touched.add(index_name)
                 
-                # Store the model data
+                # Store the model data and update its postings in place
                 searchable_data = model.to_searchable_array()
-                self.storage[index_name][model_key] = {
-                    'model': model,
-                    'data': searchable_data,
-                    'searchable_text': self._create_searchable_text(searchable_data),
-                    'indexed_at': time.time(),
-                    'boost_fields': getattr(model.__scout_config__, 'boost_fields', {})
-                }
+                index.add(model_key, searchable_data)
+                if self.path is None:
+                    self.storage[index_name][model_key] = {
+                        'model': model,
+                        'data': searchable_data,
+                        'indexed_at': time.time()
+                    }
                 
                 # Update statistics
-                self.statistics['indices'][index_name]['documents'] = len(self.storage[index_name])
+                self.statistics['indices'][index_name]['documents'] = len(index)
+            
+            self._maybe_commit(touched)
             
             # Update global statistics
             self.statistics['total_operations'] += 1
@@ -73,20 +86,27 @@ class MemoryEngine(SearchEngine):
         try:
             start_time = time.time()
             deleted_count = 0
+            touched: Set[str] = set()
             
             for model in models:
                 index_name = model.searchable_as()
                 model_key = str(model.get_scout_key())
                 
-                if index_name in self.storage and model_key in self.storage[index_name]:
-                    del self.storage[index_name][model_key]
+                # Persistent indices may hold documents from earlier runs
+                if self.path is not None:
+                    self._get_index(index_name, type(model))
+                
+                index = self.indices.get(index_name)
+                if index is not None and index.remove(model_key):
+                    self.storage[index_name].pop(model_key, None)
                     deleted_count += 1
+                    touched.add(index_name)
                 
                 # Update statistics
-                if index_name in self.statistics['indices']:
-                    self.statistics['indices'][index_name]['documents'] = len(
-                        self.storage.get(index_name, {})
-                    )
+                if index is not None:
+                    self.statistics['indices'][index_name]['documents'] = len(index)
+            
+            self._maybe_commit(touched)
             
             # Update global statistics
             self.statistics['total_operations'] += 1
@@ -111,47 +131,59 @@ class MemoryEngine(SearchEngine):
         limit = params.get('limit', 15)
         offset = params.get('offset', 0)
         
-        # Get all indexed data for this model
-        if index_name not in self.storage:
+        # Get the index for this model
+        if index_name not in self.indices and self.path is None:
             return SearchResults([], 0, 1, limit, took=0)
         
-        indexed_models = self.storage[index_name]
+        index = self._get_index(index_name, model).reader()
+        documents = self.storage[index_name]
+        orders = params.get('orders', [])
+        
+        # Apply filters first, as bitmap operations over the doc values
+        accept = index.doc_values.filter(params)
         
-        # Filter and score results
-        scored_results = []
-        for model_key, indexed_item in indexed_models.items():
-            # Apply filters first
-            if not self._matches_filters(indexed_item['data'], params):
-                continue
-            
-            # Calculate relevance score
-            score = self._calculate_advanced_score(query, indexed_item, params)
-            
-            # Apply min_score filter
-            min_score = params.get('min_score', 0)
-            if score >= min_score:
-                scored_results.append({
-                    'model': indexed_item['model'],
-                    'score': score,
-                    'data': indexed_item['data'],
-                    'indexed_at': indexed_item['indexed_at']
-                })
+        # Score the accepted documents containing the query terms
+        if query.strip():
+            terms = self._query_terms(index, query, params.get('fuzziness'))
+            boosts = {**getattr(model.__scout_config__, 'boost_fields', {}), **params.get('boost_fields', {})}
+            scores = index.score(terms, boosts, accept)
+        else:
+            # An empty query matches everything, newest first
+            scores = dict.fromkeys(accept if accept is not None else index.ordinals(), 1.0)
+            orders = orders or [{'field': '_indexed_at', 'direction': 'desc'}]
         
-        # Sort results
-        scored_results = self._sort_results(scored_results, params)
+        # Apply min_score filter
+        min_score = params.get('min_score')
+        if min_score:
+            scores = {ordinal: score for ordinal, score in scores.items() if score >= min_score}
+        
+        # Aggregate over every match
+        aggregations = None
+        if params.get('aggregations'):
+            aggregations = index.doc_values.aggregate(params['aggregations'], Bitmap.from_ordinals(scores))
         
-        # Apply collapse (deduplication)
         collapse_field = params.get('collapse_field')
-        if collapse_field:
-            scored_results = self._collapse_results(scored_results, collapse_field)
+        if orders or collapse_field:
+            # Sort every match, then apply collapse (deduplication)
+            scored_results = [
+                self._make_result(index, documents, ordinal, score, model) for ordinal, score in scores.items()
+            ]
+            scored_results = self._sort_results(scored_results, {**params, 'orders': orders})
+            if collapse_field:
+                scored_results = self._collapse_results(scored_results, collapse_field)
+            
+            total = len(scored_results)
+            paginated_results = scored_results[offset:offset + limit] if limit else scored_results
+        else:
+            # Only the requested page is ranked, through a heap
+            total = len(scores)
+            ranked = index.top(scores, offset + limit if limit else total)
+            paginated_results = [
+                self._make_result(index, documents, ordinal, score, model) for ordinal, score in ranked[offset:]
+            ]
         
-        # Calculate pagination
-        total = len(scored_results)
         page = (offset // limit) + 1 if limit > 0 else 1
         
-        # Apply pagination
-        paginated_results = scored_results[offset:offset + limit] if limit else scored_results
-        
         # Create SearchResult objects with highlights
         search_results = []
         highlight_fields = params.get('highlight_fields', [])
@@ -160,13 +192,13 @@ class MemoryEngine(SearchEngine):
             highlights = self._generate_highlights(query, result['data'], highlight_fields)
             search_results.append(SearchResult(
                 model=result['model'],
-                score=result['score'],
+                score=round(result['score'], 4),
                 highlights=highlights
             ))
         
         # Calculate execution time
         took = int((time.time() - start_time) * 1000)
-        max_score = scored_results[0]['score'] if scored_results else None
+        max_score = round(max(scores.values()), 4) if scores else None
         
         return SearchResults(
             items=search_results,
@@ -174,7 +206,8 @@ class MemoryEngine(SearchEngine):
             page=page,
             per_page=limit,
             took=took,
-            max_score=max_score
+            max_score=max_score,
+            aggregations=aggregations
         )
     
     async def raw_search(self, model: Type[Searchable], params: Dict[str, Any]) -> Dict[str, Any]:
@@ -192,7 +225,7 @@ class MemoryEngine(SearchEngine):
                 'highlight': result.highlights if result.highlights else None
             })
         
-        return {
+        response = {
             'took': results.took,
             'timed_out': False,
             'hits': {
@@ -204,6 +237,10 @@ class MemoryEngine(SearchEngine):
                 'hits': hits
             }
         }
+        if results.aggregations is not None:
+            response['aggregations'] = results.aggregations
+        
+        return response
     
     async def flush(self, model: Type[Searchable]) -> bool:
         """Remove all records for a model from the search index."""
@@ -211,9 +248,15 @@ class MemoryEngine(SearchEngine):
             start_time = time.time()
             index_name = model().searchable_as()
             
+            # Persistent indices are cleared on disk too
+            if self.path is not None:
+                self._get_index(index_name, model)
+            
             deleted_count = 0
-            if index_name in self.storage:
-                deleted_count = len(self.storage[index_name])
+            if index_name in self.indices:
+                index = self.indices.pop(index_name)
+                deleted_count = len(index)
+                index.clear()
                 del self.storage[index_name]
             
             if index_name in self.statistics['indices']:
@@ -239,13 +282,9 @@ class MemoryEngine(SearchEngine):
         try:
             index_name = model().searchable_as()
             
-            if index_name not in self.storage:
-                self.storage[index_name] = {}
-                self.statistics['indices'][index_name] = {
-                    'documents': 0,
-                    'created_at': time.time(),
-                    'mapping': mapping or {}
-                }
+            if index_name not in self.indices:
+                self._get_index(index_name, model)
+                self.statistics['indices'][index_name]['mapping'] = mapping or {}
             
             return True
         except Exception:
@@ -270,174 +309,104 @@ class MemoryEngine(SearchEngine):
     async def get_total_count(self, model: Type[Searchable]) -> int:
         """Get total count of indexed documents for a model."""
         index_name = model().searchable_as()
-        return len(self.storage.get(index_name, {}))
+        if self.path is not None:
+            return len(self._get_index(index_name, model))
+        index = self.indices.get(index_name)
+        return len(index) if index is not None else 0
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get engine statistics."""
         total_documents = sum(
-            len(index_data) for index_data in self.storage.values()
+            len(index) for index in self.indices.values()
         )
         
         return {
             'engine': 'memory',
-            'total_indices': len(self.storage),
+            'path': self.path,
+            'total_indices': len(self.indices),
             'total_documents': total_documents,
             'memory_usage_mb': self._estimate_memory_usage(),
             'statistics': self.statistics,
             'indices': {
                 name: {
-                    'documents': len(data),
-                    'size_estimate': len(str(data))
+                    'documents': len(index),
+                    'size_estimate': len(str(self.storage[name])),
+                    'index': index.get_statistics()
                 }
-                for name, data in self.storage.items()
+                for name, index in self.indices.items()
             }
         }
     
     # Helper methods
     
-    def _create_searchable_text(self, data: Dict[str, Any]) -> str:
-        """Create a searchable text string from model data."""
-        text_parts = []
-        
-        def extract_text_recursive(value: Any) -> None:
-            if isinstance(value, str):
-                text_parts.append(value.lower().strip())
-            elif isinstance(value, (int, float, bool)):
-                text_parts.append(str(value).lower())
-            elif isinstance(value, list):
-                for item in value:
-                    extract_text_recursive(item)
-            elif isinstance(value, dict):
-                for v in value.values():
-                    extract_text_recursive(v)
-        
-        for value in data.values():
-            extract_text_recursive(value)
-        
-        return ' '.join(filter(None, text_parts))
-    
-    def _calculate_advanced_score(self, query: str, indexed_item: Dict[str, Any], params: Dict[str, Any]) -> float:
-        """Calculate advanced relevance score with boost fields and fuzzy matching."""
-        if not query.strip():
-            return 1.0
-        
-        query_lower = query.lower()
-        searchable_text = indexed_item['searchable_text']
-        data = indexed_item['data']
-        boost_fields = indexed_item.get('boost_fields', {})
-        
-        base_score = 0.0
-        
-        # Exact phrase match (highest score)
-        if query_lower in searchable_text:
-            base_score += 2.0
-        
-        # Word-level scoring
-        query_words = query_lower.split()
-        total_words = len(query_words)
-        matched_words = 0
-        
-        for word in query_words:
-            if word in searchable_text:
-                matched_words += 1
-                
-                # Check for matches in boosted fields
-                for field, boost in boost_fields.items():
-                    if field in data and isinstance(data[field], str):
-                        if word in str(data[field]).lower():
-                            base_score += boost
-        
-        # Word match ratio
-        if total_words > 0:
-            base_score += (matched_words / total_words) * 1.5
-        
-        # Fuzzy matching with fuzziness parameter
-        fuzziness = params.get('fuzziness')
-        if fuzziness and base_score == 0:
-            fuzzy_score = self._calculate_fuzzy_score(query_words, searchable_text, fuzziness)
-            base_score += fuzzy_score
-        
-        # Freshness boost (newer documents get slight boost)
-        indexed_at = indexed_item.get('indexed_at', 0)
-        current_time = time.time()
-        age_hours = (current_time - indexed_at) / 3600
-        freshness_boost = max(0, 1 - (age_hours / (24 * 7))) * 0.1  # 1 week decay
-        base_score += freshness_boost
-        
-        return round(base_score, 4)
+    def _get_index(self, index_name: str, model: Type[Searchable]) -> Union[InvertedIndex, SegmentedIndex]:
+        """Get the index for an index name, creating or opening it with the model's analyzer."""
+        index = self.indices.get(index_name)
+        if index is None:
+            analyzer = getattr(model.__scout_config__, 'analyzer', None)
+            if self.path is not None:
+                index = SegmentedIndex(os.path.join(self.path, index_name), analyzer, k1=self.k1, b=self.b)
+            else:
+                index = InvertedIndex(analyzer, k1=self.k1, b=self.b)
+            self.indices[index_name] = index
+            self.storage[index_name] = {}
+            self.statistics['indices'][index_name] = {
+                'documents': len(index),
+                'created_at': time.time()
+            }
+        return index
     
-    def _calculate_fuzzy_score(self, query_words: List[str], text: str, fuzziness: Any) -> float:
-        """Calculate fuzzy matching score."""
-        if fuzziness == 'AUTO':
-            max_edits = 2
-        elif isinstance(fuzziness, int):
-            max_edits = fuzziness
-        else:
-            max_edits = 1
-        
-        text_words = text.split()
-        fuzzy_score = 0.0
-        
-        for query_word in query_words:
-            best_match_score = 0.0
-            
-            for text_word in text_words:
-                # Simple edit distance calculation
-                distance = self._levenshtein_distance(query_word, text_word)
-                
-                if distance <= max_edits and len(query_word) > 2:
-                    similarity = 1 - (distance / max(len(query_word), len(text_word)))
-                    best_match_score = max(best_match_score, similarity)
-            
-            fuzzy_score += best_match_score
-        
-        return fuzzy_score / len(query_words) * 0.5  # Fuzzy matches get lower score
+    def _maybe_commit(self, index_names: Set[str]) -> None:
+        """Let persistent indices commit their buffered changes when due."""
+        for index_name in index_names:
+            index = self.indices.get(index_name)
+            if isinstance(index, SegmentedIndex):
+                index.maybe_commit()
     
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        """Calculate Levenshtein distance between two strings."""
-        if len(s1) > len(s2):
-            s1, s2 = s2, s1
-        
-        distances = list(range(len(s1) + 1))
-        
-        for i2, c2 in enumerate(s2):
-            distances_ = [i2 + 1]
-            for i1, c1 in enumerate(s1):
-                if c1 == c2:
-                    distances_.append(distances[i1])
-                else:
-                    distances_.append(1 + min((distances[i1], distances[i1 + 1], distances_[-1])))
-            distances = distances_
-        
-        return distances[-1]
+    def _make_result(
+        self,
+        index: Any,
+        documents: Dict[str, Dict[str, Any]],
+        ordinal: int,
+        score: float,
+        model: Type[Searchable]
+    ) -> Dict[str, Any]:
+        """Build a result entry for a scored document, rebuilding the model if it isn't in memory."""
+        key = index.key(ordinal)
+        indexed_item = documents.get(key)
+        if indexed_item is None:
+            data = index.source(ordinal)
+            indexed_item = {
+                'model': model.from_searchable_array(data, key),
+                'data': data,
+                'indexed_at': index.indexed_at(ordinal)
+            }
+        return {
+            'model': indexed_item['model'],
+            'score': score,
+            'data': indexed_item['data'],
+            'indexed_at': indexed_item['indexed_at']
+        }
     
-    def _matches_filters(self, data: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """Check if data matches the search filters."""
-        # Where filters
-        for where in params.get('wheres', []):
-            field = where['field']
-            value = where['value']
-            
-            if field not in data or data[field] != value:
-                return False
-        
-        # Where in filters
-        for where_in in params.get('where_ins', []):
-            field = where_in['field']
-            values = where_in['values']
-            
-            if field not in data or data[field] not in values:
-                return False
-        
-        # Where not in filters
-        for where_not_in in params.get('where_not_ins', []):
-            field = where_not_in['field']
-            values = where_not_in['values']
-            
-            if field in data and data[field] in values:
-                return False
-        
-        return True
+    def _query_terms(self, index: InvertedIndex, query: str, fuzziness: Any = None) -> Dict[str, float]:
+        """
+        Weighted terms to look up for a query.
+        
+        With fuzziness, each query term is expanded to the indexed terms
+        within its allowed edit distance, found through the index's term
+        dictionary and weighted down by how different they are.
+        """
+        weights = {term: float(count) for term, count in Counter(index.analyze(query)).items()}
+        if not fuzziness:
+            return weights
+        
+        for query_term in list(weights):
+            for term, distance in index.dictionary.fuzzy(query_term, fuzzy_edits(query_term, fuzziness)).items():
+                if distance:
+                    similarity = 1 - (distance / max(len(query_term), len(term)))
+                    weights[term] = max(weights.get(term, 0.0), similarity * 0.5)  # Fuzzy matches get lower score
+        
+        return weights
     
     def _sort_results(self, results: List[Dict[str, Any]], params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Sort search results."""
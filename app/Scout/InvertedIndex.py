@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .Analyzer import Analyzer, get_analyzer
+from .DocValues import Bitmap, DocValues
+from .TermDictionary import TermDictionary
+
+
+class InvertedIndex:
+    """
+    In-process inverted index with BM25 ranking.
+    
+    Each document gets a small integer ordinal from the index's DocValues,
+    which also holds its field values for filters and aggregations. Every
+    field keeps posting
+    lists mapping its terms to the ordinals containing them and how often,
+    plus per-document field lengths for length normalization. Queries only
+    touch the posting lists of their own terms, so cost follows how many
+    documents match rather than how many are indexed.
+    
+    The distinct terms of all fields are kept in a TermDictionary, which
+    fuzzy queries use to find indexed terms close to a query term.
+    
+    Documents are added, replaced and removed in place: a removed document's
+    postings are dropped immediately and its ordinal is reused by the next
+    new document, so the index never needs rebuilding.
+    """
+    
+    def __init__(
+        self,
+        analyzer: Union[str, Analyzer, None] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        doc_values: Optional[DocValues] = None
+    ) -> None:
+        self.analyzer = get_analyzer(analyzer)
+        self.k1 = k1
+        self.b = b
+        self.doc_values = doc_values or DocValues()
+        
+        # {field: {term: {ordinal: term_frequency}}}
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {}
+        # {field: {ordinal: number_of_terms}}
+        self._lengths: Dict[str, Dict[int, int]] = {}
+        self._total_lengths: Dict[str, int] = {}
+        self.dictionary = TermDictionary()
+    
+    def __len__(self) -> int:
+        return len(self.doc_values)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.doc_values
+    
+    def add(self, key: str, data: Dict[str, Any]) -> int:
+        """
+        Index a document, replacing any earlier version with the same key.
+        
+        Args:
+            key: Document key (the model's scout key)
+            data: Searchable data, one entry per field
+        
+        Returns:
+            The document's ordinal
+        """
+        ordinal = self.doc_values.ordinal(key)
+        if ordinal is not None:
+            self._unindex(ordinal)
+        
+        data = dict(data)
+        ordinal = self.doc_values.add(key, data)
+        for field, value in data.items():
+            terms = self.analyzer.analyze(value)
+            if not terms:
+                continue
+            
+            postings = self._postings.setdefault(field, {})
+            for term, frequency in Counter(terms).items():
+                matches = postings.get(term)
+                if matches is None:
+                    matches = postings[term] = {}
+                    self.dictionary.add(term)
+                matches[ordinal] = frequency
+            self._lengths.setdefault(field, {})[ordinal] = len(terms)
+            self._total_lengths[field] = self._total_lengths.get(field, 0) + len(terms)
+        
+        return ordinal
+    
+    def remove(self, key: str) -> bool:
+        """Remove a document; returns False if it wasn't indexed."""
+        ordinal = self.doc_values.ordinal(key)
+        if ordinal is None:
+            return False
+        
+        self._unindex(ordinal)
+        self.doc_values.remove(key)
+        return True
+    
+    def clear(self) -> None:
+        """Remove every document."""
+        self.doc_values.clear()
+        self._postings.clear()
+        self._lengths.clear()
+        self._total_lengths.clear()
+        self.dictionary.clear()
+    
+    def ordinal(self, key: str) -> Optional[int]:
+        """Ordinal of an indexed document, or None."""
+        return self.doc_values.ordinal(key)
+    
+    def key(self, ordinal: int) -> Optional[str]:
+        """Key of the document at an ordinal, or None if the slot is free."""
+        return self.doc_values.key(ordinal)
+    
+    def source(self, ordinal: int) -> Optional[Dict[str, Any]]:
+        """Searchable data of the document at an ordinal."""
+        return self.doc_values.source(ordinal)
+    
+    def ordinals(self) -> Iterator[int]:
+        """Ordinals of every indexed document."""
+        return self.doc_values.ordinals()
+    
+    def fields(self) -> List[str]:
+        """Fields with at least one indexed term."""
+        return list(self._postings)
+    
+    def terms(self, field: Optional[str] = None) -> Iterator[str]:
+        """The term dictionary of one field, or of all fields combined."""
+        if field is not None:
+            return iter(self._postings.get(field, {}))
+        return iter(self.dictionary)
+    
+    def document_frequency(self, term: str, field: Optional[str] = None) -> int:
+        """Number of documents containing a term, in one field or any."""
+        if field is not None:
+            return len(self._postings.get(field, {}).get(term, ()))
+        
+        ordinals = set()
+        for postings in self._postings.values():
+            ordinals.update(postings.get(term, ()))
+        return len(ordinals)
+    
+    def analyze(self, text: str) -> List[str]:
+        """Terms of a query, analyzed like the indexed documents."""
+        return self.analyzer.tokenize(text)
+    
+    def postings(self, field: str, term: str) -> Optional[Dict[int, int]]:
+        """Term frequencies by ordinal for a term of one field, or None."""
+        return self._postings.get(field, {}).get(term)
+    
+    def field_lengths(self, field: str) -> Dict[int, int]:
+        """Number of terms by ordinal for a field."""
+        return self._lengths.get(field, {})
+    
+    def field_statistics(self) -> Dict[str, Tuple[int, int]]:
+        """Documents with each field, and their total number of terms."""
+        return {field: (len(lengths), self._total_lengths[field]) for field, lengths in self._lengths.items()}
+    
+    def reader(self) -> InvertedIndex:
+        """The index to search; an in-memory index reads itself."""
+        return self
+    
+    def score(
+        self,
+        terms: Mapping[str, float],
+        boosts: Optional[Mapping[str, float]] = None,
+        accept: Optional[Bitmap] = None
+    ) -> Dict[int, float]:
+        """
+        BM25 scores of every document matching at least one term.
+        
+        Each field is scored on its own, with its own document frequencies
+        and average length, and the field scores are summed after
+        multiplying by the field's boost (1.0 unless given). Statistics
+        always cover the whole index, so ``accept`` only limits which
+        documents are scored, not their scores.
+        
+        Args:
+            terms: Query terms and their weights
+            boosts: Per-field boost factors
+            accept: Only score these documents (the result of filters)
+        
+        Returns:
+            Scores by document ordinal
+        """
+        scores: Dict[int, float] = {}
+        document_count = len(self.doc_values)
+        if not document_count or (accept is not None and not accept):
+            return scores
+        
+        allowed = accept.to_bytes(self.doc_values.slots // 8 + 1) if accept is not None else None
+        accepted_count = len(accept) if accept is not None else 0
+        accepted: Optional[List[int]] = None
+        
+        k1 = self.k1
+        for field, postings in self._postings.items():
+            boost = boosts.get(field, 1.0) if boosts else 1.0
+            if boost <= 0:
+                continue
+            
+            lengths = self._lengths[field]
+            average_length = self._total_lengths[field] / len(lengths)
+            norm_base = k1 * (1 - self.b)
+            norm_length = k1 * self.b / average_length
+            
+            for term, weight in terms.items():
+                matches = postings.get(term)
+                if not matches:
+                    continue
+                
+                frequency = len(matches)
+                idf = math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))
+                factor = boost * weight * idf * (k1 + 1)
+                get = scores.get
+                if allowed is None:
+                    for ordinal, tf in matches.items():
+                        scores[ordinal] = get(ordinal, 0.0) + factor * tf / (tf + norm_base + norm_length * lengths[ordinal])
+                elif accepted_count < frequency:
+                    # Few documents pass the filters: look each one up instead
+                    if accepted is None:
+                        accepted = list(accept)  # type: ignore[arg-type]
+                    for ordinal in accepted:
+                        tf = matches.get(ordinal)
+                        if tf:
+                            scores[ordinal] = get(ordinal, 0.0) + factor * tf / (tf + norm_base + norm_length * lengths[ordinal])
+                else:
+                    for ordinal, tf in matches.items():
+                        if allowed[ordinal >> 3] >> (ordinal & 7) & 1:
+                            scores[ordinal] = get(ordinal, 0.0) + factor * tf / (tf + norm_base + norm_length * lengths[ordinal])
+        
+        return scores
+    
+    @staticmethod
+    def top(scores: Dict[int, float], k: int) -> List[Tuple[int, float]]:
+        """The ``k`` best (ordinal, score) pairs, best first, without sorting everything."""
+        if k >= len(scores):
+            return sorted(scores.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
+    
+    def search(self, query: str, k: int = 10, boosts: Optional[Mapping[str, float]] = None) -> List[Tuple[str, float]]:
+        """
+        The ``k`` best matching keys for a query, best first.
+        
+        Args:
+            query: Query text
+            k: Number of results
+            boosts: Per-field boost factors
+        
+        Returns:
+            (key, score) pairs
+        """
+        scores = self.score(Counter(self.analyze(query)), boosts)
+        return [(self.doc_values.key(ordinal), score) for ordinal, score in self.top(scores, k)]  # type: ignore[misc]
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Document, term and posting counts."""
+        return {
+            'documents': len(self.doc_values),
+            'fields': {
+                field: {
+                    'terms': len(postings),
+                    'postings': sum(len(matches) for matches in postings.values()),
+                    'average_length': round(self._total_lengths[field] / len(self._lengths[field]), 2)
+                    if self._lengths.get(field) else 0,
+                }
+                for field, postings in self._postings.items()
+            },
+        }
+    
+    def _unindex(self, ordinal: int) -> None:
+        """Drop a document's postings and lengths."""
+        data = self.doc_values.source(ordinal)
+        if data is None:
+            return
+        
+        for field, value in data.items():
+            lengths = self._lengths.get(field)
+            if lengths is None or ordinal not in lengths:
+                continue
+            
+            postings = self._postings[field]
+            for term in set(self.analyzer.analyze(value)):
+                matches = postings.get(term)
+                if matches is not None:
+                    matches.pop(ordinal, None)
+                    if not matches:
+                        del postings[term]
+                        self.dictionary.discard(term)
+            
+            self._total_lengths[field] -= lengths.pop(ordinal)
+            if not lengths:
+                del self._lengths[field], self._total_lengths[field], self._postings[field]
@@ -79,11 +79,13 @@ class ScoutManager:
     
     def _setup_default_engines(self) -> None:
         """Setup default search engines."""
+        import os
         from .Engines import DatabaseEngine, MemoryEngine
         
         self.engines = {
-            'database': DatabaseEngine(),
-            'memory': MemoryEngine(),
+            'database': DatabaseEngine(text_search_config=os.getenv('SCOUT_TEXT_SEARCH_CONFIG', 'simple')),
+            # With SCOUT_MEMORY_PATH set, memory indices persist there as segments
+            'memory': MemoryEngine(path=os.getenv('SCOUT_MEMORY_PATH') or None),
         }
         
         # Optionally add Elasticsearch and Algolia engines if configured
@@ -25,6 +25,7 @@ class SearchableConfig:
     # Search configuration
     highlight_fields: List[str] = field(default_factory=list)
     boost_fields: Dict[str, float] = field(default_factory=dict)
+    analyzer: Optional[Any] = None  # Analyzer name or instance for the memory engine's index
 
 
 class Searchable:
@@ -44,7 +45,7 @@ class Searchable:
         
         Args:
             query: The search query string
-            
+        
         Returns:
             Builder instance for the search
         """
@@ -60,7 +61,7 @@ class Searchable:
         
         Args:
             chunk_size: Number of records to process at once
-            
+        
         Returns:
             Number of records indexed
         """
@@ -187,6 +188,29 @@ class Searchable:
         """
         return self.__scout_config__.engine
     
+    @classmethod
+    def from_searchable_array(cls, data: Dict[str, Any], key: Optional[Union[str, int]] = None) -> Searchable:
+        """
+        Rebuild a model from the data it was indexed with.
+        
+        Engines that keep documents outside the process (on disk or in a
+        database) use this to return models. The default sets each field
+        as an attribute without calling ``__init__``; override it to load
+        the record from the database instead.
+        
+        Args:
+            data: Data returned by ``to_searchable_array``
+            key: The model's scout key, set if ``data`` lacks it
+        
+        Returns:
+            A model instance
+        """
+        model = cls.__new__(cls)
+        model.__dict__.update(data)
+        if key is not None:
+            model.__dict__.setdefault(model.get_scout_key_name(), key)
+        return model
+    
     # Abstract methods that should be implemented by model classes
     
     @classmethod
@@ -244,7 +268,8 @@ class SearchResults:
         page: int = 1,
         per_page: int = 15,
         took: Optional[int] = None,
-        max_score: Optional[float] = None
+        max_score: Optional[float] = None,
+        aggregations: Optional[Dict[str, Any]] = None
     ):
         self.items = items
         self.total = total
@@ -252,6 +277,7 @@ class SearchResults:
         self.per_page = per_page
         self.took = took  # Query execution time in milliseconds
         self.max_score = max_score
+        self.aggregations = aggregations  # Results by aggregation name, if any were requested
     
     def __iter__(self):
         return iter(self.items)
@@ -299,5 +325,6 @@ class SearchResults:
             'meta': {
                 'took': self.took,
                 'max_score': self.max_score,
+                'aggregations': self.aggregations,
             }
         }
\ No newline at end of file
@@ -0,0 +1,992 @@
+from __future__ import annotations
+
+import atexit
+import base64
+import bisect
+import json
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: commits are only serialized within a process
+    fcntl = None  # type: ignore[assignment]
+
+from .Analyzer import Analyzer, get_analyzer
+from .DocValues import MISSING, Bitmap, DocValues, aggregate
+from .InvertedIndex import InvertedIndex
+from .TermDictionary import TermDictionary
+
+SEGMENT_MAGIC = b'SCOUTSG1'
+SEGMENT_SUFFIX = '.seg'
+
+_COMMIT_PREFIX = 'segments_'
+_COMMIT_SUFFIX = '.json'
+_LOCK_FILE = 'write.lock'
+# Unfinished segments older than this were left by a crashed writer
+_STALE_SECONDS = 3600
+
+
+def write_segment(path: str, documents: Iterable[Tuple[str, Dict[str, Any], float]], analyzer: Analyzer) -> int:
+    """
+    Write documents to a new immutable segment file.
+    
+    The file holds, in order: the stored fields of every document, their
+    indexing times, the sorted document keys, the sorted term dictionary
+    with a posting list offset and document frequency per term, the posting
+    lists (document numbers, then term frequencies), the field lengths and
+    the doc value column of every field. A JSON header with the position of
+    each section comes last, followed by its length and a magic number.
+    
+    Args:
+        path: File to create
+        documents: (key, data, indexed_at) of each document, in the order
+            they get their segment-local numbers
+        analyzer: Analyzer producing the terms
+    
+    Returns:
+        Number of documents written
+    """
+    keys: List[str] = []
+    stored: List[bytes] = []
+    times = array('d')
+    # {b'field\0term': {document: term_frequency}}
+    postings: Dict[bytes, Dict[int, int]] = {}
+    lengths: Dict[str, Dict[int, int]] = {}
+    columns: Dict[str, List[Any]] = {}
+    
+    for number, (key, data, indexed_at) in enumerate(documents):
+        keys.append(key)
+        stored.append(json.dumps([key, data], default=str, separators=(',', ':')).encode())
+        times.append(indexed_at)
+        for field, value in data.items():
+            columns.setdefault(field, []).append([number, value])
+            terms = analyzer.analyze(value)
+            if not terms:
+                continue
+            
+            prefix = field.encode() + b'\0'
+            for term, frequency in Counter(terms).items():
+                postings.setdefault(prefix + term.encode(), {})[number] = frequency
+            lengths.setdefault(field, {})[number] = len(terms)
+    
+    count = len(keys)
+    with open(path, 'wb') as handle:
+        writer = _SectionWriter(handle)
+        header: Dict[str, Any] = {
+            'version': 1,
+            'byteorder': sys.byteorder,
+            'documents': count,
+            'analyzer': analyzer.to_dict(),
+        }
+        
+        header['stored'] = writer.write_blobs(stored)
+        header['indexed_at'] = writer.write(times.tobytes())
+        
+        order = sorted(range(count), key=keys.__getitem__)
+        header['keys'] = writer.write_blobs([keys[number].encode() for number in order])
+        header['key_documents'] = writer.write(array('I', order).tobytes())
+        
+        terms = sorted(postings)
+        header['terms'] = writer.write_blobs(terms)
+        starts = array('Q')
+        frequencies = array('I')
+        for term in terms:
+            matches = postings[term]
+            numbers = array('I', sorted(matches))
+            offset, _ = writer.write(numbers.tobytes() + array('I', (matches[number] for number in numbers)).tobytes())
+            starts.append(offset)
+            frequencies.append(len(numbers))
+        header['term_postings'] = writer.write(starts.tobytes())
+        header['term_frequencies'] = writer.write(frequencies.tobytes())
+        
+        header['fields'] = {
+            field: {
+                'documents': len(field_lengths),
+                'total_length': sum(field_lengths.values()),
+                'lengths': writer.write(array('I', (field_lengths.get(number, 0) for number in range(count))).tobytes()),
+            }
+            for field, field_lengths in lengths.items()
+        }
+        header['columns'] = {
+            field: writer.write(json.dumps(column, default=str, separators=(',', ':')).encode())
+            for field, column in columns.items()
+        }
+        
+        encoded = json.dumps(header, separators=(',', ':')).encode()
+        handle.write(encoded)
+        handle.write(len(encoded).to_bytes(8, 'little'))
+        handle.write(SEGMENT_MAGIC)
+        handle.flush()
+        os.fsync(handle.fileno())
+    
+    return count
+
+
+class _SectionWriter:
+    """Appends 8-byte aligned sections to a segment file."""
+    
+    def __init__(self, handle: Any) -> None:
+        self.handle = handle
+        self.position = 0
+    
+    def write(self, data: bytes) -> List[int]:
+        padding = -self.position % 8
+        if padding:
+            self.handle.write(bytes(padding))
+            self.position += padding
+        offset = self.position
+        self.handle.write(data)
+        self.position += len(data)
+        return [offset, len(data)]
+    
+    def write_blobs(self, blobs: List[bytes]) -> Dict[str, List[int]]:
+        offsets = array('Q', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return {'offsets': self.write(offsets.tobytes()), 'data': self.write(b''.join(blobs))}
+
+
+class Segment:
+    """
+    A read-only, memory-mapped segment file.
+    
+    Opening one only parses its header; posting lists, field lengths and
+    stored fields are read straight from the mapping when needed, so every
+    process that opens the same file shares the pages through the OS cache.
+    Terms and keys are found by binary search over the sorted tables.
+    """
+    
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.name = os.path.basename(path)[:-len(SEGMENT_SUFFIX)]
+        
+        with open(path, 'rb') as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._map)
+        if size < 16 or self._map[size - 8:] != SEGMENT_MAGIC:
+            raise ValueError(f"Not a Scout segment: {path}")
+        
+        header_length = int.from_bytes(self._map[size - 16:size - 8], 'little')
+        header = json.loads(self._map[size - 16 - header_length:size - 16])
+        self._view = memoryview(self._map)
+        self._swap = header['byteorder'] != sys.byteorder
+        
+        self.documents: int = header['documents']
+        self.size = size
+        # {field: (documents_with_field, total_length)}
+        self.fields: Dict[str, Tuple[int, int]] = {
+            field: (info['documents'], info['total_length']) for field, info in header['fields'].items()
+        }
+        self._header = header
+        
+        self._stored = self._blobs(header['stored'])
+        self._times = self._array('d', header['indexed_at'])
+        self._keys = self._blobs(header['keys'])
+        self._key_documents = self._array('I', header['key_documents'])
+        self._terms = self._blobs(header['terms'])
+        self._term_postings = self._array('Q', header['term_postings'])
+        self._term_frequencies = self._array('I', header['term_frequencies'])
+        self._lengths: Dict[str, Any] = {}
+        self._dictionary: Optional[TermDictionary] = None
+    
+    def postings(self, field: str, term: str) -> Optional[Tuple[Any, Any]]:
+        """Document numbers and term frequencies for a term of a field, or None."""
+        position = self._find(self._terms, field.encode() + b'\0' + term.encode())
+        if position is None:
+            return None
+        
+        start = self._term_postings[position]
+        frequency = self._term_frequencies[position]
+        return (
+            self._array('I', (start, frequency * 4)),
+            self._array('I', (start + frequency * 4, frequency * 4)),
+        )
+    
+    def lengths(self, field: str) -> Any:
+        """Number of terms of a field by document number."""
+        lengths = self._lengths.get(field)
+        if lengths is None:
+            lengths = self._lengths[field] = self._array('I', self._header['fields'][field]['lengths'])
+        return lengths
+    
+    def lookup(self, key: str) -> Optional[int]:
+        """Document number of a key, or None."""
+        position = self._find(self._keys, key.encode())
+        return None if position is None else self._key_documents[position]
+    
+    def stored(self, number: int) -> Tuple[str, Dict[str, Any]]:
+        """Key and data of a document."""
+        key, data = json.loads(self._blob(self._stored, number))
+        return key, data
+    
+    def indexed_at(self, number: int) -> float:
+        """When a document was indexed, in epoch seconds."""
+        return self._times[number]
+    
+    def terms(self) -> Iterator[Tuple[str, str]]:
+        """Every (field, term) pair, sorted."""
+        for position in range(len(self._terms[0]) - 1):
+            field, term = self._blob(self._terms, position).decode().split('\0', 1)
+            yield field, term
+    
+    @property
+    def dictionary(self) -> TermDictionary:
+        """The segment's terms in a trie for fuzzy lookups, built on first use."""
+        if self._dictionary is None:
+            dictionary = TermDictionary()
+            for _, term in self.terms():
+                dictionary.add(term)
+            self._dictionary = dictionary
+        return self._dictionary
+    
+    def column(self, field: str) -> List[Any]:
+        """[document number, value] pairs of a field's doc values."""
+        section = self._header['columns'].get(field)
+        if section is None:
+            return []
+        offset, size = section
+        return json.loads(self._map[offset:offset + size])
+    
+    # Internals
+    
+    def _array(self, code: str, section: Any) -> Any:
+        offset, size = section
+        values = self._view[offset:offset + size].cast(code)
+        if self._swap:
+            values = array(code, values)
+            values.byteswap()
+        return values
+    
+    def _blobs(self, section: Dict[str, List[int]]) -> Tuple[Any, int]:
+        return self._array('Q', section['offsets']), section['data'][0]
+    
+    def _blob(self, table: Tuple[Any, int], position: int) -> bytes:
+        offsets, base = table
+        return self._map[base + offsets[position]:base + offsets[position + 1]]
+    
+    def _find(self, table: Tuple[Any, int], needle: bytes) -> Optional[int]:
+        low, high = 0, len(table[0]) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._blob(table, middle) < needle:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(table[0]) - 1 and self._blob(table, low) == needle:
+            return low
+        return None
+
+
+class SegmentDocValues(DocValues):
+    """
+    Doc values of an immutable segment, loaded one field at a time.
+    
+    A field's column and bitmaps are built from the segment the first time a
+    filter or aggregation uses it. Deleted documents stay in the bitmaps and
+    are masked out with ``dead``, which the owning index updates in place.
+    """
+    
+    def __init__(self, segment: Segment, dead: bytearray, max_cardinality: int = 1024) -> None:
+        super().__init__(max_cardinality)
+        self.segment = segment
+        self.dead = dead
+        self._loaded: Set[str] = set()
+    
+    def __len__(self) -> int:
+        return self.segment.documents - len(Bitmap.from_bytes(self.dead))
+    
+    @property
+    def slots(self) -> int:
+        return self.segment.documents
+    
+    def all(self) -> Bitmap:
+        return Bitmap(((1 << self.slots) - 1) & ~int.from_bytes(self.dead, 'little'))
+    
+    def filter(self, params: Dict[str, Any]) -> Optional[Bitmap]:
+        for constraint in ('wheres', 'where_ins', 'where_not_ins'):
+            for where in params.get(constraint, []):
+                self._load(where['field'])
+        
+        matches = super().filter(params)
+        return None if matches is None else matches & self.all()
+    
+    def term_counts(self, field: str, matches: Bitmap) -> Dict[Any, int]:
+        self._load(field)
+        return super().term_counts(field, matches)
+    
+    def histogram_counts(self, field: str, interval: str, matches: Bitmap) -> Dict[float, int]:
+        self._load(field)
+        return super().histogram_counts(field, interval, matches)
+    
+    def _load(self, field: str) -> None:
+        if field in self._loaded:
+            return
+        
+        column = [MISSING] * self.slots
+        for number, value in self.segment.column(field):
+            column[number] = value
+            if field not in self._high_cardinality:
+                self._add_to_bitmap(field, value, number)
+        self._columns[field] = column
+        self._loaded.add(field)
+
+
+class _SegmentState:
+    """A segment with its committed deletions and the documents hidden from searches."""
+    
+    __slots__ = ('segment', 'deletes', 'dead', 'doc_values')
+    
+    def __init__(self, segment: Segment) -> None:
+        self.segment = segment
+        self.deletes = bytearray(segment.documents // 8 + 1)
+        # Committed deletions plus documents replaced or removed since
+        self.dead = bytearray(self.deletes)
+        self.doc_values = SegmentDocValues(segment, self.dead)
+
+
+class SegmentedIndex:
+    """
+    Persistent inverted index made of immutable, memory-mapped segments.
+    
+    New and updated documents go to a small in-memory InvertedIndex, the
+    buffer. ``commit`` writes the buffer out as a new segment, records which
+    documents of older segments were replaced or removed, and publishes the
+    result as a new commit point (``segments_N.json``), written to a
+    temporary file and renamed into place so a crash leaves either the old
+    or the new state. Opening an index reads the latest commit point and maps
+    its segments, which takes milliseconds whatever the index size; nothing
+    is re-analyzed.
+    
+    Several processes (uvicorn workers) can open the same directory: the
+    mapped segments are shared through the page cache, commits are
+    serialized with a lock file, and each process picks up the others'
+    commits within ``refresh_interval`` seconds. When a key is updated in
+    two processes at once, the last commit wins.
+    
+    Once ``merge_factor`` segments exist, the smallest are merged into one
+    in a background thread, dropping deleted documents. Scores are BM25 with
+    statistics summed over all segments and the buffer, counting deleted
+    documents until they are merged away, as Lucene does.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        analyzer: Union[str, Analyzer, None] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        buffer_size: int = 1000,
+        commit_interval: float = 5.0,
+        merge_factor: int = 10,
+        refresh_interval: float = 1.0
+    ) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.buffer_size = buffer_size
+        self.commit_interval = commit_interval
+        self.merge_factor = merge_factor
+        self.refresh_interval = refresh_interval
+        os.makedirs(path, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._states: List[_SegmentState] = []
+        self._by_name: Dict[str, _SegmentState] = {}
+        self._generation = 0
+        # Keys added or removed since the last commit, and when added
+        self._pending: Set[str] = set()
+        self._times: Dict[str, float] = {}
+        self._merging = False
+        self._last_commit = self._last_refresh = time.monotonic()
+        
+        commit = self._load_latest()
+        self.analyzer = Analyzer(**commit['analyzer']) if commit else get_analyzer(analyzer)
+        self.buffer = InvertedIndex(self.analyzer, k1=k1, b=b)
+        atexit.register(self.close)
+    
+    def __len__(self) -> int:
+        return sum(len(state.doc_values) for state in self._states) + len(self.buffer)
+    
+    @property
+    def generation(self) -> int:
+        """Generation of the commit point the index was last loaded from."""
+        return self._generation
+    
+    def add(self, key: str, data: Dict[str, Any]) -> None:
+        """Index a document, replacing any earlier version with the same key."""
+        with self._lock:
+            self._hide(key)
+            self.buffer.add(key, data)
+            self._times[key] = time.time()
+            self._pending.add(key)
+    
+    def remove(self, key: str) -> bool:
+        """Remove a document; returns False if it wasn't indexed."""
+        with self._lock:
+            found = self._hide(key)
+            if self.buffer.remove(key):
+                del self._times[key]
+                found = True
+            self._pending.add(key)
+            return found
+    
+    def reader(self) -> SegmentReader:
+        """A view of the committed segments and the buffer to search."""
+        self._maybe_refresh()
+        return SegmentReader(self, self._states, self.buffer, self._times)
+    
+    def maybe_commit(self) -> None:
+        """Commit once the buffer is full or the commit interval has passed."""
+        if len(self._pending) >= self.buffer_size or (
+            self._pending and time.monotonic() - self._last_commit >= self.commit_interval
+        ):
+            self.commit()
+    
+    def commit(self) -> None:
+        """
+        Write buffered documents to a new segment and publish a commit point.
+        
+        Older copies of every key added or removed since the last commit are
+        marked deleted in the segments of the latest commit point, including
+        ones committed by other processes in the meantime.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            
+            documents = sorted(
+                (
+                    (key, self.buffer.source(ordinal), self._times[key])
+                    for ordinal in self.buffer.ordinals()
+                    for key in (self.buffer.key(ordinal),)
+                ),
+                key=itemgetter(2)
+            )
+            name = self._new_segment(documents) if documents else None
+            
+            with self._write_lock():
+                self._install(self._read_commit(self._latest_generation()))
+                entries = []
+                for state in self._states:
+                    deletes = bytearray(state.deletes)
+                    for key in self._pending:
+                        number = state.segment.lookup(key)
+                        if number is not None:
+                            deletes[number >> 3] |= 1 << (number & 7)
+                    entries.append(_entry(state.segment.name, state.segment.documents, deletes))
+                
+                if name is not None:
+                    self._publish_segment(name)
+                    entries.append(_entry(name, len(documents), b''))
+                commit = self._write_commit(entries)
+            
+            self.buffer.clear()
+            self._times.clear()
+            self._pending.clear()
+            self._install(commit)
+            self._last_commit = time.monotonic()
+        
+        self._maybe_merge()
+    
+    def clear(self) -> None:
+        """Remove every document, on disk too."""
+        with self._lock:
+            self.buffer.clear()
+            self._times.clear()
+            self._pending.clear()
+            with self._write_lock():
+                commit = self._write_commit([])
+            self._install(commit)
+    
+    def close(self) -> None:
+        """Commit anything still buffered."""
+        try:
+            self.commit()
+        except Exception as e:
+            print(f"Scout segment commit error: {e}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Document and segment counts."""
+        return {
+            'documents': len(self),
+            'path': self.path,
+            'generation': self._generation,
+            'buffered': len(self.buffer),
+            'pending': len(self._pending),
+            'segments': [
+                {
+                    'name': state.segment.name,
+                    'documents': state.segment.documents,
+                    'deleted': len(Bitmap.from_bytes(state.dead)),
+                    'bytes': state.segment.size,
+                }
+                for state in self._states
+            ],
+        }
+    
+    # Internals
+    
+    def _hide(self, key: str) -> bool:
+        """Hide committed copies of a key from searches until the next commit."""
+        found = False
+        for state in self._states:
+            number = state.segment.lookup(key)
+            if number is not None and not state.dead[number >> 3] >> (number & 7) & 1:
+                state.dead[number >> 3] |= 1 << (number & 7)
+                found = True
+        return found
+    
+    def _install(self, commit: Optional[Dict[str, Any]]) -> None:
+        """Switch to the segments of a commit point, reusing open ones."""
+        with self._lock:
+            states = []
+            for entry in (commit['segments'] if commit else []):
+                state = self._by_name.get(entry['name'])
+                if state is None:
+                    state = _SegmentState(Segment(os.path.join(self.path, entry['name'] + SEGMENT_SUFFIX)))
+                state.deletes[:] = _decode_bitmap(entry['deletes'], state.segment.documents)
+                states.append(state)
+            
+            for state in states:
+                dead = bytearray(state.deletes)
+                for key in self._pending:
+                    number = state.segment.lookup(key)
+                    if number is not None:
+                        dead[number >> 3] |= 1 << (number & 7)
+                state.dead[:] = dead
+            
+            self._states = states
+            self._by_name = {state.segment.name: state for state in states}
+            self._generation = commit['generation'] if commit else 0
+    
+    def _load_latest(self) -> Optional[Dict[str, Any]]:
+        # Another process may remove a commit point or segment between
+        # listing and opening it; by then a newer commit point exists
+        for attempt in range(3):
+            try:
+                commit = self._read_commit(self._latest_generation())
+                self._install(commit)
+                return commit
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        return None
+    
+    def _maybe_refresh(self) -> None:
+        """Pick up commits made by other processes."""
+        now = time.monotonic()
+        if now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+        if self._latest_generation() > self._generation:
+            self._load_latest()
+    
+    def _maybe_merge(self) -> None:
+        if self.merge_factor < 2 or self._merging:
+            return
+        
+        with self._lock:
+            if len(self._states) < self.merge_factor:
+                return
+            candidates = sorted(self._states, key=lambda state: state.segment.documents)[:self.merge_factor]
+            self._merging = True
+        
+        threading.Thread(target=self._merge, args=(candidates,), name='scout-segment-merge', daemon=True).start()
+    
+    def _merge(self, states: List[_SegmentState]) -> None:
+        """Merge segments into one, then swap it in under the write lock."""
+        name = None
+        completed = False
+        try:
+            merged = {state.segment.name for state in states}
+            documents = []
+            sources = []
+            for state in states:
+                segment = state.segment
+                deletes = bytes(state.deletes)
+                for number in range(segment.documents):
+                    if not deletes[number >> 3] >> (number & 7) & 1:
+                        key, data = segment.stored(number)
+                        documents.append((key, data, segment.indexed_at(number)))
+                        sources.append((segment.name, number))
+            name = self._new_segment(documents) if documents else None
+            
+            with self._lock, self._write_lock():
+                commit = self._read_commit(self._latest_generation())
+                entries = {entry['name']: entry for entry in (commit['segments'] if commit else [])}
+                if not merged <= set(entries):
+                    # Another process merged some of them first
+                    return
+                
+                # Documents deleted while the merge ran
+                current = {
+                    source: _decode_bitmap(entries[source]['deletes'], entries[source]['documents'])
+                    for source in merged
+                }
+                deletes = bytearray(len(documents) // 8 + 1)
+                for position, (source, number) in enumerate(sources):
+                    if current[source][number >> 3] >> (number & 7) & 1:
+                        deletes[position >> 3] |= 1 << (position & 7)
+                
+                segments = []
+                for entry in entries.values():
+                    if entry['name'] not in merged:
+                        segments.append(entry)
+                    elif name is not None:
+                        segments.append(_entry(name, len(documents), deletes))
+                        self._publish_segment(name)
+                        name = None
+                self._install(self._write_commit(segments))
+                completed = True
+        except Exception as e:
+            print(f"Scout segment merge error: {e}")
+        finally:
+            if name is not None:
+                _remove(os.path.join(self.path, name + SEGMENT_SUFFIX + '.tmp'))
+            self._merging = False
+        
+        # The merge may leave enough segments for another one
+        if completed:
+            self._maybe_merge()
+    
+    def _new_segment(self, documents: List[Tuple[str, Dict[str, Any], float]]) -> str:
+        """Write an unpublished segment file; returns its name."""
+        name = f"_{uuid.uuid4().hex}"
+        write_segment(os.path.join(self.path, name + SEGMENT_SUFFIX + '.tmp'), documents, self.analyzer)
+        return name
+    
+    def _publish_segment(self, name: str) -> None:
+        path = os.path.join(self.path, name + SEGMENT_SUFFIX)
+        os.replace(path + '.tmp', path)
+    
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Hold the lock serializing commits across processes."""
+        with open(os.path.join(self.path, _LOCK_FILE), 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    
+    def _latest_generation(self) -> int:
+        generations = [
+            int(filename[len(_COMMIT_PREFIX):-len(_COMMIT_SUFFIX)])
+            for filename in os.listdir(self.path)
+            if filename.startswith(_COMMIT_PREFIX) and filename.endswith(_COMMIT_SUFFIX)
+        ]
+        return max(generations, default=0)
+    
+    def _read_commit(self, generation: int) -> Optional[Dict[str, Any]]:
+        if not generation:
+            return None
+        with open(self._commit_path(generation)) as handle:
+            return json.load(handle)
+    
+    def _write_commit(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Atomically publish a commit point, then remove files it no longer needs."""
+        generation = self._latest_generation() + 1
+        commit = {
+            'generation': generation,
+            'committed_at': time.time(),
+            'analyzer': self.analyzer.to_dict(),
+            'segments': segments,
+        }
+        
+        path = self._commit_path(generation)
+        with open(path + '.tmp', 'w') as handle:
+            json.dump(commit, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + '.tmp', path)
+        _fsync_directory(self.path)
+        
+        # Mapped files stay readable after removal, so open readers keep working
+        referenced = {entry['name'] + SEGMENT_SUFFIX for entry in segments}
+        for filename in os.listdir(self.path):
+            filepath = os.path.join(self.path, filename)
+            if filename.startswith(_COMMIT_PREFIX) and filename.endswith(_COMMIT_SUFFIX):
+                if filename != os.path.basename(path):
+                    _remove(filepath)
+            elif filename.endswith(SEGMENT_SUFFIX) and filename not in referenced:
+                _remove(filepath)
+            elif filename.endswith('.tmp') and _age(filepath) > _STALE_SECONDS:
+                _remove(filepath)
+        
+        return commit
+    
+    def _commit_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"{_COMMIT_PREFIX}{generation:010d}{_COMMIT_SUFFIX}")
+
+
+class SegmentReader:
+    """
+    A point-in-time view of a SegmentedIndex, with the read interface of
+    InvertedIndex.
+    
+    Documents are numbered across the view: each segment's documents follow
+    the previous segment's, and buffered documents come last. The numbers
+    are only valid for the reader that produced them.
+    """
+    
+    top = staticmethod(InvertedIndex.top)
+    
+    def __init__(self, index: SegmentedIndex, states: List[_SegmentState], buffer: InvertedIndex, times: Dict[str, float]) -> None:
+        self.analyzer = index.analyzer
+        self.k1 = index.k1
+        self.b = index.b
+        self._states = states
+        self._buffer = buffer
+        self._times = times
+        
+        self._bases: List[int] = []
+        base = 0
+        for state in states:
+            self._bases.append(base)
+            base += state.segment.documents
+        self._buffer_base = base
+        
+        self.doc_values = _ReaderDocValues(self._parts())
+        self.dictionary = _ReaderDictionary(states, buffer)
+    
+    def __len__(self) -> int:
+        return sum(len(state.doc_values) for state in self._states) + len(self._buffer)
+    
+    def key(self, ordinal: int) -> Optional[str]:
+        state, number = self._locate(ordinal)
+        if state is None:
+            return self._buffer.key(number)
+        return state.segment.stored(number)[0]
+    
+    def source(self, ordinal: int) -> Optional[Dict[str, Any]]:
+        state, number = self._locate(ordinal)
+        if state is None:
+            return self._buffer.source(number)
+        return state.segment.stored(number)[1]
+    
+    def indexed_at(self, ordinal: int) -> float:
+        """When the document at an ordinal was indexed, in epoch seconds."""
+        state, number = self._locate(ordinal)
+        if state is None:
+            return self._times.get(self._buffer.key(number), 0.0)  # type: ignore[arg-type]
+        return state.segment.indexed_at(number)
+    
+    def ordinals(self) -> Iterator[int]:
+        for state, base in zip(self._states, self._bases):
+            for number in state.doc_values.all():
+                yield base + number
+        for ordinal in self._buffer.ordinals():
+            yield self._buffer_base + ordinal
+    
+    def analyze(self, text: str) -> List[str]:
+        return self.analyzer.tokenize(text)
+    
+    def score(
+        self,
+        terms: Mapping[str, float],
+        boosts: Optional[Mapping[str, float]] = None,
+        accept: Optional[Bitmap] = None
+    ) -> Dict[int, float]:
+        """
+        BM25 scores of every live document matching at least one term.
+        
+        Same scoring as InvertedIndex.score, with document counts, document
+        frequencies and field lengths summed over the segments and buffer.
+        
+        Args:
+            terms: Query terms and their weights
+            boosts: Per-field boost factors
+            accept: Only score these documents (the result of filters)
+        
+        Returns:
+            Scores by ordinal
+        """
+        scores: Dict[int, float] = {}
+        document_count = self._buffer_base + len(self._buffer)
+        if not document_count or (accept is not None and not accept):
+            return scores
+        
+        statistics: Dict[str, List[int]] = {}
+        for state in self._states:
+            for field, (documents, total_length) in state.segment.fields.items():
+                totals = statistics.setdefault(field, [0, 0])
+                totals[0] += documents
+                totals[1] += total_length
+        for field, (documents, total_length) in self._buffer.field_statistics().items():
+            totals = statistics.setdefault(field, [0, 0])
+            totals[0] += documents
+            totals[1] += total_length
+        
+        allowed = self._allowed(accept)
+        k1 = self.k1
+        get = scores.get
+        for field, (field_documents, total_length) in statistics.items():
+            boost = boosts.get(field, 1.0) if boosts else 1.0
+            if boost <= 0:
+                continue
+            
+            norm_base = k1 * (1 - self.b)
+            norm_length = k1 * self.b / (total_length / field_documents)
+            
+            for term, weight in terms.items():
+                found = []
+                frequency = 0
+                for position, state in enumerate(self._states):
+                    postings = state.segment.postings(field, term)
+                    if postings is not None:
+                        found.append((position, postings))
+                        frequency += len(postings[0])
+                buffered = self._buffer.postings(field, term)
+                if buffered:
+                    frequency += len(buffered)
+                if not frequency:
+                    continue
+                
+                idf = math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))
+                factor = boost * weight * idf * (k1 + 1)
+                
+                for position, (numbers, frequencies) in found:
+                    state = self._states[position]
+                    base = self._bases[position]
+                    dead = state.dead
+                    lengths = state.segment.lengths(field)
+                    permitted = allowed[position] if allowed is not None else None
+                    for number, tf in zip(numbers, frequencies):
+                        if dead[number >> 3] >> (number & 7) & 1:
+                            continue
+                        if permitted is not None and not permitted[number >> 3] >> (number & 7) & 1:
+                            continue
+                        ordinal = base + number
+                        scores[ordinal] = get(ordinal, 0.0) + factor * tf / (tf + norm_base + norm_length * lengths[number])
+                
+                if buffered:
+                    lengths = self._buffer.field_lengths(field)
+                    permitted = allowed[-1] if allowed is not None else None
+                    for number, tf in buffered.items():
+                        if permitted is not None and not permitted[number >> 3] >> (number & 7) & 1:
+                            continue
+                        ordinal = self._buffer_base + number
+                        scores[ordinal] = get(ordinal, 0.0) + factor * tf / (tf + norm_base + norm_length * lengths[number])
+        
+        return scores
+    
+    # Internals
+    
+    def _parts(self) -> List[Tuple[DocValues, int]]:
+        parts: List[Tuple[DocValues, int]] = [
+            (state.doc_values, base) for state, base in zip(self._states, self._bases)
+        ]
+        parts.append((self._buffer.doc_values, self._buffer_base))
+        return parts
+    
+    def _allowed(self, accept: Optional[Bitmap]) -> Optional[List[bytes]]:
+        """The accepted documents of each segment and the buffer, as local bitmaps."""
+        if accept is None:
+            return None
+        return [
+            ((accept.bits >> base) & ((1 << doc_values.slots) - 1)).to_bytes(doc_values.slots // 8 + 1, 'little')
+            for doc_values, base in self._parts()
+        ]
+    
+    def _locate(self, ordinal: int) -> Tuple[Optional[_SegmentState], int]:
+        if ordinal >= self._buffer_base:
+            return None, ordinal - self._buffer_base
+        position = bisect.bisect_right(self._bases, ordinal) - 1
+        return self._states[position], ordinal - self._bases[position]
+
+
+class _ReaderDocValues:
+    """Filters and aggregations across the segments and buffer of a reader."""
+    
+    def __init__(self, parts: List[Tuple[DocValues, int]]) -> None:
+        self._parts = parts
+    
+    def filter(self, params: Dict[str, Any]) -> Optional[Bitmap]:
+        bits = 0
+        for doc_values, base in self._parts:
+            matches = doc_values.filter(params)
+            if matches is None:
+                return None
+            bits |= matches.bits << base
+        return Bitmap(bits)
+    
+    def aggregate(self, aggregations: Dict[str, Dict[str, Any]], matches: Bitmap) -> Dict[str, Any]:
+        return aggregate(
+            (
+                (doc_values, Bitmap((matches.bits >> base) & ((1 << doc_values.slots) - 1)))
+                for doc_values, base in self._parts
+            ),
+            aggregations
+        )
+
+
+class _ReaderDictionary:
+    """Fuzzy term lookups across the segments and buffer of a reader."""
+    
+    def __init__(self, states: List[_SegmentState], buffer: InvertedIndex) -> None:
+        self._states = states
+        self._buffer = buffer
+    
+    def fuzzy(self, term: str, max_edits: int, prefix_length: int = 0) -> Dict[str, int]:
+        matches = self._buffer.dictionary.fuzzy(term, max_edits, prefix_length)
+        for state in self._states:
+            matches.update(state.segment.dictionary.fuzzy(term, max_edits, prefix_length))
+        return matches
+
+
+def _entry(name: str, documents: int, deletes: bytes) -> Dict[str, Any]:
+    """Commit point entry of a segment, with its deletions compressed."""
+    return {
+        'name': name,
+        'documents': documents,
+        'deletes': base64.b64encode(zlib.compress(bytes(deletes))).decode() if any(deletes) else '',
+    }
+
+
+def _decode_bitmap(encoded: str, documents: int) -> bytearray:
+    deletes = bytearray(zlib.decompress(base64.b64decode(encoded))) if encoded else bytearray()
+    size = documents // 8 + 1
+    deletes.extend(bytes(max(0, size - len(deletes))))
+    return deletes[:size]
+
+
+def _fsync_directory(path: str) -> None:
+    """Make a rename durable; not possible (or needed) on every platform."""
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _age(path: str) -> float:
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return 0.0
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Key under which a trie node stores the term ending there
+_END = ''
+
+
+def fuzzy_edits(term: str, fuzziness: Any) -> int:
+    """
+    Maximum edit distance allowed for a query term.
+    
+    ``AUTO`` follows Elasticsearch: terms of 0-2 characters must match
+    exactly, 3-5 allow one edit, longer terms two. ``AUTO:low,high`` moves
+    the two thresholds. Integers (or digit strings) are used as given.
+    
+    Args:
+        term: The analyzed query term
+        fuzziness: Fuzziness setting from the search parameters
+    
+    Returns:
+        Number of edits allowed
+    """
+    if isinstance(fuzziness, bool) or fuzziness is None:
+        return 0
+    if isinstance(fuzziness, int):
+        return max(0, fuzziness)
+    
+    setting = str(fuzziness).strip().upper()
+    if setting.isdigit():
+        return int(setting)
+    if not setting.startswith('AUTO'):
+        raise ValueError(f"Invalid fuzziness: {fuzziness}")
+    
+    low, high = 3, 6
+    if setting.startswith('AUTO:'):
+        try:
+            low, high = (int(part) for part in setting[5:].split(','))
+        except ValueError:
+            raise ValueError(f"Invalid fuzziness: {fuzziness}")
+    
+    if len(term) < low:
+        return 0
+    return 1 if len(term) < high else 2
+
+
+class TermDictionary:
+    """
+    The distinct terms of an index, in a trie for fuzzy lookups.
+    
+    ``fuzzy`` walks the trie carrying one row of the Levenshtein matrix per
+    node, which amounts to running a Levenshtein automaton for the query
+    term over every stored term at once. Shared prefixes are computed once,
+    and a branch is abandoned as soon as every cell of its row exceeds the
+    allowed distance, so only a small part of the trie is visited. Matches
+    and their distances are exactly those of a full Levenshtein comparison
+    against every term.
+    
+    Terms are reference counted, since the same term can occur in several
+    fields, and are removed from the trie when the last reference goes.
+    """
+    
+    def __init__(self) -> None:
+        self._root: Dict[str, Any] = {}
+        self._counts: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._counts)
+    
+    def __contains__(self, term: str) -> bool:
+        return term in self._counts
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._counts)
+    
+    def add(self, term: str) -> None:
+        """Add a reference to a term."""
+        count = self._counts.get(term, 0)
+        self._counts[term] = count + 1
+        if count:
+            return
+        
+        node = self._root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[_END] = term
+    
+    def discard(self, term: str) -> None:
+        """Drop a reference to a term, removing it with the last one."""
+        count = self._counts.get(term)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[term] = count - 1
+            return
+        
+        del self._counts[term]
+        path: List[Tuple[Dict[str, Any], str]] = []
+        node = self._root
+        for char in term:
+            path.append((node, char))
+            node = node[char]
+        del node[_END]
+        
+        # Prune branches left without terms
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+    
+    def clear(self) -> None:
+        """Remove every term."""
+        self._root.clear()
+        self._counts.clear()
+    
+    def fuzzy(self, term: str, max_edits: int, prefix_length: int = 0) -> Dict[str, int]:
+        """
+        Terms within ``max_edits`` Levenshtein edits of ``term``.
+        
+        Args:
+            term: Term to match
+            max_edits: Largest edit distance allowed
+            prefix_length: Leading characters that must match exactly
+        
+        Returns:
+            Matching terms and their edit distances, including ``term``
+            itself when it is stored
+        """
+        if max_edits <= 0:
+            return {term: 0} if term in self._counts else {}
+        
+        prefix, rest = term[:prefix_length], term[prefix_length:]
+        node: Optional[Dict[str, Any]] = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return {}
+        
+        # Cells further than max_edits from the diagonal can never come back
+        # under the limit, so each row is only computed inside that band and
+        # every value is capped at limit
+        limit = max_edits + 1
+        length = len(rest)
+        matches: Dict[str, int] = {}
+        first_row = [min(column, limit) for column in range(length + 1)]
+        if _END in node and first_row[-1] <= max_edits:
+            matches[node[_END]] = first_row[-1]
+        
+        stack = [(child, char, first_row, 1) for char, child in node.items() if char != _END]
+        while stack:
+            node, char, previous, depth = stack.pop()
+            
+            row = [limit] * (length + 1)
+            row[0] = min(depth, limit)
+            for column in range(max(1, depth - max_edits), min(length, depth + max_edits) + 1):
+                row[column] = min(
+                    previous[column - 1] + (rest[column - 1] != char),
+                    row[column - 1] + 1,
+                    previous[column] + 1,
+                    limit
+                )
+            
+            if _END in node and row[-1] <= max_edits:
+                matches[node[_END]] = row[-1]
+            
+            if min(row) <= max_edits:
+                stack.extend(
+                    (child, next_char, row, depth + 1) for next_char, child in node.items() if next_char != _END
+                )
+        
+        return matches
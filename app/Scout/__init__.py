@@ -17,6 +17,11 @@ from .Engines import (
     MemoryEngine,
 )
 from .Builder import Builder
+from .Analyzer import Analyzer
+from .InvertedIndex import InvertedIndex
+from .TermDictionary import TermDictionary
+from .DocValues import DocValues, Bitmap
+from .Segments import SegmentedIndex
 from .Facades import Scout
 
 __all__ = [
@@ -31,5 +36,11 @@ __all__ = [
     'DatabaseEngine',
     'MemoryEngine',
     'Builder',
+    'Analyzer',
+    'InvertedIndex',
+    'TermDictionary',
+    'DocValues',
+    'Bitmap',
+    'SegmentedIndex',
     'Scout',
 ]
\ No newline at end of file
@@ -3,14 +3,24 @@ from __future__ import annotations
 import json
 import uuid
 import logging
-from typing import Optional, List, Dict, Any, TYPE_CHECKING, Sequence
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple, TYPE_CHECKING, Sequence
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert
 from sqlalchemy.sql import desc, asc
 from sqlalchemy.orm import Session
 
 from app.Services.BaseService import BaseService
 from app.Jobs.Job import ShouldQueue
+from app.Jobs.JobTypeRegistry import class_path, payload_codec
+from app.Jobs.Unique import unique_jobs
+from app.Queue.FailedJobs import (
+    FailedJobGroup,
+    ProgressCallback,
+    RequeuePacer,
+    RetryProgress,
+    describe_exception,
+    exception_fingerprint
+)
 from config.database import get_database
 
 if TYPE_CHECKING:
@@ -27,6 +37,7 @@ class QueueService(BaseService):
     def __init__(self, db: Session, connection: str = "default") -> None:
         super().__init__(db)
         self.connection = connection
+        self.codec = payload_codec()
         self.logger = logging.getLogger(__name__)
     
     def push(self, job: ShouldQueue, queue: Optional[str] = None) -> str:
@@ -36,38 +47,34 @@ class QueueService(BaseService):
         Args:
             job: The job to queue
             queue: Optional queue name override
-            
+        
         Returns:
-            The job ID
+            The job ID, or the ID of the queued job a unique job duplicates
         """
+        from app.Utils.ULIDUtils import generate_ulid
+        
+        job_id = generate_ulid()
+        existing = unique_jobs.claim(job, job_id, queue)
+        if existing is not None:
+            return existing
+        
         db = next(get_database())
         try:
             from database.migrations.create_jobs_table import Job as JobModel
             
-            # Serialize job data
-            payload = job.serialize()
-            
             # Create job model
-            job_model = JobModel(
-                queue=queue or job.options.queue,
-                payload=json.dumps(payload),
-                job_class=payload["job_class"],
-                job_method=payload["job_method"],
-                connection=self.connection,
-                priority=job.options.priority,
-                delay=job.options.delay,
-                available_at=datetime.utcnow() + timedelta(seconds=job.options.delay)
-            )
+            job_model = JobModel(id=job_id, **self._job_attributes(job, queue, datetime.utcnow()))
             
             db.add(job_model)
             db.commit()
             
             self.logger.info(f"Job {job_model.id} queued on '{job_model.queue}' queue")
             return job_model.id
-            
+        
         except Exception as e:
             self.logger.error(f"Failed to queue job: {str(e)}")
             db.rollback()
+            unique_jobs.release_claim(job, job_id)
             raise
         finally:
             db.close()
@@ -81,12 +88,94 @@ class QueueService(BaseService):
         job.delay_until(delay)
         return self.push(job, queue)
     
-    def bulk(self, jobs: Sequence[ShouldQueue], queue: Optional[str] = None) -> List[str]:
-        """Push multiple jobs to queue."""
+    def bulk(
+        self,
+        jobs: Sequence[ShouldQueue],
+        queue: Optional[str] = None,
+        chunk_size: int = 1000,
+        before_insert: Optional[Callable[[int], None]] = None
+    ) -> List[str]:
+        """
+        Push multiple jobs to queue.
+        
+        Jobs are serialized in one pass and written with a single multi-row
+        INSERT and one commit per ``chunk_size`` jobs. Chunks committed
+        before an error stay queued; the uniqueness claimed by the others is
+        given back. Duplicates of queued unique jobs are not inserted.
+        
+        Args:
+            before_insert: Called with the number of jobs to be inserted,
+                once duplicates are skipped and before anything is written
+        
+        Returns:
+            The job IDs, in the order given (for duplicates, the queued job's)
+        """
+        from database.migrations.create_jobs_table import Job as JobModel
+        from app.Utils.ULIDUtils import generate_ulid
+        
+        now = datetime.utcnow()
+        rows = []
         job_ids = []
-        for job in jobs:
-            job_ids.append(self.push(job, queue))
-        return job_ids
+        claimed: List[Tuple[ShouldQueue, str]] = []
+        try:
+            for job in jobs:
+                job_id = generate_ulid()
+                existing = unique_jobs.claim(job, job_id, queue)
+                if existing is not None:
+                    job_ids.append(existing)
+                    continue
+                claimed.append((job, job_id))
+                
+                # Claimed first: a debounced job's delay is set by its claim
+                row = self._job_attributes(job, queue, now)
+                row["id"] = job_id
+                rows.append(row)
+                job_ids.append(job_id)
+            
+            if before_insert is not None:
+                before_insert(len(rows))
+        except Exception:
+            self._release_claims(claimed)
+            raise
+        
+        db = next(get_database())
+        committed = 0
+        try:
+            for start in range(0, len(rows), chunk_size):
+                db.execute(insert(JobModel), rows[start:start + chunk_size])
+                db.commit()
+                committed = min(start + chunk_size, len(rows))
+            
+            self.logger.info(f"{len(rows)} jobs queued in {-(-len(rows) // chunk_size)} chunks")
+            return job_ids
+        
+        except Exception as e:
+            self.logger.error(f"Failed to bulk queue jobs: {str(e)}")
+            db.rollback()
+            self._release_claims(claimed[committed:])
+            raise
+        finally:
+            db.close()
+    
+    def _release_claims(self, claimed: List[Tuple[ShouldQueue, str]]) -> None:
+        """Give back the uniqueness of jobs that were claimed but not queued."""
+        for job, job_id in claimed:
+            unique_jobs.release_claim(job, job_id)
+    
+    def _job_attributes(self, job: ShouldQueue, queue: Optional[str], now: datetime) -> Dict[str, Any]:
+        """Column values for a queued job."""
+        payload = job.serialize()
+        return {
+            "queue": queue or job.options.queue,
+            "payload": self.codec.encode(payload),
+            "job_class": class_path(job.__class__),  # readable even when the payload uses a type code
+            "job_method": payload.get("job_method", "handle"),
+            "connection": self.connection,
+            "priority": job.options.priority,
+            "delay": job.options.delay,
+            "available_at": now + timedelta(seconds=job.options.delay),
+            "batch_id": getattr(job, "_batch_id", None)
+        }
     
     def size(self, queue: str = "default") -> int:
         """Get the size of the queue."""
@@ -213,26 +302,73 @@ class QueueService(BaseService):
         self, 
         limit: int = 50, 
         offset: int = 0,
-        queue: Optional[str] = None
+        queue: Optional[str] = None,
+        after_id: Optional[str] = None,
+        fingerprint: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get failed jobs."""
+        """
+        Get failed jobs, newest first.
+        
+        Pass the last id of a page as ``after_id`` to get the next one; that
+        seeks on the primary key (ULIDs sort by failure time), where
+        ``offset`` makes the database skip every earlier row. ``fingerprint``
+        limits the list to one group from ``group_failed_jobs``. Each job
+        comes with its ``fingerprint``. With ``after_id`` or ``fingerprint``
+        set, ``offset`` counts jobs after the seek and within the group.
+        """
         db = next(get_database())
         try:
             from database.migrations.create_failed_jobs_table import FailedJob
             
-            query = db.query(FailedJob)
-            
-            if queue:
-                query = query.filter(FailedJob.queue == queue)
-            
-            failed_jobs = (
-                query.order_by(desc(FailedJob.failed_at))
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-            
-            return [job.to_dict() for job in failed_jobs]
+            if offset and after_id is None and fingerprint is None:
+                query = db.query(FailedJob)
+                if queue:
+                    query = query.filter(FailedJob.queue == queue)
+                failed_jobs = query.order_by(desc(FailedJob.id)).offset(offset).limit(limit).all()
+            else:
+                failed_jobs = []
+                skip = offset
+                for failed_job in self._scan_failed_jobs(
+                    db, queue=queue, after_id=after_id, newest_first=True, chunk_size=max(limit, 100)
+                ):
+                    if fingerprint is not None and self._fingerprint(failed_job) != fingerprint:
+                        continue
+                    if skip > 0:
+                        skip -= 1
+                        continue
+                    failed_jobs.append(failed_job)
+                    if len(failed_jobs) >= limit:
+                        break
+            
+            return [{**job.to_dict(), "fingerprint": self._fingerprint(job)} for job in failed_jobs]
+        finally:
+            db.close()
+    
+    def group_failed_jobs(
+        self,
+        queue: Optional[str] = None,
+        job_class: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> List[FailedJobGroup]:
+        """
+        Group failed jobs by exception fingerprint, largest group first.
+        
+        Fingerprints come from the job class, exception class, masked
+        message and innermost frame, so a group is one bug however many
+        records it hit. The table is read in keyset chunks.
+        """
+        db = next(get_database())
+        try:
+            groups: Dict[str, FailedJobGroup] = {}
+            for failed_job in self._scan_failed_jobs(db, queue=queue, job_class=job_class, chunk_size=chunk_size):
+                key = self._fingerprint(failed_job)
+                group = groups.get(key)
+                if group is None:
+                    name, message, frame = describe_exception(failed_job.exception)
+                    group = groups[key] = FailedJobGroup(key, failed_job.job_class, name, message, frame)
+                group.add(failed_job.id, failed_job.queue, failed_job.failed_at)
+            
+            return sorted(groups.values(), key=lambda group: group.count, reverse=True)
         finally:
             db.close()
     
@@ -240,7 +376,6 @@ class QueueService(BaseService):
         """Retry a failed job."""
         db = next(get_database())
         try:
-            from database.migrations.create_jobs_table import Job as JobModel
             from database.migrations.create_failed_jobs_table import FailedJob
             
             failed_job = db.query(FailedJob).filter(FailedJob.id == failed_job_id).first()
@@ -248,22 +383,12 @@ class QueueService(BaseService):
                 raise ValueError(f"Failed job {failed_job_id} not found")
             
             # Create new job from failed job
-            new_job = JobModel(
-                queue=queue or failed_job.queue,
-                payload=failed_job.payload,
-                job_class=failed_job.job_class,
-                job_method=failed_job.job_method,
-                connection=failed_job.connection,
-                available_at=datetime.utcnow()
-            )
-            
-            db.add(new_job)
-            db.delete(failed_job)
+            new_job_id = self._requeue_failed_jobs(db, [failed_job], queue)[0]
             db.commit()
             
-            self.logger.info(f"Failed job {failed_job_id} retried as job {new_job.id}")
-            return new_job.id
-            
+            self.logger.info(f"Failed job {failed_job_id} retried as job {new_job_id}")
+            return new_job_id
+        
         except Exception as e:
             self.logger.error(f"Failed to retry job {failed_job_id}: {str(e)}")
             db.rollback()
@@ -273,6 +398,35 @@ class QueueService(BaseService):
     
     def retry_all_failed_jobs(self, queue: Optional[str] = None) -> int:
         """Retry all failed jobs."""
+        return self.retry_failed_jobs(queue=queue)
+    
+    def retry_failed_jobs(
+        self,
+        queue: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        job_class: Optional[str] = None,
+        to_queue: Optional[str] = None,
+        chunk_size: int = 500,
+        rate: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> int:
+        """
+        Requeue failed jobs in bulk, oldest first.
+        
+        Failed jobs are read ``chunk_size`` at a time by primary key, and
+        each chunk's matches are inserted into the jobs table and deleted
+        from failed_jobs in one transaction, so an interrupted run leaves
+        every job in exactly one of the two tables and can simply be run
+        again. Rows are locked with SKIP LOCKED where the database supports
+        it, so two concurrent runs never requeue the same job. ``rate``
+        caps requeued jobs per second; ``progress`` is called after every
+        chunk.
+        
+        Returns:
+            The number of jobs requeued
+        """
+        pacer = RequeuePacer(rate)
+        chunk_size = pacer.chunk_size(chunk_size)
         db = next(get_database())
         try:
             from database.migrations.create_failed_jobs_table import FailedJob
@@ -280,23 +434,114 @@ class QueueService(BaseService):
             query = db.query(FailedJob)
             if queue:
                 query = query.filter(FailedJob.queue == queue)
-            
-            failed_jobs = query.all()
-            count = 0
-            
-            for failed_job in failed_jobs:
-                try:
-                    self.retry_failed_job(failed_job.id)
-                    count += 1
-                except Exception as e:
-                    self.logger.error(f"Failed to retry job {failed_job.id}: {str(e)}")
-            
-            self.logger.info(f"Retried {count} failed jobs")
-            return count
-            
+            if job_class:
+                query = query.filter(FailedJob.job_class == job_class)
+            status = RetryProgress(total=query.count())
+            
+            after_id: Optional[str] = None
+            while True:
+                chunk = (
+                    query.filter(FailedJob.id > after_id) if after_id is not None else query
+                ).order_by(asc(FailedJob.id)).limit(chunk_size).with_for_update(skip_locked=True).all()
+                if not chunk:
+                    break
+                
+                after_id = chunk[-1].id
+                matches = [
+                    failed_job for failed_job in chunk
+                    if fingerprint is None or self._fingerprint(failed_job) == fingerprint
+                ]
+                if matches:
+                    self._requeue_failed_jobs(db, matches, to_queue)
+                db.commit()
+                
+                status.scanned += len(chunk)
+                status.retried += len(matches)
+                if progress is not None:
+                    progress(status)
+                pacer.wait(status)
+            
+            self.logger.info(f"Retried {status.retried} failed jobs")
+            return status.retried
+        
+        except Exception as e:
+            self.logger.error(f"Failed to retry failed jobs: {str(e)}")
+            db.rollback()
+            raise
         finally:
             db.close()
     
+    def _requeue_failed_jobs(self, db: Session, failed_jobs: Sequence[FailedJob], queue: Optional[str]) -> List[str]:
+        """
+        Move failed jobs back onto the queue within the caller's transaction.
+        
+        Priority and batch id come back from the failure context, so a
+        retried batch job still updates its batch's counters.
+        """
+        from database.migrations.create_jobs_table import Job as JobModel
+        from database.migrations.create_failed_jobs_table import FailedJob
+        from app.Utils.ULIDUtils import generate_ulid
+        
+        now = datetime.utcnow()
+        rows = []
+        for failed_job in failed_jobs:
+            context = self._failure_context(failed_job)
+            rows.append({
+                "id": generate_ulid(),
+                "queue": queue or failed_job.queue,
+                "payload": failed_job.payload,
+                "job_class": failed_job.job_class,
+                "job_method": failed_job.job_method,
+                "connection": failed_job.connection,
+                "priority": context.get("priority") or 0,
+                "batch_id": context.get("batch_id"),
+                "available_at": now
+            })
+        db.execute(insert(JobModel), rows)
+        db.query(FailedJob).filter(
+            FailedJob.id.in_([failed_job.id for failed_job in failed_jobs])
+        ).delete(synchronize_session=False)
+        return [row["id"] for row in rows]
+    
+    def _scan_failed_jobs(
+        self,
+        db: Session,
+        queue: Optional[str] = None,
+        job_class: Optional[str] = None,
+        after_id: Optional[str] = None,
+        newest_first: bool = False,
+        chunk_size: int = 1000
+    ) -> Iterator[FailedJob]:
+        """Failed jobs in id order, read in keyset chunks."""
+        from database.migrations.create_failed_jobs_table import FailedJob
+        
+        query = db.query(FailedJob)
+        if queue:
+            query = query.filter(FailedJob.queue == queue)
+        if job_class:
+            query = query.filter(FailedJob.job_class == job_class)
+        
+        while True:
+            page = query
+            if after_id is not None:
+                page = page.filter(FailedJob.id < after_id if newest_first else FailedJob.id > after_id)
+            chunk = page.order_by(desc(FailedJob.id) if newest_first else asc(FailedJob.id)).limit(chunk_size).all()
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            after_id = chunk[-1].id
+    
+    def _failure_context(self, failed_job: FailedJob) -> Dict[str, Any]:
+        """The worker's JSON context for a failed job, empty if missing or unreadable."""
+        try:
+            context = json.loads(failed_job.context or "{}")
+        except ValueError:
+            return {}
+        return context if isinstance(context, dict) else {}
+    
+    def _fingerprint(self, failed_job: FailedJob) -> str:
+        return exception_fingerprint(failed_job.job_class, failed_job.exception)
+    
     def delete_failed_job(self, failed_job_id: str) -> bool:
         """Delete a failed job."""
         db = next(get_database())
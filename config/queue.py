@@ -18,7 +18,7 @@ QUEUE_CONFIG: Dict[str, Any] = {
             "table": "jobs",
             "queue": "default",
             "retry_after": 3600,  # 1 hour
-            "after_commit": False,
+            "after_commit": os.getenv("QUEUE_AFTER_COMMIT", "false").lower() == "true",
         },
         
         # Future: Redis connection (when implemented)
@@ -28,7 +28,7 @@ QUEUE_CONFIG: Dict[str, Any] = {
             "queue": "default",
             "retry_after": 3600,
             "block_for": None,
-            "after_commit": False,
+            "after_commit": os.getenv("QUEUE_AFTER_COMMIT", "false").lower() == "true",
         },
         
         # Synchronous connection (immediate execution)
@@ -55,8 +55,64 @@ QUEUE_CONFIG: Dict[str, Any] = {
     
     # Batch job configuration
     "batching": {
-        "driver": "database", 
+        "driver": os.getenv("QUEUE_BATCHING_DRIVER", "database"),  # database or redis (counters)
         "table": "job_batches",
+        "key_prefix": "batch:",
+        "redis": {
+            "host": os.getenv("REDIS_HOST", "localhost"),
+            "port": int(os.getenv("REDIS_PORT", "6379")),
+            "db": int(os.getenv("QUEUE_BATCHING_REDIS_DB", "0")),
+            "password": os.getenv("REDIS_PASSWORD"),
+            "decode_responses": True,
+        },
+    },
+    
+    # Encoding of the jobs table payload column: json or msgpack (needs the
+    # msgpack package). Workers decode both, so it can be switched any time.
+    "payload_format": os.getenv("QUEUE_PAYLOAD_FORMAT", "json"),
+    
+    # Short type codes written to payloads instead of dotted class paths.
+    # Renaming a code strands queued jobs that still carry the old one.
+    "job_types": {
+        "email.send": "app.Jobs.Examples.SendEmailJob.SendEmailJob",
+        "notification.send": "app.Jobs.Examples.SendNotificationJob.SendNotificationJob",
+        "image.process": "app.Jobs.Examples.ProcessImageJob.ProcessImageJob",
+    },
+    
+    # Cluster-wide job rate limits (ThrottleMiddleware, CacheTokenBucket, ...)
+    "rate_limiting": {
+        "store": os.getenv("QUEUE_RATE_LIMIT_STORE", "redis"),  # cache store shared by all workers
+    },
+    
+    # Unique, debounced and non-overlapping jobs
+    "unique": {
+        "store": os.getenv("QUEUE_UNIQUE_STORE", "redis"),  # cache store holding the locks
+        "report_metrics": os.getenv("QUEUE_UNIQUE_METRICS", "true").lower() == "true",
+        "metrics_redis_url": os.getenv("HORIZON_REDIS_URL", "redis://localhost:6379/0"),
+    },
+    
+    # Job counters and timings workers report to Horizon for autoscaling
+    "metrics": {
+        "report": os.getenv("QUEUE_REPORT_METRICS", "true").lower() == "true",
+        "redis_url": os.getenv("HORIZON_REDIS_URL", "redis://localhost:6379/0"),
+    },
+    
+    # Transactional outbox for jobs dispatched after commit
+    "outbox": {
+        "relay": os.getenv("QUEUE_OUTBOX_RELAY", "thread"),  # thread (in each process) or external
+        "batch_size": 500,  # rows handed to the queue driver per pass
+        "poll_interval": 5,  # seconds between passes when nothing commits
+        "max_backoff": 300,  # seconds between retries of an undeliverable row
+    },
+    
+    # Recurring job scheduler
+    "scheduler": {
+        "store": os.getenv("QUEUE_SCHEDULER_STORE", "redis"),  # cache store shared by all nodes
+        "lock": "scheduler:leader",
+        "lease": 30,  # seconds a dead leader holds the lock before another node takes over
+        "catch_up": os.getenv("QUEUE_SCHEDULER_CATCH_UP", "once"),  # skip, once or all
+        "catch_up_grace": 60,  # seconds late a run may be and still fire under "skip"
+        "max_catch_up": 100,  # runs replayed per job under "all"
     },
     
     # Queue priorities (higher number = higher priority)
@@ -16,13 +16,18 @@ DEFAULT_DRIVER = os.getenv('SCOUT_DRIVER', 'database')
 # Configuration for each search engine
 DRIVERS: Dict[str, Dict[str, Any]] = {
     'database': {
-        # Simple database-based search
+        # Full-text search in the application database: FTS5 on SQLite, tsvector on PostgreSQL
         'driver': 'database',
+        'table_prefix': 'scout_',
+        # PostgreSQL text search configuration used to build and query tsvectors
+        'text_search_config': os.getenv('SCOUT_TEXT_SEARCH_CONFIG', 'simple'),
     },
     
     'memory': {
         # In-memory search for development/testing
         'driver': 'memory',
+        # Directory to persist indices in as memory-mapped segments (None keeps them in memory only)
+        'path': os.getenv('SCOUT_MEMORY_PATH'),
     },
     
     'elasticsearch': {
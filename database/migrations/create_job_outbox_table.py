@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.Models.BaseModel import BaseModel
+
+
+class OutboxMessage(BaseModel):
+    """
+    OutboxMessage model for jobs and broadcasts dispatched inside a transaction.
+    Rows are written in the caller's transaction and removed by the outbox relay
+    once they have been handed to the queue driver or broadcaster.
+    """
+    __tablename__ = "job_outbox"
+    
+    # What to deliver: "job" or "broadcast"
+    kind: Mapped[str] = mapped_column(nullable=False, default="job")
+    
+    # Destination
+    connection: Mapped[str] = mapped_column(nullable=False, default="default")
+    queue: Mapped[str] = mapped_column(nullable=False, default="default")
+    
+    # Encoded job payload, or JSON broadcast (channels, event, data)
+    payload: Mapped[str] = mapped_column(nullable=False)
+    
+    # Relay bookkeeping
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(nullable=True)
+    available_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<OutboxMessage(id='{self.id}', kind='{self.kind}', queue='{self.queue}', attempts={self.attempts})>"
@@ -38,6 +38,9 @@ class Job(BaseModel):
     # Connection information
     connection: Mapped[str] = mapped_column(default="default", nullable=False)
     
+    # Batch membership (job_batches.id)
+    batch_id: Mapped[Optional[str]] = mapped_column(nullable=True, index=True)
+    
     def __repr__(self) -> str:
         return f"<Job(id='{self.id}', queue='{self.queue}', job_class='{self.job_class}', attempts={self.attempts})>"
     
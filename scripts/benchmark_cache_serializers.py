@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cache serializers on realistic payloads.
+
+Compares encode/decode time and payload size for every registered
+serializer, with and without compression, on User.to_dict_safe()-shaped
+records and Scout search documents.
+
+Usage:
+    python scripts/benchmark_cache_serializers.py [--iterations N]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Cache.CacheSerializers import CacheSerializer, CacheSerializerRegistry
+
+ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def make_ulid() -> str:
+    """A ULID-shaped string, like the ids stored on models."""
+    return "".join(random.choices(ULID_ALPHABET, k=26))
+
+
+def make_user(index: int) -> Dict[str, Any]:
+    """A record shaped like User.to_dict_safe()."""
+    created_at = datetime.now(timezone.utc) - timedelta(days=random.randint(0, 1000))
+    return {
+        "id": make_ulid(),
+        "name": f"User {index}",
+        "email": f"user{index}@example.com",
+        "is_active": True,
+        "is_verified": index % 3 != 0,
+        "email_verified_at": created_at + timedelta(hours=1) if index % 3 else None,
+        "created_at": created_at,
+        "updated_at": created_at + timedelta(days=random.randint(0, 30)),
+    }
+
+
+def make_document(index: int) -> Dict[str, Any]:
+    """A record shaped like a Scout searchable document."""
+    words = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))) for _ in range(120)]
+    return {
+        "id": make_ulid(),
+        "title": " ".join(words[:8]),
+        "body": " ".join(words),
+        "tags": words[:5],
+        "author_id": make_ulid(),
+        "views": random.randint(0, 100000),
+        "published_at": datetime.now(timezone.utc),
+    }
+
+
+PAYLOADS: Dict[str, Callable[[], Any]] = {
+    "user": lambda: make_user(1),
+    "users x100": lambda: [make_user(i) for i in range(100)],
+    "scout doc": lambda: make_document(1),
+    "scout docs x100": lambda: [make_document(i) for i in range(100)],
+}
+
+
+def candidates() -> List[Tuple[str, CacheSerializer]]:
+    """Every serializer/compression combination available here."""
+    result = []
+    for name in CacheSerializerRegistry.available():
+        for compression in (None, "zlib", "zstd", "lz4"):
+            try:
+                serializer = CacheSerializerRegistry.create(name, compression=compression)
+            except ImportError:
+                continue
+            label = name if compression is None else f"{name}+{compression}"
+            result.append((label, serializer))
+    return result
+
+
+def bench(serializer: CacheSerializer, payload: Any, iterations: int) -> Optional[Tuple[float, float, int]]:
+    """Return (encode µs, decode µs, size bytes), or None if unsupported."""
+    try:
+        data = serializer.serialize(payload)
+    except TypeError:
+        return None
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serializer.serialize(payload)
+    encode = (time.perf_counter() - started) / iterations * 1e6
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serializer.unserialize(data)
+    decode = (time.perf_counter() - started) / iterations * 1e6
+    
+    size = len(data.encode() if isinstance(data, str) else data)
+    return encode, decode, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    random.seed(int(os.getenv("BENCH_SEED", "42")))
+    serializers = candidates()
+    
+    for payload_name, factory in PAYLOADS.items():
+        payload = factory()
+        print(f"\n{payload_name}")
+        print(f"  {'serializer':<18}{'encode µs':>12}{'decode µs':>12}{'bytes':>10}  round-trip")
+        for label, serializer in serializers:
+            result = bench(serializer, payload, args.iterations)
+            if result is None:
+                print(f"  {label:<18}{'unsupported':>34}")
+                continue
+            encode, decode, size = result
+            exact = serializer.unserialize(serializer.serialize(payload)) == payload
+            print(f"  {label:<18}{encode:>12.1f}{decode:>12.1f}{size:>10}  {'exact' if exact else 'lossy'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-job dispatch overhead on no-op jobs.
+
+Measures the work the queue does around a job that does nothing: encoding
+its payload on push, then decoding it, resolving the class, deserializing
+and calling handle() in the worker. The previous path (dotted class path,
+import_module and getattr on every job, JSON) is compared with type codes
+resolved through the job type registry, in JSON and msgpack. No database
+is involved, so the numbers are the per-job CPU cost only.
+
+Usage:
+    python scripts/benchmark_job_dispatch.py [--jobs N] [--repeat R]
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Jobs.Job import ShouldQueue
+from app.Jobs.JobTypeRegistry import JobPayloadCodec, job_types
+from app.Queue.Runners import resolve_job
+
+
+class NoopJob(ShouldQueue):
+    """A job that does nothing, so only dispatch overhead is measured."""
+    
+    def handle(self) -> None:
+        pass
+
+
+def legacy_encode(job: ShouldQueue) -> str:
+    payload = job.serialize()
+    payload["job_class"] = f"{job.__class__.__module__}.{job.__class__.__name__}"
+    return json.dumps(payload)
+
+
+def legacy_dispatch(encoded: str) -> None:
+    # What QueueWorker did for every job before the registry
+    payload = json.loads(encoded)
+    module_path, class_name = payload["job_class"].rsplit(".", 1)
+    job_class = getattr(importlib.import_module(module_path), class_name)
+    job = job_class.deserialize(payload)
+    job.job_id = "bench"
+    job.attempts = 1
+    getattr(job, payload.get("job_method", "handle"))()
+
+
+def codec_encoder(codec: JobPayloadCodec) -> Callable[[ShouldQueue], str]:
+    return lambda job: codec.encode(job.serialize())
+
+
+def registry_dispatch(encoded: str) -> None:
+    job, method = resolve_job(JobPayloadCodec.decode(encoded), "bench", 1)
+    method()
+
+
+def measure(encode: Callable[[ShouldQueue], str], dispatch: Callable[[str], None],
+            jobs: int, repeat: int) -> Tuple[float, float, int]:
+    """Best-of-``repeat`` microseconds per job to encode and to dispatch, and the payload size."""
+    job = NoopJob()
+    encoded = encode(job)
+    encode_times: List[float] = []
+    dispatch_times: List[float] = []
+    
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payloads = [encode(job) for _ in range(jobs)]
+        encode_times.append(time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        for payload in payloads:
+            dispatch(payload)
+        dispatch_times.append(time.perf_counter() - started)
+    
+    return min(encode_times) / jobs * 1e6, min(dispatch_times) / jobs * 1e6, len(encoded)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    job_types.register("bench.noop", NoopJob)
+    
+    variants: Dict[str, Tuple[Callable[[ShouldQueue], str], Callable[[str], None]]] = {
+        "dotted path": (legacy_encode, legacy_dispatch),
+        "code + json": (codec_encoder(JobPayloadCodec("json")), registry_dispatch),
+    }
+    try:
+        variants["code + msgpack"] = (codec_encoder(JobPayloadCodec("msgpack")), registry_dispatch)
+    except ImportError as e:
+        print(f"Skipping msgpack: {e}")
+    
+    results: Dict[str, Any] = {
+        name: measure(encode, dispatch, args.jobs, args.repeat) for name, (encode, dispatch) in variants.items()
+    }
+    baseline = sum(results["dotted path"][:2])
+    
+    print(f"{args.jobs} no-op jobs, best of {args.repeat}")
+    print(f"  {'payload':<16}{'bytes':>7}{'push µs':>10}{'run µs':>10}{'total µs':>10}{'speedup':>9}")
+    for name, (encode_us, dispatch_us, size) in results.items():
+        total = encode_us + dispatch_us
+        print(f"  {name:<16}{size:>7}{encode_us:>10.2f}{dispatch_us:>10.2f}{total:>10.2f}{baseline / total:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark database queue worker throughput.
+
+Seeds a scratch database with no-op jobs and drains it with QueueWorker at
+several prefetch sizes, reporting jobs/sec. prefetch=1 with ack batch 1 is
+the one-job-per-round-trip loop. With --workers > 1 the queue is drained by
+concurrent processes and the processed total shows whether any job ran twice.
+
+Usage:
+    python scripts/benchmark_queue_worker.py [--jobs N] [--workers W] [--prefetch 1,10,50]
+                                             [--database-url URL]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--prefetch", default="1,10,50", help="Comma-separated prefetch sizes")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    return parser.parse_args()
+
+
+args = parse_args()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/queue_bench.db"
+
+from app.Jobs.Job import ShouldQueue
+from app.Queue.Worker import QueueWorker, WorkerOptions
+from config.database import SessionLocal, create_tables, engine
+from database.migrations.create_jobs_table import Job as JobModel
+
+
+class NoopJob(ShouldQueue):
+    """A job that does nothing, so only queue overhead is measured."""
+    
+    def handle(self) -> None:
+        pass
+
+
+class DrainingWorker(QueueWorker):
+    """Stops as soon as the queue is empty instead of sleeping."""
+    
+    def _sleep(self, seconds: int) -> None:
+        self.should_quit = True
+
+
+def seed(count: int) -> None:
+    payload = NoopJob().serialize()
+    payload["job_class"] = f"{__name__}.NoopJob"
+    encoded = json.dumps(payload)
+    available_at = datetime.utcnow() - timedelta(seconds=1)
+    
+    db = SessionLocal()
+    try:
+        db.query(JobModel).delete()
+        db.add_all(
+            JobModel(
+                queue="bench",
+                payload=encoded,
+                job_class=payload["job_class"],
+                job_method="handle",
+                available_at=available_at,
+            )
+            for _ in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def remaining() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(JobModel).count()
+    finally:
+        db.close()
+
+
+def drain(prefetch: int, ack_batch_size: int, results: "multiprocessing.Queue[int]") -> None:
+    engine.dispose(close=False)  # don't share pooled connections across fork
+    worker = DrainingWorker(WorkerOptions(
+        name=f"bench-{os.getpid()}",
+        queue="bench",
+        memory_limit=0,
+        prefetch=prefetch,
+        ack_batch_size=ack_batch_size,
+    ))
+    worker.work()
+    results.put(worker.jobs_processed)
+
+
+def run(prefetch: int, ack_batch_size: int) -> Tuple[float, int, int]:
+    seed(args.jobs)
+    results: "multiprocessing.Queue[int]" = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=drain, args=(prefetch, ack_batch_size, results))
+        for _ in range(args.workers)
+    ]
+    
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    processed = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    
+    return elapsed, processed, remaining()
+
+
+def main() -> None:
+    create_tables()
+    
+    configurations: List[Tuple[int, int]] = [(1, 1)]
+    configurations += [(size, size) for size in map(int, args.prefetch.split(",")) if size > 1]
+    
+    print(f"{args.jobs} jobs, {args.workers} worker(s), {engine.url.get_backend_name()}")
+    print(f"  {'prefetch':>8}{'ack batch':>11}{'seconds':>10}{'jobs/sec':>11}{'processed':>11}{'left':>6}")
+    for prefetch, ack_batch_size in configurations:
+        elapsed, processed, left = run(prefetch, ack_batch_size)
+        print(f"  {prefetch:>8}{ack_batch_size:>11}{elapsed:>10.2f}{processed / elapsed:>11.0f}{processed:>11}{left:>6}")
+
+
+if __name__ == "__main__":
+    main()
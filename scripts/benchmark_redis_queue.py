@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark Redis queue driver push/pop throughput.
+
+Compares the scripted driver (single-job pop and pop_many batches) with
+the previous implementation, which promoted delayed jobs on every pop and
+spent a round-trip per step. Part of each run is pushed as delayed jobs so
+promotion cost shows up.
+
+Usage:
+    python scripts/benchmark_redis_queue.py [--jobs N] [--batch 10,50] [--delayed-ratio 0.2]
+                                            [--redis-url URL | --fake]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Jobs.Job import ShouldQueue
+from app.Queue.Drivers.RedisDriver import RedisQueueDriver
+
+
+class NoopJob(ShouldQueue):
+    """Payload-only job; nothing is executed."""
+    
+    def handle(self) -> None:
+        pass
+
+
+class LegacyRedisQueueDriver(RedisQueueDriver):
+    """The driver's push/pop before the scripted rewrite, kept for comparison."""
+    
+    def push(self, job: ShouldQueue, queue: str = "default") -> str:
+        job_id = self._generate_job_id()
+        job_data = self._serialize_job(job, job_id, queue)
+        if job.options.delay > 0:
+            self.redis.zadd(f"{self.key_prefix}delayed", {job_id: time.time() + job.options.delay})
+        else:
+            self.redis.zadd(f"{self.key_prefix}{queue}", {job_id: -job.options.priority})
+        self.redis.hset(f"{self.key_prefix}jobs", job_id, json.dumps(job_data))
+        return job_id
+    
+    def pop(self, queue: str = "default", timeout: int = 10) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        for job_id, _ in self.redis.zrangebyscore(f"{self.key_prefix}delayed", min=0, max=now, withscores=True):
+            job_data_json = self.redis.hget(f"{self.key_prefix}jobs", job_id)
+            if job_data_json:
+                job_data = json.loads(job_data_json)
+                self.redis.zadd(f"{self.key_prefix}{job_data['queue']}", {job_id: -job_data.get('priority', 0)})
+                self.redis.zrem(f"{self.key_prefix}delayed", job_id)
+        
+        result = self.redis.bzpopmin(f"{self.key_prefix}{queue}", timeout=timeout)
+        if not result:
+            return None
+        _, job_id, _ = result
+        job_data_json = self.redis.hget(f"{self.key_prefix}jobs", job_id)
+        if not job_data_json:
+            return None
+        self._reserve_job(job_id, {})
+        return json.loads(job_data_json)  # type: ignore[no-any-return]
+
+
+def make_driver(cls: type, args: argparse.Namespace) -> RedisQueueDriver:
+    driver: RedisQueueDriver = cls(key_prefix="bench:queue:", promote_interval=0.05)
+    if args.fake:
+        import fakeredis
+        driver._redis = fakeredis.FakeRedis(decode_responses=True)
+    else:
+        import redis
+        driver._redis = redis.Redis.from_url(args.redis_url, decode_responses=True)
+    for key in driver.redis.scan_iter(match="bench:queue:*"):
+        driver.redis.delete(key)
+    return driver
+
+
+def fill(driver: RedisQueueDriver, jobs: int, delayed_ratio: float) -> float:
+    delayed_every = int(1 / delayed_ratio) if delayed_ratio > 0 else 0
+    started = time.perf_counter()
+    for index in range(jobs):
+        job = NoopJob()
+        job.options.priority = index % 5
+        if delayed_every and index % delayed_every == 0:
+            job.options.delay = 1
+        driver.push(job, "bench")
+    return time.perf_counter() - started
+
+
+def drain(pop: Callable[[], List[Any]], expected: int) -> Tuple[float, int]:
+    started = time.perf_counter()
+    popped = 0
+    while popped < expected:
+        popped += len(pop())
+    return time.perf_counter() - started, popped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--batch", default="10,50", help="Comma-separated pop_many sizes")
+    parser.add_argument("--delayed-ratio", type=float, default=0.2)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--fake", action="store_true", help="Use fakeredis instead of a server")
+    args = parser.parse_args()
+    
+    runs: List[Tuple[str, type, Callable[[RedisQueueDriver], Callable[[], List[Any]]]]] = [
+        ("legacy pop", LegacyRedisQueueDriver, lambda d: lambda: [j for j in [d.pop("bench", 1)] if j]),
+        ("scripted pop", RedisQueueDriver, lambda d: lambda: [j for j in [d.pop("bench", 1)] if j]),
+    ]
+    for size in map(int, args.batch.split(",")):
+        runs.append((f"pop_many({size})", RedisQueueDriver, lambda d, n=size: lambda: d.pop_many("bench", n)))
+    
+    print(f"{args.jobs} jobs, {args.delayed_ratio:.0%} delayed, {'fakeredis' if args.fake else args.redis_url}")
+    print(f"  {'driver':<16}{'push/sec':>12}{'pop/sec':>12}")
+    for label, cls, make_pop in runs:
+        driver = make_driver(cls, args)
+        push_seconds = fill(driver, args.jobs, args.delayed_ratio)
+        time.sleep(1.05)  # let the delayed jobs come due
+        pop_seconds, popped = drain(make_pop(driver), args.jobs)
+        print(f"  {label:<16}{args.jobs / push_seconds:>12.0f}{popped / pop_seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark fuzzy term matching for in-memory Scout search.
+
+Compares three ways of finding the indexed words within the AUTO edit
+distance of each query term: the pairwise Levenshtein MemoryEngine used to
+run against every word of every document, the same comparison against each
+distinct term of the dictionary once, and the Levenshtein automaton walk over
+the TermDictionary trie that MemoryEngine now uses. The last two must
+find exactly the same terms; the script checks this.
+
+Usage:
+    python scripts/benchmark_scout_fuzzy.py [--documents N] [--terms N] [--queries N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Scout.TermDictionary import TermDictionary, fuzzy_edits
+
+
+def levenshtein(s1: str, s2: str) -> int:
+    # The implementation MemoryEngine used to call for every word pair
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+    
+    distances = list(range(len(s1) + 1))
+    for i2, c2 in enumerate(s2):
+        distances_ = [i2 + 1]
+        for i1, c1 in enumerate(s1):
+            if c1 == c2:
+                distances_.append(distances[i1])
+            else:
+                distances_.append(1 + min((distances[i1], distances[i1 + 1], distances_[-1])))
+        distances = distances_
+    return distances[-1]
+
+
+def pairwise(documents: List[List[str]], query: str, max_edits: int) -> Dict[str, int]:
+    matches = {}
+    for words in documents:
+        for word in words:
+            distance = levenshtein(query, word)
+            if distance <= max_edits:
+                matches[word] = distance
+    return matches
+
+
+def dictionary_scan(terms: List[str], query: str, max_edits: int) -> Dict[str, int]:
+    matches = {}
+    for term in terms:
+        if abs(len(term) - len(query)) <= max_edits:
+            distance = levenshtein(query, term)
+            if distance <= max_edits:
+                matches[term] = distance
+    return matches
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    position = rng.randrange(len(word))
+    return word[:position] + rng.choice('abcdefghijklmnopqrstuvwxyz') + word[position + 1:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = set()
+    while len(vocabulary) < args.terms:
+        vocabulary.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 12))))
+    terms = sorted(vocabulary)
+    
+    dictionary = TermDictionary()
+    for term in terms:
+        dictionary.add(term)
+    
+    queries = [misspell(rng.choice(terms), rng) for _ in range(args.queries)]
+    documents = [rng.sample(terms, 20) for _ in range(args.documents)]
+    
+    started = time.perf_counter()
+    for query in queries:
+        pairwise(documents, query, fuzzy_edits(query, 'AUTO'))
+    pairwise_ms = (time.perf_counter() - started) / len(queries) * 1000
+    
+    started = time.perf_counter()
+    scanned = [dictionary_scan(terms, query, fuzzy_edits(query, 'AUTO')) for query in queries]
+    scan_ms = (time.perf_counter() - started) / len(queries) * 1000
+    
+    started = time.perf_counter()
+    walked = [dictionary.fuzzy(query, fuzzy_edits(query, 'AUTO')) for query in queries]
+    trie_ms = (time.perf_counter() - started) / len(queries) * 1000
+    
+    if scanned != walked:
+        raise SystemExit("Trie matches differ from a full Levenshtein scan")
+    
+    print(f"{args.queries} misspelled query terms, fuzziness AUTO")
+    print(f"  {'method':<38}{'ms/term':>10}")
+    print(f"  {f'pairwise, {args.documents} docs x 20 words':<38}{pairwise_ms:>10.2f}")
+    print(f"  {f'dictionary scan, {len(terms)} terms':<38}{scan_ms:>10.2f}")
+    print(f"  {f'automaton over trie, {len(terms)} terms':<38}{trie_ms:>10.2f}")
+    print(f"  identical matches: {sum(len(matches) for matches in walked)} terms found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark in-memory Scout search at 10k, 100k and 1M documents.
+
+Compares the full scan MemoryEngine used to run for every query (substring
+checks against each document's concatenated text, plus per-field boost
+checks) with the inverted index it now uses: BM25 over the posting lists of
+the query terms and a heap for the top results. Documents are synthetic,
+with Zipf-distributed words, so common and rare terms both occur. Also
+reports the cost of updating and deleting documents in place.
+
+Usage:
+    python scripts/benchmark_scout_search.py [--sizes 10000,100000,1000000] [--queries N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Scout.InvertedIndex import InvertedIndex
+
+BOOSTS = {'title': 2.0}
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_documents(count: int, vocabulary: List[str], rng: random.Random) -> List[Tuple[str, Dict[str, Any]]]:
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights, k=count * 16)
+    categories = ['books', 'food', 'music', 'games', 'tools']
+    documents = []
+    for i in range(count):
+        chunk = words[i * 16:(i + 1) * 16]
+        documents.append((str(i), {
+            'id': i,
+            'title': ' '.join(chunk[:4]),
+            'body': ' '.join(chunk[4:]),
+            'category': categories[i % len(categories)],
+        }))
+    return documents
+
+
+def legacy_text(data: Dict[str, Any]) -> str:
+    return ' '.join(str(value).lower() for value in data.values())
+
+
+def legacy_search(documents: List[Tuple[str, Dict[str, Any], str]], query: str, k: int) -> List[Tuple[str, float]]:
+    # What MemoryEngine.search did before the index: score every document
+    query_lower = query.lower()
+    words = query_lower.split()
+    results = []
+    for key, data, text in documents:
+        score = 2.0 if query_lower in text else 0.0
+        matched = 0
+        for word in words:
+            if word in text:
+                matched += 1
+                for field, boost in BOOSTS.items():
+                    if word in str(data[field]).lower():
+                        score += boost
+        score += matched / len(words) * 1.5
+        if score > 0:
+            results.append((key, score))
+    results.sort(key=lambda result: result[1], reverse=True)
+    return results[:k]
+
+
+def best_of(repeat: int, run: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    
+    print(f"{args.queries} queries of 1-3 words, top 10, best of {args.repeat}")
+    print(f"  {'documents':>10}{'index s':>9}{'scan ms':>10}{'index ms':>10}{'speedup':>9}{'update µs':>11}{'delete µs':>11}")
+    for size in sizes:
+        documents = make_documents(size, vocabulary, rng)
+        query_rng = random.Random(size)
+        queries = [
+            ' '.join(query_rng.choice(documents)[1]['body'].split()[:query_rng.randint(1, 3)])
+            for _ in range(args.queries)
+        ]
+        
+        index = InvertedIndex()
+        started = time.perf_counter()
+        for key, data in documents:
+            index.add(key, data)
+        build = time.perf_counter() - started
+        
+        def indexed() -> None:
+            for query in queries:
+                index.top(index.score(Counter(index.analyze(query)), BOOSTS), 10)
+        
+        legacy_documents = [(key, data, legacy_text(data)) for key, data in documents]
+        
+        def scanned() -> None:
+            for query in queries:
+                legacy_search(legacy_documents, query, 10)
+        
+        index_ms = best_of(args.repeat, indexed) / len(queries) * 1000
+        scan_ms = best_of(1 if size >= 1000000 else args.repeat, scanned) / len(queries) * 1000
+        del legacy_documents
+        
+        # Incremental maintenance: replace and remove 1000 documents in place
+        changed = documents[:1000]
+        started = time.perf_counter()
+        for key, data in changed:
+            index.add(key, {**data, 'title': data['body']})
+        update_us = (time.perf_counter() - started) / len(changed) * 1e6
+        started = time.perf_counter()
+        for key, _ in changed:
+            index.remove(key)
+        delete_us = (time.perf_counter() - started) / len(changed) * 1e6
+        
+        print(f"  {size:>10}{build:>9.1f}{scan_ms:>10.2f}{index_ms:>10.2f}{scan_ms / index_ms:>8.1f}x"
+              f"{update_us:>11.1f}{delete_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
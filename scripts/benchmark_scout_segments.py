@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark starting a persistent Scout index against rebuilding one.
+
+Without a path, MemoryEngine has to re-index every document after a restart.
+With one, SegmentedIndex reopens its memory-mapped segments instead. For
+each size, the script commits the documents to segments once, then
+compares rebuilding an InvertedIndex from the source documents with
+opening the SegmentedIndex, and the query latency of both. Documents are
+synthetic, with Zipf-distributed words.
+
+Usage:
+    python scripts/benchmark_scout_segments.py [--sizes 10000,100000] [--queries N]
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Scout.InvertedIndex import InvertedIndex
+from app.Scout.Segments import SegmentedIndex
+
+BOOSTS = {'title': 2.0}
+
+
+def make_documents(count: int, vocabulary: List[str], rng: random.Random) -> List[Tuple[str, Dict[str, Any]]]:
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    words = rng.choices(vocabulary, weights, k=count * 16)
+    return [
+        (str(i), {
+            'id': i,
+            'title': ' '.join(words[i * 16:i * 16 + 4]),
+            'body': ' '.join(words[i * 16 + 4:(i + 1) * 16]),
+            'category': ('books', 'food', 'music', 'games', 'tools')[i % 5],
+        })
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = sorted({''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(args.vocabulary)})
+    
+    print(f"{args.queries} queries of 1-3 words, top 10")
+    print(f"  {'documents':>10}{'rebuild s':>11}{'open ms':>9}{'memory ms':>11}{'segments ms':>13}")
+    for size in [int(size) for size in args.sizes.split(",")]:
+        documents = make_documents(size, vocabulary, rng)
+        query_rng = random.Random(size)
+        queries = [
+            ' '.join(query_rng.choice(documents)[1]['body'].split()[:query_rng.randint(1, 3)])
+            for _ in range(args.queries)
+        ]
+        
+        directory = tempfile.mkdtemp()
+        try:
+            writer = SegmentedIndex(directory, buffer_size=size + 1, merge_factor=0)
+            for key, data in documents:
+                writer.add(key, data)
+            writer.commit()
+            
+            # What a restart costs without segments: index everything again
+            started = time.perf_counter()
+            memory = InvertedIndex()
+            for key, data in documents:
+                memory.add(key, data)
+            rebuild = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            reader = SegmentedIndex(directory, merge_factor=0).reader()
+            open_ms = (time.perf_counter() - started) * 1000
+            
+            timings = []
+            for index in (memory, reader):
+                started = time.perf_counter()
+                for query in queries:
+                    index.top(index.score(Counter(index.analyze(query)), BOOSTS), 10)
+                timings.append((time.perf_counter() - started) / len(queries) * 1000)
+        finally:
+            shutil.rmtree(directory)
+        
+        print(f"  {size:>10}{rebuild:>11.2f}{open_ms:>9.2f}{timings[0]:>11.2f}{timings[1]:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
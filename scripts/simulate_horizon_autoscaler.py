@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Simulate the Horizon auto-balancer under bursty load.
+
+Replays a load profile (steady traffic with periodic bursts) against a
+simulated worker pool and feeds the balancer the same metrics QueueMonitor
+reports: pending jobs, completions per minute, average processing time and
+longest wait. The previous pending-count heuristic runs on identical
+arrivals for comparison. New workers take --startup seconds to boot and
+stopped workers finish their current job first.
+
+Usage:
+    python scripts/simulate_horizon_autoscaler.py [--duration 900] [--base-rate 5] [--burst-rate 60]
+                                                  [--burst-every 300] [--burst-length 60]
+                                                  [--service-time 0.5] [--max-shift 1] [--timeline]
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import random
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.Horizon.AutoScaler import AutoScaler
+from app.Horizon.Supervisors import SupervisorConfig
+
+QUEUE = "sim"
+
+Strategy = Callable[[float, int, Dict[str, Any]], int]
+
+
+def legacy_target(pending_jobs: int, current_workers: int, config: SupervisorConfig) -> int:
+    """The balancer's previous estimate: one job per worker per minute."""
+    if pending_jobs == 0:
+        return max(config.min_processes, 1)
+    estimated = min(max(config.min_processes, pending_jobs), config.max_processes)
+    if estimated > current_workers + config.balance_max_shift:
+        return current_workers + config.balance_max_shift
+    if estimated < current_workers - config.balance_max_shift:
+        return max(current_workers - config.balance_max_shift, config.min_processes)
+    return estimated
+
+
+@dataclass
+class Pool:
+    """Workers draining one FIFO queue, simulated job by job."""
+    service_time: float
+    startup: float
+    rng: random.Random
+    queue: Deque[float] = field(default_factory=deque)  # arrival times
+    free_at: List[Tuple[float, int]] = field(default_factory=list)  # heap of (free time, worker)
+    retired: Set[int] = field(default_factory=set)
+    active: int = 0
+    completions: Deque[Tuple[float, float]] = field(default_factory=deque)  # (finished at, service)
+    starts: Deque[Tuple[float, float]] = field(default_factory=deque)  # (started at, waited)
+    waits: List[float] = field(default_factory=list)
+    ids: Any = field(default_factory=itertools.count)
+    
+    def resize(self, target: int, now: float) -> None:
+        while self.active < target:
+            heapq.heappush(self.free_at, (now + self.startup, next(self.ids)))
+            self.active += 1
+        if self.active > target:
+            # Retire the workers that free up soonest; each finishes its current job
+            live = sorted(entry for entry in self.free_at if entry[1] not in self.retired)
+            for _, worker in live[:self.active - target]:
+                self.retired.add(worker)
+            self.active = target
+    
+    def run_until(self, end: float) -> None:
+        while self.free_at:
+            free, worker = self.free_at[0]
+            if worker in self.retired:
+                heapq.heappop(self.free_at)
+                self.retired.discard(worker)
+                continue
+            if not self.queue:
+                return
+            start = max(free, self.queue[0])
+            if start >= end:
+                return
+            heapq.heappop(self.free_at)
+            arrived = self.queue.popleft()
+            service = self.rng.expovariate(1 / self.service_time)
+            self.starts.append((start, start - arrived))
+            self.waits.append(start - arrived)
+            self.completions.append((start + service, service))
+            heapq.heappush(self.free_at, (start + service, worker))
+    
+    def metrics(self, now: float) -> Dict[str, Any]:
+        """What QueueMonitor would report at ``now``."""
+        while self.completions and self.completions[0][0] < now - 300:
+            self.completions.popleft()
+        while self.starts and self.starts[0][0] < now - 120:
+            self.starts.popleft()
+        done = [(at, service) for at, service in self.completions if at <= now]
+        last_minute = sum(1 for at, _ in done if at > now - 60)
+        return {
+            "pending_jobs": sum(1 for arrived in self.queue if arrived <= now),
+            "throughput_per_minute": float(last_minute),
+            "average_processing_time": sum(s for _, s in done) / len(done) if done else 0.0,
+            "longest_wait_time": max((wait for at, wait in self.starts if at <= now), default=0.0),
+        }
+
+
+def arrival_rate(t: float, args: argparse.Namespace) -> float:
+    in_burst = args.burst_every and t % args.burst_every >= args.burst_every - args.burst_length
+    return args.burst_rate if in_burst else args.base_rate
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    # Knuth's method is fine for the per-second means used here
+    threshold, count, product = math.exp(-mean), 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def simulate(name: str, strategy: Strategy, config: SupervisorConfig, args: argparse.Namespace,
+             timeline: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    arrivals = random.Random(args.seed)
+    pool = Pool(args.service_time, args.startup, random.Random(args.seed + 1))
+    pool.resize(config.min_processes, 0.0)
+    worker_seconds = 0.0
+    peak_pending = 0
+    scale_events = 0
+    
+    for second in range(args.duration):
+        count = poisson(arrivals, arrival_rate(second, args))
+        pool.queue.extend(sorted(second + arrivals.random() for _ in range(count)))
+        pool.run_until(second + 1)
+        now = float(second + 1)
+        worker_seconds += pool.active
+        
+        if second % args.interval == 0:
+            metrics = pool.metrics(now)
+            peak_pending = max(peak_pending, metrics["pending_jobs"])
+            target = strategy(now, pool.active, metrics)
+            if target != pool.active:
+                scale_events += 1
+                pool.resize(target, now)
+            timeline.setdefault(second, {"rate": arrival_rate(second, args)})[name] = (
+                metrics["pending_jobs"], pool.active
+            )
+    
+    waits = sorted(pool.waits) or [0.0]
+    return {
+        "jobs": len(pool.waits),
+        "mean wait": sum(waits) / len(waits),
+        "p95 wait": waits[int(len(waits) * 0.95) - 1 if len(waits) > 1 else 0],
+        "max wait": waits[-1],
+        "peak pending": peak_pending,
+        "avg workers": worker_seconds / args.duration,
+        "scale events": scale_events,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duration", type=int, default=900, help="Simulated seconds")
+    parser.add_argument("--base-rate", type=float, default=5.0, help="Jobs/sec between bursts")
+    parser.add_argument("--burst-rate", type=float, default=60.0, help="Jobs/sec during bursts")
+    parser.add_argument("--burst-every", type=int, default=300, help="Seconds between burst starts (0 = none)")
+    parser.add_argument("--burst-length", type=int, default=60)
+    parser.add_argument("--service-time", type=float, default=0.5, help="Mean seconds per job")
+    parser.add_argument("--startup", type=float, default=2.0, help="Seconds for a new worker to boot")
+    parser.add_argument("--interval", type=int, default=5, help="Seconds between balancer runs")
+    parser.add_argument("--min-processes", type=int, default=1)
+    parser.add_argument("--max-processes", type=int, default=40)
+    parser.add_argument("--max-shift", type=int, default=1)
+    parser.add_argument("--cooldown", type=int, default=3)
+    parser.add_argument("--target-wait", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeline", action="store_true", help="Print pending/workers every 15 seconds")
+    args = parser.parse_args()
+    
+    config = SupervisorConfig(
+        name="sim",
+        queue=[QUEUE],
+        min_processes=args.min_processes,
+        max_processes=args.max_processes,
+        balance_max_shift=args.max_shift,
+        balance_cooldown=args.cooldown,
+        balance_target_wait=args.target_wait,
+    )
+    scaler = AutoScaler()
+    
+    strategies: Dict[str, Strategy] = {
+        "pending count": lambda now, current, metrics: legacy_target(metrics["pending_jobs"], current, config),
+        "little's law": lambda now, current, metrics: scaler.balance(
+            config, {QUEUE: current}, {QUEUE: metrics}, now=now
+        )[QUEUE],
+    }
+    
+    timeline: Dict[int, Dict[str, Any]] = {}
+    results = {name: simulate(name, strategy, config, args, timeline) for name, strategy in strategies.items()}
+    
+    bursts = (f"{args.burst_rate:g} jobs/s bursts ({args.burst_length}s every {args.burst_every}s)"
+              if args.burst_every else "no bursts")
+    print(f"{args.duration}s, {args.base_rate:g} jobs/s with {bursts}, {args.service_time:g}s per job, "
+          f"max shift {args.max_shift}, cooldown {args.cooldown}s")
+    print(f"  {'balancer':<15}" + "".join(f"{column:>14}" for column in next(iter(results.values()))))
+    for name, result in results.items():
+        cells = "".join(
+            f"{value:>14.2f}" if isinstance(value, float) else f"{value:>14}" for value in result.values()
+        )
+        print(f"  {name:<15}{cells}")
+    
+    if args.timeline:
+        print(f"\n  {'t':>5}{'jobs/s':>8}" + "".join(f"{name + ' pend/wrk':>24}" for name in strategies))
+        for second, row in sorted(timeline.items()):
+            if second % 15:
+                continue
+            cells = "".join(f"{f'{row[name][0]}/{row[name][1]}':>24}" for name in strategies if name in row)
+            print(f"  {second:>5}{row['rate']:>8g}{cells}")
+
+
+if __name__ == "__main__":
+    main()
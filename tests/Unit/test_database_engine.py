@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+import sqlalchemy
+
+from app.Scout.Engines.DatabaseEngine import DatabaseEngine, _FullTextTable
+from app.Scout.Searchable import Searchable, SearchableConfig
+
+
+class Article(Searchable):
+    __scout_config__ = SearchableConfig(index='articles')
+    
+    def __init__(self, id: int = 0, title: str = '') -> None:
+        self.id = id
+        self.title = title
+    
+    def to_searchable_array(self) -> Dict[str, Any]:
+        return {'id': self.id, 'title': self.title}
+
+
+@pytest.fixture
+def engine() -> DatabaseEngine:
+    # One shared in-memory database, reachable from the engine's worker threads
+    return DatabaseEngine(sqlalchemy.create_engine(
+        'sqlite://', poolclass=sqlalchemy.pool.StaticPool, connect_args={'check_same_thread': False}
+    ))
+
+
+def ids(engine: DatabaseEngine, params: Dict[str, Any]) -> List[int]:
+    return [result.model.id for result in asyncio.run(engine.search(Article, params)).items]
+
+
+def test_full_text_tables_must_implement_the_dialect_parts() -> None:
+    with pytest.raises(TypeError):
+        _FullTextTable(None, 'articles', set(), 'simple')  # type: ignore[abstract,arg-type]
+
+
+def test_ties_are_broken_in_insertion_order(engine: DatabaseEngine) -> None:
+    # String keys would sort "10" before "9"
+    assert asyncio.run(engine.update([Article(id, 'python') for id in range(8, 12)]))
+    
+    assert ids(engine, {'query': 'python', 'limit': 2}) == [8, 9]
+    assert ids(engine, {'query': 'python', 'limit': 2, 'offset': 2}) == [10, 11]
+
+
+def test_fuzziness_prefix_matches_terms_allowed_edits(engine: DatabaseEngine) -> None:
+    assert asyncio.run(engine.update([Article(1, 'haskell'), Article(2, 'go'), Article(3, 'gopher')]))
+    
+    assert ids(engine, {'query': 'haskel'}) == []
+    assert ids(engine, {'query': 'haskel', 'fuzziness': 'AUTO'}) == [1]
+    # AUTO allows no edits to two-letter terms, so they match exactly
+    assert ids(engine, {'query': 'go', 'fuzziness': 'AUTO'}) == [2]
+    assert sorted(ids(engine, {'query': 'go', 'fuzziness': 1})) == [2, 3]
@@ -0,0 +1,26 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from app.Events.Event import Event, EventDispatcher, ShouldBroadcast
+
+
+class OrderShipped(Event, ShouldBroadcast):
+    def broadcast_on(self) -> List[str]:
+        return ["orders"]
+
+
+def test_failed_broadcast_does_not_fail_the_dispatch(monkeypatch: pytest.MonkeyPatch) -> None:
+    dispatcher = EventDispatcher()
+    handled = []
+    dispatcher.listen(OrderShipped, lambda event: handled.append(event))
+    
+    async def failing_broadcast(event: ShouldBroadcast) -> None:
+        raise ConnectionError("broadcaster is down")
+    
+    monkeypatch.setattr(dispatcher, "_broadcast", failing_broadcast)
+    
+    asyncio.run(dispatcher.dispatch(OrderShipped()))
+    
+    assert len(handled) == 1
@@ -0,0 +1,40 @@
+import threading
+from pathlib import Path
+
+from app.Cache.CacheStore import FileCacheStore
+
+
+def test_increment_as_first_write_starts_garbage_collector(tmp_path: Path) -> None:
+    store = FileCacheStore(str(tmp_path), gc_interval=3600)
+    result = []
+    
+    worker = threading.Thread(target=lambda: result.append(store.increment("hits", 2)), daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+    
+    assert result == [2]
+    assert store._gc_thread is not None
+    assert store.decrement("hits") == 1
+
+
+def test_put_if_equals_only_replaces_the_expected_value(tmp_path: Path) -> None:
+    store = FileCacheStore(str(tmp_path), gc_interval=None)
+    store.put("owner", "a")
+    
+    assert not store.put_if_equals("owner", "b", "c")
+    assert store.get("owner") == "a"
+    assert store.put_if_equals("owner", "a", "c", ttl=30)
+    assert store.get("owner") == "c"
+
+
+def test_lock_extend_fails_once_another_owner_holds_the_lock(tmp_path: Path) -> None:
+    store = FileCacheStore(str(tmp_path), gc_interval=None)
+    lock = store.lock("leader", 30)
+    assert lock.acquire(blocking=False)
+    
+    assert lock.extend()
+    
+    store.put("lock:leader", "someone-else", 30)
+    assert not lock.extend()
+    assert not lock.acquired
+    assert store.get("lock:leader") == "someone-else"
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from app.Jobs.JobMetrics import JobMetrics
+
+
+class BrokenRedis:
+    def pipeline(self, transaction: bool = True) -> None:
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture
+def metrics() -> JobMetrics:
+    metrics = JobMetrics(redis_url="redis://unused", enabled=True)
+    metrics.set_connection(fakeredis.FakeRedis())
+    return metrics
+
+
+def minute_key(queue: str) -> str:
+    return f"{JobMetrics.KEY}:{queue}:{datetime.utcnow().strftime('%Y%m%d%H%M')}"
+
+
+def test_record_counts_events_per_minute_hour_and_day(metrics: JobMetrics) -> None:
+    metrics.record("emails", "started", wait_time=1.5)
+    metrics.record("emails", "completed", processing_time=0.25)
+    metrics.record("emails", "completed", processing_time=0.75)
+    
+    now = datetime.utcnow()
+    for key in (minute_key("emails"),
+                f"{JobMetrics.KEY}:emails:hour:{now.strftime('%Y%m%d%H')}",
+                f"{JobMetrics.KEY}:emails:day:{now.strftime('%Y%m%d')}"):
+        assert metrics.redis.hgetall(key) == {b"started": b"1", b"completed": b"2"}
+        assert metrics.redis.ttl(key) > 0
+
+
+def test_record_keeps_timing_samples_the_monitor_reads(metrics: JobMetrics) -> None:
+    metrics.record("emails", "started", wait_time=1.5)
+    metrics.record("emails", "completed", processing_time=0.25)
+    
+    assert [float(v) for v in metrics.redis.lrange(f"{minute_key('emails')}:waits", 0, -1)] == [1.5]
+    assert [float(v) for v in metrics.redis.lrange(f"{minute_key('emails')}:times", 0, -1)] == [0.25]
+
+
+def test_samples_are_capped(metrics: JobMetrics) -> None:
+    for i in range(JobMetrics.SAMPLES + 10):
+        metrics.record("emails", "completed", processing_time=float(i))
+    
+    assert metrics.redis.llen(f"{minute_key('emails')}:times") == JobMetrics.SAMPLES
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    metrics = JobMetrics(redis_url="redis://unused", enabled=False)
+    metrics.set_connection(fakeredis.FakeRedis())
+    
+    metrics.record("emails", "completed")
+    
+    assert metrics.redis.keys("*") == []
+
+
+def test_unreachable_redis_pauses_reporting() -> None:
+    metrics = JobMetrics(redis_url="redis://unused", enabled=True, retry_after=60)
+    metrics.set_connection(BrokenRedis())
+    
+    metrics.record("emails", "completed")  # swallowed
+    
+    healthy = fakeredis.FakeRedis()
+    metrics.set_connection(healthy)
+    metrics.record("emails", "completed")
+    assert healthy.keys("*") == []
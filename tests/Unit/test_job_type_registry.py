@@ -0,0 +1,31 @@
+import pytest
+
+from app.Jobs.Job import Job
+from app.Jobs.JobTypeRegistry import JobTypeRegistry, class_path
+
+
+class Outer:
+    class NestedJob(Job):
+        def handle(self) -> None:
+            pass
+
+
+def test_resolves_nested_classes_from_their_dotted_path() -> None:
+    registry = JobTypeRegistry(types={})
+    
+    assert registry.resolve(class_path(Outer.NestedJob)) is Outer.NestedJob
+
+
+def test_resolves_configured_codes_for_nested_classes() -> None:
+    registry = JobTypeRegistry(types={"tests.nested": class_path(Outer.NestedJob)})
+    
+    assert registry.resolve("tests.nested") is Outer.NestedJob
+
+
+def test_unknown_paths_raise_value_error() -> None:
+    registry = JobTypeRegistry(types={})
+    
+    with pytest.raises(ValueError):
+        registry.resolve(f"{__name__}.Outer.MissingJob")
+    with pytest.raises(ValueError):
+        registry.resolve("no_such_package.jobs.Job")
@@ -0,0 +1,139 @@
+import fakeredis
+import pytest
+
+from app.Cache.CacheStore import RedisCacheStore, RedisCacheLock
+
+
+@pytest.fixture
+def store() -> RedisCacheStore:
+    store = RedisCacheStore(prefix="test:")
+    store.set_connection(fakeredis.FakeRedis())
+    return store
+
+
+def test_put_and_get_round_trip_values(store: RedisCacheStore) -> None:
+    for key, value in {"int": 42, "str": "hello", "dict": {"a": [1, 2]}, "bytes": b"\x01raw", "bool": True}.items():
+        assert store.put(key, value)
+        assert store.get(key) == value
+    
+    assert store.get("missing", "default") == "default"
+
+
+def test_integers_are_stored_as_plain_numbers(store: RedisCacheStore) -> None:
+    store.put("counter", 5)
+    
+    assert store.redis.get("test:counter") == b"5"
+
+
+def test_put_with_ttl_sets_expiry(store: RedisCacheStore) -> None:
+    store.put("key", "value", ttl=30)
+    
+    assert 0 < store.redis.ttl("test:key") <= 30
+
+
+def test_put_with_non_positive_ttl_forgets(store: RedisCacheStore) -> None:
+    store.put("key", "value")
+    
+    assert store.put("key", "other", ttl=0)
+    assert store.get("key") is None
+
+
+def test_many_and_put_many(store: RedisCacheStore) -> None:
+    assert store.put_many({"a": 1, "b": "two"})
+    assert store.put_many({"c": [3]}, ttl=60)
+    
+    assert store.many(["a", "b", "c", "d"]) == {"a": 1, "b": "two", "c": [3], "d": None}
+    assert 0 < store.redis.ttl("test:c") <= 60
+    assert store.many([]) == {}
+
+
+def test_put_many_with_non_positive_ttl_forgets(store: RedisCacheStore) -> None:
+    store.put_many({"a": 1, "b": 2})
+    
+    assert store.put_many({"a": 3, "b": 4}, ttl=0)
+    assert store.many(["a", "b"]) == {"a": None, "b": None}
+
+
+def test_increment_and_decrement(store: RedisCacheStore) -> None:
+    assert store.increment("hits") == 1
+    assert store.increment("hits", 5) == 6
+    assert store.decrement("hits", 2) == 4
+    assert store.get("hits") == 4
+    
+    store.put("existing", 10)
+    assert store.increment("existing") == 11
+
+
+def test_add_only_stores_missing_keys(store: RedisCacheStore) -> None:
+    assert store.add("key", "first", ttl=60)
+    assert not store.add("key", "second", ttl=60)
+    assert store.get("key") == "first"
+
+
+def test_add_with_non_positive_ttl_does_not_store(store: RedisCacheStore) -> None:
+    assert not store.add("key", "value", ttl=0)
+    assert store.get("key") is None
+
+
+def test_values_from_other_clients_are_returned_raw(store: RedisCacheStore) -> None:
+    store.redis.set("test:text", "written elsewhere")
+    store.redis.set("test:binary", b"\xff\xfe")
+    store.redis.set("test:negative", "-12")
+    
+    assert store.get("text") == "written elsewhere"
+    assert store.get("binary") == b"\xff\xfe"
+    assert store.get("negative") == -12
+
+
+def test_lock_is_exclusive_and_released_by_owner(store: RedisCacheStore) -> None:
+    lock = store.lock("job", timeout=10)
+    other = store.lock("job", timeout=10)
+    
+    assert isinstance(lock, RedisCacheLock)
+    assert lock.acquire(blocking=False)
+    assert not other.acquire(blocking=False)
+    assert lock.is_owned_by_current_process()
+    assert not other.release()
+    
+    assert lock.release()
+    assert other.acquire(blocking=False)
+    other.release()
+
+
+def test_lock_key_can_be_read_while_held(store: RedisCacheStore) -> None:
+    lock = store.lock("job", timeout=10)
+    lock.acquire(blocking=False)
+    
+    assert store.get("lock:job") == lock.owner
+    lock.release()
+
+
+def test_lock_extend(store: RedisCacheStore) -> None:
+    lock = store.lock("job", timeout=10)
+    lock.acquire(blocking=False)
+    store.redis.pexpire("test:lock:job", 1000)
+    
+    assert lock.extend()
+    assert store.redis.pttl("test:lock:job") > 1000
+    
+    store.redis.delete("test:lock:job")
+    assert not lock.extend()
+
+
+def test_flush_only_removes_prefixed_keys(store: RedisCacheStore) -> None:
+    store.put("a", 1)
+    store.put("b", 2)
+    store.redis.set("other:c", 3)
+    
+    assert store.flush()
+    assert store.many(["a", "b"]) == {"a": None, "b": None}
+    assert store.redis.get("other:c") == b"3"
+
+
+def test_flush_without_prefix_clears_database() -> None:
+    store = RedisCacheStore()
+    store.set_connection(fakeredis.FakeRedis())
+    store.put("a", 1)
+    
+    assert store.flush()
+    assert store.get("a") is None
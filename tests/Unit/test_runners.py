@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any, Callable, List
+
+from app.Jobs.Job import Job
+from app.Jobs.JobTypeRegistry import job_type
+from app.Jobs.Middleware.JobMiddleware import JobMiddleware
+from app.Queue.Runners import AsyncJobRunner, ProcessJobRunner, ThreadJobRunner, resolve_job
+
+events: List[str] = []
+
+
+class Recording(JobMiddleware):
+    def handle(self, job: Any, next_handler: Callable[[], Any]) -> Any:
+        events.append("before")
+        try:
+            return next_handler()
+        finally:
+            events.append("after")
+
+
+@job_type("tests.async_with_middleware")
+class AsyncJobWithMiddleware(Job):
+    async def handle(self) -> None:
+        await asyncio.sleep(0)
+        events.append("handled")
+    
+    def middleware(self) -> List[JobMiddleware]:
+        return [Recording()]
+
+
+@job_type("tests.failing_async_with_middleware")
+class FailingAsyncJobWithMiddleware(AsyncJobWithMiddleware):
+    async def handle(self) -> None:
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+
+@job_type("tests.async_without_middleware")
+class AsyncJob(Job):
+    async def handle(self) -> None:
+        await asyncio.sleep(0)
+        events.append("handled")
+
+
+@job_type("tests.failing_async_without_middleware")
+class FailingAsyncJob(Job):
+    async def handle(self) -> None:
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+
+def payload(code: str) -> dict:
+    return {"job_class": code, "job_method": "handle", "options": {}}
+
+
+def test_async_runner_awaits_coroutine_handlers_inside_middleware() -> None:
+    events.clear()
+    runner = AsyncJobRunner(concurrency=2)
+    try:
+        future = runner.submit("job-1", payload("tests.async_with_middleware"), 1)
+        assert future.result(timeout=5) is None
+    finally:
+        runner.shutdown()
+    
+    assert events == ["before", "handled", "after"]
+
+
+def test_async_runner_reports_errors_from_coroutine_handlers_behind_middleware() -> None:
+    runner = AsyncJobRunner(concurrency=1)
+    try:
+        future = runner.submit("job-2", payload("tests.failing_async_with_middleware"), 1)
+        assert isinstance(future.exception(timeout=5), ValueError)
+    finally:
+        runner.shutdown()
+
+
+def test_thread_runner_runs_coroutine_handlers_behind_middleware() -> None:
+    events.clear()
+    runner = ThreadJobRunner(concurrency=1)
+    try:
+        future = runner.submit("job-3", payload("tests.async_with_middleware"), 1)
+        assert future.result(timeout=5) is None
+    finally:
+        runner.shutdown()
+    
+    assert events == ["before", "handled", "after"]
+
+
+def test_thread_runner_runs_coroutine_handlers_without_middleware() -> None:
+    events.clear()
+    runner = ThreadJobRunner(concurrency=1)
+    try:
+        future = runner.submit("job-4", payload("tests.async_without_middleware"), 1)
+        assert future.result(timeout=5) is None
+    finally:
+        runner.shutdown()
+    
+    assert events == ["handled"]
+
+
+def test_process_runner_runs_coroutine_handlers_without_middleware() -> None:
+    runner = ProcessJobRunner(concurrency=1)
+    try:
+        future = runner.submit("job-5", payload("tests.failing_async_without_middleware"), 1)
+        runner.wait([future], timeout=5)
+        error = future.exception(timeout=0)
+    finally:
+        runner.shutdown()
+    
+    # Only raised if the coroutine actually ran in the child
+    assert error is not None and "ValueError: boom" in str(error)
+
+
+def test_worker_path_runs_coroutine_handlers_without_middleware() -> None:
+    # QueueWorker._process_job calls the resolved method without a loop
+    events.clear()
+    _, method = resolve_job(payload("tests.async_without_middleware"), "job-6", 1)
+    
+    assert method() is None
+    assert events == ["handled"]
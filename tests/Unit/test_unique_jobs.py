@@ -0,0 +1,79 @@
+from typing import Any, Dict
+
+import fakeredis
+import pytest
+
+from app.Cache.CacheStore import ArrayCacheStore, CacheStore
+from app.Jobs.Job import Job
+from app.Jobs.JobTypeRegistry import job_type
+from app.Jobs.Unique import ShouldBeUnique, suppression_metrics, unique_jobs
+from app.Queue.Drivers.RedisDriver import RedisQueueDriver
+
+store = ArrayCacheStore()
+
+
+@job_type("tests.unique_report")
+class UniqueReport(ShouldBeUnique, Job):
+    def __init__(self, report_id: str = "1") -> None:
+        super().__init__()
+        self.report_id = report_id
+    
+    def unique_id(self) -> str:
+        return self.report_id
+    
+    def unique_via(self) -> CacheStore:
+        return store
+    
+    def handle(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def clean_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    store.flush()
+    monkeypatch.setattr(suppression_metrics, "enabled", False)
+    monkeypatch.setattr(suppression_metrics, "redis_url", "redis://unused")
+
+
+@pytest.fixture
+def driver(monkeypatch: pytest.MonkeyPatch) -> RedisQueueDriver:
+    driver = RedisQueueDriver()
+    driver._redis = fakeredis.FakeRedis(decode_responses=True)
+    
+    def fail(job: Any, job_id: str, queue: str) -> Dict[str, Any]:
+        raise RuntimeError("serialization failed")
+    
+    monkeypatch.setattr(driver, "_serialize_job", fail)
+    return driver
+
+
+def test_release_claim_lets_the_job_be_claimed_again() -> None:
+    assert unique_jobs.claim(UniqueReport(), "job-1") is None
+    assert unique_jobs.claim(UniqueReport(), "job-2") == "job-1"
+    
+    unique_jobs.release_claim(UniqueReport(), "job-1")
+    
+    assert unique_jobs.claim(UniqueReport(), "job-3") is None
+
+
+def test_release_claim_leaves_another_jobs_claim_alone() -> None:
+    assert unique_jobs.claim(UniqueReport(), "job-1") is None
+    
+    unique_jobs.release_claim(UniqueReport(), "job-2")
+    
+    assert unique_jobs.claim(UniqueReport(), "job-3") == "job-1"
+
+
+def test_failed_push_gives_back_its_claim(driver: RedisQueueDriver) -> None:
+    with pytest.raises(RuntimeError):
+        driver.push(UniqueReport())
+    
+    assert unique_jobs.claim(UniqueReport(), "job-1") is None
+
+
+def test_failed_push_many_gives_back_its_claims(driver: RedisQueueDriver) -> None:
+    with pytest.raises(RuntimeError):
+        driver.push_many([UniqueReport("1"), UniqueReport("2")])
+    
+    assert unique_jobs.claim(UniqueReport("1"), "job-1") is None
+    assert unique_jobs.claim(UniqueReport("2"), "job-2") is None
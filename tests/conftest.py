@@ -0,0 +1,15 @@
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Import modules under test directly instead of through their package
+# __init__ files, which pull in the whole application (database models,
+# facades) and aren't needed for unit tests.
+for package in ('app', 'app.Cache', 'app.Queue', 'app.Jobs', 'app.Horizon', 'app.Events', 'app.Scout', 'app.Scout.Engines'):
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [os.path.join(ROOT, *package.split('.'))]
+        sys.modules[package] = module